@@ -15,8 +15,8 @@ if not site.ENABLE_USER_SITE:
     if user_site and user_site not in sys.path:
         sys.path.insert(0, user_site)
 
+import atexit
 import os
-import queue
 import threading
 import platform
 import subprocess
@@ -25,9 +25,20 @@ from typing import Any
 
 from flask import Flask, render_template, jsonify, send_file, Response, request
 
+import config
+
 from utils.dependencies import check_tool, check_all_dependencies, TOOL_DEPENDENCIES
 from utils.process import cleanup_stale_processes
 from utils.sdr import SDRFactory
+from utils.adsb import AircraftStore, build_aircraft_db, open_aircraft_db
+from utils.cleanup import cleanup_manager
+from utils.alerts import AlertEngine
+from utils.history import HistoryWriter
+from utils.message_log import MessageLog
+from utils.pager_stats import AddressStats, MessageDeduplicator
+from utils.sensor_registry import SensorRegistry
+from utils.sse import BroadcastHub, COALESCE, merge_update, message_key
+from utils.timeseries import TimeSeriesStore
 
 
 # Create Flask app
@@ -39,34 +50,67 @@ app = Flask(__name__)
 
 # Pager decoder
 current_process = None
-output_queue = queue.Queue()
+output_queue = BroadcastHub('pager', subscriber_maxlen=config.PAGER_QUEUE_SIZE,
+                            replay_size=config.SSE_REPLAY_SIZE)
 process_lock = threading.Lock()
+pager_dedup = MessageDeduplicator(config.PAGER_DEDUP_WINDOW, config.PAGER_DEDUP_MAX_ENTRIES)
+pager_addresses = AddressStats(config.PAGER_MAX_ADDRESSES)
 
 # RTL_433 sensor
 sensor_process = None
-sensor_queue = queue.Queue()
+sensor_queue = BroadcastHub('sensor', subscriber_maxlen=config.SENSOR_QUEUE_SIZE,
+                            replay_size=config.SSE_REPLAY_SIZE)
 sensor_lock = threading.Lock()
+sensor_schedule = None  # HopSchedule of the last hopping run (for /sensor/hopping)
+sensor_registry = SensorRegistry(config.SENSOR_REPEAT_WINDOW, config.SENSOR_MAX_DEVICES)
 
 # WiFi
 wifi_process = None
-wifi_queue = queue.Queue()
+wifi_queue = BroadcastHub('wifi', subscriber_maxlen=config.WIFI_QUEUE_SIZE,
+                          policy=COALESCE, key=message_key('bssid', 'mac'),
+                          replay_size=config.SSE_REPLAY_SIZE)
 wifi_lock = threading.Lock()
 
 # Bluetooth
 bt_process = None
-bt_queue = queue.Queue()
+bt_queue = BroadcastHub('bluetooth', subscriber_maxlen=config.BT_QUEUE_SIZE,
+                        policy=COALESCE, key=message_key('mac'),
+                        replay_size=config.SSE_REPLAY_SIZE)
 bt_lock = threading.Lock()
 
 # ADS-B aircraft
 adsb_process = None
-adsb_queue = queue.Queue()
+adsb_queue = BroadcastHub('adsb', subscriber_maxlen=config.ADSB_QUEUE_SIZE,
+                          policy=COALESCE, key=message_key('icao'), merge=merge_update,
+                          replay_size=config.SSE_REPLAY_SIZE)
 adsb_lock = threading.Lock()
 
 # Satellite/Iridium
 satellite_process = None
-satellite_queue = queue.Queue()
+satellite_queue = BroadcastHub('satellite', subscriber_maxlen=config.SATELLITE_QUEUE_SIZE,
+                               replay_size=config.SSE_REPLAY_SIZE)
 satellite_lock = threading.Lock()
 
+# Chart time series fed by the sensor, Bluetooth and WiFi streams
+timeseries = TimeSeriesStore(config.TIMESERIES_MAX_SERIES, config.TIMESERIES_MAX_POINTS,
+                             config.TIMESERIES_RETENTION_HOURS * 3600)
+
+# Watchlist alerts, published on their own stream (watchlist loaded in main())
+alert_queue = BroadcastHub('alerts', subscriber_maxlen=config.ALERT_QUEUE_SIZE,
+                           replay_size=config.SSE_REPLAY_SIZE)
+alerts = AlertEngine(config.ALERT_WATCHLIST, alert_queue.put,
+                     cooldown=config.ALERT_COOLDOWN, reload_interval=config.ALERT_RELOAD_INTERVAL)
+
+# Decoded event history (started in main())
+history = HistoryWriter(
+    config.HISTORY_DB,
+    retention_hours=config.HISTORY_RETENTION_HOURS,
+    batch_size=config.HISTORY_BATCH_SIZE,
+    flush_interval=config.HISTORY_FLUSH_INTERVAL,
+    max_pending=config.HISTORY_MAX_PENDING,
+    mode_retention_hours={'pager': config.HISTORY_PAGER_RETENTION_HOURS},
+)
+
 # ============================================
 # GLOBAL STATE DICTIONARIES
 # ============================================
@@ -74,6 +118,17 @@ satellite_lock = threading.Lock()
 # Logging settings
 logging_enabled = False
 log_file_path = 'pager_messages.log'
+# Shared decoded-message log; call message_log.set_path() when log_file_path changes
+message_log = MessageLog(
+    log_file_path,
+    log_format=config.MESSAGE_LOG_FORMAT,
+    max_bytes=config.MESSAGE_LOG_MAX_BYTES,
+    rotate_seconds=config.MESSAGE_LOG_ROTATE_HOURS * 3600,
+    backups=config.MESSAGE_LOG_BACKUPS,
+    compress=config.MESSAGE_LOG_COMPRESS,
+    flush_interval=config.MESSAGE_LOG_FLUSH_INTERVAL,
+)
+atexit.register(message_log.close)
 
 # WiFi state
 wifi_monitor_interface = None
@@ -88,7 +143,12 @@ bt_beacons = {}      # MAC -> beacon info (AirTags, Tiles, iBeacons)
 bt_services = {}     # MAC -> list of services
 
 # Aircraft (ADS-B) state
-adsb_aircraft = {}   # ICAO hex -> aircraft info
+adsb_aircraft = AircraftStore(   # ICAO hex -> Aircraft
+    max_age_seconds=config.ADSB_AIRCRAFT_MAX_AGE,
+    track_points=config.ADSB_TRACK_POINTS,
+    database=open_aircraft_db(config.ADSB_AIRCRAFT_DB, config.ADSB_AIRCRAFT_DB_CACHE),
+)
+cleanup_manager.register(adsb_aircraft)
 
 # Satellite state
 iridium_bursts = []  # List of detected Iridium bursts
@@ -143,6 +203,13 @@ def get_dependencies() -> Response:
     })
 
 
+@app.route('/queues')
+def get_queue_stats() -> Response:
+    """Get per-stream SSE queue counters (enqueued, dropped, high-water mark)."""
+    hubs = [output_queue, sensor_queue, wifi_queue, bt_queue, adsb_queue, satellite_queue, alert_queue]
+    return jsonify({hub.name: hub.stats() for hub in hubs})
+
+
 @app.route('/export/aircraft', methods=['GET'])
 def export_aircraft() -> Response:
     """Export aircraft data as JSON or CSV."""
@@ -154,19 +221,24 @@ def export_aircraft() -> Response:
     if format_type == 'csv':
         output = io.StringIO()
         writer = csv.writer(output)
-        writer.writerow(['icao', 'callsign', 'altitude', 'speed', 'heading', 'lat', 'lon', 'squawk', 'last_seen'])
+        writer.writerow(['icao', 'callsign', 'registration', 'type_code', 'model', 'operator',
+                         'altitude', 'speed', 'heading', 'lat', 'lon', 'squawk', 'last_seen'])
 
         for icao, ac in adsb_aircraft.items():
             writer.writerow([
                 icao,
                 ac.get('callsign', ''),
+                ac.get('registration', ''),
+                ac.get('type_code', ''),
+                ac.get('model', ''),
+                ac.get('operator', ''),
                 ac.get('altitude', ''),
                 ac.get('speed', ''),
                 ac.get('heading', ''),
                 ac.get('lat', ''),
                 ac.get('lon', ''),
                 ac.get('squawk', ''),
-                ac.get('lastSeen', '')
+                __import__('datetime').datetime.utcfromtimestamp(ac.last_seen).isoformat()
             ])
 
         response = Response(output.getvalue(), mimetype='text/csv')
@@ -175,7 +247,7 @@ def export_aircraft() -> Response:
     else:
         return jsonify({
             'timestamp': __import__('datetime').datetime.utcnow().isoformat(),
-            'aircraft': list(adsb_aircraft.values())
+            'aircraft': adsb_aircraft.to_list()
         })
 
 
@@ -290,7 +362,6 @@ def kill_all() -> Response:
 def main() -> None:
     """Main entry point."""
     import argparse
-    import config
 
     parser = argparse.ArgumentParser(
         description='INTERCEPT - Signal Intelligence Platform',
@@ -318,8 +389,24 @@ def main() -> None:
         action='store_true',
         help='Check dependencies and exit'
     )
+    parser.add_argument(
+        '--import-aircraft-db',
+        metavar='CSV',
+        help=f'Build the aircraft registration database from a CSV export and exit '
+             f'(written to {config.ADSB_AIRCRAFT_DB})'
+    )
     args = parser.parse_args()
 
+    # Import aircraft database only
+    if args.import_aircraft_db:
+        try:
+            count = build_aircraft_db(args.import_aircraft_db, config.ADSB_AIRCRAFT_DB)
+        except (OSError, ValueError) as e:
+            print(f"Import failed: {e}")
+            sys.exit(1)
+        print(f"Imported {count} aircraft into {config.ADSB_AIRCRAFT_DB}")
+        sys.exit(0)
+
     # Check dependencies only
     if args.check_deps:
         results = check_all_dependencies()
@@ -347,6 +434,18 @@ def main() -> None:
     from routes import register_blueprints
     register_blueprints(app)
 
+    # Expire stale entries from registered stores (ADS-B aircraft)
+    cleanup_manager.start()
+
+    # Watchlist alerts; the watchlist file is reloaded when edited
+    alerts.start()
+    atexit.register(alerts.stop)
+
+    # Persist decoded events; pending ones are written on exit
+    if config.HISTORY_ENABLED:
+        history.start()
+        atexit.register(history.stop)
+
     print(f"Open http://localhost:{args.port} in your browser")
     print()
     print("Press Ctrl+C to stop")
@@ -0,0 +1 @@
+"""Throughput and memory benchmarks. Run modules directly, e.g. python -m benchmarks.bench_sbs"""
@@ -0,0 +1,82 @@
+"""
+ADS-B SSE payload benchmark: full aircraft updates vs deltas.
+
+Usage:
+    python -m benchmarks.bench_adsb_deltas [capture_file]
+
+Replays a Beast/SBS capture (or a synthetic SBS session with 300 aircraft
+at ~1000 msgs/s) through an AircraftStore, publishing once per second of
+feed time as the ADS-B route does, and compares the JSON bytes of sending
+every changed aircraft in full against deltas with a keyframe every 10 s.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+
+from benchmarks.feeds import synthetic_sbs_feed
+from utils.adsb import AircraftStore, BeastParser, SBSParser
+from utils.adsb.capture import CaptureReader
+
+KEYFRAME_INTERVAL = 10
+
+
+def timed_messages(path: str | None):
+    """Yield (feed second, icao, updates)."""
+    if path:
+        reader = CaptureReader(path)
+        parser = BeastParser() if reader.feed_format == 'beast' else SBSParser()
+        first = None
+        for timestamp, data in reader:
+            first = timestamp if first is None else first
+            for icao, updates in parser.feed(data):
+                yield int(timestamp - first), icao, updates
+    else:
+        for i, (icao, updates) in enumerate(SBSParser().feed(synthetic_sbs_feed())):
+            yield i // 1000, icao, updates
+
+
+def run(path: str | None) -> None:
+    full_store = AircraftStore(track_points=0)
+    delta_store = AircraftStore(track_points=0)
+    full_bytes = delta_bytes = 0
+    pending: set[str] = set()
+    second = 0
+
+    def publish(second: int) -> tuple[int, int]:
+        full = sum(len(json.dumps({'type': 'aircraft', **full_store.get(icao).to_dict()})) for icao in pending)
+        if second % KEYFRAME_INTERVAL == 0:
+            delta = sum(len(json.dumps({'type': 'aircraft', 'keyframe': True, **ac}))
+                        for ac in delta_store.keyframe())
+        else:
+            delta = 0
+            for icao in pending:
+                update = delta_store.take_delta(icao)
+                if update is not None:
+                    delta += len(json.dumps({'type': 'aircraft', **update}))
+        pending.clear()
+        return full, delta
+
+    for feed_second, icao, updates in timed_messages(path):
+        if feed_second != second:
+            full, delta = publish(second)
+            full_bytes += full
+            delta_bytes += delta
+            second = feed_second
+        full_store.apply(icao, updates, float(feed_second))
+        delta_store.apply(icao, updates, float(feed_second))
+        pending.add(icao)
+
+    full, delta = publish(second)
+    full_bytes += full
+    delta_bytes += delta
+    seconds = second + 1
+    print(f"{seconds} s of feed, {len(full_store)} aircraft")
+    print(f"  full updates: {full_bytes / seconds / 1024:,.1f} KB/s")
+    print(f"  deltas + {KEYFRAME_INTERVAL} s keyframes: {delta_bytes / seconds / 1024:,.1f} KB/s"
+          f" ({100 * (1 - delta_bytes / full_bytes):.0f}% smaller)")
+
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,85 @@
+"""
+Aircraft state memory and update benchmark.
+
+Usage:
+    python -m benchmarks.bench_aircraft_store [aircraft]
+
+Builds a table of fully populated aircraft (default 5000, a long day near a
+busy airport without expiry) from a synthetic SBS feed, once as the plain
+dict of dicts the ADS-B route used to keep and once as an AircraftStore
+(without and with position history), and reports traced memory per
+aircraft and update throughput.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks.feeds import synthetic_sbs_feed
+from utils.adsb import NUMPY_AVAILABLE, AircraftStore, SBSParser
+
+
+def decode(feed: bytes) -> list[tuple[str, dict]]:
+    parser = SBSParser()
+    return list(parser.feed(feed))
+
+
+def dict_table(messages: list[tuple[str, dict]]) -> dict[str, dict]:
+    table: dict[str, dict] = {}
+    for icao, updates in messages:
+        aircraft = table.get(icao)
+        if aircraft is None:
+            aircraft = table[icao] = {'icao': icao}
+        aircraft.update(updates)
+    return table
+
+
+def store_table(messages: list[tuple[str, dict]], track_points: int = 0) -> AircraftStore:
+    store = AircraftStore(track_points=track_points)
+    now = time.time()
+    for icao, updates in messages:
+        store.apply(icao, updates, now)
+    return store
+
+
+def store_with_history(messages: list[tuple[str, dict]]) -> AircraftStore:
+    return store_table(messages, track_points=128)
+
+
+def measure(build, messages: list[tuple[str, dict]]) -> tuple[float, float]:
+    """Return (bytes retained by the table, seconds to build it)."""
+    start = time.perf_counter()
+    build(messages)
+    elapsed = time.perf_counter() - start
+
+    # Separate traced run: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    table = build(messages)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return size, elapsed
+
+
+def run(aircraft: int) -> None:
+    messages = decode(synthetic_sbs_feed(messages=aircraft * 40, aircraft=aircraft))
+    # Beast feeds also carry vertical rate, squawk and signal level
+    messages += [
+        (icao, {'vertical_rate': -64 * i, 'squawk': f'{1000 + i % 6000:04d}', 'rssi': -30.0 + i % 200 / 10})
+        for i, icao in enumerate({icao for icao, _ in messages})
+    ]
+    print(f"{len(messages)} messages for {aircraft} aircraft")
+
+    builds = [('dict of dicts', dict_table), ('AircraftStore', store_table)]
+    if NUMPY_AVAILABLE:
+        builds.append(('+ 128 pt track', store_with_history))
+    for name, build in builds:
+        size, elapsed = measure(build, messages)
+        print(f"{name:>14}: {size / aircraft:,.0f} bytes/aircraft,"
+              f" {len(messages) / elapsed:,.0f} updates/s")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
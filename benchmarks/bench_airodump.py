@@ -0,0 +1,110 @@
+"""
+airodump-ng CSV ingest benchmark.
+
+Usage:
+    python -m benchmarks.bench_airodump [networks] [rewrites]
+
+Simulates a dense office: networks access points (default 600) and half
+as many clients, with airodump-ng rewriting its CSV every 2 s for
+rewrites passes (default 150, five minutes). Every pass moves beacon and
+packet counters, last-seen times and power by a few dB; a few rows per pass
+change channel or probes, and some devices come and go.
+
+Compares the old loop (re-parse everything, send every network as an
+update) with AirodumpIngest, in SSE events per second and parse time per
+rewrite.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from utils.airodump import AirodumpIngest, parse_airodump_text
+
+INTERVAL = 2.0
+NETWORK_HEADER = ('BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, Authentication, '
+                  'Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key')
+CLIENT_HEADER = 'Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs'
+
+
+def mac(rng: random.Random) -> str:
+    return ':'.join(f'{rng.randrange(256):02X}' for _ in range(6))
+
+
+def stamp(t: float) -> str:
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))
+
+
+def rewrites(count: int, passes: int):
+    """Yield successive CSV contents."""
+    rng = random.Random(11)
+    start = time.time() - passes * INTERVAL
+    networks = [{'bssid': mac(rng), 'channel': rng.choice((1, 6, 11, 36, 44, 149)), 'power': rng.randint(-90, -30),
+                 'beacons': 0, 'essid': f'Corp-{i % 40}', 'away': False} for i in range(count)]
+    clients = [{'mac': mac(rng), 'power': rng.randint(-90, -40), 'packets': 0, 'probes': 'Corp-1',
+                'bssid': rng.choice(networks)['bssid'], 'away': False} for _ in range(count // 2)]
+    for n in range(passes):
+        now = start + n * INTERVAL
+        for net in networks:
+            if rng.random() < 0.002:
+                net['away'] = not net['away']
+            if not net['away']:
+                net['beacons'] += rng.randint(15, 25)
+                net['power'] = max(-95, min(-20, net['power'] + rng.randint(-2, 2)))
+                net['seen'] = now
+                if rng.random() < 0.002:
+                    net['channel'] = rng.choice((1, 6, 11))
+        for cl in clients:
+            if not cl['away']:
+                cl['packets'] += rng.randint(0, 10)
+                cl['power'] = max(-95, min(-20, cl['power'] + rng.randint(-2, 2)))
+                cl['seen'] = now
+                if rng.random() < 0.005:
+                    cl['probes'] += f',Guest-{rng.randrange(9)}'
+        lines = ['', NETWORK_HEADER]
+        for net in networks:
+            lines.append(f"{net['bssid']}, {stamp(start)}, {stamp(net.get('seen', start))}, {net['channel']:>2}, 54, "
+                         f"WPA2, CCMP, PSK, {net['power']:>3}, {net['beacons']:>8}, 0, 0.  0.  0.  0, "
+                         f"{len(net['essid']):>3}, {net['essid']}, ")
+        lines += ['', CLIENT_HEADER]
+        for cl in clients:
+            lines.append(f"{cl['mac']}, {stamp(start)}, {stamp(cl.get('seen', start))}, {cl['power']:>3}, "
+                         f"{cl['packets']:>8}, {cl['bssid']}, {cl['probes']}")
+        yield '\r\n'.join(lines + ['', ''])
+
+
+def run(count: int, passes: int) -> None:
+    contents = list(rewrites(count, passes))
+    print(f"{count} networks, {count // 2} clients, {passes} rewrites every {INTERVAL:.0f} s "
+          f"({len(contents[-1]) / 1024:.0f} KiB each)")
+
+    # Old loop: every network re-sent as new/update, clients only when new
+    start = time.perf_counter()
+    events = 0
+    known_clients: set[str] = set()
+    for content in contents:
+        networks, clients = parse_airodump_text(content)
+        events += len(networks)
+        events += len(clients.keys() - known_clients)
+        known_clients |= clients.keys()
+    elapsed = time.perf_counter() - start
+    print(f"  re-parse + resend  {events / (passes * INTERVAL):>7.1f} events/s  {elapsed / passes * 1000:>6.2f} ms/rewrite")
+
+    ingest = AirodumpIngest('unused', stale_after=60)
+    start = time.perf_counter()
+    counts = {'new': 0, 'update': 0, 'remove': 0}
+    for content in contents:
+        for change in ingest.apply(content):
+            if change.action:
+                counts[change.action] += 1
+    elapsed = time.perf_counter() - start
+    steady = sum(counts.values()) - count - count // 2
+    print(f"  incremental        {sum(counts.values()) / (passes * INTERVAL):>7.1f} events/s  "
+          f"{elapsed / passes * 1000:>6.2f} ms/rewrite  ({counts}, {steady / (passes * INTERVAL):.1f}/s after the first pass)")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 600,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 150)
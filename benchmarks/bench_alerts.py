@@ -0,0 +1,90 @@
+"""
+Watchlist alert matching benchmark.
+
+Usage:
+    python -m benchmarks.bench_alerts [keywords] [messages]
+
+Builds a watchlist of keywords (default 5000) and checks messages (default
+20,000) synthetic pager messages against it, comparing a per-message loop
+over the keyword list (substring test plus the same word-boundary rule)
+with the Aho-Corasick automaton in AlertEngine. Also times the ADS-B path
+(ICAO and squawk set lookups) per update. Both keyword matchers must
+report the same matches.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import sys
+import time
+
+from utils.alerts import AhoCorasick, AlertEngine
+
+WORDS = (
+    'fire alarm ambulance respond call station engine ladder medic unit dispatch cardiac '
+    'arrest fall injury structure smoke investigate commercial residential street road '
+    'avenue north south east west priority code red amber green routine transfer patient'
+).split()
+
+
+def naive_find(keywords: list[str], text: str) -> list[str]:
+    """Check every keyword against the message in turn."""
+    folded = text.casefold()
+    found = []
+    for keyword in keywords:
+        if keyword in folded and re.search(r'(?<!\w)' + re.escape(keyword) + r'(?!\w)', folded):
+            found.append(keyword)
+    return found
+
+
+def run(keyword_count: int, message_count: int) -> None:
+    rng = random.Random(3)
+    keywords = [f'{rng.choice(WORDS)}{rng.randint(0, 99999)}' for _ in range(keyword_count - 20)]
+    keywords += [f'{a} {b}' for a, b in zip(rng.sample(WORDS, 10), rng.sample(WORDS, 10))]
+    keywords += rng.sample(WORDS, 10)
+    keywords = list(dict.fromkeys(keywords))
+    messages = []
+    for _ in range(message_count):
+        words = rng.choices(WORDS, k=rng.randint(4, 14))
+        if rng.random() < 0.05:
+            words.append(rng.choice(keywords))
+        messages.append(' '.join(words).upper())
+
+    start = time.perf_counter()
+    automaton = AhoCorasick(keywords)
+    build = time.perf_counter() - start
+    print(f"{len(keywords):,} keywords, {len(messages):,} messages; automaton built in {build * 1000:.0f} ms")
+
+    sample = messages[:min(len(messages), 2000)]
+    start = time.perf_counter()
+    expected = [sorted(naive_find(keywords, m)) for m in sample]
+    naive = (time.perf_counter() - start) / len(sample)
+    print(f"  naive loop       {1 / naive:>12,.0f} msg/s  ({naive * 1e6:,.0f} us/msg, first {len(sample):,})")
+
+    start = time.perf_counter()
+    results = [automaton.find(m) for m in messages]
+    elapsed = time.perf_counter() - start
+    print(f"  Aho-Corasick     {len(messages) / elapsed:>12,.0f} msg/s  ({elapsed / len(messages) * 1e6:,.1f} us/msg)")
+
+    mismatches = sum(sorted(r) != e for r, e in zip(results, expected))
+    matched = sum(bool(r) for r in results)
+    print(f"  {matched:,} messages matched, {mismatches} disagreements with the naive loop")
+
+    engine = AlertEngine(None, lambda alert: None)
+    engine.update({'icao': [f'{rng.randrange(1 << 24):06X}' for _ in range(keyword_count)],
+                   'squawks': ['7500', '7600', '7700']}, save=False)
+    updates = [(f'{rng.randrange(1 << 24):06X}', {'altitude': 30000, 'squawk': str(rng.randint(1000, 7777))})
+               for _ in range(200_000)]
+    start = time.perf_counter()
+    for icao, update in updates:
+        engine.check_aircraft(icao, update, 0.0)
+    elapsed = time.perf_counter() - start
+    print(f"  ADS-B checks     {len(updates) / elapsed:>12,.0f} updates/s ({engine.alerts} alerts)")
+    if mismatches:
+        sys.exit('Aho-Corasick and the naive loop disagree')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20_000)
@@ -0,0 +1,88 @@
+"""
+Wideband pager channelizer benchmark.
+
+Usage:
+    python -m benchmarks.bench_channelizer [channels] [seconds]
+
+Feeds seconds (default 5) of synthetic 2.4 Msps 8-bit IQ through
+PagerChannelizer in 256 KiB reads (as ChannelizerGroup does) and reports
+the real-time factor for 1..channels (default 8) channels, next to a
+direct per-channel receiver (mix the full-rate stream down, apply the same
+prototype FIR with np.convolve, decimate). Above 1.0x the receiver keeps
+up with a live rtl_sdr.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+
+from utils.channelizer import (
+    DEFAULT_CUTOFF_HZ,
+    DEFAULT_NUM_BINS,
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_TAPS_PER_BIN,
+    FMDemodulator,
+    PagerChannelizer,
+    iq_from_u8,
+    prototype_filter,
+)
+
+CENTER = 930_250_000
+CHUNK = 262_144
+
+
+def synthetic_iq(seconds: float) -> bytes:
+    rng = np.random.default_rng(1)
+    return rng.integers(96, 160, int(2 * DEFAULT_SAMPLE_RATE * seconds), dtype=np.uint8).tobytes()
+
+
+def channel_list(count: int) -> list[float]:
+    return [CENTER + 12_500 * (7 + 11 * i) * (-1) ** i for i in range(count)]
+
+
+def run_channelizer(raw: bytes, channels: list[float]) -> float:
+    receiver = PagerChannelizer(channels, center_hz=CENTER)
+    start = time.perf_counter()
+    for i in range(0, len(raw), CHUNK):
+        receiver.process(raw[i:i + CHUNK])
+    return time.perf_counter() - start
+
+
+def run_direct(raw: bytes, channels: list[float]) -> float:
+    """Mix, filter and decimate the full-rate stream separately for each channel."""
+    taps = prototype_filter(DEFAULT_NUM_BINS * DEFAULT_TAPS_PER_BIN, DEFAULT_CUTOFF_HZ, DEFAULT_SAMPLE_RATE)
+    decimation = DEFAULT_NUM_BINS // 2
+    demods = [FMDemodulator(DEFAULT_SAMPLE_RATE / decimation) for _ in channels]
+    position = 0
+    start = time.perf_counter()
+    for i in range(0, len(raw), CHUNK):
+        iq = iq_from_u8(raw[i:i + CHUNK])
+        t = (position + np.arange(len(iq))) / DEFAULT_SAMPLE_RATE
+        position += len(iq)
+        for freq, demod in zip(channels, demods):
+            mixed = iq * np.exp(-2j * np.pi * (freq - CENTER) * t).astype(np.complex64)
+            demod.process(np.convolve(mixed, taps, mode='same')[::decimation])
+    return time.perf_counter() - start
+
+
+def run(max_channels: int, seconds: float) -> None:
+    raw = synthetic_iq(seconds)
+    print(f"{seconds:g} s of {DEFAULT_SAMPLE_RATE / 1e6:g} Msps IQ, {DEFAULT_NUM_BINS} bins, "
+          f"{DEFAULT_NUM_BINS * DEFAULT_TAPS_PER_BIN} tap prototype")
+    for count in sorted({1, 2, 4, max_channels}):
+        if count > max_channels:
+            continue
+        channels = channel_list(count)
+        bank = run_channelizer(raw, channels)
+        # The direct receiver is slow; time one second of input and scale
+        direct = run_direct(raw[:2 * DEFAULT_SAMPLE_RATE], channels) * seconds
+        print(f"  {count} channel(s): filter bank {seconds / bank:6.2f}x real time   "
+              f"direct {seconds / direct:6.2f}x real time")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5.0)
@@ -0,0 +1,191 @@
+"""
+Live 802.11 frame parser benchmark.
+
+Usage:
+    python -m benchmarks.bench_dot11 [capture.pcap]
+    python -m benchmarks.bench_dot11 --synthetic [networks] [seconds]
+
+With a capture (classic pcap, radiotap or plain 802.11, e.g. from
+`tcpdump -i wlan0mon -w office.pcap` or airodump-ng's -01.cap), replays it
+through PcapTail and FrameTracker in the chunks a growing file would be
+read in. Without one, records a synthetic dense office to a temporary file:
+networks access points (default 600) beaconing ten times a second with
+wandering signal, half as many clients sending data frames and probes, and
+a few handshakes, for seconds of air time (default 20).
+
+Reports parse throughput (frames/s against the capture's own frame rate),
+events sent, and the delay from a device's first frame to its 'new' event:
+the frame reader polls every WIFI_FRAME_INTERVAL, against the CSV path's
+airodump-ng write interval (1 s) plus the WIFI_UPDATE_INTERVAL poll.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from config import WIFI_FRAME_INTERVAL, WIFI_UPDATE_INTERVAL
+from utils.airodump import AirodumpIngest
+from utils.dot11 import FrameTracker, PcapReader, PcapTail, parse_frame
+
+AIRODUMP_WRITE_INTERVAL = 1.0
+RSN = bytes.fromhex('0100' '000fac04' '0100' '000fac04' '0100' '000fac02' '0000')
+EAPOL = (0x008a, 0x010a, 0x13ca, 0x030a)
+
+
+def mac(rng: random.Random, local: bool = False) -> bytes:
+    first = rng.randrange(256) & 0xFC | (0x02 if local else 0)
+    return bytes([first] + [rng.randrange(256) for _ in range(5)])
+
+
+def radiotap(signal: int, freq: int) -> bytes:
+    fields = struct.pack('<BxHHb', 0, freq, 0x00a0, signal)
+    return struct.pack('<BBHI', 0, 0, 8 + len(fields), 1 << 1 | 1 << 3 | 1 << 5) + fields
+
+
+def synthetic(path: str, count: int, seconds: float) -> None:
+    """Write a radiotap capture of a busy office."""
+    rng = random.Random(25)
+    start = 1_700_000_000.0
+    aps = []
+    for i in range(count):
+        bssid = mac(rng)
+        channel = rng.choice((1, 6, 11))
+        body = (b'\x00' * 8 + struct.pack('<HH', 100, 0x0411) + bytes([0, len(f'Corp-{i % 40}')])
+                + f'Corp-{i % 40}'.encode() + bytes([1, 8]) + b'\x82\x84\x8b\x96\x24\x30\x48\x6c'
+                + bytes([3, 1, channel]) + bytes([5, 4, 0, 1, 0, 0]) + bytes([48, len(RSN)]) + RSN
+                + bytes([45, 26]) + b'\x00' * 26 + bytes([61, 22]) + b'\x00' * 22)
+        frame = b'\x80\x00\x00\x00' + b'\xff' * 6 + bssid + bssid + b'\x00\x00' + body
+        aps.append({'frame': frame, 'bssid': bssid, 'freq': 2407 + 5 * channel,
+                    'signal': rng.randint(-90, -30), 'offset': rng.random() * 0.1})
+    clients = [{'mac': mac(rng, local=True), 'ap': rng.choice(aps), 'signal': rng.randint(-90, -40),
+                'offset': rng.random()} for _ in range(count // 2)]
+
+    records = []
+    ticks = int(seconds * 10)
+    for tick in range(ticks):
+        base = start + tick * 0.1
+        for ap in aps:
+            if tick % 10 == 0:
+                ap['signal'] = max(-95, min(-20, ap['signal'] + rng.randint(-2, 2)))
+            records.append((base + ap['offset'], radiotap(ap['signal'] + rng.randint(-3, 3), ap['freq']) + ap['frame']))
+        if tick % 2 == 0:
+            for cl in clients:
+                ap = cl['ap']
+                header = b'\x88\x01\x00\x00' + ap['bssid'] + cl['mac'] + ap['bssid'] + b'\x00\x00\x00\x00'
+                records.append((base + cl['offset'] * 0.2,
+                                radiotap(cl['signal'] + rng.randint(-3, 3), ap['freq']) + header
+                                + b'\xaa\xaa\x03\x00\x00\x00\x08\x00' + b'\x45' * 60))
+        for cl in rng.sample(clients, max(1, len(clients) // 200)):
+            probe = (b'\x40\x00\x00\x00' + b'\xff' * 6 + cl['mac'] + b'\xff' * 6 + b'\x00\x00'
+                     + bytes([0, 6]) + f'Home-{rng.randrange(5)}'.encode())
+            records.append((base + rng.random() * 0.1, radiotap(cl['signal'], 2437) + probe))
+        if tick % 50 == 25:
+            cl = rng.choice(clients)
+            ap = cl['ap']
+            for n, info in enumerate(EAPOL):
+                to_ap = n % 2 == 1
+                addrs = ap['bssid'] + cl['mac'] if to_ap else cl['mac'] + ap['bssid']
+                frame = (bytes([0x88, 0x01 if to_ap else 0x02, 0, 0]) + addrs + ap['bssid'] + b'\x00\x00\x00\x00'
+                         + b'\xaa\xaa\x03\x00\x00\x00\x88\x8e' + bytes([2, 3, 0, 95, 2])
+                         + struct.pack('>H', info) + b'\x00' * 93)
+                records.append((base + 0.01 * n, radiotap(cl['signal'], ap['freq']) + frame))
+
+    records.sort(key=lambda r: r[0])
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 127))
+        for ts, frame in records:
+            f.write(struct.pack('<IIII', int(ts), int(ts % 1 * 1e6), len(frame), len(frame)) + frame)
+
+
+def run(path: str) -> None:
+    reader = PcapReader()
+    with open(path, 'rb') as f:
+        frames = reader.feed(f.read())
+    if not frames:
+        print('No frames in capture')
+        return
+    air_time = max(frames[-1][0] - frames[0][0], 1e-9)
+    print(f"{len(frames)} frames over {air_time:.1f} s of air time ({len(frames) / air_time:.0f} frames/s, "
+          f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB, link type {reader.linktype})")
+
+    # Replay as a growing file: each read picks up WIFI_FRAME_INTERVAL worth of frames
+    offsets = []
+    offset = 24
+    for ts, frame in frames:
+        offset += 16 + len(frame)
+        offsets.append((ts, offset))
+    tail_path = path + '.tail'
+    ingest = AirodumpIngest('unused')
+    tracker = FrameTracker(ingest)
+    tail = PcapTail(tail_path)
+    delays = []
+    counts = {'new': 0, 'update': 0}
+    handshakes = 0
+    elapsed = 0.0
+    try:
+        with open(path, 'rb') as src, open(tail_path, 'wb') as dst:
+            dst.write(src.read(24))
+            written = 24
+            index = 0
+            poll = frames[0][0] + WIFI_FRAME_INTERVAL
+            while index < len(offsets):
+                while index < len(offsets) and offsets[index][0] <= poll:
+                    index += 1
+                end = offsets[index - 1][1] if index else written
+                dst.write(src.read(end - written))
+                dst.flush()
+                written = end
+
+                start = time.perf_counter()
+                batch = tail.read() or []
+                changes, found = tracker.process(tail.linktype, batch)
+                took = time.perf_counter() - start
+                elapsed += took
+                for change in changes:
+                    counts[change.action] += 1
+                new = [c.record['bssid' if c.kind == 'network' else 'mac'] for c in changes if c.action == 'new']
+                if new:
+                    # A new device's first frame is in this batch
+                    first: dict[str, float] = {}
+                    for ts, data in batch:
+                        frame = parse_frame(tail.linktype, data)
+                        if frame:
+                            first.setdefault(frame.bssid, ts)
+                            first.setdefault(frame.station, ts)
+                    delays += [poll - first[key] + took for key in new if key in first]
+                handshakes += len(found)
+                poll += WIFI_FRAME_INTERVAL
+    finally:
+        os.remove(tail_path)
+
+    stats = tracker.stats()
+    print(f"  parse          {len(frames) / elapsed:>9.0f} frames/s  ({elapsed / air_time * 100:.1f}% of one core "
+          f"at the capture's rate)  kinds {stats['kinds']}")
+    print(f"  events         {sum(counts.values()) / air_time:>9.1f} /s  ({counts}, "
+          f"{counts['update'] / air_time:.1f}/s updates; {ingest.stats()['networks']} networks, "
+          f"{ingest.stats()['clients']} clients, {handshakes} handshake events, "
+          f"{stats['handshakes']} crackable handshakes)")
+    if delays:
+        delays.sort()
+        print(f"  first frame -> 'new' event: frames {sum(delays) / len(delays) * 1000:.0f} ms mean, "
+              f"{delays[math.ceil(len(delays) * 0.99) - 1] * 1000:.0f} ms p99; CSV polling "
+              f"{(AIRODUMP_WRITE_INTERVAL + WIFI_UPDATE_INTERVAL) / 2 * 1000:.0f} ms mean, "
+              f"{(AIRODUMP_WRITE_INTERVAL + WIFI_UPDATE_INTERVAL) * 1000:.0f} ms worst")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] != '--synthetic':
+        run(sys.argv[1])
+    else:
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+        seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 20.0
+        with tempfile.TemporaryDirectory() as tmp:
+            capture = os.path.join(tmp, 'office.pcap')
+            synthetic(capture, count, seconds)
+            run(capture)
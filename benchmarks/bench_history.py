@@ -0,0 +1,79 @@
+"""
+Event history write benchmark.
+
+Usage:
+    python -m benchmarks.bench_history [seconds]
+
+Decodes the synthetic SBS session and pushes it through HistoryWriter:
+first as fast as possible (caller cost of record() and the writer's
+sustained rows/s), then paced at 20k msgs/s with a burst of BLE adverts
+on top, reporting the peak backlog, drops and batch write times.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.feeds import synthetic_sbs_feed
+from utils.adsb import SBSParser
+from utils.history import HistoryWriter
+
+PACED_RATE = 20_000
+
+
+def drain(writer: HistoryWriter) -> None:
+    while writer.stats()['pending']:
+        time.sleep(0.01)
+
+
+def run(seconds: float) -> None:
+    messages = [{'icao': icao, **updates} for icao, updates in SBSParser().feed(synthetic_sbs_feed())
+                if updates]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = HistoryWriter(os.path.join(tmp, 'history.db'))
+        writer.start()
+
+        start = time.perf_counter()
+        for event in messages:
+            writer.record('adsb', event)
+        queued = time.perf_counter() - start
+        drain(writer)
+        elapsed = time.perf_counter() - start
+        print(f"Unpaced: {len(messages)} ADS-B events, record() {queued / len(messages) * 1e6:.2f} us/call,"
+              f" written at {writer.written / elapsed:,.0f} rows/s")
+
+        written = writer.written
+        peak = 0
+        batch_ms = 0.0
+        start = time.perf_counter()
+        sent = 0
+        bursts = 0
+        i = 0
+        while (now := time.perf_counter() - start) < seconds:
+            due = int(now * PACED_RATE)
+            while sent < due:
+                writer.record('adsb', messages[i])
+                i = (i + 1) % len(messages)
+                sent += 1
+            if now >= bursts * 2 + 1:
+                # BLE advert burst: 5000 devices at once every 2 s
+                for n in range(5000):
+                    writer.record('bluetooth', {'mac': f'AA:BB:CC:00:{n >> 8:02X}:{n & 0xFF:02X}', 'rssi': -70})
+                bursts += 1
+            peak = max(peak, writer.stats()['pending'])
+            batch_ms = max(batch_ms, writer.last_batch_ms)
+            time.sleep(0.001)
+        drain(writer)
+        writer.stop()
+
+        print(f"Paced {PACED_RATE:,}/s for {seconds:.0f}s + BLE bursts: {writer.written - written:,} rows,"
+              f" peak backlog {peak:,}, dropped {writer.dropped}, slowest batch {batch_ms:.0f} ms")
+        print(f"Database: {os.path.getsize(writer.path) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
@@ -0,0 +1,125 @@
+"""
+multimon-ng output parser benchmark.
+
+Usage:
+    python -m benchmarks.bench_multimon [corpus_file] [lines]
+
+Repeats a corpus of multimon-ng output (default: the test fixture with
+POCSAG, FLEX, EAS, AFSK1200, DTMF and ZVEI lines plus banner noise) to
+200k lines and reports lines/s for the legacy four-regex parser and the
+prefix-dispatched MultimonParser, on the whole corpus and on only the
+POCSAG/FLEX lines. Also checks both agree on every line
+the legacy parser understood, so parsing regressions show up here too.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+
+from utils.multimon import MultimonParser, parse_multimon_line
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'multimon_corpus.txt')
+
+
+def legacy_parse(line: str) -> dict[str, str] | None:
+    """parse_multimon_output as routes/pager.py had it before utils.multimon."""
+    line = line.strip()
+
+    # POCSAG parsing - with message content
+    pocsag_match = re.match(
+        r'(POCSAG\d+):\s*Address:\s*(\d+)\s+Function:\s*(\d+)\s+(Alpha|Numeric):\s*(.*)',
+        line
+    )
+    if pocsag_match:
+        return {
+            'protocol': pocsag_match.group(1),
+            'address': pocsag_match.group(2),
+            'function': pocsag_match.group(3),
+            'msg_type': pocsag_match.group(4),
+            'message': pocsag_match.group(5).strip() or '[No Message]'
+        }
+
+    # POCSAG parsing - address only (no message content)
+    pocsag_addr_match = re.match(
+        r'(POCSAG\d+):\s*Address:\s*(\d+)\s+Function:\s*(\d+)\s*$',
+        line
+    )
+    if pocsag_addr_match:
+        return {
+            'protocol': pocsag_addr_match.group(1),
+            'address': pocsag_addr_match.group(2),
+            'function': pocsag_addr_match.group(3),
+            'msg_type': 'Tone',
+            'message': '[Tone Only]'
+        }
+
+    # FLEX parsing (standard format)
+    flex_match = re.match(
+        r'FLEX[:\|]\s*[\d\-]+[\s\|]+[\d:]+[\s\|]+([\d/A-Z]+)[\s\|]+([\d.]+)[\s\|]+\[?(\d+)\]?[\s\|]+(\w+)[\s\|]+(.*)',
+        line
+    )
+    if flex_match:
+        return {
+            'protocol': 'FLEX',
+            'address': flex_match.group(3),
+            'function': flex_match.group(1),
+            'msg_type': flex_match.group(4),
+            'message': flex_match.group(5).strip() or '[No Message]'
+        }
+
+    # Simple FLEX format
+    flex_simple = re.match(r'FLEX:\s*(.+)', line)
+    if flex_simple:
+        return {
+            'protocol': 'FLEX',
+            'address': 'Unknown',
+            'function': '',
+            'msg_type': 'Unknown',
+            'message': flex_simple.group(1).strip()
+        }
+
+    return None
+
+
+def timed(label: str, lines: list[str], parse) -> None:
+    start = time.perf_counter()
+    parsed = 0
+    for line in lines:
+        if parse(line):
+            parsed += 1
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<16} {len(lines) / elapsed:>12,.0f} lines/s  ({parsed:,} messages)")
+
+
+def run(path: str, count: int) -> None:
+    with open(path, errors='replace') as f:
+        corpus = [line.rstrip('\n') for line in f if line.strip()]
+    lines = (corpus * (count // len(corpus) + 1))[:count]
+
+    mismatches = 0
+    for line in corpus:
+        old = legacy_parse(line)
+        if old is not None and parse_multimon_line(line) != old:
+            mismatches += 1
+            print(f"MISMATCH: {line!r}")
+
+    print(f"{len(lines):,} lines from {os.path.basename(path)} ({len(corpus)} distinct)")
+    timed('legacy', lines, legacy_parse)
+    timed('MultimonParser', lines, MultimonParser().feed)
+
+    # Same comparison on only the lines the legacy parser handles
+    pager = [line for line in corpus if legacy_parse(line)]
+    pager_lines = (pager * (count // len(pager) + 1))[:count]
+    print(f"POCSAG/FLEX lines only ({len(pager)} distinct)")
+    timed('legacy', pager_lines, legacy_parse)
+    timed('MultimonParser', pager_lines, MultimonParser().feed)
+    if mismatches:
+        sys.exit(f"{mismatches} lines parse differently from the legacy parser")
+
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
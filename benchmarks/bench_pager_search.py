@@ -0,0 +1,100 @@
+"""
+Pager message search benchmark.
+
+Usage:
+    python -m benchmarks.bench_pager_search [messages] [db_path]
+
+Writes messages (default 2,000,000) synthetic pages through HistoryWriter,
+as the pager decoder does, reporting ingest rate with the full-text index
+maintained in the same batches. Then times /pager/search style queries:
+word, phrase, prefix, address, address + text, time range and a deep
+page reached through the cursor. Each query should stay well under 100 ms.
+The database is kept (default: a temporary file) so reruns can skip ingest.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+from utils.history import HistoryWriter
+
+WORDS = (
+    'FIRE ALARM AMBULANCE RESPOND CALL STATION ENGINE LADDER MEDIC UNIT DISPATCH CARDIAC '
+    'ARREST FALL INJURY STRUCTURE SMOKE INVESTIGATE COMMERCIAL RESIDENTIAL STREET ROAD '
+    'AVENUE NORTH SOUTH EAST WEST PRIORITY CODE RED AMBER GREEN ROUTINE TRANSFER PATIENT '
+    'HOSPITAL ADMIT DISCHARGE NURSE WARD THEATRE BLEEP SECURITY MAINTENANCE LIFT TEST'
+).split()
+START = 1_700_000_000.0
+
+
+def fill(writer: HistoryWriter, count: int) -> None:
+    rng = random.Random(42)
+    addresses = [str(rng.randint(1_000_000, 9_999_999)) for _ in range(5000)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(addresses))))
+    pace = 86400 * 30 / count  # spread over 30 days
+    started = time.perf_counter()
+    for i in range(count):
+        writer.record('pager', {
+            'protocol': 'POCSAG1200',
+            'address': rng.choices(addresses, cum_weights=cum_weights)[0],
+            'function': str(rng.randint(0, 3)),
+            'msg_type': 'Alpha',
+            'message': f"{' '.join(rng.choices(WORDS, k=rng.randint(3, 12)))} {rng.randint(1, 999)}",
+        }, ts=START + i * pace)
+        # Stay under max_pending so nothing is dropped
+        while len(writer._pending) > 100_000:
+            time.sleep(0.01)
+    writer.stop(timeout=600)
+    elapsed = time.perf_counter() - started
+    stats = writer.stats()
+    print(f"ingest: {stats['written']:,} messages in {elapsed:.1f}s "
+          f"({stats['written'] / elapsed:,.0f}/s), dropped {stats['dropped']}, "
+          f"last batch {stats['last_batch_ms']} ms")
+
+
+def timed(label: str, writer: HistoryWriter, **query) -> tuple[list, int | None]:
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        events, cursor = writer.search('pager', **query)
+        runs.append((time.perf_counter() - start) * 1000)
+    print(f"  {label:34s} {len(events):4d} results  median {sorted(runs)[2]:7.2f} ms  max {max(runs):7.2f} ms")
+    return events, cursor
+
+
+def run(count: int, path: str) -> None:
+    writer = HistoryWriter(path, retention_hours=0, flush_interval=0.5)
+    writer.start()
+    existing = writer.query('pager', limit=1)
+    if existing:
+        writer.stop()
+        print(f"using existing {path}")
+    else:
+        fill(writer, count)
+    print(f"database: {os.path.getsize(path) / 1e6:,.0f} MB")
+
+    address = writer.query('pager', limit=1)[0]['address']
+    timed('word: cardiac', writer, text='cardiac')
+    timed('phrase: "cardiac arrest"', writer, text='"cardiac arrest"')
+    timed('prefix: hosp* amb*', writer, text='hosp* amb*')
+    timed('rare conjunction', writer, text='lift theatre nurse smoke ladder')
+    timed(f'address {address}', writer, key=address)
+    timed(f'address {address} + patient', writer, key=address, text='patient')
+    timed('day 10-11 + "code red"', writer, text='"code red"', since=START + 86400 * 10, until=START + 86400 * 11)
+    timed('day 20, no text', writer, since=START + 86400 * 20, until=START + 86400 * 21)
+
+    cursor = None
+    start = time.perf_counter()
+    for _ in range(20):
+        _, cursor = writer.search('pager', text='fire', before=cursor, limit=100)
+    print(f"  {'20 pages of 100 for fire':34s} total {(time.perf_counter() - start) * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000,
+        sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), 'bench_pager_search.db'))
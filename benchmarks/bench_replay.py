@@ -0,0 +1,93 @@
+"""
+End-to-end ADS-B ingest benchmark from a recorded capture.
+
+Usage:
+    python -m benchmarks.bench_replay [capture_file] [speed]
+
+Serves the capture (or a synthetic 200k message SBS session) on a local TCP
+port with ReplayServer, runs the normal /adsb/start ingest path against it
+and consumes the ADS-B SSE hub like a dashboard would. Reports messages/s
+through parse_sbs_stream and how stale aircraft state is when it reaches
+the SSE subscriber. Speed defaults to 0 (as fast as possible).
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+import app as app_module
+from benchmarks.feeds import synthetic_sbs_feed
+from routes import adsb as adsb_routes
+from utils.adsb.capture import CaptureWriter, ReplayServer
+
+
+def synthetic_capture(path: str, chunk_size: int = 4096, interval: float = 0.002) -> None:
+    """Write the synthetic SBS feed as a capture, one chunk every interval seconds."""
+    feed = synthetic_sbs_feed()
+    with CaptureWriter(path, 'sbs') as writer:
+        for i, offset in enumerate(range(0, len(feed), chunk_size)):
+            writer.write(feed[offset:offset + chunk_size], 1_700_000_000.0 + i * interval)
+
+
+def run(path: str, speed: float) -> None:
+    server = ReplayServer(path, speed=speed)
+    port = server.start()
+
+    ages: list[float] = []
+    stop = threading.Event()
+    subscriber = app_module.adsb_queue.subscribe()
+
+    def consume() -> None:
+        store = app_module.adsb_aircraft
+        while not stop.is_set():
+            try:
+                msg = subscriber.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            aircraft = store.get(msg.get('icao'))
+            if aircraft is not None:
+                ages.append(max(0.0, time.time() - aircraft.last_seen))
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+
+    start = time.perf_counter()
+    adsb_routes._start_ingest([('replay', '127.0.0.1', port, server.feed_format)])
+
+    # Wait for the whole capture to be sent and the message count to settle
+    last_count = -1
+    while True:
+        time.sleep(0.1)
+        count = adsb_routes.adsb_messages_received
+        if server.finished and count == last_count:
+            break
+        last_count = count
+    elapsed = time.perf_counter() - start - 0.1
+
+    adsb_routes.adsb_using_service = False
+    stop.set()
+    consumer.join()
+    app_module.adsb_queue.unsubscribe(subscriber)
+
+    print(f"Ingested {count} messages in {elapsed:.2f}s = {count / elapsed:,.0f} msgs/s")
+    print(f"Aircraft tracked: {len(app_module.adsb_aircraft)}")
+    if ages:
+        ages.sort()
+        print(f"SSE state age over {len(ages)} updates: p50 {ages[len(ages) // 2] * 1000:.0f} ms,"
+              f" p95 {ages[int(len(ages) * 0.95)] * 1000:.0f} ms, max {ages[-1] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    replay_speed = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    if len(sys.argv) > 1:
+        run(sys.argv[1], replay_speed)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            capture = os.path.join(tmp, 'synthetic.cap')
+            synthetic_capture(capture)
+            run(capture, replay_speed)
@@ -0,0 +1,108 @@
+"""
+SBS parser throughput benchmark.
+
+Usage:
+    python -m benchmarks.bench_sbs [capture_file]
+
+Feeds a recorded port 30003 capture (or a synthetic 200k message feed) through
+the legacy string parser and SBSParser in 4 KB and 64 KB reads (a backlog
+after a busy burst) and reports messages/s.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from benchmarks.feeds import synthetic_sbs_feed
+from utils.adsb import SBSParser
+
+READ_SIZES = (4096, 65536)
+
+
+def legacy_parse(data: bytes, read_size: int) -> int:
+    """The string based loop parse_sbs_stream used before SBSParser."""
+    aircraft_table: dict[str, dict] = {}
+    buffer = ""
+    count = 0
+    for offset in range(0, len(data), read_size):
+        buffer += data[offset:offset + read_size].decode('utf-8', errors='ignore')
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split(',')
+            if len(parts) < 11 or parts[0] != 'MSG':
+                continue
+            msg_type = parts[1]
+            icao = parts[4].upper()
+            if not icao:
+                continue
+            aircraft = aircraft_table.get(icao, {'icao': icao})
+            try:
+                if msg_type == '1' and parts[10].strip():
+                    aircraft['callsign'] = parts[10].strip()
+                elif msg_type == '3' and len(parts) > 15:
+                    if parts[11]:
+                        aircraft['altitude'] = int(float(parts[11]))
+                    if parts[14] and parts[15]:
+                        aircraft['lat'] = float(parts[14])
+                        aircraft['lon'] = float(parts[15])
+                elif msg_type == '4' and len(parts) > 13:
+                    if parts[12]:
+                        aircraft['speed'] = int(float(parts[12]))
+                    if parts[13]:
+                        aircraft['heading'] = int(float(parts[13]))
+                elif msg_type == '5' and len(parts) > 11:
+                    if parts[10].strip():
+                        aircraft['callsign'] = parts[10].strip()
+                    if parts[11]:
+                        aircraft['altitude'] = int(float(parts[11]))
+                elif msg_type == '6' and len(parts) > 17 and parts[17]:
+                    aircraft['squawk'] = parts[17]
+            except ValueError:
+                pass
+            aircraft_table[icao] = aircraft
+            time.time()
+            time.time()
+            count += 1
+    return count
+
+
+def sbs_parse(data: bytes, read_size: int) -> int:
+    """SBSParser applied to an aircraft table as parse_sbs_stream uses it."""
+    aircraft_table: dict[str, dict] = {}
+    parser = SBSParser()
+    count = 0
+    view = memoryview(data)
+    for offset in range(0, len(data), read_size):
+        for icao, updates in parser.feed(view[offset:offset + read_size]):
+            aircraft = aircraft_table.get(icao)
+            if aircraft is None:
+                aircraft = aircraft_table[icao] = {'icao': icao}
+            if updates:
+                aircraft.update(updates)
+            count += 1
+        time.time()
+    return count
+
+
+def run(data: bytes) -> None:
+    for read_size in READ_SIZES:
+        for name, func in (('legacy', legacy_parse), ('SBSParser', sbs_parse)):
+            start = time.perf_counter()
+            count = func(data, read_size)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>10} ({read_size // 1024:>2} KB reads): {count} msgs in {elapsed:.3f}s"
+                  f" = {count / elapsed:,.0f} msgs/s")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            feed = f.read()
+    else:
+        feed = synthetic_sbs_feed()
+    print(f"Feed: {len(feed) / 1e6:.1f} MB")
+    run(feed)
@@ -0,0 +1,65 @@
+"""
+Chart time series benchmark.
+
+Usage:
+    python -m benchmarks.bench_timeseries [points_per_series] [chart_points]
+
+Fills a series with a week of noisy RSSI (default 20,160 points, one per
+30 s) and compares what a chart costs: replaying every raw event as JSON
+(the old approach) against a /timeseries style query downsampled to
+chart_points (default 500) with LTTB and min/max bucketing. Also reports
+the append rate and memory per point.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import sys
+import time
+
+from utils.timeseries import TimeSeriesStore
+
+WEEK = 7 * 86400.0
+
+
+def run(total: int, chart_points: int) -> None:
+    rng = random.Random(5)
+    store = TimeSeriesStore(max_points=total, retention=WEEK)
+    step = WEEK / total
+    now = time.time()
+    samples = [(now - WEEK + i * step, -70 + 8 * math.sin(i / 400) + rng.gauss(0, 3)) for i in range(total)]
+
+    start = time.perf_counter()
+    for ts, value in samples:
+        store.record('bt:AA:BB:CC:DD:EE:FF:rssi', value, ts)
+    elapsed = time.perf_counter() - start
+    series = store._series['bt:AA:BB:CC:DD:EE:FF:rssi']
+    size = series.times.itemsize + series.values.itemsize
+    print(f"{total:,} points: {total / elapsed:,.0f} appends/s, {size} bytes/point "
+          f"({total * size / 1024:,.0f} KiB)")
+
+    start = time.perf_counter()
+    raw = json.dumps([{'type': 'device', 'mac': 'AA:BB:CC:DD:EE:FF', 'rssi': v, 'last_seen': t}
+                      for t, v in samples])
+    elapsed = time.perf_counter() - start
+    print(f"  raw replay   {len(raw) / 1024:>10,.0f} KiB  {elapsed * 1000:>7.1f} ms to serialise")
+
+    for method in ('lttb', 'minmax'):
+        start = time.perf_counter()
+        result = store.query('bt:AA:BB:CC:DD:EE:FF:rssi', points=chart_points, method=method)
+        body = json.dumps(result)
+        elapsed = time.perf_counter() - start
+        print(f"  {method:<12} {len(body) / 1024:>10,.1f} KiB  {elapsed * 1000:>7.1f} ms "
+              f"({len(result['t'])} of {result['total']:,} points)")
+
+    start = time.perf_counter()
+    result = store.query('bt:AA:BB:CC:DD:EE:FF:rssi', start=now - 3600, points=chart_points)
+    elapsed = time.perf_counter() - start
+    print(f"  last hour    {elapsed * 1000:>18.1f} ms ({len(result['t'])} of {result['total']:,} points)")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20_160,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500)
@@ -55,6 +55,32 @@ DEFAULT_DEVICE = _get_env('DEFAULT_DEVICE', '0')
 
 # Pager defaults
 DEFAULT_PAGER_FREQ = _get_env('PAGER_FREQ', '929.6125M')
+# Drop repeats of a page (same protocol, address and text) seen within this many seconds (0 disables)
+PAGER_DEDUP_WINDOW = _get_env_float('PAGER_DEDUP_WINDOW', 30.0)
+PAGER_DEDUP_MAX_ENTRIES = _get_env_int('PAGER_DEDUP_MAX_ENTRIES', 10000)
+# Per-address counters kept for /pager/addresses (least recently heard evicted first)
+PAGER_MAX_ADDRESSES = _get_env_int('PAGER_MAX_ADDRESSES', 5000)
+# Wideband pager mode: IQ rate the channelizer expects and the most channels one SDR decodes
+PAGER_CHANNELIZER_SAMPLE_RATE = _get_env_int('PAGER_CHANNELIZER_SAMPLE_RATE', 2400000)
+PAGER_MAX_CHANNELS = _get_env_int('PAGER_MAX_CHANNELS', 8)
+
+# Sensor registry: identical rtl_433 readings from one device within this many seconds are repeats (0 disables)
+SENSOR_REPEAT_WINDOW = _get_env_float('SENSOR_REPEAT_WINDOW', 2.0)
+# Devices kept for /sensor/devices (least recently heard evicted first)
+SENSOR_MAX_DEVICES = _get_env_int('SENSOR_MAX_DEVICES', 500)
+
+# Sensor hopping mode: bands visited (MHz) and seconds per band, from quiet to busiest
+SENSOR_HOP_FREQUENCIES = _get_env('SENSOR_HOP_FREQUENCIES', '315,345,433.92,868,915')
+SENSOR_HOP_MIN_DWELL = _get_env_float('SENSOR_HOP_MIN_DWELL', 15.0)
+SENSOR_HOP_MAX_DWELL = _get_env_float('SENSOR_HOP_MAX_DWELL', 90.0)
+
+# Chart time series (sensor readings, RSSI) kept in memory for /timeseries
+TIMESERIES_MAX_SERIES = _get_env_int('TIMESERIES_MAX_SERIES', 1000)
+# Points per series (a week of readings every 30 s) and hours kept
+TIMESERIES_MAX_POINTS = _get_env_int('TIMESERIES_MAX_POINTS', 20160)
+TIMESERIES_RETENTION_HOURS = _get_env_float('TIMESERIES_RETENTION_HOURS', 24.0 * 7)
+# Most points a single /timeseries query may ask for
+TIMESERIES_MAX_QUERY_POINTS = _get_env_int('TIMESERIES_MAX_QUERY_POINTS', 5000)
 
 # Iridium defaults
 DEFAULT_IRIDIUM_FREQ = _get_env('IRIDIUM_FREQ', '1626.0')
@@ -65,8 +91,30 @@ PROCESS_TIMEOUT = _get_env_int('PROCESS_TIMEOUT', 5)
 SOCKET_TIMEOUT = _get_env_int('SOCKET_TIMEOUT', 5)
 SSE_TIMEOUT = _get_env_int('SSE_TIMEOUT', 1)
 
+# SSE queue sizes (pending messages buffered per connected client)
+SSE_QUEUE_SIZE = _get_env_int('SSE_QUEUE_SIZE', 1000)
+PAGER_QUEUE_SIZE = _get_env_int('PAGER_QUEUE_SIZE', SSE_QUEUE_SIZE)
+SENSOR_QUEUE_SIZE = _get_env_int('SENSOR_QUEUE_SIZE', SSE_QUEUE_SIZE)
+WIFI_QUEUE_SIZE = _get_env_int('WIFI_QUEUE_SIZE', SSE_QUEUE_SIZE)
+BT_QUEUE_SIZE = _get_env_int('BT_QUEUE_SIZE', SSE_QUEUE_SIZE)
+ADSB_QUEUE_SIZE = _get_env_int('ADSB_QUEUE_SIZE', SSE_QUEUE_SIZE)
+SATELLITE_QUEUE_SIZE = _get_env_int('SATELLITE_QUEUE_SIZE', SSE_QUEUE_SIZE)
+ALERT_QUEUE_SIZE = _get_env_int('ALERT_QUEUE_SIZE', SSE_QUEUE_SIZE)
+
+# Recent messages kept per stream for Last-Event-ID resume after a reconnect
+SSE_REPLAY_SIZE = _get_env_int('SSE_REPLAY_SIZE', 1000)
+
 # WiFi settings
 WIFI_UPDATE_INTERVAL = _get_env_float('WIFI_UPDATE_INTERVAL', 2.0)
+# Networks/clients not seen by airodump-ng for this many seconds are reported as gone
+WIFI_STALE_SECONDS = _get_env_float('WIFI_STALE_SECONDS', 120.0)
+# Power change (dB) that makes an otherwise unchanged network or client worth an update
+WIFI_POWER_DELTA = _get_env_int('WIFI_POWER_DELTA', 5)
+# Live 802.11 frames alongside the CSV: 'tcpdump' (radiotap pipe, per-frame signal),
+# 'capture' (airodump-ng's own -01.cap, no signal), 'auto' (tcpdump if installed) or 'off'
+WIFI_FRAME_SOURCE = _get_env('WIFI_FRAME_SOURCE', 'auto')
+# Seconds between reads of the live frame source when it has nothing new
+WIFI_FRAME_INTERVAL = _get_env_float('WIFI_FRAME_INTERVAL', 0.25)
 AIRODUMP_HEADER_LINES = _get_env_int('AIRODUMP_HEADER_LINES', 2)
 
 # Bluetooth settings
@@ -75,7 +123,26 @@ BT_UPDATE_INTERVAL = _get_env_float('BT_UPDATE_INTERVAL', 2.0)
 
 # ADS-B settings
 ADSB_SBS_PORT = _get_env_int('ADSB_SBS_PORT', 30003)
+ADSB_BEAST_PORT = _get_env_int('ADSB_BEAST_PORT', 30005)
+# Comma separated receivers to aggregate, e.g. 'rx1:30003,rx2:30005:beast'
+ADSB_SOURCES = _get_env('ADSB_SOURCES', '')
+# Seconds within which the same message from another receiver is a duplicate
+ADSB_DEDUP_WINDOW = _get_env_float('ADSB_DEDUP_WINDOW', 1.0)
 ADSB_UPDATE_INTERVAL = _get_env_float('ADSB_UPDATE_INTERVAL', 1.0)
+# Seconds between full aircraft keyframes on /adsb/stream (deltas in between)
+ADSB_KEYFRAME_INTERVAL = _get_env_float('ADSB_KEYFRAME_INTERVAL', 10.0)
+# Seconds since last message before an aircraft is dropped server-side
+ADSB_AIRCRAFT_MAX_AGE = _get_env_float('ADSB_AIRCRAFT_MAX_AGE', 300.0)
+# Positions of history kept per aircraft for /adsb/track (0 disables)
+ADSB_TRACK_POINTS = _get_env_int('ADSB_TRACK_POINTS', 128)
+# Default Douglas-Peucker tolerance in metres for track responses
+ADSB_TRACK_TOLERANCE = _get_env_float('ADSB_TRACK_TOLERANCE', 50.0)
+# Directory for raw feed captures (recorded with /adsb/start 'record', replayed with 'replay')
+ADSB_RECORD_DIR = _get_env('ADSB_RECORD_DIR', 'recordings')
+# Aircraft registration database (built with: intercept.py --import-aircraft-db FILE.csv)
+ADSB_AIRCRAFT_DB = _get_env('ADSB_AIRCRAFT_DB', 'aircraft_db.bin')
+# Registration lookups cached in memory
+ADSB_AIRCRAFT_DB_CACHE = _get_env_int('ADSB_AIRCRAFT_DB_CACHE', 4096)
 
 # Satellite settings
 SATELLITE_UPDATE_INTERVAL = _get_env_int('SATELLITE_UPDATE_INTERVAL', 30)
@@ -85,6 +152,36 @@ SATELLITE_ORBIT_MINUTES = _get_env_int('SATELLITE_ORBIT_MINUTES', 45)
 # Maximum burst count for Iridium monitoring
 IRIDIUM_MAX_BURSTS = _get_env_int('IRIDIUM_MAX_BURSTS', 100)
 
+# Decoded message log (/logging): 'text' or 'jsonl'
+MESSAGE_LOG_FORMAT = _get_env('MESSAGE_LOG_FORMAT', 'text')
+# Rotate the log at this size or age, keeping MESSAGE_LOG_BACKUPS rotated files
+MESSAGE_LOG_MAX_BYTES = _get_env_int('MESSAGE_LOG_MAX_BYTES', 10 * 1024 * 1024)
+MESSAGE_LOG_ROTATE_HOURS = _get_env_float('MESSAGE_LOG_ROTATE_HOURS', 24.0)
+MESSAGE_LOG_BACKUPS = _get_env_int('MESSAGE_LOG_BACKUPS', 7)
+MESSAGE_LOG_COMPRESS = _get_env_bool('MESSAGE_LOG_COMPRESS', True)
+# Seconds between writes of buffered messages to disk
+MESSAGE_LOG_FLUSH_INTERVAL = _get_env_float('MESSAGE_LOG_FLUSH_INTERVAL', 1.0)
+
+# Watchlist alerts: JSON file with keywords, pager_addresses, icao, squawks and sensors
+ALERT_WATCHLIST = _get_env('ALERT_WATCHLIST', 'alerts.json')
+# Seconds before the same aircraft or sensor alerts again
+ALERT_COOLDOWN = _get_env_float('ALERT_COOLDOWN', 60.0)
+# Seconds between checks of the watchlist file for edits (0 disables hot reload)
+ALERT_RELOAD_INTERVAL = _get_env_float('ALERT_RELOAD_INTERVAL', 5.0)
+
+# Decoded event history (SQLite)
+HISTORY_ENABLED = _get_env_bool('HISTORY_ENABLED', True)
+HISTORY_DB = _get_env('HISTORY_DB', 'intercept_history.db')
+# Hours of history kept (0 keeps everything)
+HISTORY_RETENTION_HOURS = _get_env_float('HISTORY_RETENTION_HOURS', 24.0)
+# Pager messages are kept longer for /pager/search (hours, 0 keeps everything)
+HISTORY_PAGER_RETENTION_HOURS = _get_env_float('HISTORY_PAGER_RETENTION_HOURS', 24.0 * 30)
+# Seconds between batched writes, and pending events that trigger an early write
+HISTORY_FLUSH_INTERVAL = _get_env_float('HISTORY_FLUSH_INTERVAL', 1.0)
+HISTORY_BATCH_SIZE = _get_env_int('HISTORY_BATCH_SIZE', 5000)
+# Events buffered in memory if the disk falls behind (oldest dropped beyond this)
+HISTORY_MAX_PENDING = _get_env_int('HISTORY_MAX_PENDING', 200000)
+
 
 def configure_logging() -> None:
     """Configure application logging."""
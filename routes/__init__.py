@@ -10,6 +10,9 @@ def register_blueprints(app):
     from .satellite import satellite_bp
     from .iridium import iridium_bp
     from .gps import gps_bp
+    from .history import history_bp
+    from .alerts import alerts_bp
+    from .timeseries import timeseries_bp
 
     app.register_blueprint(pager_bp)
     app.register_blueprint(sensor_bp)
@@ -19,3 +22,6 @@ def register_blueprints(app):
     app.register_blueprint(satellite_bp)
     app.register_blueprint(iridium_bp)
     app.register_blueprint(gps_bp)
+    app.register_blueprint(history_bp)
+    app.register_blueprint(alerts_bp)
+    app.register_blueprint(timeseries_bp)
@@ -4,20 +4,27 @@ from __future__ import annotations
 
 import json
 import os
-import queue
 import shutil
 import socket
 import subprocess
 import threading
 import time
-from typing import Any, Generator
+from typing import Any
 
 from flask import Blueprint, jsonify, request, Response, render_template
 
 import app as app_module
+from config import (
+    ADSB_SBS_PORT, ADSB_BEAST_PORT, ADSB_SOURCES, ADSB_DEDUP_WINDOW, ADSB_TRACK_TOLERANCE, ADSB_RECORD_DIR,
+    ADSB_KEYFRAME_INTERVAL,
+)
 from utils.logging import adsb_logger as logger
 from utils.validation import validate_device_index, validate_gain
-from utils.sse import format_sse
+from utils.sse import sse_stream, negotiate_stream
+from utils.adsb import (
+    BeastParser, ReceiverAggregator, SBSParser, bbox_filter, parse_bbox, simplify_track, track_to_list
+)
+from utils.adsb.capture import CaptureReader, CaptureWriter, ReplayServer, capture_path
 from utils.sdr import SDRFactory, SDRType
 
 adsb_bp = Blueprint('adsb', __name__, url_prefix='/adsb')
@@ -27,6 +34,18 @@ adsb_using_service = False
 adsb_connected = False
 adsb_messages_received = 0
 adsb_last_message_time = None
+adsb_feed_format = 'sbs'
+
+# Receivers feeding the shared aircraft table
+adsb_aggregator = ReceiverAggregator(dedup_window=ADSB_DEDUP_WINDOW)
+adsb_pending_updates = set()
+adsb_pending_lock = threading.Lock()
+adsb_last_publish = 0.0
+adsb_last_keyframe = 0.0
+
+# Raw feed recording and capture replay
+adsb_recorders = []
+adsb_replay = None  # ReplayServer, or dict describing a direct replay
 
 # Common installation paths for dump1090 (when not in PATH)
 DUMP1090_PATHS = [
@@ -59,140 +78,340 @@ def find_dump1090():
     return None
 
 
-def check_dump1090_service():
-    """Check if dump1090 SBS port (30003) is available."""
+def check_dump1090_service(port=ADSB_SBS_PORT):
+    """Check if a dump1090 output port (SBS 30003 or Beast 30005) is available."""
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(2)
-        result = sock.connect_ex(('localhost', 30003))
+        result = sock.connect_ex(('localhost', port))
         sock.close()
         if result == 0:
-            return 'localhost:30003'
+            return f'localhost:{port}'
     except Exception:
         pass
     return None
 
 
-def parse_sbs_stream(service_addr):
-    """Parse SBS format data from dump1090 port 30003."""
-    global adsb_using_service, adsb_connected, adsb_messages_received, adsb_last_message_time
-
-    host, port = service_addr.split(':')
+def parse_receiver_sources(raw):
+    """
+    Validate receiver feeds for multi-receiver aggregation.
+
+    Accepts a list of {'host', 'port', 'format', 'name'} dicts or
+    'host:port[:format]' strings (the INTERCEPT_ADSB_SOURCES form).
+
+    Returns:
+        List of (name, host, port, format) tuples
+
+    Raises:
+        ValueError: If any entry is invalid
+    """
+    if isinstance(raw, str):
+        raw = [entry for entry in raw.split(',') if entry.strip()]
+    if not isinstance(raw, list):
+        raise ValueError('Sources must be a list')
+
+    sources = []
+    for entry in raw:
+        if isinstance(entry, str):
+            parts = entry.strip().split(':')
+            entry = {'host': parts[0], 'port': parts[1] if len(parts) > 1 else ADSB_SBS_PORT}
+            if len(parts) > 2:
+                entry['format'] = parts[2]
+        if not isinstance(entry, dict):
+            raise ValueError('Invalid source entry')
+
+        host = str(entry.get('host', '')).strip()
+        if not host or not all(c.isalnum() or c in '.-_' for c in host):
+            raise ValueError(f'Invalid source host: {host}')
+        feed_format = entry.get('format', 'sbs')
+        if feed_format not in ('sbs', 'beast'):
+            raise ValueError('Source format must be sbs or beast')
+        try:
+            port = int(entry.get('port', ADSB_BEAST_PORT if feed_format == 'beast' else ADSB_SBS_PORT))
+        except (TypeError, ValueError):
+            raise ValueError('Invalid source port') from None
+        if not 1 <= port <= 65535:
+            raise ValueError('Invalid source port')
+
+        name = str(entry.get('name') or f'{host}:{port}')[:64]
+        sources.append((name, host, port, feed_format))
+
+    if len({name for name, _, _, _ in sources}) != len(sources):
+        raise ValueError('Source names must be unique')
+    return sources
+
+
+def _publish_pending_updates(now, force=False):
+    """
+    Push aircraft changed since the last publish to the SSE queue (at most once a second).
+
+    Messages are deltas holding only the attributes that changed, plus a full
+    keyframe of every aircraft each ADSB_KEYFRAME_INTERVAL seconds. Clients
+    merge them into their aircraft state.
+    """
+    global adsb_last_publish, adsb_last_keyframe
+
+    # Each receiver's ingest thread publishes; only one of them sends a due keyframe
+    with adsb_pending_lock:
+        if not force and now - adsb_last_publish < 1.0:
+            return
+        icaos = list(adsb_pending_updates)
+        adsb_pending_updates.clear()
+        adsb_last_publish = now
+        keyframe = now - adsb_last_keyframe >= ADSB_KEYFRAME_INTERVAL
+        if keyframe:
+            adsb_last_keyframe = now
+
+    store = app_module.adsb_aircraft
+    if keyframe:
+        # Every aircraft in full so late joiners and clients that lost deltas converge
+        _publish_keyframe()
+        return
+
+    for icao in icaos:
+        delta = store.take_delta(icao)
+        if delta is not None:
+            app_module.adsb_queue.put({'type': 'aircraft', **delta})
+
+
+def _publish_keyframe():
+    for aircraft in app_module.adsb_aircraft.keyframe():
+        app_module.adsb_queue.put({'type': 'aircraft', 'keyframe': True, **aircraft})
+
+
+def _ingest_messages(source, messages, now):
+    """Merge parsed (icao, updates) pairs from one read into the aircraft table."""
+    global adsb_messages_received, adsb_last_message_time
+
+    aircraft_store = app_module.adsb_aircraft
+    history = app_module.history if app_module.history.running else None
+    alerts = app_module.alerts
+    changed = []
+    for icao, updates in messages:
+        if not adsb_aggregator.accept(source, icao, updates, now):
+            continue
+        aircraft_store.apply(icao, updates, now)
+        alerts.check_aircraft(icao, updates, now)
+        if history is not None and updates:
+            history.record('adsb', {'icao': icao, **updates}, now)
+        changed.append(icao)
+
+    if changed:
+        with adsb_pending_lock:
+            adsb_pending_updates.update(changed)
+            adsb_messages_received += len(changed)
+            adsb_last_message_time = now
+
+    _publish_pending_updates(now)
+
+
+def parse_sbs_stream(service_addr, feed_format='sbs', source_name=None, recorder=None, replay=None):
+    """
+    Ingest one SBS (port 30003) or Beast binary (port 30005) receiver feed.
+
+    Several of these run concurrently when aggregating receivers. All of them
+    merge into the same aircraft table through adsb_aggregator, which drops
+    copies of a message already delivered by another receiver. With a
+    recorder, the raw bytes are also written to a capture file. With a
+    ReplayServer, the parser stops once a non-looping replay has finished.
+    """
+    global adsb_connected
+
+    host, port = service_addr.rsplit(':', 1)
     port = int(port)
+    source = adsb_aggregator.add_source(source_name or service_addr, host, port, feed_format)
 
-    logger.info(f"SBS stream parser started, connecting to {host}:{port}")
-    adsb_connected = False
-    adsb_messages_received = 0
+    logger.info(f"{feed_format.upper()} stream parser started, connecting to {host}:{port}")
 
-    while adsb_using_service:
+    while adsb_using_service and not (replay is not None and replay.finished):
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((host, port))
-            adsb_connected = True
-            logger.info("Connected to SBS stream")
-
-            buffer = ""
-            last_update = time.time()
-            pending_updates = set()
-
-            while adsb_using_service:
-                try:
-                    data = sock.recv(4096).decode('utf-8', errors='ignore')
-                    if not data:
-                        break
-                    buffer += data
-
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        parts = line.split(',')
-                        if len(parts) < 11 or parts[0] != 'MSG':
-                            continue
-
-                        msg_type = parts[1]
-                        icao = parts[4].upper()
-                        if not icao:
-                            continue
-
-                        aircraft = app_module.adsb_aircraft.get(icao, {'icao': icao})
-
-                        if msg_type == '1' and len(parts) > 10:
-                            callsign = parts[10].strip()
-                            if callsign:
-                                aircraft['callsign'] = callsign
-
-                        elif msg_type == '3' and len(parts) > 15:
-                            if parts[11]:
-                                try:
-                                    aircraft['altitude'] = int(float(parts[11]))
-                                except (ValueError, TypeError):
-                                    pass
-                            if parts[14] and parts[15]:
-                                try:
-                                    aircraft['lat'] = float(parts[14])
-                                    aircraft['lon'] = float(parts[15])
-                                except (ValueError, TypeError):
-                                    pass
-
-                        elif msg_type == '4' and len(parts) > 13:
-                            if parts[12]:
-                                try:
-                                    aircraft['speed'] = int(float(parts[12]))
-                                except (ValueError, TypeError):
-                                    pass
-                            if parts[13]:
-                                try:
-                                    aircraft['heading'] = int(float(parts[13]))
-                                except (ValueError, TypeError):
-                                    pass
-
-                        elif msg_type == '5' and len(parts) > 11:
-                            if parts[10]:
-                                callsign = parts[10].strip()
-                                if callsign:
-                                    aircraft['callsign'] = callsign
-                            if parts[11]:
-                                try:
-                                    aircraft['altitude'] = int(float(parts[11]))
-                                except (ValueError, TypeError):
-                                    pass
-
-                        elif msg_type == '6' and len(parts) > 17:
-                            if parts[17]:
-                                aircraft['squawk'] = parts[17]
-
-                        app_module.adsb_aircraft[icao] = aircraft
-                        pending_updates.add(icao)
-                        adsb_messages_received += 1
-                        adsb_last_message_time = time.time()
-
-                        now = time.time()
-                        if now - last_update >= 1.0:
-                            for update_icao in pending_updates:
-                                if update_icao in app_module.adsb_aircraft:
-                                    app_module.adsb_queue.put({
-                                        'type': 'aircraft',
-                                        **app_module.adsb_aircraft[update_icao]
-                                    })
-                            pending_updates.clear()
-                            last_update = now
-
-                except socket.timeout:
-                    continue
-
-            sock.close()
-            adsb_connected = False
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(5)
+                sock.connect((host, port))
+                source.connected = True
+                adsb_connected = True
+                logger.info(f"Connected to {feed_format.upper()} stream {source.name}")
+
+                parser = BeastParser() if feed_format == 'beast' else SBSParser()
+
+                while adsb_using_service:
+                    try:
+                        if recorder is None:
+                            if not parser.recv_from(sock):
+                                break
+                            now = time.time()
+                            messages = parser.messages()
+                        else:
+                            data = sock.recv(65536)
+                            if not data:
+                                break
+                            now = time.time()
+                            recorder.write(data, now)
+                            messages = parser.feed(data)
+
+                        _ingest_messages(source, messages, now)
+
+                    except socket.timeout:
+                        continue
         except Exception as e:
-            adsb_connected = False
-            logger.warning(f"SBS connection error: {e}, reconnecting...")
+            logger.warning(f"{source.name} connection error: {e}, reconnecting...")
+            source.connected = False
+            adsb_connected = adsb_aggregator.connected
             time.sleep(2)
+            continue
+
+        source.connected = False
+        adsb_connected = adsb_aggregator.connected
+
+    source.connected = False
+    adsb_connected = adsb_aggregator.connected
+    logger.info(f"Stream parser for {source.name} stopped")
+
+
+def feed_capture(path, speed=0.0, stop=None, source_name='replay'):
+    """Feed a capture file straight into a parser, bypassing the socket."""
+    global adsb_connected
 
-    adsb_connected = False
-    logger.info("SBS stream parser stopped")
+    reader = CaptureReader(path)
+    source = adsb_aggregator.add_source(source_name, 'file', 0, reader.feed_format)
+    source.connected = adsb_connected = True
+    parser = BeastParser() if reader.feed_format == 'beast' else SBSParser()
+
+    logger.info(f"Replaying {path} directly at {speed or 'max'}x")
+    try:
+        for data in reader.replay(speed, stop):
+            if not adsb_using_service:
+                break
+            now = time.time()
+            _ingest_messages(source, parser.feed(data), now)
+        _publish_pending_updates(time.time(), force=True)
+    except Exception as e:
+        logger.error(f"Replay of {path} failed: {e}")
+    finally:
+        source.connected = False
+        adsb_connected = adsb_aggregator.connected
+        if isinstance(adsb_replay, dict):
+            adsb_replay['finished'] = True
+    logger.info(f"Replay of {path} finished")
+
+
+def _start_ingest(sources, record=False, replay=None):
+    """Start one ingest thread per (name, host, port, format) source."""
+    global adsb_using_service, adsb_messages_received, adsb_feed_format
+
+    adsb_aggregator.clear()
+    adsb_messages_received = 0
+    adsb_feed_format = sources[0][3] if len({fmt for _, _, _, fmt in sources}) == 1 else 'mixed'
+    adsb_using_service = True
+    for name, host, port, feed_format in sources:
+        recorder = None
+        if record:
+            label = ''.join(c if c.isalnum() else '_' for c in name) if len(sources) > 1 else 'adsb'
+            recorder = CaptureWriter(capture_path(ADSB_RECORD_DIR, feed_format, label), feed_format)
+            adsb_recorders.append(recorder)
+            logger.info(f"Recording {name} to {recorder.path}")
+        thread = threading.Thread(
+            target=parse_sbs_stream,
+            args=(f'{host}:{port}', feed_format, name, recorder, replay),
+            daemon=True
+        )
+        thread.start()
+
+
+def _resolve_capture(name):
+    """
+    Resolve a capture file name inside the recordings directory.
+
+    Raises:
+        ValueError: If the path escapes the directory or doesn't exist
+    """
+    record_dir = os.path.realpath(ADSB_RECORD_DIR)
+    path = os.path.realpath(os.path.join(record_dir, str(name)))
+    if os.path.dirname(path) != record_dir or not os.path.isfile(path):
+        raise ValueError('Capture not found in recordings directory')
+    return path
+
+
+def _start_replay(data):
+    """Start replaying a capture, served on a local port ('tcp') or fed directly ('direct')."""
+    global adsb_replay, adsb_using_service, adsb_feed_format, adsb_messages_received
+
+    path = _resolve_capture(data['replay'])
+    try:
+        speed = float(data.get('replay_speed', 1.0))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid replay speed') from None
+    if not 0 <= speed <= 1000:
+        raise ValueError('Replay speed must be between 0 (as fast as possible) and 1000')
+    mode = data.get('replay_mode', 'tcp')
+    if mode not in ('tcp', 'direct'):
+        raise ValueError('Replay mode must be tcp or direct')
+
+    if mode == 'direct':
+        reader = CaptureReader(path)
+        adsb_aggregator.clear()
+        adsb_messages_received = 0
+        adsb_feed_format = reader.feed_format
+        stop = threading.Event()
+        adsb_replay = {'path': path, 'mode': 'direct', 'speed': speed, 'finished': False, 'stop': stop}
+        adsb_using_service = True
+        threading.Thread(target=feed_capture, args=(path, speed, stop), daemon=True).start()
+        return
+
+    server = ReplayServer(path, speed=speed)
+    port = server.start()
+    adsb_replay = server
+    _start_ingest([('replay', '127.0.0.1', port, server.feed_format)], record=False, replay=server)
+
+
+def _stop_recording_and_replay():
+    global adsb_replay
+
+    for recorder in adsb_recorders:
+        recorder.close()
+    adsb_recorders.clear()
+
+    if isinstance(adsb_replay, ReplayServer):
+        adsb_replay.stop()
+    elif isinstance(adsb_replay, dict):
+        adsb_replay['stop'].set()
+    adsb_replay = None
+
+
+def _replay_status():
+    if isinstance(adsb_replay, ReplayServer):
+        return {
+            'mode': 'tcp',
+            'path': adsb_replay.reader.path,
+            'port': adsb_replay.port,
+            'speed': adsb_replay.speed,
+            'bytes_sent': adsb_replay.bytes_sent,
+            'finished': adsb_replay.finished,
+        }
+    if isinstance(adsb_replay, dict):
+        return {key: value for key, value in adsb_replay.items() if key != 'stop'}
+    return None
+
+
+@adsb_bp.route('/recordings')
+def list_recordings():
+    """List capture files available for replay."""
+    recordings = []
+    if os.path.isdir(ADSB_RECORD_DIR):
+        for name in sorted(os.listdir(ADSB_RECORD_DIR)):
+            path = os.path.join(ADSB_RECORD_DIR, name)
+            try:
+                reader = CaptureReader(path)
+            except (OSError, ValueError):
+                continue
+            stat = os.stat(path)
+            recordings.append({
+                'name': name,
+                'format': reader.feed_format,
+                'size': stat.st_size,
+                'modified': stat.st_mtime,
+            })
+    return jsonify({'status': 'success', 'recordings': recordings})
 
 
 @adsb_bp.route('/tools')
@@ -210,13 +429,22 @@ def adsb_status():
     return jsonify({
         'tracking_active': adsb_using_service,
         'connected_to_sbs': adsb_connected,
+        'feed_format': adsb_feed_format,
+        'sources': adsb_aggregator.status(),
         'messages_received': adsb_messages_received,
         'last_message_time': adsb_last_message_time,
         'aircraft_count': len(app_module.adsb_aircraft),
-        'aircraft': dict(app_module.adsb_aircraft),  # Full aircraft data
+        'aircraft_summary': app_module.adsb_aircraft.summary(),
         'queue_size': app_module.adsb_queue.qsize(),
+        'stream_subscribers': app_module.adsb_queue.subscriber_count,
+        'queue_stats': app_module.adsb_queue.stats(),
         'dump1090_path': find_dump1090(),
-        'port_30003_open': check_dump1090_service() is not None
+        'port_30003_open': check_dump1090_service(ADSB_SBS_PORT) is not None,
+        'port_30005_open': check_dump1090_service(ADSB_BEAST_PORT) is not None,
+        'recording': [
+            {'path': r.path, 'bytes': r.bytes_written, 'chunks': r.chunks} for r in adsb_recorders
+        ],
+        'replay': _replay_status()
     })
 
 
@@ -238,13 +466,38 @@ def start_adsb():
     except ValueError as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
+    # SBS text (port 30003) or Beast binary (port 30005) feed
+    feed_format = data.get('format', 'sbs')
+    if feed_format not in ('sbs', 'beast'):
+        return jsonify({'status': 'error', 'message': 'Format must be sbs or beast'}), 400
+    feed_port = ADSB_BEAST_PORT if feed_format == 'beast' else ADSB_SBS_PORT
+    record = bool(data.get('record', False))
+
+    # Replay a recorded session instead of live receivers
+    if data.get('replay'):
+        try:
+            _start_replay(data)
+        except (OSError, ValueError) as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        return jsonify({'status': 'started', 'message': f"Replaying {data['replay']}"})
+
+    # Aggregate remote receivers instead of starting a local decoder
+    raw_sources = data.get('sources') or ADSB_SOURCES
+    if raw_sources:
+        try:
+            sources = parse_receiver_sources(raw_sources)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        if sources:
+            _start_ingest(sources, record=record)
+            return jsonify({'status': 'started', 'message': f'Aggregating {len(sources)} receivers'})
+
     # Check if dump1090 is already running externally (e.g., user started it manually)
-    existing_service = check_dump1090_service()
+    existing_service = check_dump1090_service(feed_port)
     if existing_service:
         logger.info(f"Found existing dump1090 service at {existing_service}")
-        adsb_using_service = True
-        thread = threading.Thread(target=parse_sbs_stream, args=(existing_service,), daemon=True)
-        thread.start()
+        host, port = existing_service.split(':')
+        _start_ingest([(existing_service, host, int(port), feed_format)], record=record)
         return jsonify({'status': 'started', 'message': 'Connected to existing dump1090 service'})
 
     # Get SDR type from request
@@ -300,9 +553,7 @@ def start_adsb():
         if app_module.adsb_process.poll() is not None:
             return jsonify({'status': 'error', 'message': 'dump1090 failed to start. Check RTL-SDR device permissions or if another process is using it.'})
 
-        adsb_using_service = True
-        thread = threading.Thread(target=parse_sbs_stream, args=('localhost:30003',), daemon=True)
-        thread.start()
+        _start_ingest([(f'localhost:{feed_port}', 'localhost', feed_port, feed_format)], record=record)
 
         return jsonify({'status': 'started', 'message': 'ADS-B tracking started'})
     except Exception as e:
@@ -323,35 +574,122 @@ def stop_adsb():
                 app_module.adsb_process.kill()
             app_module.adsb_process = None
         adsb_using_service = False
+        _stop_recording_and_replay()
 
-    app_module.adsb_aircraft = {}
+    app_module.adsb_aircraft.clear()
     return jsonify({'status': 'stopped'})
 
 
 @adsb_bp.route('/stream')
 def stream_adsb():
-    """SSE stream for ADS-B aircraft."""
-    def generate():
-        last_keepalive = time.time()
-        keepalive_interval = 30.0
+    """SSE stream for ADS-B aircraft. ?bbox=south,west,north,east limits it to a map viewport."""
+    message_filter = None
+    if request.args.get('bbox'):
+        try:
+            message_filter = bbox_filter(parse_bbox(request.args['bbox']), app_module.adsb_aircraft.position)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        while True:
-            try:
-                msg = app_module.adsb_queue.get(timeout=1)
-                last_keepalive = time.time()
-                yield format_sse(msg)
-            except queue.Empty:
-                now = time.time()
-                if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
-                    last_keepalive = now
-
-    response = Response(generate(), mimetype='text/event-stream')
+    response = Response(
+        sse_stream(app_module.adsb_queue, message_filter=message_filter, **negotiate_stream(request)),
+        mimetype='text/event-stream'
+    )
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     return response
 
 
+@adsb_bp.route('/aircraft')
+def query_aircraft():
+    """
+    Aircraft inside ?bbox=south,west,north,east or within ?radius= nm of ?lat=&lon=.
+
+    Without either, returns every aircraft.
+    """
+    store = app_module.adsb_aircraft
+
+    if request.args.get('bbox'):
+        try:
+            bbox = parse_bbox(request.args['bbox'])
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        aircraft = [ac.to_dict() for ac in store.in_bbox(bbox)]
+    elif 'radius' in request.args:
+        lat = request.args.get('lat', type=float)
+        lon = request.args.get('lon', type=float)
+        radius = request.args.get('radius', type=float)
+        if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return jsonify({'status': 'error', 'message': 'Radius queries need a valid lat and lon'}), 400
+        if radius is None or not 0 < radius <= 1000:
+            return jsonify({'status': 'error', 'message': 'Radius must be between 0 and 1000 nm'}), 400
+        aircraft = [{**ac.to_dict(), 'distance_nm': round(distance, 1)}
+                    for ac, distance in store.within_radius(lat, lon, radius)]
+    else:
+        aircraft = store.to_list()
+
+    return jsonify({'status': 'success', 'count': len(aircraft), 'aircraft': aircraft})
+
+
+def _track_params():
+    """Parse ?since= and ?tolerance= for the track endpoints."""
+    since = request.args.get('since', type=float)
+    tolerance = request.args.get('tolerance', ADSB_TRACK_TOLERANCE, type=float)
+    if tolerance is None or not 0 <= tolerance <= 10000:
+        raise ValueError('Tolerance must be between 0 and 10000 metres')
+    return since, tolerance
+
+
+@adsb_bp.route('/track/<icao>')
+def get_track(icao):
+    """Position history for one aircraft, Douglas-Peucker simplified."""
+    if app_module.adsb_aircraft.tracks is None:
+        return jsonify({'status': 'error', 'message': 'Track history unavailable (numpy not installed)'}), 503
+
+    icao = icao.upper()
+    if len(icao) != 6 or not all(c in '0123456789ABCDEF' for c in icao):
+        return jsonify({'status': 'error', 'message': 'Invalid ICAO address'}), 400
+    try:
+        since, tolerance = _track_params()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    rows = app_module.adsb_aircraft.track(icao, since)
+    if rows is None:
+        return jsonify({'status': 'error', 'message': 'No track for aircraft'}), 404
+
+    simplified = simplify_track(rows, tolerance)
+    return jsonify({
+        'status': 'success',
+        'icao': icao,
+        'fields': ['t', 'lat', 'lon', 'alt', 'speed'],
+        'points': track_to_list(simplified),
+        'original_points': len(rows),
+    })
+
+
+@adsb_bp.route('/tracks')
+def get_tracks():
+    """Position history for all aircraft in one response, for painting trails on page load."""
+    if app_module.adsb_aircraft.tracks is None:
+        return jsonify({'status': 'error', 'message': 'Track history unavailable (numpy not installed)'}), 503
+
+    try:
+        since, tolerance = _track_params()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    tracks = {}
+    for icao, rows in app_module.adsb_aircraft.all_tracks(since).items():
+        if len(rows):
+            tracks[icao] = track_to_list(simplify_track(rows, tolerance))
+
+    return jsonify({
+        'status': 'success',
+        'fields': ['t', 'lat', 'lon', 'alt', 'speed'],
+        'tracks': tracks,
+    })
+
+
 @adsb_bp.route('/dashboard')
 def adsb_dashboard():
     """Popout ADS-B dashboard."""
@@ -0,0 +1,61 @@
+"""Watchlist alert routes."""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, jsonify, request
+
+import app as app_module
+from utils.logging import app_logger as logger
+from utils.sse import negotiate_stream, sse_stream
+
+alerts_bp = Blueprint('alerts', __name__, url_prefix='/alerts')
+
+
+@alerts_bp.route('/status')
+def alerts_status() -> Response:
+    """Watchlist sizes and alert counters."""
+    return jsonify({'status': 'success', **app_module.alerts.stats()})
+
+
+@alerts_bp.route('/watchlist', methods=['GET'])
+def get_watchlist() -> Response:
+    """The watchlist currently in effect."""
+    return jsonify({'status': 'success', 'watchlist': app_module.alerts.watchlist.source})
+
+
+@alerts_bp.route('/watchlist', methods=['POST'])
+def set_watchlist() -> Response:
+    """
+    Replace the watchlist (and save it to the watchlist file).
+
+    Body: {"keywords": [...], "pager_addresses": [...], "icao": [...],
+    "squawks": [...], "sensors": [{"model": ..., "id": ..., "channel": ...}]}
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'status': 'error', 'message': 'Watchlist must be a JSON object'}), 400
+    try:
+        compiled = app_module.alerts.update(data)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except OSError as e:
+        logger.error(f"Failed to save watchlist: {e}")
+        return jsonify({'status': 'error', 'message': 'Watchlist applied but could not be saved'}), 500
+    return jsonify({'status': 'success', 'watchlist': compiled.counts()})
+
+
+@alerts_bp.route('/reload', methods=['POST'])
+def reload_watchlist() -> Response:
+    """Re-read the watchlist file now."""
+    if not app_module.alerts.load():
+        return jsonify({'status': 'error', 'message': 'Watchlist file missing or invalid'}), 400
+    return jsonify({'status': 'success', 'watchlist': app_module.alerts.watchlist.counts()})
+
+
+@alerts_bp.route('/stream')
+def stream_alerts() -> Response:
+    response = Response(sse_stream(app_module.alert_queue, **negotiate_stream(request)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Connection'] = 'keep-alive'
+    return response
@@ -7,25 +7,27 @@ import json
 import os
 import platform
 import pty
-import queue
 import re
 import select
 import subprocess
 import threading
 import time
-from typing import Any, Generator
+from typing import Any
 
 from flask import Blueprint, jsonify, request, Response
 
 import app as app_module
 from utils.dependencies import check_tool
 from utils.logging import bluetooth_logger as logger
-from utils.sse import format_sse
+from utils.sse import sse_stream, negotiate_stream, clear_queue
 from data.oui import OUI_DATABASE, load_oui_database, get_manufacturer
 from data.patterns import AIRTAG_PREFIXES, TILE_PREFIXES, SAMSUNG_TRACKER
 
 bluetooth_bp = Blueprint('bluetooth', __name__, url_prefix='/bt')
 
+# bluetoothctl "[CHG] Device <mac> RSSI: -60" (newer versions: "RSSI: 0xffffffc4 (-60)")
+BT_RSSI_PATTERN = re.compile(r'RSSI:\s*(?:0x[0-9A-Fa-f]+\s*\()?(-?\d+)')
+
 
 def classify_bt_device(name, device_class, services, manufacturer=None):
     """Classify Bluetooth device type based on available info."""
@@ -179,6 +181,7 @@ def stream_bt_scan(process, scan_mode):
                         'device_type': device.get('type', 'other'),
                         'action': 'new' if is_new else 'update',
                     })
+                    app_module.history.record('bluetooth', device)
 
         elif scan_mode == 'bluetoothctl':
             master_fd = getattr(process, '_master_fd', None)
@@ -208,13 +211,22 @@ def stream_bt_scan(process, scan_mode):
                                     mac = match.group(1).upper()
                                     name = match.group(2).strip()
 
+                                    rssi = None
+                                    rssi_match = BT_RSSI_PATTERN.match(name)
+                                    if rssi_match:
+                                        # Signal update for a device, not its name
+                                        rssi = int(rssi_match.group(1))
+                                        app_module.timeseries.record(f'bt:{mac}:rssi', rssi)
+                                        known = app_module.bt_devices.get(mac)
+                                        name = known['name'] if known and known['name'] != '[Unknown]' else ''
+
                                     manufacturer = get_manufacturer(mac)
                                     device = {
                                         'mac': mac,
                                         'name': name or '[Unknown]',
                                         'manufacturer': manufacturer,
                                         'type': classify_bt_device(name, None, None, manufacturer),
-                                        'rssi': None,
+                                        'rssi': rssi,
                                         'last_seen': time.time()
                                     }
 
@@ -231,6 +243,7 @@ def stream_bt_scan(process, scan_mode):
                                         'device_type': device.get('type', 'other'),
                                         'action': 'new' if is_new else 'update',
                                     })
+                                    app_module.history.record('bluetooth', device)
                     except OSError:
                         break
 
@@ -295,11 +308,7 @@ def start_bt_scan():
         app_module.bt_interface = interface
         app_module.bt_devices = {}
 
-        while not app_module.bt_queue.empty():
-            try:
-                app_module.bt_queue.get_nowait()
-            except queue.Empty:
-                break
+        clear_queue(app_module.bt_queue)
 
         try:
             if scan_mode == 'hcitool':
@@ -470,22 +479,7 @@ def get_bt_devices():
 @bluetooth_bp.route('/stream')
 def stream_bt():
     """SSE stream for Bluetooth events."""
-    def generate():
-        last_keepalive = time.time()
-        keepalive_interval = 30.0
-
-        while True:
-            try:
-                msg = app_module.bt_queue.get(timeout=1)
-                last_keepalive = time.time()
-                yield format_sse(msg)
-            except queue.Empty:
-                now = time.time()
-                if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
-                    last_keepalive = now
-
-    response = Response(generate(), mimetype='text/event-stream')
+    response = Response(sse_stream(app_module.bt_queue, **negotiate_stream(request)), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     response.headers['Connection'] = 'keep-alive'
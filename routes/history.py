@@ -0,0 +1,50 @@
+"""Decoded event history routes."""
+
+from __future__ import annotations
+
+import sqlite3
+
+from flask import Blueprint, Response, jsonify, request
+
+import app as app_module
+from utils.history import SCHEMAS
+from utils.logging import app_logger as logger
+
+history_bp = Blueprint('history', __name__, url_prefix='/history')
+
+MAX_LIMIT = 10000
+
+
+@history_bp.route('/status')
+def history_status() -> Response:
+    """Writer counters: pending, written, dropped, last batch time."""
+    return jsonify({'status': 'success', **app_module.history.stats()})
+
+
+@history_bp.route('/<mode>')
+def get_history(mode: str) -> Response:
+    """
+    Stored events for one mode, newest first.
+
+    Query args: key (ICAO, pager address, sensor model, BSSID or MAC),
+    since/until (Unix time), limit (default 1000).
+    """
+    if mode not in SCHEMAS:
+        return jsonify({'status': 'error', 'message': f'Unknown mode: {mode}'}), 404
+    try:
+        since = request.args.get('since', type=float)
+        until = request.args.get('until', type=float)
+        limit = int(request.args.get('limit', 1000))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid parameters'}), 400
+    if not 1 <= limit <= MAX_LIMIT:
+        return jsonify({'status': 'error', 'message': f'limit must be 1-{MAX_LIMIT}'}), 400
+
+    try:
+        events = app_module.history.query(mode, key=request.args.get('key'),
+                                          since=since, until=until, limit=limit)
+    except sqlite3.Error as e:
+        logger.error(f"History query failed: {e}")
+        return jsonify({'status': 'error', 'message': 'History database unavailable'}), 503
+
+    return jsonify({'status': 'success', 'mode': mode, 'count': len(events), 'events': events})
@@ -8,21 +8,20 @@ gr-iridium or iridium-toolkit which are not yet integrated.
 from __future__ import annotations
 
 import json
-import queue
 import random
 import shutil
 import subprocess
 import threading
 import time
 from datetime import datetime
-from typing import Any, Generator
+from typing import Any
 
 from flask import Blueprint, jsonify, request, Response
 
 import app as app_module
 from utils.logging import iridium_logger as logger
 from utils.validation import validate_frequency, validate_device_index, validate_gain
-from utils.sse import format_sse
+from utils.sse import sse_stream, negotiate_stream
 from utils.sdr import SDRFactory, SDRType
 
 iridium_bp = Blueprint('iridium', __name__, url_prefix='/iridium')
@@ -184,22 +183,7 @@ def stop_iridium():
 @iridium_bp.route('/stream')
 def stream_iridium():
     """SSE stream for Iridium bursts."""
-    def generate():
-        last_keepalive = time.time()
-        keepalive_interval = 30.0
-
-        while True:
-            try:
-                msg = app_module.satellite_queue.get(timeout=1)
-                last_keepalive = time.time()
-                yield format_sse(msg)
-            except queue.Empty:
-                now = time.time()
-                if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
-                    last_keepalive = now
-
-    response = Response(generate(), mimetype='text/event-stream')
+    response = Response(sse_stream(app_module.satellite_queue, **negotiate_stream(request)), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     return response
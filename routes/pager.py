@@ -2,107 +2,74 @@
 
 from __future__ import annotations
 
+import contextlib
 import os
 import pathlib
-import re
 import pty
-import queue
 import select
+import sqlite3
 import subprocess
 import threading
 import time
 from datetime import datetime
-from typing import Any, Generator
+from typing import Any, BinaryIO
 
 from flask import Blueprint, jsonify, request, Response
 
 import app as app_module
+from config import PAGER_CHANNELIZER_SAMPLE_RATE, PAGER_MAX_CHANNELS
 from utils.logging import pager_logger as logger
 from utils.validation import validate_frequency, validate_device_index, validate_gain, validate_ppm
-from utils.sse import format_sse
+from utils.sse import sse_stream, negotiate_stream, clear_queue
+from utils.multimon import DECODERS, PAGER_DECODERS, MultimonParser, multimon_args
+from utils.channelizer import NUMPY_AVAILABLE, PagerChannelizer
 from utils.process import safe_terminate, register_process
 from utils.sdr import SDRFactory, SDRType, SDRValidationError
 
 pager_bp = Blueprint('pager', __name__)
 
-
-def parse_multimon_output(line: str) -> dict[str, str] | None:
-    """Parse multimon-ng output line."""
-    line = line.strip()
-
-    # POCSAG parsing - with message content
-    pocsag_match = re.match(
-        r'(POCSAG\d+):\s*Address:\s*(\d+)\s+Function:\s*(\d+)\s+(Alpha|Numeric):\s*(.*)',
-        line
-    )
-    if pocsag_match:
-        return {
-            'protocol': pocsag_match.group(1),
-            'address': pocsag_match.group(2),
-            'function': pocsag_match.group(3),
-            'msg_type': pocsag_match.group(4),
-            'message': pocsag_match.group(5).strip() or '[No Message]'
-        }
-
-    # POCSAG parsing - address only (no message content)
-    pocsag_addr_match = re.match(
-        r'(POCSAG\d+):\s*Address:\s*(\d+)\s+Function:\s*(\d+)\s*$',
-        line
-    )
-    if pocsag_addr_match:
-        return {
-            'protocol': pocsag_addr_match.group(1),
-            'address': pocsag_addr_match.group(2),
-            'function': pocsag_addr_match.group(3),
-            'msg_type': 'Tone',
-            'message': '[Tone Only]'
-        }
-
-    # FLEX parsing (standard format)
-    flex_match = re.match(
-        r'FLEX[:\|]\s*[\d\-]+[\s\|]+[\d:]+[\s\|]+([\d/A-Z]+)[\s\|]+([\d.]+)[\s\|]+\[?(\d+)\]?[\s\|]+(\w+)[\s\|]+(.*)',
-        line
-    )
-    if flex_match:
-        return {
-            'protocol': 'FLEX',
-            'address': flex_match.group(3),
-            'function': flex_match.group(1),
-            'msg_type': flex_match.group(4),
-            'message': flex_match.group(5).strip() or '[No Message]'
-        }
-
-    # Simple FLEX format
-    flex_simple = re.match(r'FLEX:\s*(.+)', line)
-    if flex_simple:
-        return {
-            'protocol': 'FLEX',
-            'address': 'Unknown',
-            'function': '',
-            'msg_type': 'Unknown',
-            'message': flex_simple.group(1).strip()
-        }
-
-    return None
+SEARCH_MAX_LIMIT = 500
 
 
 def log_message(msg: dict[str, Any]) -> None:
-    """Log a message to file if logging is enabled."""
+    """Log a message to file if logging is enabled (buffered, see utils.message_log)."""
     if not app_module.logging_enabled:
         return
-    try:
-        with open(app_module.log_file_path, 'a') as f:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            f.write(f"{timestamp} | {msg.get('protocol', 'UNKNOWN')} | {msg.get('address', '')} | {msg.get('message', '')}\n")
-    except Exception as e:
-        logger.error(f"Failed to log message: {e}")
+    app_module.message_log.write(
+        'pager', msg,
+        f"{msg.get('protocol', 'UNKNOWN')} | {msg.get('address', '')} | {msg.get('message', '')}"
+    )
 
 
-def stream_decoder(master_fd: int, process: subprocess.Popen[bytes]) -> None:
-    """Stream decoder output to queue using PTY for unbuffered output."""
+def publish_message(parsed: dict[str, Any], channel: float | None = None) -> None:
+    """Send one decoded message to the UI, alerts, history and log."""
+    # Repeated transmissions only bump the address counters
+    duplicate = not app_module.pager_dedup.accept(parsed)
+    app_module.pager_addresses.record(parsed, duplicate=duplicate)
+    if duplicate:
+        return
+    parsed['timestamp'] = datetime.now().strftime('%H:%M:%S')
+    if channel is not None:
+        parsed['frequency'] = channel
+    app_module.output_queue.put({'type': 'message', **parsed})
+    app_module.alerts.check_pager(parsed)
+    app_module.history.record('pager', parsed)
+    log_message(parsed)
+
+
+def stream_decoder(master_fd: int, process: subprocess.Popen[bytes], channel: float | None = None) -> None:
+    """
+    Stream decoder output to queue using PTY for unbuffered output.
+
+    channel is set for the per-channel decoders of a ChannelizerGroup: their
+    messages are tagged with that frequency (MHz), and start/stop status is
+    left to the group.
+    """
     try:
-        app_module.output_queue.put({'type': 'status', 'text': 'started'})
+        if channel is None:
+            app_module.output_queue.put({'type': 'status', 'text': 'started'})
 
+        parser = MultimonParser()
         buffer = ""
         while True:
             try:
@@ -123,12 +90,10 @@ def stream_decoder(master_fd: int, process: subprocess.Popen[bytes]) -> None:
                         if not line:
                             continue
 
-                        parsed = parse_multimon_output(line)
-                        if parsed:
-                            parsed['timestamp'] = datetime.now().strftime('%H:%M:%S')
-                            app_module.output_queue.put({'type': 'message', **parsed})
-                            log_message(parsed)
-                        else:
+                        messages = parser.feed(line)
+                        for parsed in messages:
+                            publish_message(parsed, channel)
+                        if not messages and not parser.waiting:
                             app_module.output_queue.put({'type': 'raw', 'text': line})
                 except OSError:
                     break
@@ -136,6 +101,12 @@ def stream_decoder(master_fd: int, process: subprocess.Popen[bytes]) -> None:
             if process.poll() is not None:
                 break
 
+        # Output ended (EOF, exit or stop): an unterminated last line and a
+        # header still waiting for its payload would otherwise be lost
+        messages = parser.feed(buffer.strip()) if buffer.strip() else []
+        for parsed in messages + parser.flush():
+            publish_message(parsed, channel)
+
     except Exception as e:
         app_module.output_queue.put({'type': 'error', 'text': str(e)})
     finally:
@@ -144,9 +115,99 @@ def stream_decoder(master_fd: int, process: subprocess.Popen[bytes]) -> None:
         except OSError:
             pass
         process.wait()
-        app_module.output_queue.put({'type': 'status', 'text': 'stopped'})
-        with app_module.process_lock:
-            app_module.current_process = None
+        if channel is None:
+            app_module.output_queue.put({'type': 'status', 'text': 'stopped'})
+            with app_module.process_lock:
+                app_module.current_process = None
+
+
+class ChannelizerGroup:
+    """
+    rtl_sdr (or an IQ file) -> PagerChannelizer -> one multimon-ng per channel.
+
+    Stands in for the multimon-ng process in app_module.current_process, so
+    /stop and /status work the same in both modes.
+    """
+
+    # Bytes of 8-bit IQ per read (~55 ms at 2.4 Msps)
+    CHUNK_SIZE = 262144
+
+    def __init__(
+        self,
+        receiver: PagerChannelizer,
+        source: subprocess.Popen[bytes] | None,
+        iq_file: BinaryIO | None,
+        decoders: list[subprocess.Popen[bytes]],
+    ):
+        self.receiver = receiver
+        self.source = source
+        self.iq_file = iq_file
+        self.decoders = decoders
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._pump, name='pager-channelizer', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _pump(self) -> None:
+        """Read IQ, channelize and write each channel's audio to its multimon-ng."""
+        app_module.output_queue.put({'type': 'status', 'text': 'started'})
+        stream = self.iq_file if self.iq_file is not None else self.source.stdout
+        try:
+            while not self._stop.is_set():
+                data = stream.read(self.CHUNK_SIZE)
+                if not data:
+                    break
+                for decoder, audio in zip(self.decoders, self.receiver.process(data)):
+                    decoder.stdin.write(audio)
+                    decoder.stdin.flush()
+        except (OSError, ValueError) as e:
+            if not self._stop.is_set():
+                logger.error(f"Channelizer stopped: {e}")
+                app_module.output_queue.put({'type': 'error', 'text': str(e)})
+        finally:
+            # End of input: let each multimon-ng drain and exit
+            for decoder in self.decoders:
+                try:
+                    decoder.stdin.close()
+                except OSError:
+                    pass
+            for decoder in self.decoders:
+                try:
+                    decoder.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    decoder.kill()
+            if self.iq_file is not None:
+                self.iq_file.close()
+            if self.source is not None:
+                safe_terminate(self.source)
+            app_module.output_queue.put({'type': 'status', 'text': 'stopped'})
+            # No process_lock here: /stop holds it while wait() joins this
+            # thread. Only a stop can replace us, and it joins us before releasing
+            # the lock, so this compare-and-clear cannot clear a newer process.
+            if app_module.current_process is self:
+                app_module.current_process = None
+
+    def poll(self) -> int | None:
+        return None if self._thread.is_alive() else 0
+
+    def terminate(self) -> None:
+        self._stop.set()
+        if self.source is not None:
+            safe_terminate(self.source)
+        for decoder in self.decoders:
+            safe_terminate(decoder)
+
+    def kill(self) -> None:
+        for process in [self.source, *self.decoders]:
+            if process is not None and process.poll() is None:
+                process.kill()
+
+    def wait(self, timeout: float | None = None) -> int:
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise subprocess.TimeoutExpired('pager-channelizer', timeout)
+        return 0
 
 
 @pager_bp.route('/start', methods=['POST'])
@@ -174,33 +235,19 @@ def start_decoding() -> Response:
         except (ValueError, TypeError):
             return jsonify({'status': 'error', 'message': 'Invalid squelch value'}), 400
 
-        # Validate protocols
-        valid_protocols = ['POCSAG512', 'POCSAG1200', 'POCSAG2400', 'FLEX']
-        protocols = data.get('protocols', valid_protocols)
+        # Validate protocols (any registered multimon-ng decoder; pager ones by default)
+        protocols = data.get('protocols', list(PAGER_DECODERS))
         if not isinstance(protocols, list):
             return jsonify({'status': 'error', 'message': 'Protocols must be a list'}), 400
-        protocols = [p for p in protocols if p in valid_protocols]
+        protocols = [p for p in protocols if p in DECODERS]
         if not protocols:
-            protocols = valid_protocols
+            protocols = list(PAGER_DECODERS)
 
         # Clear queue
-        while not app_module.output_queue.empty():
-            try:
-                app_module.output_queue.get_nowait()
-            except queue.Empty:
-                break
+        clear_queue(app_module.output_queue)
 
         # Build multimon-ng decoder arguments
-        decoders = []
-        for proto in protocols:
-            if proto == 'POCSAG512':
-                decoders.extend(['-a', 'POCSAG512'])
-            elif proto == 'POCSAG1200':
-                decoders.extend(['-a', 'POCSAG1200'])
-            elif proto == 'POCSAG2400':
-                decoders.extend(['-a', 'POCSAG2400'])
-            elif proto == 'FLEX':
-                decoders.extend(['-a', 'FLEX'])
+        decoders = multimon_args(protocols)
 
         # Get SDR type and build command via abstraction layer
         sdr_type_str = data.get('sdr_type', 'rtlsdr')
@@ -209,6 +256,9 @@ def start_decoding() -> Response:
         except ValueError:
             sdr_type = SDRType.RTL_SDR
 
+        if data.get('mode') == 'channelizer':
+            return _start_channelizer(data, decoders, sdr_type, device, gain, ppm)
+
         # Create device object and get command builder
         sdr_device = SDRFactory.create_default_device(sdr_type, index=device)
         builder = SDRFactory.get_builder(sdr_type)
@@ -282,34 +332,149 @@ def start_decoding() -> Response:
             return jsonify({'status': 'error', 'message': str(e)})
 
 
+def _start_channelizer(
+    data: dict[str, Any],
+    decoders: list[str],
+    sdr_type: SDRType,
+    device: int,
+    gain: float,
+    ppm: int,
+) -> Response:
+    """
+    Decode several pager channels from one SDR (called with process_lock held).
+
+    Request fields: channels (list of MHz), optionally iq_file (8-bit IQ
+    recorded at PAGER_CHANNELIZER_SAMPLE_RATE, instead of a live rtl_sdr).
+    """
+    if not NUMPY_AVAILABLE:
+        return jsonify({'status': 'error', 'message': 'Wideband mode requires numpy'}), 503
+
+    channels = data.get('channels')
+    if not isinstance(channels, list) or not channels:
+        return jsonify({'status': 'error', 'message': 'Channels must be a non-empty list'}), 400
+    if len(channels) > PAGER_MAX_CHANNELS:
+        return jsonify({'status': 'error', 'message': f'At most {PAGER_MAX_CHANNELS} channels'}), 400
+    try:
+        channels_mhz = list(dict.fromkeys(validate_frequency(c) for c in channels))
+        receiver = PagerChannelizer([c * 1e6 for c in channels_mhz], sample_rate=PAGER_CHANNELIZER_SAMPLE_RATE)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    source_cmd = None
+    if data.get('iq_file'):
+        iq_path = pathlib.Path(data['iq_file']).resolve()
+        if not iq_path.is_relative_to(pathlib.Path('.').resolve()) or not iq_path.is_file():
+            return jsonify({'status': 'error', 'message': 'Invalid IQ file path'}), 400
+        source_desc = str(iq_path)
+    else:
+        builder = SDRFactory.get_builder(sdr_type)
+        try:
+            source_cmd = builder.build_iq_capture_command(
+                device=SDRFactory.create_default_device(sdr_type, index=device),
+                frequency_mhz=receiver.center_hz / 1e6,
+                sample_rate=PAGER_CHANNELIZER_SAMPLE_RATE,
+                gain=float(gain) if gain and gain != '0' else None,
+                ppm=int(ppm) if ppm and ppm != '0' else None,
+            )
+        except NotImplementedError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        source_desc = ' '.join(source_cmd)
+
+    multimon_cmd = ['multimon-ng', '-t', 'raw'] + decoders + ['-f', 'alpha', '-']
+    full_cmd = f"{source_desc} | channelizer ({', '.join(map(str, channels_mhz))} MHz) | {' '.join(multimon_cmd)}"
+    logger.info(f"Running: {full_cmd}")
+
+    source = None
+    iq_file = None
+    multimon_processes: list[subprocess.Popen[bytes]] = []
+    master_fds: list[int] = []
+    try:
+        with contextlib.ExitStack() as stack:
+            if source_cmd is None:
+                iq_file = stack.enter_context(open(source_desc, 'rb'))
+            else:
+                source = subprocess.Popen(source_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+                def monitor_source_stderr():
+                    for line in source.stderr:
+                        err_text = line.decode('utf-8', errors='replace').strip()
+                        if err_text:
+                            logger.debug(f"[RTL_SDR] {err_text}")
+                            app_module.output_queue.put({'type': 'raw', 'text': f'[rtl_sdr] {err_text}'})
+
+                threading.Thread(target=monitor_source_stderr, daemon=True).start()
+
+            # One multimon-ng per channel, each with its own PTY for output
+            for _ in channels_mhz:
+                master_fd, slave_fd = pty.openpty()
+                master_fds.append(master_fd)
+                multimon_processes.append(subprocess.Popen(
+                    multimon_cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=slave_fd,
+                    stderr=slave_fd,
+                    close_fds=True
+                ))
+                os.close(slave_fd)
+            # Handed to the ChannelizerGroup from here on
+            stack.pop_all()
+    except (OSError, ValueError) as e:
+        for process in [source, *multimon_processes]:
+            safe_terminate(process)
+        for master_fd in master_fds:
+            os.close(master_fd)
+        if isinstance(e, FileNotFoundError):
+            return jsonify({'status': 'error', 'message': f'Tool not found: {e.filename}'})
+        return jsonify({'status': 'error', 'message': str(e)})
+
+    group = ChannelizerGroup(receiver, source, iq_file, multimon_processes)
+    app_module.current_process = group
+    for master_fd, process, channel in zip(master_fds, multimon_processes, channels_mhz):
+        thread = threading.Thread(target=stream_decoder, args=(master_fd, process, channel))
+        thread.daemon = True
+        thread.start()
+    group.start()
+
+    app_module.output_queue.put({'type': 'info', 'text': f'Command: {full_cmd}'})
+
+    return jsonify({
+        'status': 'started',
+        'command': full_cmd,
+        'center_frequency': receiver.center_hz / 1e6,
+        'channels': channels_mhz,
+    })
+
+
 @pager_bp.route('/stop', methods=['POST'])
 def stop_decoding() -> Response:
     with app_module.process_lock:
-        if app_module.current_process:
+        # The reader thread may clear current_process as soon as it exits
+        process = app_module.current_process
+        if process:
             # Kill rtl_fm process first
-            if hasattr(app_module.current_process, '_rtl_process'):
+            if hasattr(process, '_rtl_process'):
                 try:
-                    app_module.current_process._rtl_process.terminate()
-                    app_module.current_process._rtl_process.wait(timeout=2)
+                    process._rtl_process.terminate()
+                    process._rtl_process.wait(timeout=2)
                 except (subprocess.TimeoutExpired, OSError):
                     try:
-                        app_module.current_process._rtl_process.kill()
+                        process._rtl_process.kill()
                     except OSError:
                         pass
 
             # Close PTY master fd
-            if hasattr(app_module.current_process, '_master_fd'):
+            if hasattr(process, '_master_fd'):
                 try:
-                    os.close(app_module.current_process._master_fd)
+                    os.close(process._master_fd)
                 except OSError:
                     pass
 
             # Kill multimon-ng
-            app_module.current_process.terminate()
+            process.terminate()
             try:
-                app_module.current_process.wait(timeout=2)
+                process.wait(timeout=2)
             except subprocess.TimeoutExpired:
-                app_module.current_process.kill()
+                process.kill()
 
             app_module.current_process = None
             return jsonify({'status': 'stopped'})
@@ -326,10 +491,97 @@ def get_status() -> Response:
         return jsonify({'running': False, 'logging': app_module.logging_enabled, 'log_file': app_module.log_file_path})
 
 
+@pager_bp.route('/pager/addresses')
+def get_addresses() -> Response:
+    """
+    Per-address counters: messages, suppressed duplicates, first/last seen,
+    protocols, function codes and the latest message.
+
+    Query args: sort ('last_seen', 'count' or 'first_seen'), limit (default 500),
+    address (a single address).
+    """
+    address = request.args.get('address')
+    if address:
+        entry = app_module.pager_addresses.get(address)
+        if entry is None:
+            return jsonify({'status': 'error', 'message': f'Unknown address: {address}'}), 404
+        return jsonify({'status': 'success', 'address': entry})
+
+    try:
+        limit = int(request.args.get('limit', 500))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid parameters'}), 400
+    if limit < 1:
+        return jsonify({'status': 'error', 'message': 'limit must be positive'}), 400
+    try:
+        addresses = app_module.pager_addresses.snapshot(request.args.get('sort', 'last_seen'), limit)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    return jsonify({
+        'status': 'success',
+        'total': len(app_module.pager_addresses),
+        'count': len(addresses),
+        'addresses': addresses,
+        'dedup': app_module.pager_dedup.stats(),
+    })
+
+
+@pager_bp.route('/pager/search')
+def search_messages() -> Response:
+    """
+    Search stored pager messages, newest first.
+
+    Query args: q (words, "a phrase", prefix*), address, protocol,
+    since/until (Unix time), limit (default 50), before (the 'next' cursor
+    of the previous page).
+    """
+    if not app_module.history.running:
+        return jsonify({'status': 'error', 'message': 'Message history is disabled'}), 503
+    try:
+        since = request.args.get('since', type=float)
+        until = request.args.get('until', type=float)
+        before = request.args.get('before', type=int)
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid parameters'}), 400
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return jsonify({'status': 'error', 'message': f'limit must be 1-{SEARCH_MAX_LIMIT}'}), 400
+
+    start = time.perf_counter()
+    try:
+        messages, cursor = app_module.history.search(
+            'pager',
+            text=request.args.get('q') or None,
+            key=request.args.get('address') or None,
+            protocol=request.args.get('protocol') or None,
+            since=since, until=until, before=before, limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except sqlite3.Error as e:
+        logger.error(f"Pager search failed: {e}")
+        return jsonify({'status': 'error', 'message': 'History database unavailable'}), 503
+
+    return jsonify({
+        'status': 'success',
+        'count': len(messages),
+        'messages': messages,
+        'next': cursor,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+    })
+
+
 @pager_bp.route('/logging', methods=['POST'])
 def toggle_logging() -> Response:
     """Toggle message logging."""
     data = request.json or {}
+    if 'format' in data:
+        try:
+            app_module.message_log.set_format(data['format'])
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
     if 'enabled' in data:
         app_module.logging_enabled = bool(data['enabled'])
 
@@ -353,33 +605,21 @@ def toggle_logging() -> Response:
                 return jsonify({'status': 'error', 'message': 'Log file path must be a file, not a directory'}), 400
 
             app_module.log_file_path = str(requested_path)
+            app_module.message_log.set_path(app_module.log_file_path)
         except (ValueError, OSError) as e:
             logger.warning(f"Invalid log file path: {e}")
             return jsonify({'status': 'error', 'message': 'Invalid log file path'}), 400
 
-    return jsonify({'logging': app_module.logging_enabled, 'log_file': app_module.log_file_path})
+    return jsonify({
+        'logging': app_module.logging_enabled,
+        'log_file': app_module.log_file_path,
+        'log_format': app_module.message_log.log_format,
+    })
 
 
 @pager_bp.route('/stream')
 def stream() -> Response:
-    import json
-
-    def generate() -> Generator[str, None, None]:
-        last_keepalive = time.time()
-        keepalive_interval = 30.0  # Send keepalive every 30 seconds instead of 1 second
-
-        while True:
-            try:
-                msg = app_module.output_queue.get(timeout=1)
-                last_keepalive = time.time()
-                yield format_sse(msg)
-            except queue.Empty:
-                now = time.time()
-                if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
-                    last_keepalive = now
-
-    response = Response(generate(), mimetype='text/event-stream')
+    response = Response(sse_stream(app_module.output_queue, **negotiate_stream(request)), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     response.headers['Connection'] = 'keep-alive'
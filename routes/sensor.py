@@ -3,24 +3,72 @@
 from __future__ import annotations
 
 import json
-import queue
 import subprocess
 import threading
 import time
-from datetime import datetime
-from typing import Generator
+from typing import Any, Callable
 
 from flask import Blueprint, jsonify, request, Response
 
 import app as app_module
+from config import SENSOR_HOP_FREQUENCIES, SENSOR_HOP_MAX_DWELL, SENSOR_HOP_MIN_DWELL, SENSOR_MAX_DEVICES
+from utils.dependencies import check_tool
 from utils.logging import sensor_logger as logger
 from utils.validation import validate_frequency, validate_device_index, validate_gain, validate_ppm
-from utils.sse import format_sse
+from utils.sse import sse_stream, negotiate_stream, clear_queue
 from utils.process import safe_terminate, register_process
-from utils.sdr import SDRFactory, SDRType
+from utils.sdr import SDRDevice, SDRFactory, SDRType
+from utils.sdr import validation as sdr_validation
+from utils.sensor_hopper import HopSchedule
+from utils.sensor_registry import device_key, measurements
 
 sensor_bp = Blueprint('sensor', __name__)
 
+# rtl_433 takes a second or two to open the device, so shorter dwells mostly miss
+MIN_HOP_DWELL = 5.0
+MAX_HOP_BANDS = 16
+
+
+def handle_sensor_line(line: str, band: float | None = None) -> dict[str, Any] | None:
+    """
+    Decode one line of rtl_433 output and pass it on.
+
+    Args:
+        line: A line of rtl_433 stdout
+        band: Frequency (MHz) being listened on when hopping
+
+    Returns:
+        The reading if it was accepted (not a repeat or non-JSON)
+    """
+    try:
+        # rtl_433 outputs JSON objects, one per line
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        # Not JSON, send as raw
+        app_module.sensor_queue.put({'type': 'raw', 'text': line})
+        return None
+    if not isinstance(data, dict):
+        app_module.sensor_queue.put({'type': 'raw', 'text': line})
+        return None
+
+    data['type'] = 'sensor'
+    if band is not None:
+        data['frequency'] = band
+    if not app_module.sensor_registry.ingest(data):
+        # Repeat of a transmission already passed on
+        return None
+    app_module.sensor_queue.put(data)
+    series = 'sensor:' + ':'.join(device_key(data))
+    for field, value in measurements(data).items():
+        app_module.timeseries.record(f'{series}:{field}', value)
+    app_module.alerts.check_sensor(data)
+    app_module.history.record('sensor', data)
+
+    # Log if enabled
+    if app_module.logging_enabled:
+        app_module.message_log.write('sensor', data, f"{data.get('model', 'Unknown')} | {line}")
+    return data
+
 
 def stream_sensor_output(process: subprocess.Popen[bytes]) -> None:
     """Stream rtl_433 JSON output to queue."""
@@ -29,26 +77,8 @@ def stream_sensor_output(process: subprocess.Popen[bytes]) -> None:
 
         for line in iter(process.stdout.readline, b''):
             line = line.decode('utf-8', errors='replace').strip()
-            if not line:
-                continue
-
-            try:
-                # rtl_433 outputs JSON objects, one per line
-                data = json.loads(line)
-                data['type'] = 'sensor'
-                app_module.sensor_queue.put(data)
-
-                # Log if enabled
-                if app_module.logging_enabled:
-                    try:
-                        with open(app_module.log_file_path, 'a') as f:
-                            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                            f.write(f"{timestamp} | {data.get('model', 'Unknown')} | {json.dumps(data)}\n")
-                    except Exception:
-                        pass
-            except json.JSONDecodeError:
-                # Not JSON, send as raw
-                app_module.sensor_queue.put({'type': 'raw', 'text': line})
+            if line:
+                handle_sensor_line(line)
 
     except Exception as e:
         app_module.sensor_queue.put({'type': 'error', 'text': str(e)})
@@ -59,6 +89,114 @@ def stream_sensor_output(process: subprocess.Popen[bytes]) -> None:
             app_module.sensor_process = None
 
 
+def monitor_sensor_stderr(process: subprocess.Popen[bytes]) -> None:
+    """Forward rtl_433 stderr to the log and the stream."""
+    for line in process.stderr:
+        err = line.decode('utf-8', errors='replace').strip()
+        if err:
+            logger.debug(f"[rtl_433] {err}")
+            app_module.sensor_queue.put({'type': 'info', 'text': f'[rtl_433] {err}'})
+
+
+class SensorHopper:
+    """
+    Runs rtl_433 on each band of a HopSchedule in turn.
+
+    rtl_433's own hopping (-H) gives every frequency the same interval, so
+    each dwell is a fresh rtl_433 on one band, stopped when its (adaptive)
+    dwell time is up. Stands in for the rtl_433 process in
+    app_module.sensor_process, so /stop_sensor works the same in both modes.
+    """
+
+    def __init__(self, schedule: HopSchedule, build_command: Callable[[float], list[str]]):
+        self.schedule = schedule
+        self.build_command = build_command
+        self._stop = threading.Event()
+        self._child: subprocess.Popen[bytes] | None = None
+        self._child_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='sensor-hopper', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _dwell(self, freq: float, dwell: float) -> bool:
+        """Listen on one band; returns False if rtl_433 stopped by itself."""
+        started = time.monotonic()
+        child = subprocess.Popen(self.build_command(freq), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        register_process(child)
+        with self._child_lock:
+            self._child = child
+        if self._stop.is_set():
+            safe_terminate(child)
+        threading.Thread(target=monitor_sensor_stderr, args=(child,), daemon=True).start()
+        timer = threading.Timer(dwell, safe_terminate, args=(child,))
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in iter(child.stdout.readline, b''):
+                line = line.decode('utf-8', errors='replace').strip()
+                if not line:
+                    continue
+                data = handle_sensor_line(line, band=freq)
+                if data is not None:
+                    self.schedule.record(device_key(data))
+        finally:
+            timer.cancel()
+            safe_terminate(child)
+        listened = time.monotonic() - started
+        self.schedule.finish(listened)
+        # rtl_433 runs until stopped: ending well before the dwell is a failure (no device, bad args)
+        return self._stop.is_set() or listened >= dwell - 1
+
+    def _run(self) -> None:
+        app_module.sensor_queue.put({'type': 'status', 'text': 'started'})
+        try:
+            while not self._stop.is_set():
+                freq, dwell = self.schedule.next_dwell()
+                app_module.sensor_queue.put({
+                    'type': 'hop',
+                    'frequency': freq,
+                    'dwell': round(dwell, 1),
+                    'bands': self.schedule.stats()['bands'],
+                })
+                if not self._dwell(freq, dwell):
+                    app_module.sensor_queue.put({'type': 'error', 'text': f'rtl_433 exited on {freq} MHz, hopping stopped'})
+                    break
+        except FileNotFoundError:
+            app_module.sensor_queue.put({'type': 'error', 'text': 'rtl_433 not found'})
+        except Exception as e:
+            logger.error(f"Sensor hopping stopped: {e}")
+            app_module.sensor_queue.put({'type': 'error', 'text': str(e)})
+        finally:
+            app_module.sensor_queue.put({'type': 'status', 'text': 'stopped'})
+            # No sensor_lock here: /stop_sensor holds it while wait() joins this
+            # thread. Only a stop can replace us, and it joins us before releasing
+            # the lock, so this compare-and-clear cannot clear a newer process.
+            if app_module.sensor_process is self:
+                app_module.sensor_process = None
+
+    def poll(self) -> int | None:
+        return None if self._thread.is_alive() else 0
+
+    def terminate(self) -> None:
+        self._stop.set()
+        with self._child_lock:
+            child = self._child
+        safe_terminate(child)
+
+    def kill(self) -> None:
+        with self._child_lock:
+            child = self._child
+        if child is not None and child.poll() is None:
+            child.kill()
+
+    def wait(self, timeout: float | None = None) -> int:
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise subprocess.TimeoutExpired('sensor-hopper', timeout)
+        return 0
+
+
 @sensor_bp.route('/start_sensor', methods=['POST'])
 def start_sensor() -> Response:
     with app_module.sensor_lock:
@@ -77,11 +215,7 @@ def start_sensor() -> Response:
             return jsonify({'status': 'error', 'message': str(e)}), 400
 
         # Clear queue
-        while not app_module.sensor_queue.empty():
-            try:
-                app_module.sensor_queue.get_nowait()
-            except queue.Empty:
-                break
+        clear_queue(app_module.sensor_queue)
 
         # Get SDR type and build command via abstraction layer
         sdr_type_str = data.get('sdr_type', 'rtlsdr')
@@ -94,13 +228,19 @@ def start_sensor() -> Response:
         sdr_device = SDRFactory.create_default_device(sdr_type, index=device)
         builder = SDRFactory.get_builder(sdr_type)
 
+        def build_command(frequency_mhz: float) -> list[str]:
+            return builder.build_ism_command(
+                device=sdr_device,
+                frequency_mhz=frequency_mhz,
+                gain=float(gain) if gain and gain != 0 else None,
+                ppm=int(ppm) if ppm and ppm != 0 else None
+            )
+
+        if data.get('hop'):
+            return _start_hopping(data, sdr_device, build_command)
+
         # Build ISM band decoder command
-        cmd = builder.build_ism_command(
-            device=sdr_device,
-            frequency_mhz=freq,
-            gain=float(gain) if gain and gain != 0 else None,
-            ppm=int(ppm) if ppm and ppm != 0 else None
-        )
+        cmd = build_command(freq)
 
         full_cmd = ' '.join(cmd)
         logger.info(f"Running: {full_cmd}")
@@ -119,14 +259,7 @@ def start_sensor() -> Response:
             thread.start()
 
             # Monitor stderr
-            def monitor_stderr():
-                for line in app_module.sensor_process.stderr:
-                    err = line.decode('utf-8', errors='replace').strip()
-                    if err:
-                        logger.debug(f"[rtl_433] {err}")
-                        app_module.sensor_queue.put({'type': 'info', 'text': f'[rtl_433] {err}'})
-
-            stderr_thread = threading.Thread(target=monitor_stderr)
+            stderr_thread = threading.Thread(target=monitor_sensor_stderr, args=(app_module.sensor_process,))
             stderr_thread.daemon = True
             stderr_thread.start()
 
@@ -140,39 +273,127 @@ def start_sensor() -> Response:
             return jsonify({'status': 'error', 'message': str(e)})
 
 
+def parse_bands(value: Any, device: SDRDevice) -> list[float]:
+    """
+    Parse hop frequencies (list or comma-separated MHz) for a device.
+
+    Raises:
+        ValueError: If a frequency is malformed or outside the hardware's range
+    """
+    if isinstance(value, str):
+        value = [part for part in value.split(',') if part.strip()]
+    if not isinstance(value, list) or not value:
+        raise ValueError('frequencies must be a non-empty list')
+    if len(value) > MAX_HOP_BANDS:
+        raise ValueError(f'At most {MAX_HOP_BANDS} frequencies can be hopped')
+    try:
+        bands = [float(f) for f in value]
+    except (TypeError, ValueError):
+        raise ValueError('Invalid frequency') from None
+    return [sdr_validation.validate_frequency(f, device=device) for f in bands]
+
+
+def _start_hopping(
+    data: dict[str, Any],
+    sdr_device: SDRDevice,
+    build_command: Callable[[float], list[str]],
+) -> Response:
+    """Start hopping mode (caller holds sensor_lock)."""
+    try:
+        bands = parse_bands(data.get('frequencies', SENSOR_HOP_FREQUENCIES), sdr_device)
+        min_dwell = float(data.get('min_dwell', SENSOR_HOP_MIN_DWELL))
+        max_dwell = float(data.get('max_dwell', SENSOR_HOP_MAX_DWELL))
+        if min_dwell < MIN_HOP_DWELL:
+            raise ValueError(f'min_dwell must be at least {MIN_HOP_DWELL} seconds')
+        schedule = HopSchedule(bands, min_dwell=min_dwell, max_dwell=max_dwell)
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    if not check_tool('rtl_433'):
+        return jsonify({'status': 'error', 'message': 'rtl_433 not found. Install with: brew install rtl_433'})
+
+    hopper = SensorHopper(schedule, build_command)
+    app_module.sensor_process = hopper
+    app_module.sensor_schedule = schedule
+    hopper.start()
+
+    frequencies = [band.frequency_mhz for band in schedule.bands]
+    logger.info(f"Hopping rtl_433 over {frequencies} MHz")
+    app_module.sensor_queue.put({'type': 'info', 'text': f'Hopping: {", ".join(f"{f} MHz" for f in frequencies)}'})
+    return jsonify({
+        'status': 'started',
+        'mode': 'hop',
+        'frequencies': frequencies,
+        'command': ' '.join(build_command(frequencies[0])),
+    })
+
+
+@sensor_bp.route('/sensor/hopping')
+def hopping_status() -> Response:
+    """
+    Hop schedule: current band, and per band the time listened, decodes,
+    distinct devices, yield per minute, recent rate and next dwell.
+    """
+    schedule = app_module.sensor_schedule
+    running = isinstance(app_module.sensor_process, SensorHopper)
+    if schedule is None:
+        return jsonify({'status': 'success', 'running': False, 'bands': []})
+    return jsonify({'status': 'success', 'running': running, **schedule.stats()})
+
+
 @sensor_bp.route('/stop_sensor', methods=['POST'])
 def stop_sensor() -> Response:
     with app_module.sensor_lock:
-        if app_module.sensor_process:
-            app_module.sensor_process.terminate()
+        # A SensorHopper clears sensor_process as soon as its thread exits
+        process = app_module.sensor_process
+        if process:
+            process.terminate()
             try:
-                app_module.sensor_process.wait(timeout=2)
+                process.wait(timeout=2)
             except subprocess.TimeoutExpired:
-                app_module.sensor_process.kill()
+                process.kill()
             app_module.sensor_process = None
             return jsonify({'status': 'stopped'})
 
         return jsonify({'status': 'not_running'})
 
 
+@sensor_bp.route('/sensor/devices')
+def get_devices() -> Response:
+    """
+    Devices heard by rtl_433 with the last reading and, per measured field,
+    the last value and min/max/mean/count over the last minute, hour and day.
+
+    Query args: model, id, channel (filters), series ('1m', '1h' or '24h':
+    include that tier's buckets as [start, min, max, mean, count]), limit.
+    """
+    try:
+        limit = int(request.args.get('limit', SENSOR_MAX_DEVICES))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid parameters'}), 400
+    if limit < 1:
+        return jsonify({'status': 'error', 'message': 'limit must be positive'}), 400
+    try:
+        devices = app_module.sensor_registry.devices(
+            model=request.args.get('model'),
+            device_id=request.args.get('id'),
+            channel=request.args.get('channel'),
+            series=request.args.get('series'),
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return jsonify({
+        'status': 'success',
+        'count': len(devices),
+        'devices': devices,
+        'registry': app_module.sensor_registry.stats(),
+    })
+
+
 @sensor_bp.route('/stream_sensor')
 def stream_sensor() -> Response:
-    def generate() -> Generator[str, None, None]:
-        last_keepalive = time.time()
-        keepalive_interval = 30.0
-
-        while True:
-            try:
-                msg = app_module.sensor_queue.get(timeout=1)
-                last_keepalive = time.time()
-                yield format_sse(msg)
-            except queue.Empty:
-                now = time.time()
-                if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
-                    last_keepalive = now
-
-    response = Response(generate(), mimetype='text/event-stream')
+    response = Response(sse_stream(app_module.sensor_queue, **negotiate_stream(request)), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     response.headers['Connection'] = 'keep-alive'
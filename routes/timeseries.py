@@ -0,0 +1,63 @@
+"""Downsampled time series routes for charts."""
+
+from __future__ import annotations
+
+import time
+
+from flask import Blueprint, Response, jsonify, request
+
+import app as app_module
+from config import TIMESERIES_MAX_QUERY_POINTS
+
+timeseries_bp = Blueprint('timeseries', __name__, url_prefix='/timeseries')
+
+
+@timeseries_bp.route('')
+def list_series() -> Response:
+    """
+    Series available for charting, with point counts and time spans.
+
+    Names are 'sensor:<model>:<id>:<channel>:<field>', 'bt:<mac>:rssi' and
+    'wifi:<bssid or client mac>:power'. Query args: prefix.
+    """
+    return jsonify({
+        'status': 'success',
+        'series': app_module.timeseries.names(request.args.get('prefix', '')),
+        'store': app_module.timeseries.stats(),
+    })
+
+
+@timeseries_bp.route('/<path:series>')
+def get_series(series: str) -> Response:
+    """
+    Points of one series as columns ('t' epoch seconds, 'v' values).
+
+    Query args: from, to (epoch seconds; negative values are relative to
+    now), points (at most this many returned, default 500), method ('lttb'
+    or 'minmax').
+    """
+    try:
+        start = float(request.args['from']) if request.args.get('from') else None
+        end = float(request.args['to']) if request.args.get('to') else None
+        points = int(request.args.get('points', 500))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid parameters'}), 400
+    if not 1 <= points <= TIMESERIES_MAX_QUERY_POINTS:
+        return jsonify({
+            'status': 'error',
+            'message': f'points must be between 1 and {TIMESERIES_MAX_QUERY_POINTS}',
+        }), 400
+    now = time.time()
+    if start is not None and start < 0:
+        start += now
+    if end is not None and end < 0:
+        end += now
+
+    method = request.args.get('method', 'lttb')
+    try:
+        result = app_module.timeseries.query(series, start, end, points, method)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if result is None:
+        return jsonify({'status': 'error', 'message': f'Unknown series: {series}'}), 404
+    return jsonify({'status': 'success', 'series': series, 'method': method, 'count': len(result['t']), **result})
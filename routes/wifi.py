@@ -6,21 +6,30 @@ import fcntl
 import json
 import os
 import platform
-import queue
 import re
+import select
 import subprocess
 import threading
 import time
-from typing import Any, Generator
+from typing import Any
 
 from flask import Blueprint, jsonify, request, Response
 
 import app as app_module
+from config import (
+    WIFI_FRAME_INTERVAL,
+    WIFI_FRAME_SOURCE,
+    WIFI_POWER_DELTA,
+    WIFI_STALE_SECONDS,
+    WIFI_UPDATE_INTERVAL,
+)
+from utils.airodump import AirodumpIngest
 from utils.dependencies import check_tool
+from utils.dot11 import FrameTracker, PcapError, PcapReader, PcapTail
 from utils.logging import wifi_logger as logger
 from utils.process import is_valid_mac, is_valid_channel
 from utils.validation import validate_wifi_channel, validate_mac_address
-from utils.sse import format_sse
+from utils.sse import sse_stream, negotiate_stream, clear_queue
 from data.oui import get_manufacturer
 
 wifi_bp = Blueprint('wifi', __name__, url_prefix='/wifi')
@@ -29,6 +38,16 @@ wifi_bp = Blueprint('wifi', __name__, url_prefix='/wifi')
 pmkid_process = None
 pmkid_lock = threading.Lock()
 
+# Live frame state of the current scan (for /wifi/frames)
+frame_tracker = None
+frame_source = None
+# CSV and frame threads both publish into app_module.wifi_networks/clients
+publish_lock = threading.Lock()
+
+FRAME_SOURCES = ('auto', 'tcpdump', 'capture', 'off')
+# Enough for the SSID, channel and RSN elements of a beacon and a whole EAPOL-Key frame
+TCPDUMP_SNAPLEN = 512
+
 
 def detect_wifi_interfaces():
     """Detect available WiFi interfaces."""
@@ -104,70 +123,109 @@ def detect_wifi_interfaces():
     return interfaces
 
 
-def parse_airodump_csv(csv_path):
-    """Parse airodump-ng CSV output file."""
-    networks = {}
-    clients = {}
+def record_power(series, power):
+    """Add an airodump-ng power reading to a chart series (-1 means not measured)."""
+    try:
+        value = int(power)
+    except ValueError:
+        return
+    if value != -1:
+        app_module.timeseries.record(series, value)
+
+
+def publish_wifi_changes(ingest, changes):
+    """Send new, changed and disappeared rows and refresh app_module state."""
+    with publish_lock:
+        _publish_wifi_changes(ingest, changes)
+
+
+def _publish_wifi_changes(ingest, changes):
+    history = app_module.history
+    for change in changes:
+        record = change.record
+        key = record['bssid'] if change.kind == 'network' else record['mac']
+        if change.action != 'remove':
+            # Sighting: keep history and the power chart current even if nothing else moved
+            history.record('wifi', {'kind': change.kind, **record})
+            record_power(f'wifi:{key}:power', record['power'])
+        if change.action:
+            app_module.wifi_queue.put({'type': change.kind, 'action': change.action, **record})
+
+    # Readers iterate these dicts from other threads: update entries in place,
+    # and only swap in a new dict when rows were added or dropped
+    for name, records in (('wifi_networks', ingest.networks), ('wifi_clients', ingest.clients)):
+        current = getattr(app_module, name)
+        if current.keys() == records.keys():
+            current.update(records)
+        else:
+            setattr(app_module, name, dict(records))
+
+
+def publish_handshake(event):
+    """Send handshake progress; remember pairs with enough messages to crack."""
+    app_module.wifi_queue.put({'type': 'handshake', **event})
+    if event['complete'] and not any(
+        h.get('bssid') == event['bssid'] and h.get('client') == event['client'] for h in app_module.wifi_handshakes
+    ):
+        app_module.wifi_handshakes.append({'bssid': event['bssid'], 'client': event['client'], 'time': time.time()})
 
+
+def stream_wifi_frames(process, ingest, source, interface, cap_path):
+    """Feed live 802.11 frames into the scan while airodump-ng runs."""
+    global frame_tracker
+    tracker = frame_tracker = FrameTracker(ingest)
+    capture = None
+    tail = reader = None
     try:
-        with open(csv_path, 'r', errors='replace') as f:
-            content = f.read()
-
-        sections = content.split('\n\n')
-
-        for section in sections:
-            lines = section.strip().split('\n')
-            if not lines:
-                continue
-
-            header = lines[0] if lines else ''
-
-            if 'BSSID' in header and 'ESSID' in header:
-                for line in lines[1:]:
-                    parts = [p.strip() for p in line.split(',')]
-                    if len(parts) >= 14:
-                        bssid = parts[0]
-                        if bssid and ':' in bssid:
-                            networks[bssid] = {
-                                'bssid': bssid,
-                                'first_seen': parts[1],
-                                'last_seen': parts[2],
-                                'channel': parts[3],
-                                'speed': parts[4],
-                                'privacy': parts[5],
-                                'cipher': parts[6],
-                                'auth': parts[7],
-                                'power': parts[8],
-                                'beacons': parts[9],
-                                'ivs': parts[10],
-                                'lan_ip': parts[11],
-                                'essid': parts[13] or 'Hidden'
-                            }
-
-            elif 'Station MAC' in header:
-                for line in lines[1:]:
-                    parts = [p.strip() for p in line.split(',')]
-                    if len(parts) >= 6:
-                        station = parts[0]
-                        if station and ':' in station:
-                            vendor = get_manufacturer(station)
-                            clients[station] = {
-                                'mac': station,
-                                'first_seen': parts[1],
-                                'last_seen': parts[2],
-                                'power': parts[3],
-                                'packets': parts[4],
-                                'bssid': parts[5],
-                                'probes': parts[6] if len(parts) > 6 else '',
-                                'vendor': vendor
-                            }
-    except Exception as e:
-        logger.error(f"Error parsing CSV: {e}")
+        if source == 'tcpdump':
+            cmd = ['tcpdump', '-i', interface, '-y', 'IEEE802_11_RADIO', '-U', '-s', str(TCPDUMP_SNAPLEN),
+                   '-w', '-', 'not', 'type', 'ctl']
+            logger.info(f"Running: {' '.join(cmd)}")
+            capture = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            reader = PcapReader()
+        else:
+            tail = PcapTail(cap_path)
 
-    return networks, clients
+        while process.poll() is None:
+            if capture is not None:
+                fd = capture.stdout.fileno()
+                if not select.select([fd], [], [], WIFI_FRAME_INTERVAL)[0]:
+                    continue
+                data = os.read(fd, 65536)
+                if not data:
+                    # tcpdump could not capture: fall back to airodump-ng's own file
+                    capture.wait()
+                    capture = None
+                    tail = PcapTail(cap_path)
+                    app_module.wifi_queue.put({'type': 'info', 'text': 'tcpdump stopped; reading frames from the airodump-ng capture (no per-frame signal)'})
+                    continue
+                frames, linktype = reader.feed(data), reader.linktype
+            else:
+                frames, linktype = tail.read(), tail.linktype
+                if not frames:
+                    time.sleep(WIFI_FRAME_INTERVAL)
+                    continue
+
+            changes, handshakes = tracker.process(linktype, frames)
+            if changes:
+                publish_wifi_changes(ingest, changes)
+            for event in handshakes:
+                publish_handshake(event)
+
+    except PcapError as e:
+        app_module.wifi_queue.put({'type': 'error', 'text': f'Live frames stopped: {e}'})
+    except Exception as e:
+        logger.error(f"Live frame reader error: {e}")
+    finally:
+        if capture is not None:
+            capture.terminate()
+            try:
+                capture.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                capture.kill()
 
 
-def stream_airodump_output(process, csv_path):
+def stream_airodump_output(process, ingest):
     """Stream airodump-ng output to queue."""
     try:
         app_module.wifi_queue.put({'type': 'status', 'text': 'started'})
@@ -193,37 +251,13 @@ def stream_airodump_output(process, csv_path):
                 pass
 
             current_time = time.time()
-            if current_time - last_parse >= 2:
-                csv_file = csv_path + '-01.csv'
-                if os.path.exists(csv_file):
+            if current_time - last_parse >= WIFI_UPDATE_INTERVAL:
+                last_parse = current_time
+                changes = ingest.poll()
+                if changes is not None:
                     csv_found = True
-                    networks, clients = parse_airodump_csv(csv_file)
-
-                    for bssid, net in networks.items():
-                        if bssid not in app_module.wifi_networks:
-                            app_module.wifi_queue.put({
-                                'type': 'network',
-                                'action': 'new',
-                                **net
-                            })
-                        else:
-                            app_module.wifi_queue.put({
-                                'type': 'network',
-                                'action': 'update',
-                                **net
-                            })
-
-                    for mac, client in clients.items():
-                        if mac not in app_module.wifi_clients:
-                            app_module.wifi_queue.put({
-                                'type': 'client',
-                                'action': 'new',
-                                **client
-                            })
-
-                    app_module.wifi_networks = networks
-                    app_module.wifi_clients = clients
-                    last_parse = current_time
+                if changes:
+                    publish_wifi_changes(ingest, changes)
 
                 if current_time - start_time > 5 and not csv_found:
                     app_module.wifi_queue.put({'type': 'error', 'text': 'No scan data after 5 seconds. Check if monitor mode is properly enabled.'})
@@ -411,6 +445,8 @@ def toggle_monitor_mode():
 @wifi_bp.route('/scan/start', methods=['POST'])
 def start_wifi_scan():
     """Start WiFi scanning with airodump-ng."""
+    global frame_source
+
     with app_module.wifi_lock:
         if app_module.wifi_process:
             return jsonify({'status': 'error', 'message': 'Scan already running'})
@@ -419,18 +455,22 @@ def start_wifi_scan():
         interface = data.get('interface') or app_module.wifi_monitor_interface
         channel = data.get('channel')
         band = data.get('band', 'abg')
+        frames = data.get('frames', WIFI_FRAME_SOURCE)
 
         if not interface:
             return jsonify({'status': 'error', 'message': 'No monitor interface available.'})
 
+        if frames not in FRAME_SOURCES:
+            return jsonify({'status': 'error', 'message': f'frames must be one of: {", ".join(FRAME_SOURCES)}'}), 400
+        if frames == 'auto':
+            frames = 'tcpdump' if check_tool('tcpdump') else 'capture'
+        elif frames == 'tcpdump' and not check_tool('tcpdump'):
+            return jsonify({'status': 'error', 'message': 'tcpdump not found.'}), 400
+
         app_module.wifi_networks = {}
         app_module.wifi_clients = {}
 
-        while not app_module.wifi_queue.empty():
-            try:
-                app_module.wifi_queue.get_nowait()
-            except queue.Empty:
-                break
+        clear_queue(app_module.wifi_queue)
 
         csv_path = '/tmp/intercept_wifi'
 
@@ -478,13 +518,22 @@ def start_wifi_scan():
 
                 return jsonify({'status': 'error', 'message': error_msg})
 
-            thread = threading.Thread(target=stream_airodump_output, args=(app_module.wifi_process, csv_path))
+            frame_source = frames
+            ingest = AirodumpIngest(csv_path + '-01.csv', get_manufacturer,
+                                    stale_after=WIFI_STALE_SECONDS, power_delta=WIFI_POWER_DELTA)
+            thread = threading.Thread(target=stream_airodump_output, args=(app_module.wifi_process, ingest))
             thread.daemon = True
             thread.start()
 
+            if frames != 'off':
+                thread = threading.Thread(target=stream_wifi_frames, args=(
+                    app_module.wifi_process, ingest, frames, interface, csv_path + '-01.cap'))
+                thread.daemon = True
+                thread.start()
+
             app_module.wifi_queue.put({'type': 'info', 'text': f'Started scanning on {interface}'})
 
-            return jsonify({'status': 'started', 'interface': interface})
+            return jsonify({'status': 'started', 'interface': interface, 'frames': frames})
 
         except FileNotFoundError:
             return jsonify({'status': 'error', 'message': 'airodump-ng not found.'})
@@ -756,25 +805,24 @@ def get_wifi_networks():
     })
 
 
+@wifi_bp.route('/frames')
+def get_wifi_frames():
+    """Live frame reader statistics for the current or last scan."""
+    if frame_tracker is None:
+        return jsonify({'status': 'success', 'source': frame_source, 'running': False})
+    return jsonify({
+        'status': 'success',
+        'source': frame_source,
+        'running': bool(app_module.wifi_process and app_module.wifi_process.poll() is None),
+        'frames': frame_tracker.stats(),
+        'ingest': frame_tracker.ingest.stats(),
+    })
+
+
 @wifi_bp.route('/stream')
 def stream_wifi():
     """SSE stream for WiFi events."""
-    def generate():
-        last_keepalive = time.time()
-        keepalive_interval = 30.0
-
-        while True:
-            try:
-                msg = app_module.wifi_queue.get(timeout=1)
-                last_keepalive = time.time()
-                yield format_sse(msg)
-            except queue.Empty:
-                now = time.time()
-                if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
-                    last_keepalive = now
-
-    response = Response(generate(), mimetype='text/event-stream')
+    response = Response(sse_stream(app_module.wifi_queue, **negotiate_stream(request)), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     response.headers['Connection'] = 'keep-alive'
@@ -0,0 +1,594 @@
+"""Tests for ADS-B decoding utilities."""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import routes.adsb as adsb_routes
+from utils.adsb import (
+    NUMPY_AVAILABLE,
+    AircraftDatabase,
+    AircraftStore,
+    BBox,
+    BeastParser,
+    ModeSDecoder,
+    ReceiverAggregator,
+    SBSParser,
+    SpatialGrid,
+    bbox_filter,
+    build_aircraft_db,
+    crc_syndrome,
+    decode_ac13,
+    decode_id13,
+    encode_beast_frame,
+    open_aircraft_db,
+    parse_bbox,
+    simplify_track,
+    track_to_list,
+)
+from utils.adsb.capture import CaptureReader, CaptureWriter, ReplayServer, capture_path
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SBS_SAMPLE = (
+    b"MSG,3,1,1,4ca2d6,1,2024/01/01,12:00:00.000,2024/01/01,12:00:00.000,,35000,,,53.1,-2.3,,,0,0,0,0\r\n"
+    b"MSG,1,1,1,4CA2D6,1,2024/01/01,12:00:00.000,2024/01/01,12:00:00.000,RYR123  ,,,,,,,,,,,\r\n"
+    b"MSG,4,1,1,4CA2D6,1,2024/01/01,12:00:00.000,2024/01/01,12:00:00.000,,,451.2,270.9,,,0,,,,,\r\n"
+    b"MSG,6,1,1,4CA2D6,1,2024/01/01,12:00:00.000,2024/01/01,12:00:00.000,,,,,,,,7700,0,0,0,0\r\n"
+    b"MSG,8,1,1,4CA2D6,1,2024/01/01,12:00:00.000,2024/01/01,12:00:00.000,,,,,,,,,,,,0\r\n"
+    b"STA,,5,179,400AE7,10103,2008/11/28,14:58:51.153,2008/11/28,14:58:51.153,RM\r\n"
+)
+
+
+class TestSBSParser:
+    """Tests for the SBS-1 feed parser."""
+
+    def test_parses_message_types(self):
+        """Test each MSG type yields the attributes it carries."""
+        messages = list(SBSParser().feed(SBS_SAMPLE))
+
+        assert [icao for icao, _ in messages] == ['4CA2D6'] * 5
+        assert messages[0][1] == {'altitude': 35000, 'lat': 53.1, 'lon': -2.3}
+        assert messages[1][1] == {'callsign': 'RYR123'}
+        assert messages[2][1] == {'speed': 451, 'heading': 270}
+        assert messages[3][1] == {'squawk': '7700'}
+        assert messages[4][1] == {}
+
+    def test_lines_split_across_reads(self):
+        """Test partial lines are kept until the rest arrives."""
+        parser = SBSParser()
+        messages = []
+        for i in range(0, len(SBS_SAMPLE), 7):
+            messages.extend(parser.feed(SBS_SAMPLE[i:i + 7]))
+
+        assert len(messages) == 5
+        assert messages[0][1]['lat'] == 53.1
+
+    def test_small_buffer_drops_oversized_lines(self):
+        """Test a line longer than the buffer is discarded without stalling."""
+        parser = SBSParser(bufsize=64)
+        messages = list(parser.feed(b'X' * 200 + b'\n' + b'MSG,6,1,1,ABC123,1,,,,,,,,,,,,1200,0\n'))
+
+        assert messages == [('ABC123', {'squawk': '1200'})]
+
+    def test_invalid_numbers_are_skipped(self):
+        """Test malformed, infinite and nan numeric fields do not raise."""
+        line = b"MSG,3,1,1,ABC123,1,,,,,,FL350,,,abc,def,,,0,0,0,0\n"
+        assert list(SBSParser().feed(line)) == [('ABC123', {})]
+        lines = (b"MSG,3,1,1,ABC123,1,,,,,,inf,,,nan,-2.3,,,0,0,0,0\n"
+                 b"MSG,3,1,1,ABC123,1,,,,,,-inf,,,53.1,inf,,,0,0,0,0\n"
+                 b"MSG,4,1,1,ABC123,1,,,,,,,1e999,nan,,,,,0,0,0,0\n")
+        assert list(SBSParser().feed(lines)) == [('ABC123', {})] * 3
+
+    def test_truncated_and_bad_type_lines(self):
+        """Test a bare 'MSG,', a two-digit or non-digit type are skipped without losing the block."""
+        block = (b'MSG,\nMSG,3\nMSG,10,1,1,ABC123,1,,,,,,35000,,,53.1,-2.3,,,0,0,0,0\n'
+                 b'MSG,X,1,1,ABC123,1,,,,,,\nMSG,6,1,1,ABC123,1,,,,,,,,,,,,1200,0\n')
+        assert list(SBSParser().feed(block)) == [('ABC123', {'squawk': '1200'})]
+
+
+class TestModeSDecoder:
+    """Tests for Mode S message decoding against published reference messages."""
+
+    def test_crc(self):
+        """Test CRC check of valid and corrupted extended squitters."""
+        assert crc_syndrome(bytes.fromhex('8D406B902015A678D4D220AA4BDA')) == 0
+        assert crc_syndrome(bytes.fromhex('8D406B902015A678D4D220AA4B00')) != 0
+
+    def test_identification(self):
+        """Test DF17 aircraft identification."""
+        result = ModeSDecoder().decode(bytes.fromhex('8D4840D6202CC371C32CE0576098'), now=0)
+        assert result == ('4840D6', {'callsign': 'KLM1023'})
+
+    def test_global_cpr_position(self):
+        """Test airborne position from an even/odd pair."""
+        decoder = ModeSDecoder()
+        _, odd = decoder.decode(bytes.fromhex('8D40621D58C386435CC412692AD6'), now=100)
+        assert odd == {'altitude': 38000}
+
+        _, even = decoder.decode(bytes.fromhex('8D40621D58C382D690C8AC2863A7'), now=102)
+        assert even['lat'] == 52.2572
+        assert even['lon'] == 3.91937
+
+    def test_state_pruned_by_age(self):
+        """Test CPR state of aircraft no longer heard is dropped with the known addresses."""
+        decoder = ModeSDecoder()
+        decoder.decode(bytes.fromhex('8D40621D58C386435CC412692AD6'), now=100)
+        assert '40621D' in decoder._cpr
+        decoder.decode(bytes.fromhex('8D4840D6202CC371C32CE0576098'), now=400)
+        assert '40621D' not in decoder._cpr
+        assert set(decoder._known) == {'4840D6'}
+
+    def test_local_cpr_position(self):
+        """Test single-frame position relative to a receiver reference."""
+        decoder = ModeSDecoder(reference=(52.258, 3.918))
+        _, updates = decoder.decode(bytes.fromhex('8D40621D58C382D690C8AC2863A7'), now=0)
+        assert (updates['lat'], updates['lon']) == (52.2572, 3.91937)
+
+    def test_velocity(self):
+        """Test ground speed and airspeed velocity subtypes."""
+        decoder = ModeSDecoder()
+        _, ground = decoder.decode(bytes.fromhex('8D485020994409940838175B284F'), now=0)
+        assert ground == {'speed': 159, 'heading': 182, 'vertical_rate': -832}
+
+        _, air = decoder.decode(bytes.fromhex('8DA05F219B06B6AF189400CBC33F'), now=0)
+        assert air == {'heading': 243, 'airspeed': 375, 'vertical_rate': -2304}
+
+    def test_surveillance_replies_need_known_address(self):
+        """Test DF20/21 replies are only attributed to aircraft already seen."""
+        altitude_reply = bytes.fromhex('A02014B400000000000000F9D514')
+        decoder = ModeSDecoder()
+        assert decoder.decode(altitude_reply, now=0) is None
+
+        icao = f'{crc_syndrome(altitude_reply):06X}'
+        decoder._mark_known(icao, 0)
+        assert decoder.decode(altitude_reply, now=1) == (icao, {'altitude': 32300})
+
+    def test_field_decoding(self):
+        """Test squawk and altitude code fields."""
+        identity = int.from_bytes(bytes.fromhex('A800292D'), 'big') & 0x1FFF
+        assert decode_id13(identity) == '1346'
+        assert decode_ac13(int.from_bytes(bytes.fromhex('A02014B4'), 'big') & 0x1FFF) == 32300
+
+
+class TestBeastParser:
+    """Tests for Beast binary framing."""
+
+    def test_recorded_feed(self):
+        """Test decoding the recorded fixture, including escaped bytes and a bad CRC."""
+        with open(os.path.join(FIXTURES, 'beast_sample.bin'), 'rb') as f:
+            data = f.read()
+
+        parser = BeastParser()
+        messages = list(parser.feed(data))
+
+        assert parser.frames_parsed == 5
+        assert parser.decoder.crc_errors == 1
+        assert [icao for icao, _ in messages] == ['4840D6', '40621D', '40621D', '485020']
+        assert messages[0][1]['callsign'] == 'KLM1023'
+        assert messages[2][1]['lat'] == 52.2572
+        assert all('rssi' in updates for _, updates in messages)
+
+    def test_mlat_timestamp_passed_through(self):
+        """Test the 12 MHz counter reaches the updates (and a zero counter is left out)."""
+        message = bytes.fromhex('8D4840D6202CC371C32CE0576098')
+        data = encode_beast_frame(message, timestamp=0x1A1A0012D687, signal=128) + encode_beast_frame(message)
+        first, second = list(BeastParser().feed(data))
+        assert first[1]['mlat_time'] == 0x1A1A0012D687
+        assert 'mlat_time' not in second[1]
+
+    def test_frames_split_across_reads(self):
+        """Test frames and escape sequences split across reads."""
+        with open(os.path.join(FIXTURES, 'beast_sample.bin'), 'rb') as f:
+            data = f.read()
+
+        parser = BeastParser()
+        frames = []
+        for i in range(0, len(data), 3):
+            frames.extend(parser.feed_frames(data[i:i + 3]))
+
+        assert len(frames) == 5
+        assert frames[0].timestamp == 0x0A1A00000000
+        assert frames[2].signal == 0x1A
+
+
+class TestReceiverAggregator:
+    """Tests for multi-receiver de-duplication."""
+
+    def test_cross_receiver_duplicate_dropped(self):
+        """Test the same message from a second receiver is suppressed."""
+        agg = ReceiverAggregator(dedup_window=1.0)
+        a = agg.add_source('a', 'rx1', 30005, 'beast')
+        b = agg.add_source('b', 'rx2', 30005, 'beast')
+
+        assert agg.accept(a, '40621D', {'altitude': 38000, 'rssi': -10.0}, 100.0)
+        assert not agg.accept(b, '40621D', {'altitude': 38000, 'rssi': -20.0, 'mlat_time': 12345}, 100.2)
+        assert agg.accept(b, '40621D', {'altitude': 38025}, 100.3)
+        assert (a.unique, b.unique, b.duplicates) == (1, 1, 1)
+
+    def test_same_receiver_repeats_kept(self):
+        """Test repeated identical messages from one receiver are applied."""
+        agg = ReceiverAggregator(dedup_window=1.0)
+        a = agg.add_source('a', 'rx1', 30003)
+
+        assert agg.accept(a, '4CA2D6', {'squawk': '7700'}, 100.0)
+        assert agg.accept(a, '4CA2D6', {'squawk': '7700'}, 100.5)
+        assert a.duplicates == 0
+
+    def test_window_expiry(self):
+        """Test duplicates outside the window are applied again."""
+        agg = ReceiverAggregator(dedup_window=1.0)
+        a = agg.add_source('a', 'rx1', 30003)
+        b = agg.add_source('b', 'rx2', 30003)
+
+        agg.accept(a, '4CA2D6', {'squawk': '7700'}, 100.0)
+        agg.accept(a, '485020', {}, 101.5)
+        agg.accept(a, '485020', {}, 103.0)
+        assert agg.accept(b, '4CA2D6', {'squawk': '7700'}, 103.1)
+
+    def test_status_coverage(self):
+        """Test per-source shares and exclusive aircraft."""
+        agg = ReceiverAggregator()
+        a = agg.add_source('a', 'rx1', 30003)
+        b = agg.add_source('b', 'rx2', 30003)
+
+        agg.accept(a, 'AAAAAA', {'altitude': 1000}, 100.0)
+        agg.accept(a, 'BBBBBB', {'altitude': 2000}, 100.0)
+        agg.accept(b, 'BBBBBB', {'altitude': 2000}, 100.0)
+
+        status = {s['name']: s for s in agg.status(now=101.0)}
+        assert status['a']['unique_share'] == 100.0
+        assert status['a']['aircraft'] == 2
+        assert status['a']['exclusive_aircraft'] == 1
+        assert status['b']['duplicates'] == 1
+        assert status['b']['exclusive_aircraft'] == 0
+
+    def test_rate_unaffected_by_polling(self):
+        """Test every caller sees the same msgs/s over a sliding window, however often status() is read."""
+        agg = ReceiverAggregator()
+        a = agg.add_source('a', 'rx1', 30003)
+        for i in range(200):
+            agg.accept(a, f'{i:06X}', {}, 100.0 + i / 20)
+
+        assert [agg.status(now=110.0)[0]['messages_per_second'] for _ in range(3)] == [20.0] * 3
+        assert agg.status(now=110.5)[0]['messages_per_second'] == 20.0
+        # Seconds 105-114 hold 100 messages
+        assert agg.status(now=115.0)[0]['messages_per_second'] == 10.0
+        assert agg.status(now=200.0)[0]['messages_per_second'] == 0.0
+
+
+class TestAircraftStore:
+    """Tests for the aircraft state store."""
+
+    def test_apply_and_to_dict(self):
+        """Test messages merge into one record."""
+        store = AircraftStore()
+        store.apply('4CA2D6', {'callsign': 'RYR123'}, 100.0)
+        aircraft = store.apply('4CA2D6', {'altitude': 35000, 'category': 'A3'}, 101.0)
+
+        assert len(store) == 1
+        assert aircraft.messages == 2
+        assert aircraft.first_seen == 100.0
+        assert aircraft.last_seen == 101.0
+        assert aircraft.get('altitude') == 35000
+        assert store.snapshot('4CA2D6') == {
+            'icao': '4CA2D6', 'callsign': 'RYR123', 'altitude': 35000, 'category': 'A3',
+        }
+
+    def test_cleanup_expires_by_last_seen(self):
+        """Test aircraft not heard for max_age are removed."""
+        store = AircraftStore(max_age_seconds=60)
+        store.apply('AAAAAA', {'lat': 51.0, 'lon': 0.0}, 100.0)
+        store.apply('BBBBBB', {}, 100.0)
+        store.apply('BBBBBB', {}, 150.0)
+
+        assert store.cleanup(now=170.0) == 1
+        assert 'AAAAAA' not in store
+        assert 'BBBBBB' in store
+        assert store.summary()['with_position'] == 0
+        assert store.summary()['expired'] == 1
+
+    def test_summary_counters(self):
+        """Test status summary tracks positions and emergency squawks."""
+        store = AircraftStore()
+        store.apply('AAAAAA', {'lat': 51.0, 'lon': 0.0, 'squawk': '7700'}, 100.0)
+        store.apply('BBBBBB', {'squawk': '7600'}, 100.0)
+        store.apply('BBBBBB', {'squawk': '1200'}, 101.0)
+
+        summary = store.summary()
+        assert summary['aircraft'] == 2
+        assert summary['with_position'] == 1
+        assert summary['emergencies'] == ['AAAAAA']
+        assert summary['messages'] == 3
+
+        store.delete('AAAAAA')
+        assert store.summary()['emergencies'] == []
+
+    def test_deltas_carry_changed_fields_only(self):
+        """Test take_delta returns a full first update, then only changes."""
+        store = AircraftStore(track_points=0)
+        store.apply('4CA2D6', {'callsign': 'RYR123', 'altitude': 35000}, 100.0)
+        assert store.take_delta('4CA2D6') == {'icao': '4CA2D6', 'callsign': 'RYR123', 'altitude': 35000}
+
+        store.apply('4CA2D6', {'callsign': 'RYR123', 'altitude': 35025}, 101.0)
+        assert store.take_delta('4CA2D6') == {'icao': '4CA2D6', 'altitude': 35025}
+        store.apply('4CA2D6', {'altitude': 35025}, 102.0)
+        assert store.take_delta('4CA2D6') is None
+
+        # Position fields always travel together
+        store.apply('4CA2D6', {'lat': 51.0, 'lon': 0.0}, 103.0)
+        store.take_delta('4CA2D6')
+        store.apply('4CA2D6', {'lat': 51.1, 'lon': 0.0}, 104.0)
+        assert store.take_delta('4CA2D6') == {'icao': '4CA2D6', 'lat': 51.1, 'lon': 0.0}
+        assert store.take_delta('FFFFFF') is None
+
+    def test_keyframe_clears_deltas(self):
+        """Test a keyframe sends full state and resets pending changes."""
+        store = AircraftStore(track_points=0)
+        store.apply('AAAAAA', {'callsign': 'A'}, 100.0)
+        store.apply('BBBBBB', {'squawk': '1200'}, 100.0)
+
+        assert sorted(ac['icao'] for ac in store.keyframe()) == ['AAAAAA', 'BBBBBB']
+        assert store.take_delta('AAAAAA') is None
+        assert store.position('AAAAAA') is None
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason='numpy not installed')
+class TestTrackHistory:
+    """Tests for per-aircraft position history."""
+
+    def test_ring_keeps_latest_points(self):
+        """Test the ring wraps and returns positions oldest first."""
+        store = AircraftStore(track_points=4)
+        for i in range(6):
+            store.apply('AAAAAA', {'altitude': 1000 + i, 'lat': 51.0 + i / 100, 'lon': 0.0}, 100.0 + i)
+
+        rows = store.track('AAAAAA')
+        assert list(rows['t']) == [102.0, 103.0, 104.0, 105.0]
+        assert list(rows['alt']) == [1002, 1003, 1004, 1005]
+        assert list(store.track('AAAAAA', since=103.5)['t']) == [104.0, 105.0]
+
+    def test_repeated_position_not_stored(self):
+        """Test an unchanged position doesn't add a point."""
+        store = AircraftStore()
+        store.apply('AAAAAA', {'lat': 51.0, 'lon': 0.0}, 100.0)
+        store.apply('AAAAAA', {'lat': 51.0, 'lon': 0.0}, 101.0)
+        assert len(store.track('AAAAAA')) == 1
+
+    def test_track_expires_with_aircraft(self):
+        """Test history is dropped when the aircraft expires."""
+        store = AircraftStore(max_age_seconds=60)
+        store.apply('AAAAAA', {'lat': 51.0, 'lon': 0.0}, 100.0)
+        store.cleanup(now=200.0)
+        assert store.track('AAAAAA') is None
+        assert store.all_tracks() == {}
+
+    def test_simplify_straight_line(self):
+        """Test collinear points collapse to the end points, corners survive."""
+        store = AircraftStore()
+        for i in range(11):
+            store.apply('AAAAAA', {'lat': 51.0 + i / 1000, 'lon': 0.0}, 100.0 + i)
+        for i in range(1, 11):
+            store.apply('AAAAAA', {'lat': 51.01, 'lon': i / 1000}, 110.0 + i)
+
+        simplified = simplify_track(store.track('AAAAAA'), tolerance=10)
+        points = track_to_list(simplified)
+        assert [(p[1], p[2]) for p in points] == [(51.0, 0.0), (51.01, 0.0), (51.01, 0.01)]
+        assert points[0][3] is None
+
+
+class TestSpatialGrid:
+    """Tests for the aircraft spatial index."""
+
+    def test_bbox_query(self):
+        """Test bounding box queries and incremental moves between cells."""
+        grid = SpatialGrid(cell_degrees=1.0)
+        grid.update('AAAAAA', 51.5, -0.1)
+        grid.update('BBBBBB', 53.4, -2.2)
+        grid.update('CCCCCC', 40.6, -73.8)
+
+        assert sorted(grid.query_bbox(BBox(50, -3, 54, 1))) == ['AAAAAA', 'BBBBBB']
+        assert grid.query_bbox(BBox(51, -1, 52, 0)) == ['AAAAAA']
+
+        grid.update('AAAAAA', 48.9, 2.5)
+        assert grid.query_bbox(BBox(51, -1, 52, 0)) == []
+        grid.remove('BBBBBB')
+        assert grid.query_bbox(BBox(50, -3, 54, 1)) == []
+        assert len(grid.cells) == 2
+
+    def test_bbox_across_antimeridian(self):
+        """Test a box with west > east wraps around 180 degrees."""
+        grid = SpatialGrid()
+        grid.update('AAAAAA', 60.0, 179.5)
+        grid.update('BBBBBB', 60.0, -179.5)
+        grid.update('CCCCCC', 60.0, 0.0)
+
+        assert sorted(grid.query_bbox(BBox(59, 179, 61, -179))) == ['AAAAAA', 'BBBBBB']
+
+    def test_radius_query(self):
+        """Test radius queries return the nearest aircraft first."""
+        grid = SpatialGrid()
+        grid.update('AAAAAA', 51.5, 0.0)
+        grid.update('BBBBBB', 51.0, 0.0)
+        grid.update('CCCCCC', 55.0, 0.0)
+
+        result = grid.query_radius(51.4, 0.0, 60)
+        assert [icao for icao, _ in result] == ['AAAAAA', 'BBBBBB']
+        assert round(result[0][1], 1) == 6.0
+
+    def test_store_queries(self):
+        """Test the aircraft store keeps the index in step with expiry."""
+        store = AircraftStore(max_age_seconds=60)
+        store.apply('AAAAAA', {'lat': 51.5, 'lon': 0.0}, 100.0)
+        store.apply('BBBBBB', {'lat': 51.6, 'lon': 0.1}, 150.0)
+
+        assert {ac.icao for ac in store.in_bbox(BBox(51, -1, 52, 1))} == {'AAAAAA', 'BBBBBB'}
+        store.cleanup(now=170.0)
+        assert [ac.icao for ac, _ in store.within_radius(51.5, 0.0, 50)] == ['BBBBBB']
+
+    def test_viewport_filter(self):
+        """Test the SSE viewport filter."""
+        accept = bbox_filter(parse_bbox('50,-1,52,1'))
+        assert accept({'type': 'aircraft', 'icao': 'AAAAAA', 'lat': 51.0, 'lon': 0.0})
+        assert not accept({'type': 'aircraft', 'icao': 'AAAAAA', 'lat': 53.0, 'lon': 0.0})
+        assert not accept({'type': 'aircraft', 'icao': 'AAAAAA', 'callsign': 'X'})
+        assert accept({'type': 'keepalive'})
+
+        # Deltas without a position are placed by the last known one
+        positions = {'AAAAAA': (51.0, 0.0)}
+        accept = bbox_filter(parse_bbox('50,-1,52,1'), positions.get)
+        assert accept({'type': 'aircraft', 'icao': 'AAAAAA', 'callsign': 'X'})
+        assert not accept({'type': 'aircraft', 'icao': 'BBBBBB', 'callsign': 'Y'})
+
+        with pytest.raises(ValueError):
+            parse_bbox('52,-1,50,1')
+
+
+AIRCRAFT_CSV = (
+    "'icao24','registration','manufacturername','model','typecode','operator'\n"
+    "'4ca2d6','EI-DCL','Boeing','737-8AS','B738','Ryanair'\n"
+    "'400ae7','G-EUPA','Airbus','A319-131','A319',''\n"
+    "'zzzzzz','BAD','','','',''\n"
+    "'3c6444','D-AIBA','Airbus','A319-114','A319','Lufthansa'\n"
+    "'4CA2D6','EI-DCL','Boeing','737-8AS','B738','Ryanair Ltd'\n"
+)
+
+
+class TestAircraftDatabase:
+    """Tests for the mmap registration database."""
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        source = tmp_path / 'aircraft.csv'
+        source.write_text(AIRCRAFT_CSV)
+        path = str(tmp_path / 'aircraft_db.bin')
+        assert build_aircraft_db(str(source), path) == 3
+        database = AircraftDatabase(path, cache_size=2)
+        yield database
+        database.close()
+
+    def test_lookup(self, database):
+        """Test hits, misses and that later CSV rows win."""
+        assert database.lookup('4CA2D6') == {
+            'registration': 'EI-DCL', 'type_code': 'B738', 'model': '737-8AS', 'operator': 'Ryanair Ltd',
+        }
+        assert database.lookup('400ae7') == {'registration': 'G-EUPA', 'type_code': 'A319', 'model': 'A319-131'}
+        assert database.lookup('3C6444')['operator'] == 'Lufthansa'
+        assert database.lookup('000001') is None
+        assert database.lookup('FFFFFF') is None
+        assert database.lookup('not hex') is None
+
+    def test_lru(self, database):
+        """Test repeat lookups are served from the bounded cache."""
+        database.lookup('4CA2D6')
+        database.lookup('4CA2D6')
+        database.lookup('400AE7')
+        database.lookup('3C6444')
+
+        stats = database.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 3
+        assert stats['cached'] == 2
+
+    def test_store_enrichment(self, database):
+        """Test new aircraft carry their registration in full updates and exports."""
+        store = AircraftStore(track_points=0, database=database)
+        store.apply('4CA2D6', {'altitude': 35000}, 100.0)
+        assert store.take_delta('4CA2D6')['registration'] == 'EI-DCL'
+
+        store.apply('4CA2D6', {'altitude': 35100}, 101.0)
+        assert store.take_delta('4CA2D6') == {'icao': '4CA2D6', 'altitude': 35100}
+        assert store.get('4CA2D6').get('type_code') == 'B738'
+        assert store.snapshot('4CA2D6')['operator'] == 'Ryanair Ltd'
+
+    def test_invalid_files(self, tmp_path):
+        """Test missing and foreign files are handled."""
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'not a database at all')
+        with pytest.raises(ValueError):
+            AircraftDatabase(str(path))
+        assert open_aircraft_db(str(path)) is None
+        assert open_aircraft_db(str(tmp_path / 'missing.bin')) is None
+
+        source = tmp_path / 'no_icao.csv'
+        source.write_text('registration,model\nG-ABCD,Cessna\n')
+        with pytest.raises(ValueError):
+            build_aircraft_db(str(source), str(tmp_path / 'out.bin'))
+
+
+class TestCapture:
+    """Tests for raw feed recording and replay."""
+
+    def test_round_trip(self, tmp_path):
+        """Test chunks and the feed format survive a write/read cycle."""
+        path = capture_path(str(tmp_path / 'recordings'), 'sbs', now=0)
+        assert os.path.basename(path).startswith('adsb_sbs_19')
+
+        with CaptureWriter(path, 'sbs') as writer:
+            writer.write(SBS_SAMPLE[:50], 10.0)
+            writer.write(SBS_SAMPLE[50:], 10.5)
+
+        reader = CaptureReader(path)
+        assert reader.feed_format == 'sbs'
+        assert list(reader) == [(10.0, SBS_SAMPLE[:50]), (10.5, SBS_SAMPLE[50:])]
+        assert b''.join(reader.replay(speed=0)) == SBS_SAMPLE
+
+    def test_replay_pacing(self, tmp_path):
+        """Test replay at Nx keeps the recorded gaps scaled."""
+        path = str(tmp_path / 'paced.cap')
+        with CaptureWriter(path, 'sbs') as writer:
+            writer.write(b'a', 100.0)
+            writer.write(b'b', 101.0)
+
+        start = time.monotonic()
+        assert list(CaptureReader(path).replay(speed=10)) == [b'a', b'b']
+        assert 0.08 <= time.monotonic() - start < 0.5
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test non-capture files are refused."""
+        path = tmp_path / 'other.cap'
+        path.write_bytes(b'MSG,3,1,1\n')
+        with pytest.raises(ValueError):
+            CaptureReader(str(path))
+
+    def test_replay_server(self, tmp_path):
+        """Test a capture served over TCP decodes like the live feed."""
+        with open(os.path.join(FIXTURES, 'beast_sample.bin'), 'rb') as f:
+            data = f.read()
+        path = str(tmp_path / 'beast.cap')
+        with CaptureWriter(path, 'beast') as writer:
+            writer.write(data[:20], 1.0)
+            writer.write(data[20:] + encode_beast_frame(bytes.fromhex('8D4840D6202CC371C32CE0576098')), 1.01)
+
+        server = ReplayServer(path, speed=0)
+        port = server.start()
+        try:
+            parser = BeastParser()
+            with socket.create_connection(('127.0.0.1', port), timeout=2) as sock:
+                while parser.recv_from(sock):
+                    pass
+            messages = list(parser.messages())
+        finally:
+            server.stop()
+
+        assert [icao for icao, _ in messages] == ['4840D6', '40621D', '40621D', '485020', '4840D6']
+        assert server.finished
+
+    def test_ingest_ends_with_replay(self, tmp_path, monkeypatch):
+        """Test the stream parser stops, rather than reconnecting, once a replay has finished."""
+        path = str(tmp_path / 'sbs.cap')
+        with CaptureWriter(path, 'sbs') as writer:
+            writer.write(SBS_SAMPLE, 1.0)
+        server = ReplayServer(path, speed=0)
+        port = server.start()
+        monkeypatch.setattr(adsb_routes, 'adsb_using_service', True)
+        thread = threading.Thread(target=adsb_routes.parse_sbs_stream,
+                                  args=(f'127.0.0.1:{port}', 'sbs', 'replay', None, server), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        server.stop()
+        assert server.finished
+        assert not thread.is_alive()
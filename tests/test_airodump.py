@@ -0,0 +1,107 @@
+"""Tests for incremental airodump-ng CSV ingest."""
+
+import os
+
+from utils.airodump import AirodumpIngest, parse_airodump_text
+
+NETWORK_HEADER = ('BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, Authentication, '
+                  'Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key')
+CLIENT_HEADER = 'Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs'
+
+
+def network(bssid, seen='12:00:00', power=-50, beacons=10, channel=6, essid='Office'):
+    return (f'{bssid}, 2024-05-01 11:00:00, 2024-05-01 {seen}, {channel:>2}, 54, WPA2, CCMP, PSK, '
+            f'{power:>3}, {beacons:>8}, 0, 0.  0.  0.  0, {len(essid):>3}, {essid}, ')
+
+
+def client(mac, seen='12:00:00', power=-60, packets=5, bssid='(not associated)', probes='Home'):
+    return f'{mac}, 2024-05-01 11:00:00, 2024-05-01 {seen}, {power:>3}, {packets:>8}, {bssid}, {probes}'
+
+
+def csv(networks, clients=()):
+    return '\r\n'.join(['', NETWORK_HEADER, *networks, '', CLIENT_HEADER, *clients, '', ''])
+
+
+def actions(changes):
+    return sorted((c.kind, c.action or '', c.record['bssid' if c.kind == 'network' else 'mac']) for c in changes)
+
+
+AP1 = 'AA:AA:AA:AA:AA:01'
+AP2 = 'AA:AA:AA:AA:AA:02'
+STA = '11:22:33:44:55:66'
+
+
+class TestAirodumpIngest:
+    """Tests for change detection between rewrites."""
+
+    def test_parse(self):
+        """Test both sections parse into records."""
+        networks, clients = parse_airodump_text(csv([network(AP1, essid='')], [client(STA)]),
+                                                lambda mac: 'Acme')
+        assert networks[AP1]['essid'] == 'Hidden'
+        assert networks[AP1]['channel'] == '6'
+        assert clients[STA] == {'mac': STA, 'first_seen': '2024-05-01 11:00:00', 'last_seen': '2024-05-01 12:00:00',
+                                'power': '-60', 'packets': '5', 'bssid': '(not associated)', 'probes': 'Home',
+                                'vendor': 'Acme'}
+
+    def test_only_real_changes_reported(self):
+        """Test counters and small power moves are sightings, not updates."""
+        ingest = AirodumpIngest('unused')
+        first = ingest.apply(csv([network(AP1), network(AP2)], [client(STA)]))
+        assert actions(first) == [('client', 'new', STA), ('network', 'new', AP1), ('network', 'new', AP2)]
+
+        # Identical rewrite: nothing at all
+        assert ingest.apply(csv([network(AP1), network(AP2)], [client(STA)])) == []
+
+        # Beacons, last seen and a 2 dB power wobble: sighting only
+        changes = ingest.apply(csv([network(AP1, '12:00:05', -52, 60), network(AP2)], [client(STA)]))
+        assert actions(changes) == [('network', '', AP1)]
+        assert ingest.networks[AP1]['beacons'] == '60'
+
+        # Channel change, a 6 dB power move and a new probe are updates
+        changes = ingest.apply(csv(
+            [network(AP1, '12:00:10', -52, 70, channel=11), network(AP2, '12:00:10', power=-56)],
+            [client(STA, '12:00:10', probes='Home,Guest')],
+        ))
+        assert actions(changes) == [('client', 'update', STA), ('network', 'update', AP1), ('network', 'update', AP2)]
+        assert ingest.events == 6
+
+    def test_power_delta_from_last_report(self):
+        """Test power is compared with the last reported value, not the last sighting."""
+        ingest = AirodumpIngest('unused', power_delta=5)
+        ingest.apply(csv([network(AP1, power=-50)]))
+        assert actions(ingest.apply(csv([network(AP1, '12:00:01', -53)]))) == [('network', '', AP1)]
+        assert actions(ingest.apply(csv([network(AP1, '12:00:02', -55)]))) == [('network', 'update', AP1)]
+
+    def test_stale_and_gone(self):
+        """Test rows not seen recently or missing twice are removed once."""
+        ingest = AirodumpIngest('unused', stale_after=60)
+        ingest.apply(csv([network(AP1), network(AP2)], [client(STA)]))
+        changes = ingest.apply(csv([network(AP1, '12:05:00'), network(AP2)], [client(STA, '12:05:00')]))
+        assert ('network', 'remove', AP2) in actions(changes)
+        assert AP2 in ingest.networks
+        # Still stale: not reported again
+        assert 'remove' not in [c.action for c in ingest.apply(csv([network(AP1, '12:06:00'), network(AP2)],
+                                                                     [client(STA, '12:06:00')]))]
+        # Back in range
+        changes = ingest.apply(csv([network(AP1, '12:06:00'), network(AP2, '12:06:00')], [client(STA, '12:06:00')]))
+        assert actions(changes) == [('network', 'update', AP2)]
+
+        # Missing from one rewrite (caught mid-write) is tolerated, two is not
+        assert ingest.apply(csv([network(AP1, '12:06:00'), network(AP2, '12:06:00')])) == []
+        changes = ingest.apply(csv([network(AP1, '12:06:00'), network(AP2, '12:06:00')]))
+        assert actions(changes) == [('client', 'remove', STA)]
+        assert STA not in ingest.clients
+
+    def test_poll_skips_unchanged_file(self, tmp_path):
+        """Test the file is only read when its mtime or size changes."""
+        path = tmp_path / 'scan-01.csv'
+        ingest = AirodumpIngest(str(path))
+        assert ingest.poll() is None
+        path.write_text(csv([network(AP1)]))
+        assert actions(ingest.poll()) == [('network', 'new', AP1)]
+        assert ingest.poll() == []
+        path.write_text(csv([network(AP1, '12:00:01', beacons=11)]))
+        os.utime(path, (1, 1))
+        assert actions(ingest.poll()) == [('network', '', AP1)]
+        assert (ingest.stats()['polls'], ingest.stats()['parses']) == (4, 2)
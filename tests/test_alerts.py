@@ -0,0 +1,125 @@
+"""Tests for watchlist alerts."""
+
+import json
+import os
+
+import pytest
+
+from utils.alerts import AhoCorasick, AlertEngine, CompiledWatchlist
+
+
+class TestAhoCorasick:
+    """Tests for the keyword automaton."""
+
+    def test_overlapping_keywords(self):
+        """Test keywords sharing prefixes and suffixes are all found."""
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'], whole_words=False)
+        assert automaton.find('ushers') == ['she', 'he', 'hers']
+        assert automaton.find('ahishers') == ['his', 'she', 'he', 'hers']
+        assert automaton.find('nothing') == []
+
+    def test_whole_words_and_case(self):
+        """Test matching is case-insensitive and respects word boundaries."""
+        automaton = AhoCorasick(['FIRE', 'cardiac arrest', 'A&E'])
+        assert automaton.find('Fire at 12 High St - CARDIAC ARREST, to A&E') == ['fire', 'cardiac arrest', 'a&e']
+        assert automaton.find('fireworks display') == []
+        assert automaton.find('bonfire') == []
+        assert automaton.find('(fire)') == ['fire']
+
+    def test_many_keywords(self):
+        """Test a large list matches the naive scan."""
+        keywords = [f'unit{i}' for i in range(5000)] + ['code red']
+        automaton = AhoCorasick(keywords)
+        text = 'Dispatch UNIT42 and unit4999 to a CODE RED; unit50000 unavailable'
+        assert automaton.find(text) == ['unit42', 'unit4999', 'code red']
+
+
+class TestAlertEngine:
+    """Tests for watchlist checks, cooldowns and reloading."""
+
+    def make_engine(self, watchlist, path=None, **kwargs):
+        published = []
+        engine = AlertEngine(path, published.append, **kwargs)
+        engine.update(watchlist, save=False)
+        return engine, published
+
+    def test_pager_alerts(self):
+        """Test keyword and address alerts fire for every message."""
+        engine, published = self.make_engine({'keywords': ['fire'], 'pager_addresses': ['1234567']})
+        msg = {'protocol': 'POCSAG1200', 'address': '1234567', 'message': 'FIRE CALL'}
+        assert engine.check_pager(msg) == 2
+        assert engine.check_pager(msg) == 2
+        assert [(a['kind'], a['match']) for a in published[:2]] == [('pager_address', '1234567'), ('keyword', 'fire')]
+        assert published[0]['details']['text'] == 'FIRE CALL'
+        assert engine.check_pager({'address': '1', 'message': 'all quiet'}) == 0
+
+    def test_aircraft_alerts_and_cooldown(self):
+        """Test ICAO and squawk alerts are limited per aircraft by the cooldown."""
+        engine, published = self.make_engine({'icao': ['abc123'], 'squawks': ['7700']}, cooldown=60)
+        assert engine.check_aircraft('ABC123', {'altitude': 1000}, now=100) == 1
+        assert engine.check_aircraft('ABC123', {'altitude': 1100}, now=130) == 0
+        assert engine.check_aircraft('ABC123', {'altitude': 1200}, now=161) == 1
+        assert engine.check_aircraft('DEF456', {'squawk': '7700'}, now=100) == 1
+        assert engine.check_aircraft('DEF456', {'squawk': '1200'}, now=100) == 0
+        assert engine.suppressed == 1
+        assert published[-1]['subject'] == 'DEF456'
+
+    def test_sensor_alerts(self):
+        """Test exact and model-only sensor entries."""
+        engine, published = self.make_engine({'sensors': [
+            {'model': 'Acurite-Tower', 'id': 1234, 'channel': 'A'},
+            {'model': 'Schrader-TPMS'},
+        ]}, cooldown=0)
+        assert engine.check_sensor({'model': 'Acurite-Tower', 'id': 1234, 'channel': 'A'}) == 1
+        assert engine.check_sensor({'model': 'Acurite-Tower', 'id': 1234, 'channel': 'B'}) == 0
+        assert engine.check_sensor({'model': 'Schrader-TPMS', 'id': 'f00d'}) == 1
+        assert published[-1]['match'] == 'schrader-tpms'
+        assert published[-1]['subject'] == 'Schrader-TPMS/f00d'
+
+    def test_invalid_watchlist(self):
+        """Test malformed watchlists are rejected."""
+        with pytest.raises(ValueError):
+            CompiledWatchlist({'keywords': 'fire'})
+        with pytest.raises(ValueError):
+            CompiledWatchlist({'sensors': [{'id': 1}]})
+        with pytest.raises(ValueError):
+            CompiledWatchlist({'colours': []})
+
+    def test_hot_reload(self, tmp_path):
+        """Test file edits are picked up and bad edits keep the old list."""
+        path = tmp_path / 'alerts.json'
+        path.write_text(json.dumps({'keywords': ['fire']}))
+        published = []
+        engine = AlertEngine(str(path), published.append, reload_interval=0)
+        engine.start()
+        assert engine.check_pager({'address': '1', 'message': 'fire'}) == 1
+
+        path.write_text(json.dumps({'keywords': ['flood']}))
+        os.utime(path, (1, 1))
+        engine._watch_once()
+        assert engine.check_pager({'address': '1', 'message': 'fire'}) == 0
+        assert engine.check_pager({'address': '1', 'message': 'flood'}) == 1
+
+        path.write_text('{not json')
+        os.utime(path, (2, 2))
+        engine._watch_once()
+        assert engine.watchlist.counts()['keywords'] == 1
+
+    def test_update_saves_file(self, tmp_path):
+        """Test API updates are written back to the watchlist file."""
+        path = tmp_path / 'alerts.json'
+        engine = AlertEngine(str(path), lambda alert: None)
+        engine.update({'icao': ['ABC123']})
+        assert json.loads(path.read_text())['icao'] == ['ABC123']
+        # Default watchlist (no file) watches the emergency squawks
+        assert AlertEngine(None, lambda alert: None).watchlist.squawks == {'7500', '7600', '7700'}
+
+    def test_update_applies_even_if_save_fails(self, tmp_path):
+        """Test a failed save still installs the list and leaves no temporary file."""
+        path = tmp_path / 'alerts.json'
+        path.mkdir()  # os.replace onto a directory fails after the temp file is written
+        engine = AlertEngine(str(path), lambda alert: None)
+        with pytest.raises(OSError):
+            engine.update({'icao': ['ABC123']})
+        assert engine.watchlist.icao == {'ABC123'}
+        assert os.listdir(tmp_path) == ['alerts.json']
@@ -0,0 +1,219 @@
+"""Tests for the wideband pager channelizer, using synthetic IQ."""
+
+import subprocess
+import time
+
+import pytest
+
+import app as app_module
+from routes.pager import ChannelizerGroup, stop_decoding
+from utils.channelizer import NUMPY_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason='numpy not installed')
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+    from utils.channelizer import (
+        AUDIO_RATE,
+        FMDemodulator,
+        PagerChannelizer,
+        PolyphaseChannelizer,
+        plan_center_frequency,
+    )
+
+FS = 2_400_000
+CENTER = 930_250_000
+
+
+def fm_signal(offset_hz, modulation, amplitude=0.3, deviation=4500):
+    """Complex baseband FM carrier at offset_hz modulated by samples in [-1, 1]."""
+    t = np.arange(len(modulation)) / FS
+    phase = 2 * np.pi * deviation * np.cumsum(modulation) / FS
+    return amplitude * np.exp(1j * (2 * np.pi * offset_hz * t + phase))
+
+
+def to_u8(iq):
+    """Quantise complex samples the way rtl_sdr outputs them."""
+    raw = np.empty(2 * len(iq), dtype=np.uint8)
+    raw[0::2] = np.clip(np.round(iq.real * 127.5 + 127.5), 0, 255)
+    raw[1::2] = np.clip(np.round(iq.imag * 127.5 + 127.5), 0, 255)
+    return raw.tobytes()
+
+
+def pcm(data):
+    return np.frombuffer(data, dtype='<i2').astype(float)
+
+
+def peak_frequency(audio, rate=AUDIO_RATE):
+    spectrum = np.abs(np.fft.rfft(audio - audio.mean()))
+    return np.fft.rfftfreq(len(audio), 1 / rate)[spectrum.argmax()]
+
+
+class TestPlanning:
+    """Tests for centre frequency selection."""
+
+    def test_channels_on_bins_away_from_dc(self):
+        """Test the centre keeps channels on the raster and off the DC bin."""
+        channels = [929_612_500, 929_937_500]
+        center = plan_center_frequency(channels, FS, 12_500)
+        for freq in channels:
+            assert (freq - center) % 12_500 == 0
+            assert abs(freq - center) >= 12_500
+
+        single = plan_center_frequency([929_612_500], FS, 12_500)
+        assert abs(single - 929_612_500) == 12_500
+
+    def test_span_too_wide(self):
+        """Test channels further apart than the capture bandwidth are rejected."""
+        with pytest.raises(ValueError):
+            plan_center_frequency([929_000_000, 931_500_000], FS, 12_500)
+
+
+class TestChannelizer:
+    """Tests for the filter bank and demodulator."""
+
+    def test_channel_isolation(self):
+        """Test each carrier appears only in its own channel."""
+        channels = [CENTER + 12_500 * k for k in (-40, 7, 52)]
+        bank = PolyphaseChannelizer(channels, CENTER, FS)
+        n = FS // 10
+        iq = fm_signal(channels[1] - CENTER, np.zeros(n))
+        out = bank.process(iq.astype(np.complex64))[:, 200:]
+
+        power = (np.abs(out) ** 2).mean(axis=1)
+        assert power[1] == pytest.approx(0.09, rel=0.05)
+        assert power[0] < power[1] * 1e-4
+        assert power[2] < power[1] * 1e-4
+        # Adjacent channel rejection
+        adjacent = PolyphaseChannelizer([channels[1] + 12_500], CENTER, FS)
+        leak = (np.abs(adjacent.process(iq.astype(np.complex64))[:, 200:]) ** 2).mean()
+        assert leak < power[1] * 1e-3
+
+    def test_fm_tones(self):
+        """Test every channel demodulates its own audio tone."""
+        channels = [929_562_500, 929_612_500, 930_937_500, 929_614_000]
+        receiver = PagerChannelizer(channels)
+        n = FS // 2
+        t = np.arange(n) / FS
+        tones = [500, 1000, 1500, 2000]
+        # The last channel is off the 12.5 kHz raster and is mixed down separately
+        iq = sum(fm_signal(freq - receiver.center_hz, np.sin(2 * np.pi * tone * t), amplitude=0.2)
+                 for freq, tone in zip(channels[:3], tones))
+        outputs = receiver.process(to_u8(iq))
+
+        for data, tone in zip(outputs[:3], tones):
+            audio = pcm(data)[1000:]
+            assert len(data) // 2 == pytest.approx(n * AUDIO_RATE / FS, abs=2000)
+            assert peak_frequency(audio) == pytest.approx(tone, abs=5)
+            # 4.5 kHz peak deviation at the rtl_fm discriminator scale
+            assert audio.std() == pytest.approx(4500 / 25000 * 2 * 16384 / np.sqrt(2), rel=0.05)
+
+    def test_off_raster_channel(self):
+        """Test a channel between bins is shifted to baseband."""
+        receiver = PagerChannelizer([929_614_000], center_hz=CENTER)
+        n = FS // 4
+        t = np.arange(n) / FS
+        iq = fm_signal(929_614_000 - CENTER, np.sin(2 * np.pi * 800 * t))
+        (data,) = receiver.process(to_u8(iq))
+        audio = pcm(data)[1000:]
+        assert peak_frequency(audio) == pytest.approx(800, abs=5)
+        # No residual carrier offset (it would show up as a DC level)
+        assert abs(audio.mean()) < 100
+
+    def test_fsk_bits(self):
+        """Test 1200 baud FSK (POCSAG-style) bits survive channelizing."""
+        rng = np.random.default_rng(7)
+        bits = rng.integers(0, 2, 240)
+        samples_per_bit = FS // 1200
+        modulation = np.repeat(bits * 2.0 - 1, samples_per_bit)
+        receiver = PagerChannelizer([929_612_500], center_hz=CENTER)
+        (data,) = receiver.process(to_u8(fm_signal(929_612_500 - CENTER, modulation)))
+
+        audio = pcm(data)
+        per_bit = AUDIO_RATE / 1200
+        # Filter bank group delay, in output samples
+        delay = (receiver.bank._length / 2) / FS * AUDIO_RATE
+        centres = (np.arange(len(bits)) + 0.5) * per_bit + delay
+        valid = centres < len(audio)
+        decoded = audio[centres[valid].astype(int)] > 0
+        assert valid.sum() > 200
+        assert (decoded == bits[valid].astype(bool)).all()
+
+    def test_block_size_independent(self):
+        """Test output doesn't depend on how the stream is chunked."""
+        channels = [CENTER - 100_000, CENTER + 12_500, CENTER + 3_000]
+        n = FS // 10
+        t = np.arange(n) / FS
+        iq = sum(fm_signal(freq - CENTER, np.sin(2 * np.pi * 700 * t)) for freq in channels)
+        iq = iq.astype(np.complex64)
+
+        whole_bank = PolyphaseChannelizer(channels, CENTER, FS)
+        whole_demods = [FMDemodulator(whole_bank.output_rate) for _ in channels]
+        whole = [d.process(c) for d, c in zip(whole_demods, whole_bank.process(iq))]
+
+        bank = PolyphaseChannelizer(channels, CENTER, FS)
+        demods = [FMDemodulator(bank.output_rate) for _ in channels]
+        parts = [[] for _ in channels]
+        start = 0
+        for size in rng_sizes(len(iq)):
+            for part, demod, channel in zip(parts, demods, bank.process(iq[start:start + size])):
+                part.append(demod.process(channel))
+            start += size
+
+        for part, expected in zip(parts, whole):
+            chunked = np.concatenate(part)
+            assert len(chunked) == len(expected)
+            assert np.abs(chunked.astype(int) - expected).max() <= 1
+
+    def test_odd_byte_chunks(self):
+        """Test IQ byte pairs split across reads are reassembled."""
+        receiver = PagerChannelizer([929_612_500], center_hz=CENTER)
+        raw = to_u8(fm_signal(929_612_500 - CENTER, np.zeros(FS // 100)))
+        total = sum(len(receiver.process(raw[i:i + 1001])[0]) for i in range(0, len(raw), 1001))
+        assert receiver.samples_in == len(raw) // 2
+        assert total // 2 == pytest.approx(len(raw) // 2 * AUDIO_RATE / FS, abs=2000)
+
+    def test_dc_removal_chunk_independent(self):
+        """Test small and odd-sized reads give the same audio as one block, with a DC offset present."""
+        channel = CENTER + 12_500
+        t = np.arange(FS // 10) / FS
+        raw = to_u8(fm_signal(channel - CENTER, np.sin(2 * np.pi * 700 * t)) + (0.05 - 0.03j))
+
+        (whole,) = PagerChannelizer([channel], CENTER).process(raw)
+        receiver = PagerChannelizer([channel], CENTER)
+        chunked = b''.join(receiver.process(raw[i:i + 1001])[0] for i in range(0, len(raw), 1001))
+        assert len(chunked) == len(whole)
+        assert np.abs(pcm(chunked) - pcm(whole)).max() <= 1
+
+
+def rng_sizes(total):
+    rng = np.random.default_rng(3)
+    sizes = []
+    while sum(sizes) < total:
+        sizes.append(int(rng.integers(1, 30_000)))
+    return sizes
+
+
+class TestChannelizerGroup:
+    """Tests for the multimon-ng stand-in process."""
+
+    def test_stop_does_not_wait_for_timeout(self, monkeypatch):
+        """Test /stop returns promptly and lets the decoders drain rather than killing them."""
+        source = subprocess.Popen(['sleep', '30'], stdout=subprocess.PIPE)
+        decoder = subprocess.Popen(['cat'], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        group = ChannelizerGroup(PagerChannelizer([CENTER + 25_000], CENTER, FS), source, None, [decoder])
+        killed = []
+        monkeypatch.setattr(group, 'kill', lambda: killed.append(True))
+        with app_module.process_lock:
+            app_module.current_process = group
+        group.start()
+        time.sleep(0.2)
+
+        started = time.monotonic()
+        with app_module.app.app_context():
+            assert stop_decoding().get_json() == {'status': 'stopped'}
+        assert time.monotonic() - started < 1
+        assert not killed
+        assert group.poll() == 0
+        assert app_module.current_process is None
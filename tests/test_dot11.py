@@ -0,0 +1,191 @@
+"""Tests for the streaming pcap/802.11 frame parser."""
+
+import struct
+
+import pytest
+
+from utils.airodump import AirodumpIngest
+from utils.dot11 import (
+    LINKTYPE_IEEE802_11,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    FrameTracker,
+    PcapError,
+    PcapReader,
+    PcapTail,
+    parse_frame,
+    parse_radiotap,
+)
+
+AP = 'AA:AA:AA:AA:AA:01'
+STA = '02:22:33:44:55:66'
+BROADCAST = 'FF:FF:FF:FF:FF:FF'
+RSN_PSK_CCMP = bytes.fromhex('0100' '000fac04' '0100' '000fac04' '0100' '000fac02' '0000')
+
+
+def mac(text):
+    return bytes.fromhex(text.replace(':', ''))
+
+
+def radiotap(signal=-42, freq=2437, fcs=False):
+    """Radiotap header with TSFT, flags, channel and dBm signal (TSFT forces alignment padding)."""
+    present = 1 << 0 | 1 << 1 | 1 << 3 | 1 << 5
+    fields = struct.pack('<QB', 0, 0x10 if fcs else 0) + b'\x00' + struct.pack('<HHb', freq, 0x00a0, signal)
+    return struct.pack('<BBHI', 0, 0, 8 + len(fields), present) + fields
+
+
+def element(eid, body):
+    return bytes([eid, len(body)]) + body
+
+
+def beacon(bssid=AP, ssid=b'Office', channel=6, rsn=RSN_PSK_CCMP, subtype=8):
+    header = bytes([subtype << 4, 0, 0, 0]) + mac(BROADCAST) + mac(bssid) + mac(bssid) + b'\x00\x00'
+    capability = 0x0011 if rsn else 0x0001
+    body = b'\x00' * 8 + struct.pack('<HH', 100, capability) + element(0, ssid) + element(3, bytes([channel]))
+    if rsn:
+        body += element(48, rsn)
+    return header + body
+
+
+def probe_request(sta=STA, ssid=b'Home'):
+    return bytes([0x40, 0, 0, 0]) + mac(BROADCAST) + mac(sta) + mac(BROADCAST) + b'\x00\x00' + element(0, ssid)
+
+
+def data_frame(sta=STA, bssid=AP, to_ap=True, eapol_key_info=None):
+    flags = 0x01 if to_ap else 0x02
+    addr1, addr2 = (bssid, sta) if to_ap else (sta, bssid)
+    # QoS data: 2-byte QoS control after the 24-byte header
+    frame = bytes([0x88, flags, 0, 0]) + mac(addr1) + mac(addr2) + mac(bssid) + b'\x00\x00' + b'\x00\x00'
+    if eapol_key_info is None:
+        return frame + b'\xaa\xaa\x03\x00\x00\x00\x08\x00' + b'\x45' * 40
+    return frame + b'\xaa\xaa\x03\x00\x00\x00\x88\x8e' + bytes([2, 3, 0, 95, 2]) + struct.pack('>H', eapol_key_info)
+
+
+# EAPOL-Key key information for the 4-way handshake messages
+M1, M2, M3, M4 = 0x008a, 0x010a, 0x13ca, 0x030a
+
+
+def pcap(frames, linktype=LINKTYPE_IEEE802_11_RADIOTAP, start=1_700_000_000.0):
+    out = struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, linktype)
+    for i, frame in enumerate(frames):
+        ts = start + i * 0.1
+        out += struct.pack('<IIII', int(ts), round(ts % 1 * 1e6), len(frame), len(frame)) + frame
+    return out
+
+
+class TestParsing:
+    """Tests for pcap records, radiotap and 802.11 frame decoding."""
+
+    def test_radiotap_alignment_and_fcs(self):
+        """Test fields after the 8-byte aligned TSFT are found, and the FCS flag is read."""
+        length, signal, freq, fcs = parse_radiotap(radiotap(-67, 5180, fcs=True))
+        assert (length, signal, freq, fcs) == (23, -67, 5180, True)
+
+    def test_beacon(self):
+        """Test SSID, channel and security of a WPA2 beacon, trailing FCS ignored."""
+        frame = parse_frame(LINKTYPE_IEEE802_11_RADIOTAP, radiotap(-50, fcs=True) + beacon() + b'\xde\xad\xbe\xef')
+        assert (frame.kind, frame.bssid, frame.ssid, frame.channel, frame.signal) == ('beacon', AP, 'Office', 6, -50)
+        assert frame.security == ('WPA2', 'CCMP', 'PSK')
+
+    def test_hidden_open_and_wpa3(self):
+        """Test hidden SSIDs, open networks and SAE transition mode."""
+        hidden = parse_frame(LINKTYPE_IEEE802_11, beacon(ssid=b'\x00' * 6, rsn=None))
+        assert (hidden.ssid, hidden.security) == ('', ('OPN', '', ''))
+        transition = RSN_PSK_CCMP[:12] + bytes.fromhex('0200' '000fac02' '000fac08' '0000')
+        assert parse_frame(LINKTYPE_IEEE802_11, beacon(rsn=transition)).security == ('WPA3 WPA2', 'CCMP', 'PSK SAE')
+
+    def test_probe_and_data(self):
+        """Test probe requests and the direction of data frames."""
+        probe = parse_frame(LINKTYPE_IEEE802_11, probe_request())
+        assert (probe.kind, probe.station, probe.ssid) == ('probe_request', STA, 'Home')
+        up = parse_frame(LINKTYPE_IEEE802_11, data_frame(to_ap=True))
+        down = parse_frame(LINKTYPE_IEEE802_11, data_frame(to_ap=False))
+        assert (up.bssid, up.station, up.transmitter) == (AP, STA, STA)
+        assert (down.bssid, down.station, down.transmitter) == (AP, STA, AP)
+        assert parse_frame(LINKTYPE_IEEE802_11, data_frame(sta=BROADCAST, to_ap=False)).station is None
+
+    def test_eapol_messages(self):
+        """Test the 4-way handshake message numbers."""
+        messages = [parse_frame(LINKTYPE_IEEE802_11, data_frame(to_ap=info in (M2, M4), eapol_key_info=info)).eapol
+                    for info in (M1, M2, M3, M4)]
+        assert messages == [1, 2, 3, 4]
+
+    def test_reader_handles_partial_records(self):
+        """Test records split across reads come out whole and in order."""
+        data = pcap([beacon(), probe_request(), data_frame()])
+        reader = PcapReader()
+        frames = []
+        for i in range(0, len(data), 7):
+            frames += reader.feed(data[i:i + 7])
+        assert reader.linktype == LINKTYPE_IEEE802_11_RADIOTAP
+        assert [f[1] for f in frames] == [beacon(), probe_request(), data_frame()]
+        assert frames[1][0] == pytest.approx(1_700_000_000.1)
+
+    def test_reader_rejects_other_formats(self):
+        """Test pcapng and garbage are refused."""
+        with pytest.raises(PcapError):
+            PcapReader().feed(b'\x0a\x0d\x0d\x0a' + b'\x00' * 28)
+        with pytest.raises(PcapError):
+            PcapReader().feed(b'not a capture at all....')
+
+
+class TestTail:
+    """Tests for following a capture file as it grows."""
+
+    def test_tail_by_offset(self, tmp_path):
+        """Test only appended frames are returned, and a replaced file is read from the start."""
+        path = tmp_path / 'scan-01.cap'
+        tail = PcapTail(str(path))
+        assert tail.read() is None
+        data = pcap([beacon(), probe_request()], LINKTYPE_IEEE802_11)
+        path.write_bytes(data[:-5])
+        assert len(tail.read()) == 1
+        with open(path, 'ab') as f:
+            f.write(data[-5:])
+        assert [f[1] for f in tail.read()] == [probe_request()]
+        assert tail.read() == []
+
+        path.unlink()
+        path.write_bytes(pcap([data_frame()], LINKTYPE_IEEE802_11))
+        assert [f[1] for f in tail.read()] == [data_frame()]
+        assert tail.restarts == 1
+
+
+class TestFrameTracker:
+    """Tests for live frames updating the shared records."""
+
+    def test_networks_clients_and_power(self):
+        """Test new devices, averaged per-frame power with hysteresis and probe/association updates."""
+        ingest = AirodumpIngest('unused', power_delta=5)
+        tracker = FrameTracker(ingest)
+        frames = [radiotap(-50) + beacon(), radiotap(-52) + beacon(), radiotap(-60) + probe_request(),
+                  radiotap(-30) + beacon(), radiotap(-30) + beacon(), radiotap(-61) + data_frame()]
+        changes, _ = tracker.process(LINKTYPE_IEEE802_11_RADIOTAP, PcapReader().feed(pcap(frames)))
+        # One strong frame moves the average 4 dB (a sighting), the second 7 dB
+        assert [(c.kind, c.action) for c in changes] == [('network', 'new'), ('client', 'new'),
+                                                         ('network', 'update'), ('client', 'update')]
+        assert ingest.networks[AP]['essid'] == 'Office'
+        assert ingest.networks[AP]['power'] == '-43'
+        assert ingest.clients[STA]['probes'] == 'Home'
+        assert ingest.clients[STA]['bssid'] == AP
+        assert ingest.clients[STA]['power'] == '-60'
+
+    def test_csv_does_not_announce_known_devices_again(self):
+        """Test a network first seen in a frame is not 'new' again when the CSV catches up."""
+        ingest = AirodumpIngest('unused')
+        FrameTracker(ingest).process(LINKTYPE_IEEE802_11_RADIOTAP, PcapReader().feed(pcap([radiotap() + beacon()])))
+        row = (f'{AP}, 2024-05-01 11:00:00, 2024-05-01 12:00:00,  6, 54, WPA2, CCMP, PSK, -42, 10, 0, '
+               f'0.  0.  0.  0,   6, Office, ')
+        changes = ingest.apply('\r\nBSSID, First time seen\r\n' + row + '\r\n')
+        assert [c.action for c in changes] == ['update']
+
+    def test_handshake_progress(self):
+        """Test handshake events accumulate messages and report when crackable."""
+        tracker = FrameTracker(AirodumpIngest('unused'))
+        frames = [data_frame(to_ap=False, eapol_key_info=M1), data_frame(eapol_key_info=M2),
+                  data_frame(eapol_key_info=M2)]
+        _, events = tracker.process(LINKTYPE_IEEE802_11, PcapReader().feed(pcap(frames, LINKTYPE_IEEE802_11)))
+        assert events == [
+            {'bssid': AP, 'client': STA, 'messages': [1], 'complete': False},
+            {'bssid': AP, 'client': STA, 'messages': [1, 2], 'complete': True},
+        ]
+        assert tracker.stats()['handshakes'] == 1
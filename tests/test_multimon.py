@@ -0,0 +1,223 @@
+"""Tests for multimon-ng output parsing."""
+
+import os
+import queue
+
+import app as app_module
+from routes.pager import stream_decoder
+from utils.multimon import (
+    DECODERS,
+    MultimonDecoder,
+    MultimonParser,
+    multimon_args,
+    parse_multimon_line,
+    register_decoder,
+)
+from utils.pager_stats import AddressStats, MessageDeduplicator
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'fixtures', 'multimon_corpus.txt')
+
+
+class TestPagerLines:
+    """Tests for POCSAG and FLEX output."""
+
+    def test_pocsag_alpha(self):
+        """Test an alphanumeric POCSAG page."""
+        msg = parse_multimon_line('POCSAG1200: Address: 1234567  Function: 3  Alpha:   FIRE CALL<NUL>')
+        assert msg == {'protocol': 'POCSAG1200', 'address': '1234567', 'function': '3',
+                       'msg_type': 'Alpha', 'message': 'FIRE CALL<NUL>'}
+
+    def test_pocsag_tone_and_empty(self):
+        """Test address-only and empty POCSAG messages."""
+        tone = parse_multimon_line('POCSAG512: Address:   10240  Function: 1')
+        assert tone['msg_type'] == 'Tone'
+        assert tone['message'] == '[Tone Only]'
+        empty = parse_multimon_line('POCSAG2400: Address:  988001  Function: 2  Alpha:   ')
+        assert empty['message'] == '[No Message]'
+
+    def test_flex_formats(self):
+        """Test both FLEX output layouts."""
+        msg = parse_multimon_line(
+            'FLEX|2024-01-01 12:00:00|1600/2/K/A|07.104|001234567|ALN|Ambulance 3 dispatched')
+        assert msg['address'] == '001234567'
+        assert msg['function'] == '1600/2/K/A'
+        assert msg['msg_type'] == 'ALN'
+        assert msg['message'] == 'Ambulance 3 dispatched'
+
+        simple = parse_multimon_line('FLEX: unparsed short frame')
+        assert simple['address'] == 'Unknown'
+        assert simple['message'] == 'unparsed short frame'
+
+    def test_unknown_lines(self):
+        """Test banner and unrelated lines are not messages."""
+        assert parse_multimon_line('multimon-ng 1.2.0') is None
+        assert parse_multimon_line('POCSAG1200: garbage') is None
+        assert parse_multimon_line('') is None
+
+
+class TestOtherDecoders:
+    """Tests for EAS, DTMF, ZVEI and AFSK1200 output."""
+
+    def test_eas_header(self):
+        """Test SAME header fields are extracted."""
+        msg = parse_multimon_line('EAS: ZCZC-WXR-TOR-029095-029165+0030-1051700-KEAX/NWS-')
+        assert msg['msg_type'] == 'TOR'
+        assert msg['originator'] == 'WXR'
+        assert msg['locations'] == ['029095', '029165']
+        assert msg['duration'] == '00:30'
+        assert msg['address'] == 'KEAX/NWS'
+        assert parse_multimon_line('EAS: NNNN')['msg_type'] == 'End of Message'
+
+    def test_tones(self):
+        """Test DTMF digits and ZVEI sequences."""
+        assert parse_multimon_line('DTMF: #')['message'] == '#'
+        zvei = parse_multimon_line('ZVEI1: 2E4R6')
+        assert zvei['protocol'] == 'ZVEI1'
+        assert zvei['address'] == '2E4R6'
+
+    def test_aprs_two_line_frames(self):
+        """Test AX.25 headers are joined with the payload on the next line."""
+        parser = MultimonParser()
+        assert parser.feed('AFSK1200: fm N0CALL-9 to APRS via WIDE1-1,WIDE2-1 UI  pid=F0') == []
+        assert parser.waiting
+
+        (msg,) = parser.feed('!4903.50N/07201.75W-Test 001234')
+        assert msg['source'] == 'N0CALL-9'
+        assert msg['destination'] == 'APRS'
+        assert msg['path'] == ['WIDE1-1', 'WIDE2-1']
+        assert msg['message'] == '!4903.50N/07201.75W-Test 001234'
+        assert not parser.waiting
+
+        # A header without payload is released by the next message
+        parser.feed('AFSK1200: fm KD2ABC to APDR16 UI  pid=F0')
+        header, dtmf = parser.feed('DTMF: 5')
+        assert header['message'] == '[No Payload]'
+        assert dtmf['message'] == '5'
+
+    def test_corpus(self):
+        """Test every decoder line in the corpus parses."""
+        parser = MultimonParser()
+        with open(CORPUS) as f:
+            messages = [msg for line in f for msg in parser.feed(line)]
+        messages += parser.flush()
+
+        protocols = [msg['protocol'] for msg in messages]
+        assert protocols.count('AFSK1200') == 2
+        assert protocols.count('EAS') == 3
+        assert len(messages) == 16
+
+
+class TestDecoderTable:
+    """Tests for the pluggable decoder table."""
+
+    def test_multimon_args(self):
+        """Test command-line arguments come from the table."""
+        assert multimon_args(['POCSAG1200', 'EAS', 'bogus']) == ['-a', 'POCSAG1200', '-a', 'EAS']
+
+    def test_register_decoder(self):
+        """Test a new decoder is dispatched on its prefix."""
+        register_decoder(MultimonDecoder(
+            'TESTDEC', ('TESTDEC',), lambda token, rest: {'protocol': token, 'message': rest[1:].strip()},
+            args=('-a', 'TESTDEC', '-x'),
+        ))
+        assert 'TESTDEC' in DECODERS
+        assert parse_multimon_line('TESTDEC: hello') == {'protocol': 'TESTDEC', 'message': 'hello'}
+        assert multimon_args(['TESTDEC']) == ['-a', 'TESTDEC', '-x']
+
+
+class TestPagerDedup:
+    """Tests for duplicate suppression and per-address counters."""
+
+    PAGE = {'protocol': 'POCSAG1200', 'address': '1234567', 'function': '3',
+            'msg_type': 'Alpha', 'message': 'FIRE CALL'}
+
+    def test_window(self):
+        """Test repeats are dropped only within the window from the first copy."""
+        dedup = MessageDeduplicator(window=30)
+        assert dedup.accept(self.PAGE, now=100)
+        assert not dedup.accept(dict(self.PAGE), now=110)
+        assert dedup.accept({**self.PAGE, 'message': 'OTHER'}, now=110)
+        assert dedup.accept({**self.PAGE, 'protocol': 'POCSAG512'}, now=110)
+        # Duplicates don't extend the window
+        assert not dedup.accept(self.PAGE, now=129)
+        assert dedup.accept(self.PAGE, now=131)
+        assert dedup.stats()['duplicates'] == 2
+
+    def test_bounded(self):
+        """Test the oldest pages are forgotten beyond max_entries."""
+        dedup = MessageDeduplicator(window=30, max_entries=3)
+        for i in range(5):
+            assert dedup.accept({**self.PAGE, 'address': str(i)}, now=100)
+        assert dedup.stats()['tracked'] == 3
+        assert dedup.accept({**self.PAGE, 'address': '0'}, now=101)
+        assert not dedup.accept({**self.PAGE, 'address': '4'}, now=101)
+
+    def test_only_pages_filtered(self):
+        """Test repeated DTMF digits and tone sequences all get through."""
+        dedup = MessageDeduplicator(window=30, max_entries=10000)
+        parser = MultimonParser()
+        digits = [msg['message'] for line in ('DTMF: 1', 'DTMF: 5', 'DTMF: 5', 'DTMF: 1', 'DTMF: 2')
+                  for msg in parser.feed(line) if dedup.accept(msg, now=100)]
+        assert digits == ['1', '5', '5', '1', '2']
+        zvei = parse_multimon_line('ZVEI1: 2E4R6')
+        assert dedup.accept(zvei, now=100) and dedup.accept(dict(zvei), now=101)
+        eom = parse_multimon_line('EAS: NNNN')
+        assert dedup.accept(eom, now=100) and dedup.accept(dict(eom), now=101)
+        assert dedup.stats()['duplicates'] == 0
+
+    def test_disabled(self):
+        """Test a zero window accepts everything."""
+        dedup = MessageDeduplicator(window=0)
+        assert dedup.accept(self.PAGE) and dedup.accept(self.PAGE)
+
+    def test_address_stats(self):
+        """Test counters, sorting and eviction."""
+        stats = AddressStats(max_addresses=2)
+        stats.record(self.PAGE, now=100)
+        stats.record(self.PAGE, duplicate=True, now=101)
+        stats.record({**self.PAGE, 'function': '0', 'message': 'TEST'}, now=105)
+        stats.record({**self.PAGE, 'address': '42'}, now=103)
+
+        entry = stats.get('1234567')
+        assert entry['count'] == 2
+        assert entry['duplicates'] == 1
+        assert (entry['first_seen'], entry['last_seen']) == (100, 105)
+        assert entry['functions'] == {'3': 1, '0': 1}
+        assert entry['last_message'] == 'TEST'
+
+        assert [e['address'] for e in stats.snapshot('last_seen')] == ['1234567', '42']
+        assert [e['address'] for e in stats.snapshot('first_seen', limit=1)] == ['42']
+
+        # '42' was heard most recently, so the other address goes first
+        stats.record({**self.PAGE, 'address': '7'}, now=106)
+        assert stats.get('1234567') is None
+        assert len(stats) == 2
+
+
+class TestStreamDecoder:
+    """Tests for the decoder output reader."""
+
+    class Exited:
+        """A decoder process that has already finished."""
+
+        def poll(self):
+            return 0
+
+        def wait(self):
+            return 0
+
+    def test_pending_header_published_at_eof(self, monkeypatch):
+        """Test a header still waiting for its payload is sent when the output ends."""
+        monkeypatch.setattr(app_module, 'output_queue', queue.Queue())
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b'POCSAG1200: Address: 1234567  Function: 3  Alpha:   FIRE CALL\n'
+                           b'AFSK1200: fm N0CALL-9 to APRS UI  pid=F0\n')
+        os.close(write_fd)
+        stream_decoder(read_fd, self.Exited(), channel=152.0)
+
+        sent = []
+        while not app_module.output_queue.empty():
+            sent.append(app_module.output_queue.get())
+        assert [(m['protocol'], m['message']) for m in sent] == [
+            ('POCSAG1200', 'FIRE CALL'), ('AFSK1200', '[No Payload]')]
+        assert all(m['frequency'] == 152.0 for m in sent)
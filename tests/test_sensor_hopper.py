@@ -0,0 +1,110 @@
+"""Tests for rtl_433 frequency hopping."""
+
+import time
+
+import pytest
+
+import app as app_module
+from routes.sensor import SensorHopper, parse_bands
+from utils.sdr import SDRFactory, SDRType
+from utils.sensor_hopper import HopSchedule
+
+
+def listen(schedule, per_minute, seconds=None):
+    """One dwell on the next band with traffic at the given decodes per minute."""
+    freq, dwell = schedule.next_dwell()
+    seconds = seconds or dwell
+    for i in range(round(per_minute * seconds / 60)):
+        schedule.record(('Acurite-Tower', str(i % 4), 'A'), now=0.0)
+    schedule.finish(seconds)
+    return freq, dwell
+
+
+class TestHopSchedule:
+    """Tests for band order, adaptive dwell and yield."""
+
+    def test_round_robin_and_initial_dwell(self):
+        """Test bands are visited in order, all at min_dwell until traffic is heard."""
+        schedule = HopSchedule([315, 433.92, 868, 433.92], min_dwell=10, max_dwell=60)
+        visits = [schedule.next_dwell() for _ in range(4)]
+        assert visits == [(315.0, 10), (433.92, 10), (868.0, 10), (315.0, 10)]
+
+    def test_dwell_follows_recent_traffic(self):
+        """Test the busiest band gets max_dwell and others scale with their rate."""
+        schedule = HopSchedule([315, 433.92, 868], min_dwell=10, max_dwell=60)
+        listen(schedule, 0)
+        listen(schedule, 60)
+        listen(schedule, 30)
+        assert [schedule.next_dwell()[1] for _ in range(3)] == [10, 60, 35]
+
+    def test_quiet_band_gives_time_back(self):
+        """Test a band that goes silent decays back towards min_dwell."""
+        schedule = HopSchedule([315, 433.92], min_dwell=10, max_dwell=60, smoothing=0.5)
+        listen(schedule, 6)
+        listen(schedule, 6)
+        dwells = []
+        for _ in range(4):
+            _, dwell = listen(schedule, 0)
+            dwells.append(dwell)
+            listen(schedule, 6)
+        assert dwells[0] == 60
+        assert dwells == sorted(dwells, reverse=True)
+        assert dwells[-1] < 20
+
+    def test_yield_report(self):
+        """Test per-band totals, distinct devices and time share."""
+        schedule = HopSchedule([315, 433.92], min_dwell=10, max_dwell=60)
+        listen(schedule, 0, seconds=30)
+        listen(schedule, 40, seconds=30)
+        stats = schedule.stats()
+        assert stats['current'] == 433.92
+        quiet, busy = stats['bands']
+        assert (quiet['decodes'], quiet['yield_per_minute'], quiet['next_dwell']) == (0, 0.0, 10)
+        assert (busy['decodes'], busy['devices'], busy['yield_per_minute']) == (20, 4, 40.0)
+        assert busy['share'] == 0.5
+
+    def test_invalid_schedule(self):
+        """Test empty band lists and inverted dwell limits are rejected."""
+        with pytest.raises(ValueError):
+            HopSchedule([])
+        with pytest.raises(ValueError):
+            HopSchedule([433.92], min_dwell=60, max_dwell=10)
+
+
+class TestSensorHopper:
+    """Tests for the rtl_433 stand-in process."""
+
+    def test_stop_does_not_wait_for_timeout(self):
+        """Test terminate/wait under sensor_lock (as /stop_sensor does) returns promptly."""
+        hopper = SensorHopper(HopSchedule([433.92], min_dwell=30, max_dwell=30), lambda freq: ['sleep', '30'])
+        with app_module.sensor_lock:
+            app_module.sensor_process = hopper
+        hopper.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        with app_module.sensor_lock:
+            hopper.terminate()
+            hopper.wait(timeout=2)
+            app_module.sensor_process = None
+        assert time.monotonic() - started < 1
+        assert hopper.poll() == 0
+
+
+class TestParseBands:
+    """Tests for hop frequency parsing and hardware validation."""
+
+    def test_per_sdr_type_ranges(self):
+        """Test frequencies are checked against each SDR type's capabilities."""
+        rtlsdr = SDRFactory.create_default_device(SDRType.RTL_SDR)
+        hackrf = SDRFactory.create_default_device(SDRType.HACKRF)
+        assert parse_bands('315, 433.92,868', rtlsdr) == [315.0, 433.92, 868.0]
+        assert parse_bands([2400], hackrf) == [2400.0]
+        with pytest.raises(ValueError):
+            parse_bands([2400], rtlsdr)
+
+    def test_malformed(self):
+        """Test malformed frequency lists are rejected."""
+        device = SDRFactory.create_default_device(SDRType.RTL_SDR)
+        for value in ('', [], ['abc'], {'f': 433}, [433.92] * 17):
+            with pytest.raises(ValueError):
+                parse_bands(value, device)
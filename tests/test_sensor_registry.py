@@ -0,0 +1,97 @@
+"""Tests for the rtl_433 sensor registry."""
+
+import pytest
+
+from utils.sensor_registry import BucketRing, SensorRegistry, device_key, measurements
+
+
+def reading(**fields):
+    data = {'time': '2024-01-01 12:00:00', 'model': 'Acurite-Tower', 'id': 1234, 'channel': 'A',
+            'battery_ok': 1, 'temperature_C': 20.0, 'humidity': 50, 'mic': 'CHECKSUM', 'type': 'sensor'}
+    data.update(fields)
+    return data
+
+
+class TestHelpers:
+    """Tests for keys and measured fields."""
+
+    def test_device_key(self):
+        """Test ids and channels are normalised to strings."""
+        assert device_key(reading()) == ('Acurite-Tower', '1234', 'A')
+        assert device_key({'model': 'Generic-Remote'}) == ('Generic-Remote', '', '')
+
+    def test_measurements(self):
+        """Test only numeric non-identity fields are measured."""
+        assert measurements(reading(flag=True, status='OK', bad=float('nan'))) == {
+            'battery_ok': 1.0, 'temperature_C': 20.0, 'humidity': 50.0,
+        }
+
+
+class TestBucketRing:
+    """Tests for the fixed-size bucket ring."""
+
+    def test_rolling_window(self):
+        """Test buckets aggregate and age out of the window."""
+        ring = BucketRing(width=5, size=12)
+        ring.add(100, 10.0)
+        ring.add(101, 14.0)
+        ring.add(130, 2.0)
+        assert ring.summary(now=130) == {'min': 2.0, 'max': 14.0, 'mean': pytest.approx(26 / 3), 'count': 3}
+        assert ring.series(now=130) == [[100, 10.0, 14.0, 12.0, 2], [130, 2.0, 2.0, 2.0, 1]]
+        # 100-104 bucket leaves the one-minute window
+        assert ring.summary(now=161)['count'] == 1
+        assert ring.summary(now=200) is None
+
+    def test_slot_reuse(self):
+        """Test a slot is overwritten a full window later and late values are dropped."""
+        ring = BucketRing(width=60, size=60)
+        ring.add(0, 1.0)
+        ring.add(3600, 5.0)
+        ring.add(30, 100.0)
+        assert ring.series(now=3600) == [[3600, 5.0, 5.0, 5.0, 1]]
+
+
+class TestSensorRegistry:
+    """Tests for repeat suppression and per-device aggregates."""
+
+    def test_repeats_collapsed(self):
+        """Test identical readings within the window are repeats."""
+        registry = SensorRegistry(repeat_window=2.0)
+        assert registry.ingest(reading(rssi=-10.0), now=100.0)
+        assert not registry.ingest(reading(rssi=-12.0), now=100.4)
+        assert not registry.ingest(reading(), now=101.5)
+        # The window runs from the accepted copy, so a steady reading still gets through
+        assert registry.ingest(reading(), now=102.1)
+        assert registry.ingest(reading(temperature_C=20.5), now=102.2)
+        assert registry.ingest(reading(channel='B'), now=102.2)
+        device = registry.devices(channel='A', now=103.0)[0]
+        assert (device['count'], device['repeats']) == (3, 2)
+        assert registry.stats()['repeats'] == 2
+
+    def test_field_aggregates(self):
+        """Test last value and min/max/mean per tier."""
+        registry = SensorRegistry()
+        for i, temp in enumerate((18.0, 22.0, 20.0)):
+            registry.ingest(reading(temperature_C=temp), now=1000.0 + i * 600)
+        device = registry.devices(series='1h', now=2200.0)[0]
+        field = device['fields']['temperature_C']
+        assert field['last'] == 20.0
+        assert field['1m'] == {'min': 20.0, 'max': 20.0, 'mean': 20.0, 'count': 1}
+        assert field['1h'] == {'min': 18.0, 'max': 22.0, 'mean': 20.0, 'count': 3}
+        assert field['24h']['count'] == 3
+        assert [bucket[3] for bucket in field['series']] == [18.0, 22.0, 20.0]
+        assert device['last']['temperature_C'] == 20.0
+        assert 'type' not in device['last']
+
+    def test_filters_and_eviction(self):
+        """Test filters, ordering and least-recently-heard eviction."""
+        registry = SensorRegistry(max_devices=2)
+        registry.ingest(reading(id=1), now=1.0)
+        registry.ingest(reading(id=2), now=2.0)
+        registry.ingest(reading(id=1, humidity=60), now=3.0)
+        registry.ingest(reading(id=3), now=4.0)
+        assert [d['id'] for d in registry.devices(now=5.0)] == ['3', '1']
+        assert [d['id'] for d in registry.devices(device_id='1', now=5.0)] == ['1']
+        assert len(registry.devices(limit=1, now=5.0)) == 1
+        with pytest.raises(ValueError):
+            registry.devices(series='1w')
@@ -0,0 +1,107 @@
+"""Tests for chart time series and downsampling."""
+
+import math
+from array import array
+
+import pytest
+
+from routes.bluetooth import BT_RSSI_PATTERN
+from utils.timeseries import TimeSeriesStore, lttb, minmax
+
+
+def wave(n):
+    times = array('d', range(n))
+    values = array('d', (math.sin(i / 50) for i in range(n)))
+    return times, values
+
+
+class TestDownsampling:
+    """Tests for LTTB and min/max bucketing."""
+
+    @pytest.mark.parametrize('method', [lttb, minmax])
+    @pytest.mark.parametrize('points', [1, 2, 3, 100, 101])
+    def test_never_exceeds_points(self, method, points):
+        """Test the output size is bounded and stays in time order."""
+        times, values = wave(10000)
+        out_t, out_v = method(times, values, points)
+        assert 0 < len(out_t) <= points
+        assert len(out_t) == len(out_v)
+        assert out_t == sorted(out_t)
+
+    def test_short_series_unchanged(self):
+        """Test series already under the limit are returned as-is."""
+        times, values = wave(10)
+        assert lttb(times, values, 10) == (list(times), list(values))
+        assert minmax(times, values, 50) == (list(times), list(values))
+
+    def test_lttb_keeps_ends_and_peaks(self):
+        """Test LTTB keeps both end points and an isolated spike."""
+        times, values = wave(5000)
+        values[2500] = 10.0
+        out_t, out_v = lttb(times, values, 100)
+        assert len(out_t) == 100
+        assert (out_t[0], out_t[-1]) == (0.0, 4999.0)
+        assert 10.0 in out_v
+
+    def test_minmax_keeps_extremes(self):
+        """Test min/max bucketing keeps every bucket's extremes."""
+        times, values = wave(5000)
+        values[1234] = -7.0
+        out_t, out_v = minmax(times, values, 20)
+        assert min(out_v) == -7.0
+        assert max(out_v) == pytest.approx(1.0, abs=1e-3)
+
+
+class TestTimeSeriesStore:
+    """Tests for the series store."""
+
+    def test_range_query(self):
+        """Test from/to select a range and the total counts raw points."""
+        store = TimeSeriesStore()
+        for i in range(1000):
+            store.record('bt:AA:rssi', -i, ts=1000.0 + i)
+        result = store.query('bt:AA:rssi', start=1100, end=1199, points=1000)
+        assert result['total'] == 100
+        assert (result['t'][0], result['t'][-1]) == (1100.0, 1199.0)
+        assert len(store.query('bt:AA:rssi', points=50)['t']) == 50
+        assert store.query('unknown') is None
+        with pytest.raises(ValueError):
+            store.query('bt:AA:rssi', method='average')
+
+    def test_late_points_sorted(self):
+        """Test out-of-order points are inserted in time order."""
+        store = TimeSeriesStore()
+        for ts in (1.0, 3.0, 2.0):
+            store.record('s', ts, ts=ts)
+        assert store.query('s')['t'] == [1.0, 2.0, 3.0]
+
+    def test_limits(self):
+        """Test point, age and series limits."""
+        store = TimeSeriesStore(max_series=2, max_points=100, retention=500)
+        for i in range(1000):
+            store.record('a', i, ts=float(i))
+        result = store.query('a', points=1000)
+        assert len(result['t']) <= 100 + 100 // 8
+        assert result['t'][-1] == 999.0
+        store.record('b', 1)
+        store.record('c', 1)
+        assert [s['name'] for s in store.names()] == ['b', 'c']
+
+        aged = TimeSeriesStore(retention=800)
+        for i in range(1000):
+            aged.record('a', i, ts=float(i))
+        assert aged.query('a', points=1000)['t'][0] >= 999 - 800 - 100
+
+    def test_names_prefix(self):
+        """Test series listings filter by prefix."""
+        store = TimeSeriesStore()
+        store.record('wifi:AA:power', -50, ts=1.0)
+        store.record('bt:BB:rssi', -70, ts=2.0)
+        assert store.names('bt:') == [{'name': 'bt:BB:rssi', 'points': 1, 'first': 2.0, 'last': 2.0}]
+
+
+def test_bluetoothctl_rssi_pattern():
+    """Test both bluetoothctl RSSI formats are recognised."""
+    assert BT_RSSI_PATTERN.match('RSSI: -67').group(1) == '-67'
+    assert BT_RSSI_PATTERN.match('RSSI: 0xffffffb5 (-75)').group(1) == '-75'
+    assert BT_RSSI_PATTERN.match('Galaxy Buds') is None
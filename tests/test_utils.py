@@ -1,8 +1,18 @@
 """Tests for utility modules."""
 
+import gzip
+import json
+import queue
+import sqlite3
+import threading
+import time
+
 import pytest
 from utils.process import is_valid_mac, is_valid_channel
 from utils.dependencies import check_tool
+from utils.history import HistoryWriter, build_match_query
+from utils.message_log import MessageLog
+from utils.sse import BroadcastHub, COALESCE, merge_update, message_key, sse_stream
 from data.oui import get_manufacturer
 
 
@@ -71,3 +81,367 @@ class TestOuiLookup:
         """Test looking up unknown manufacturer."""
         result = get_manufacturer('FF:FF:FF:FF:FF:FF')
         assert result == 'Unknown'
+
+
+class TestBroadcastHub:
+    """Tests for the SSE broadcast hub."""
+
+    def test_every_subscriber_gets_each_message(self):
+        """Test messages fan out to all subscribers."""
+        hub = BroadcastHub('test')
+        first = hub.subscribe()
+        second = hub.subscribe()
+        hub.put({'type': 'aircraft', 'icao': 'ABC123'})
+
+        assert first.get(timeout=0.1)['icao'] == 'ABC123'
+        assert second.get(timeout=0.1)['icao'] == 'ABC123'
+
+    def test_slow_subscriber_drops_oldest(self):
+        """Test a full subscriber buffer drops its oldest message."""
+        hub = BroadcastHub('test', subscriber_maxlen=2)
+        sub = hub.subscribe()
+        for i in range(3):
+            hub.put(i)
+
+        assert sub.dropped == 1
+        assert sub.get(timeout=0.1) == 1
+        assert sub.get(timeout=0.1) == 2
+
+    def test_get_times_out_when_empty(self):
+        """Test get raises queue.Empty on timeout."""
+        sub = BroadcastHub('test').subscribe()
+        with pytest.raises(queue.Empty):
+            sub.get(timeout=0.01)
+
+    def test_stream_unsubscribes_on_close(self):
+        """Test closing the SSE generator removes its subscriber."""
+        hub = BroadcastHub('test')
+        stream = sse_stream(hub, timeout=0.01)
+        hub_put = threading.Timer(0.05, hub.put, args=({'type': 'info'},))
+        hub_put.start()
+        assert next(stream).endswith('data: {"type": "info"}\n\n')
+        assert hub.subscriber_count == 1
+        stream.close()
+        assert hub.subscriber_count == 0
+
+    def test_coalesce_replaces_pending_update(self):
+        """Test coalesce policy keeps only the newest pending update per key."""
+        hub = BroadcastHub('test', policy=COALESCE, key=message_key('icao'))
+        sub = hub.subscribe()
+        hub.put({'type': 'aircraft', 'icao': 'ABC123', 'altitude': 1000})
+        hub.put({'type': 'status', 'text': 'ok'})
+        hub.put({'type': 'aircraft', 'icao': 'ABC123', 'altitude': 2000})
+
+        assert sub.get(timeout=0.1)['altitude'] == 2000
+        assert sub.get(timeout=0.1)['type'] == 'status'
+        assert len(sub) == 0
+
+        stats = hub.stats()
+        assert stats['enqueued'] == 3
+        assert stats['coalesced'] == 1
+        assert stats['high_water'] == 2
+
+    def test_coalesce_merges_deltas(self):
+        """Test merge_update keeps fields from the replaced pending delta."""
+        hub = BroadcastHub('test', policy=COALESCE, key=message_key('icao'), merge=merge_update)
+        sub = hub.subscribe()
+        hub.put({'type': 'aircraft', 'icao': 'ABC123', 'callsign': 'RYR1', 'altitude': 1000})
+        hub.put({'type': 'aircraft', 'icao': 'ABC123', 'altitude': 2000})
+
+        assert sub.get(timeout=0.1) == {
+            'type': 'aircraft', 'icao': 'ABC123', 'callsign': 'RYR1', 'altitude': 2000,
+        }
+        assert len(sub) == 0
+
+    def test_stats_survive_unsubscribe(self):
+        """Test counters include subscribers that have disconnected."""
+        hub = BroadcastHub('test', subscriber_maxlen=1)
+        hub.put('lost')
+        sub = hub.subscribe()
+        hub.put(1)
+        hub.put(2)
+        hub.unsubscribe(sub)
+
+        stats = hub.stats()
+        assert stats['undelivered'] == 1
+        assert stats['dropped'] == 1
+        assert stats['subscribers'] == 0
+
+    def test_subscriber_filter(self):
+        """Test a subscriber filter keeps rejected messages out of its buffer."""
+        hub = BroadcastHub('test', replay_size=10)
+        hub.put({'n': 0})
+        sub = hub.subscribe(last_event_id=0, message_filter=lambda msg: msg['n'] % 2 == 0)
+        other = hub.subscribe()
+        for i in range(1, 4):
+            hub.put({'n': i})
+
+        assert [sub.get(timeout=0)['n'] for _ in range(len(sub))] == [0, 2]
+        assert len(other) == 3
+        assert hub.stats()['filtered'] == 2
+
+    def test_batch_mode_sends_json_array(self):
+        """Test batch mode drains pending messages into one event."""
+        q = queue.Queue()
+        for i in range(3):
+            q.put({'n': i})
+        stream = sse_stream(q, timeout=0.01, batch=True, batch_max_delay=0.01)
+
+        assert next(stream) == 'data: [{"n": 0},{"n": 1},{"n": 2}]\n\n'
+
+    def test_batch_mode_respects_count_limit(self):
+        """Test batch mode splits events at the count limit."""
+        q = queue.Queue()
+        for i in range(3):
+            q.put({'n': i})
+        stream = sse_stream(q, timeout=0.01, batch=True, batch_max_count=2)
+
+        assert next(stream) == 'data: [{"n": 0},{"n": 1}]\n\n'
+        assert next(stream) == 'data: [{"n": 2}]\n\n'
+
+
+class TestStreamResume:
+    """Tests for Last-Event-ID resume."""
+
+    def test_events_carry_increasing_ids(self):
+        """Test hub streams emit monotonically increasing event ids."""
+        hub = BroadcastHub('test')
+        stream = sse_stream(hub, timeout=0.01)
+        threading.Timer(0.05, lambda: [hub.put({'n': i}) for i in range(2)]).start()
+
+        first = next(stream)
+        second = next(stream)
+        stream.close()
+
+        first_id = int(first.split('\n')[0][len('id: '):])
+        second_id = int(second.split('\n')[0][len('id: '):])
+        assert second_id == first_id + 1
+
+    def test_resume_replays_only_missed_events(self):
+        """Test subscribing with a last event id replays newer messages."""
+        hub = BroadcastHub('test')
+        sub = hub.subscribe()
+        for i in range(5):
+            hub.put({'n': i})
+        for _ in range(2):
+            sub.get(timeout=0.1)
+        last_seen = sub.last_seq
+
+        resumed = hub.subscribe(last_event_id=last_seen)
+        assert [resumed.get(timeout=0.1)['n'] for _ in range(3)] == [2, 3, 4]
+        assert len(resumed) == 0
+
+    def test_replay_ring_is_bounded(self):
+        """Test only the newest replay_size messages are replayed."""
+        hub = BroadcastHub('test', replay_size=2)
+        for i in range(5):
+            hub.put({'n': i})
+
+        resumed = hub.subscribe(last_event_id=0)
+        assert [resumed.get(timeout=0.1)['n'] for _ in range(2)] == [3, 4]
+
+
+class TestHistoryWriter:
+    """Tests for the batched SQLite event history."""
+
+    def test_not_recording_until_started(self, tmp_path):
+        """Test events are ignored (and no file is created) before start()."""
+        writer = HistoryWriter(str(tmp_path / 'history.db'))
+        writer.record('pager', {'address': '1234'})
+        assert writer.stats()['pending'] == 0
+        assert writer.query('pager') == []
+
+    def test_batched_write_and_query(self, tmp_path):
+        """Test events from several modes land in their own tables."""
+        # No retention: the writer's periodic prune would delete these old timestamps
+        writer = HistoryWriter(str(tmp_path / 'history.db'), retention_hours=0, flush_interval=60)
+        writer.start()
+        for i in range(10):
+            writer.record('adsb', {'icao': 'ABC123', 'altitude': 1000 + i, 'category': 'A3'}, ts=100.0 + i)
+        writer.record('adsb', {'icao': 'DEF456', 'altitude': 5000}, ts=105.0)
+        writer.record('sensor', {'type': 'sensor', 'model': 'Acurite', 'id': 42, 'temperature_C': 21.5}, ts=100.0)
+        writer.stop()
+
+        stats = writer.stats()
+        assert stats['written'] == 12
+        assert stats['batches'] == 1
+
+        events = writer.query('adsb', key='ABC123', since=105.0)
+        assert [e['altitude'] for e in events] == [1009, 1008, 1007, 1006, 1005]
+        assert events[0]['category'] == 'A3'
+        assert writer.query('sensor') == [
+            {'ts': 100.0, 'model': 'Acurite', 'device_id': 42, 'temperature_C': 21.5},
+        ]
+        with pytest.raises(ValueError):
+            writer.query('unknown')
+
+    def test_overflow_drops_oldest(self, tmp_path):
+        """Test a full buffer drops old events instead of blocking."""
+        writer = HistoryWriter(str(tmp_path / 'history.db'), retention_hours=0, flush_interval=60, max_pending=3)
+        writer.start()
+        writer._stop.set()  # keep the writer from draining before the buffer fills
+        for i in range(5):
+            writer.record('pager', {'address': str(i)}, ts=float(i))
+        writer.stop()
+
+        assert writer.dropped == 2
+        assert [e['address'] for e in writer.query('pager')] == ['4', '3', '2']
+
+    def test_retention(self, tmp_path):
+        """Test rows older than the retention period are pruned."""
+        writer = HistoryWriter(str(tmp_path / 'history.db'), retention_hours=1, flush_interval=60)
+        writer.start()
+        now = time.time()
+        writer.record('bluetooth', {'mac': 'AA:BB:CC:DD:EE:FF'}, ts=now)
+        writer.record('bluetooth', {'mac': '11:22:33:44:55:66'}, ts=now + 7200)
+        writer.stop()
+        assert len(writer.query('bluetooth')) == 2
+
+        assert writer.prune(now=now + 7200) == 1
+        assert [e['mac'] for e in writer.query('bluetooth')] == ['11:22:33:44:55:66']
+
+
+class TestPagerSearch:
+    """Tests for full-text search over stored pager messages."""
+
+    MESSAGES = [
+        ('1234567', 'FIRE CALL 12 HIGH STREET'),
+        ('1234567', 'Ambulance required, high priority'),
+        ('7654321', 'Highway closed due to fire'),
+        ('7654321', 'TEST PAGE please ignore'),
+        ('1234567', 'street lights out'),
+    ]
+    # Recent enough that the writer's own periodic prune keeps them
+    START = float(int(time.time()))
+
+    def make_writer(self, tmp_path, **kwargs):
+        writer = HistoryWriter(str(tmp_path / 'history.db'), flush_interval=60, **kwargs)
+        writer.start()
+        for i, (address, message) in enumerate(self.MESSAGES):
+            writer.record('pager', {'type': 'message', 'protocol': 'POCSAG1200', 'address': address,
+                                    'message': message}, ts=self.START + i)
+        writer.stop()
+        return writer
+
+    def search(self, writer, **kwargs):
+        events, _ = writer.search('pager', **kwargs)
+        return [e['message'] for e in events]
+
+    def test_build_match_query(self):
+        """Test terms are quoted so FTS5 syntax in the input is literal."""
+        assert build_match_query('fire "high street" amb*') == '"fire" "high street" "amb"*'
+        assert build_match_query('a-b OR NEAR(') == '"a-b" "OR" "NEAR("'
+        with pytest.raises(ValueError):
+            build_match_query('  "" * ')
+
+    def test_phrase_prefix_address(self, tmp_path):
+        """Test word, phrase, prefix and address filters."""
+        writer = self.make_writer(tmp_path)
+        assert self.search(writer, text='fire') == ['Highway closed due to fire', 'FIRE CALL 12 HIGH STREET']
+        assert self.search(writer, text='"high street"') == ['FIRE CALL 12 HIGH STREET']
+        assert self.search(writer, text='high*') == [
+            'Highway closed due to fire', 'Ambulance required, high priority', 'FIRE CALL 12 HIGH STREET']
+        assert self.search(writer, text='street', key='1234567') == [
+            'street lights out', 'FIRE CALL 12 HIGH STREET']
+        assert len(self.search(writer, key='7654321')) == 2
+        assert self.search(writer, text='nothing') == []
+
+    def test_time_range_and_pages(self, tmp_path):
+        """Test time filters and cursor pagination."""
+        writer = self.make_writer(tmp_path)
+        assert self.search(writer, since=self.START + 1, until=self.START + 3) == [
+            'Highway closed due to fire', 'Ambulance required, high priority']
+        assert self.search(writer, text='fire', since=self.START + 1) == ['Highway closed due to fire']
+        assert self.search(writer, since=self.START + 1000) == []
+
+        pages = []
+        cursor = None
+        while True:
+            events, cursor = writer.search('pager', before=cursor, limit=2)
+            pages.append([e['message'] for e in events])
+            if cursor is None:
+                break
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert pages[0][0] == 'street lights out'
+
+    def test_pruned_rows_leave_index(self, tmp_path):
+        """Test pager rows use their own retention and pruning updates the index."""
+        writer = self.make_writer(tmp_path, retention_hours=1, mode_retention_hours={'pager': 2})
+        assert writer.prune(now=self.START + 2.5 + 3600) == 0
+        assert writer.prune(now=self.START + 2.5 + 7200) == 3
+        assert self.search(writer, text='fire') == []
+        assert self.search(writer, text='street') == ['street lights out']
+
+    def test_existing_rows_indexed(self, tmp_path):
+        """Test a database from before full-text search is indexed on start."""
+        path = str(tmp_path / 'history.db')
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE pager (ts REAL NOT NULL, protocol, address, function, msg_type, message, data TEXT)")
+        conn.execute("INSERT INTO pager (ts, address, message) VALUES (1.0, '42', 'old page')")
+        conn.commit()
+        conn.close()
+
+        writer = HistoryWriter(path, retention_hours=0)
+        writer.start()
+        writer.stop()
+        assert self.search(writer, text='old') == ['old page']
+
+
+class TestMessageLog:
+    """Tests for the buffered message log sink."""
+
+    def test_buffered_until_flush(self, tmp_path):
+        """Test messages reach the file on flush, through one long-lived handle."""
+        path = tmp_path / 'pager.log'
+        log = MessageLog(str(path), flush_interval=60)
+        log.write('pager', {'protocol': 'POCSAG1200', 'address': '1234'}, 'POCSAG1200 | 1234 | hello')
+        log.write('pager', {'protocol': 'POCSAG1200', 'address': '5678'})
+        assert not path.exists()
+
+        log.flush()
+        lines = path.read_text().splitlines()
+        assert lines[0].endswith(' | POCSAG1200 | 1234 | hello')
+        assert lines[1].endswith(' | POCSAG1200 | 5678')
+        log.close()
+        assert log.stats()['flushes'] == 1
+
+    def test_jsonl_format(self, tmp_path):
+        """Test JSONL records keep the decoder fields."""
+        path = tmp_path / 'sensor.jsonl'
+        log = MessageLog(str(path), log_format='jsonl')
+        log.write('sensor', {'model': 'Acurite', 'temperature_C': 21.5})
+        log.close()
+
+        record = json.loads(path.read_text())
+        assert record['source'] == 'sensor'
+        assert record['temperature_C'] == 21.5
+        assert 'timestamp' in record
+        with pytest.raises(ValueError):
+            log.set_format('xml')
+
+    def test_size_rotation(self, tmp_path):
+        """Test full files are rotated, gzipped and pruned to the backup count."""
+        path = tmp_path / 'pager.log'
+        log = MessageLog(str(path), max_bytes=100, backups=2, flush_interval=60)
+        for i in range(4):
+            log.write('pager', {}, 'x' * 120)
+            log.flush()
+        log.close()
+
+        rotated = sorted(tmp_path.glob('pager.*.log.gz'))
+        assert log.rotations == 3
+        assert len(rotated) == 2
+        with gzip.open(rotated[0], 'rt') as f:
+            assert f.read().endswith('x' * 120 + '\n')
+        assert path.read_text().count('\n') == 1
+
+    def test_set_path(self, tmp_path):
+        """Test switching files flushes pending messages to the old one."""
+        log = MessageLog(str(tmp_path / 'a.log'), flush_interval=60)
+        log.write('pager', {}, 'first')
+        log.set_path(str(tmp_path / 'b.log'))
+        log.write('pager', {}, 'second')
+        log.close()
+
+        assert (tmp_path / 'a.log').read_text().endswith('first\n')
+        assert (tmp_path / 'b.log').read_text().endswith('second\n')
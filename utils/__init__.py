@@ -38,5 +38,16 @@ from .validation import (
     sanitize_ssid,
     sanitize_device_name,
 )
-from .sse import sse_stream, format_sse, clear_queue
+from .sse import (
+    sse_stream,
+    format_sse,
+    clear_queue,
+    BroadcastHub,
+    SSESubscriber,
+    message_key,
+    merge_update,
+    negotiate_stream,
+    DROP_OLDEST,
+    COALESCE,
+)
 from .cleanup import DataStore, CleanupManager, cleanup_manager, cleanup_dict
@@ -0,0 +1,36 @@
+"""
+ADS-B decoding and aircraft state.
+
+SBSParser reads the dump1090 text feed (port 30003) and BeastParser the
+binary feed (port 30005). Both yield (icao, updates) pairs, which are
+merged into an AircraftStore, optionally enriched from an AircraftDatabase.
+
+Example usage:
+    from utils.adsb import AircraftStore, SBSParser
+
+    aircraft = AircraftStore(max_age_seconds=300)
+    parser = SBSParser()
+    while parser.recv_from(sock):
+        for icao, updates in parser.messages():
+            aircraft.apply(icao, updates)
+"""
+
+from __future__ import annotations
+
+from .aggregator import ReceiverAggregator, ReceiverSource
+from .aircraft_db import AircraftDatabase, build_aircraft_db, open_aircraft_db
+from .beast import BeastFrame, BeastParser, encode_beast_frame
+from .modes import (
+    ModeSDecoder,
+    cpr_global,
+    cpr_local,
+    crc24,
+    crc_syndrome,
+    decode_ac12,
+    decode_ac13,
+    decode_id13,
+)
+from .sbs import SBSParser, parse_sbs_fields
+from .spatial import BBox, SpatialGrid, bbox_filter, distance_nm, parse_bbox
+from .store import Aircraft, AircraftStore
+from .tracks import NUMPY_AVAILABLE, TrackHistory, simplify_track, track_to_list
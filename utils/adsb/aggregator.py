@@ -0,0 +1,181 @@
+"""
+Multi-receiver ADS-B aggregation.
+
+Several dump1090/readsb receivers on one site hear the same transmissions.
+ReceiverAggregator sits between the per-source parsers and the aircraft
+table: the first copy of a message accepted from any receiver is applied,
+copies of it arriving from other receivers within the de-duplication
+window are dropped, and every source keeps its own message rate and
+coverage counters.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+# Aircraft not heard by a source for this long no longer count towards its coverage
+COVERAGE_WINDOW = 300.0
+
+# Whole seconds the per-source message rate is averaged over
+RATE_WINDOW = 10
+
+# Attributes measured by each receiver (not part of the transmission itself)
+_PER_RECEIVER = frozenset({'rssi', 'mlat_time'})
+
+
+class ReceiverSource:
+    """Connection details and counters for one receiver feed."""
+
+    __slots__ = (
+        'name', 'host', 'port', 'feed_format', 'connected',
+        'messages', 'unique', 'duplicates', 'aircraft',
+        '_rate_seconds', '_rate_counts',
+    )
+
+    def __init__(self, name: str, host: str, port: int, feed_format: str = 'sbs'):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.feed_format = feed_format
+        self.connected = False
+        self.messages = 0
+        self.unique = 0
+        self.duplicates = 0
+        self.aircraft: dict[str, float] = {}  # ICAO -> last heard by this source
+        # Messages per whole second, in a ring of RATE_WINDOW slots
+        self._rate_seconds = [-1] * RATE_WINDOW
+        self._rate_counts = [0] * RATE_WINDOW
+
+    @property
+    def address(self) -> str:
+        return f'{self.host}:{self.port}'
+
+    def count_message(self, now: float) -> None:
+        self.messages += 1
+        second = int(now)
+        slot = second % RATE_WINDOW
+        if self._rate_seconds[slot] != second:
+            self._rate_seconds[slot] = second
+            self._rate_counts[slot] = 0
+        self._rate_counts[slot] += 1
+
+    def rate(self, now: float) -> float:
+        """Messages per second over the last RATE_WINDOW complete seconds."""
+        current = int(now)
+        total = sum(count for second, count in zip(self._rate_seconds, self._rate_counts)
+                    if current - RATE_WINDOW <= second < current)
+        return total / RATE_WINDOW
+
+
+class ReceiverAggregator:
+    """Merges messages from several receivers, suppressing cross-receiver duplicates."""
+
+    def __init__(self, dedup_window: float = 1.0):
+        """
+        Initialize aggregator.
+
+        Args:
+            dedup_window: Seconds within which the same message from another
+                receiver is treated as a duplicate
+        """
+        self.dedup_window = dedup_window
+        self.sources: dict[str, ReceiverSource] = {}
+        self._lock = threading.Lock()
+        # Two generations of message keys: entries live between one and two windows
+        self._current: dict[tuple, str] = {}
+        self._previous: dict[tuple, str] = {}
+        self._rotated = 0.0
+
+    def add_source(self, name: str, host: str, port: int, feed_format: str = 'sbs') -> ReceiverSource:
+        """Register a receiver feed."""
+        source = ReceiverSource(name, host, port, feed_format)
+        with self._lock:
+            self.sources[name] = source
+        return source
+
+    def clear(self) -> None:
+        """Forget all sources and recent messages."""
+        with self._lock:
+            self.sources = {}
+            self._current = {}
+            self._previous = {}
+
+    def accept(self, source: ReceiverSource, icao: str, updates: dict[str, Any], now: float) -> bool:
+        """
+        Record a decoded message and decide whether to apply it.
+
+        Args:
+            source: Receiver the message came from
+            icao: Aircraft address
+            updates: Decoded attributes
+            now: Receive time
+
+        Returns:
+            False if another receiver already delivered this message within
+            the de-duplication window
+        """
+        key = (icao, tuple(item for item in updates.items() if item[0] not in _PER_RECEIVER))
+        source.count_message(now)
+        source.aircraft[icao] = now
+
+        with self._lock:
+            if now - self._rotated >= self.dedup_window:
+                self._previous = self._current
+                self._current = {}
+                self._rotated = now
+
+            first = self._current.get(key) or self._previous.get(key)
+            if first is not None and first != source.name:
+                source.duplicates += 1
+                return False
+            self._current[key] = source.name
+
+        source.unique += 1
+        return True
+
+    @property
+    def connected(self) -> bool:
+        return any(source.connected for source in self.sources.values())
+
+    def status(self, now: float | None = None) -> list[dict[str, Any]]:
+        """
+        Per-source rates and coverage contribution.
+
+        Returns:
+            List of dicts with message counts, msgs/s over the last RATE_WINDOW seconds,
+            the share of accepted messages the source delivered first, the
+            number of aircraft it heard recently and how many of those no
+            other source heard
+        """
+        if now is None:
+            now = time.time()
+
+        sources = list(self.sources.values())
+        heard_by: dict[str, int] = {}
+        for source in sources:
+            for icao, seen in list(source.aircraft.items()):
+                if now - seen > COVERAGE_WINDOW:
+                    source.aircraft.pop(icao, None)
+                else:
+                    heard_by[icao] = heard_by.get(icao, 0) + 1
+
+        total_unique = sum(source.unique for source in sources) or 1
+        result = []
+        for source in sources:
+            aircraft = list(source.aircraft)
+            result.append({
+                'name': source.name,
+                'address': source.address,
+                'format': source.feed_format,
+                'connected': source.connected,
+                'messages': source.messages,
+                'unique_messages': source.unique,
+                'duplicates': source.duplicates,
+                'messages_per_second': round(source.rate(now), 1),
+                'unique_share': round(100.0 * source.unique / total_unique, 1),
+                'aircraft': len(aircraft),
+                'exclusive_aircraft': sum(1 for icao in aircraft if heard_by.get(icao) == 1),
+            })
+        return result
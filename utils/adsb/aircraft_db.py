@@ -0,0 +1,278 @@
+"""
+Aircraft registration database.
+
+Maps ICAO 24-bit addresses to registration, type code, model and operator.
+build_aircraft_db() converts a local CSV export (OpenSky aircraftDatabase,
+tar1090/ADSBExchange style and similar column names are recognised) into a
+sorted binary file once; AircraftDatabase then opens that file with mmap
+and binary-searches the index, so a database of a few hundred thousand
+aircraft costs almost no memory or startup time. A small LRU sits in front
+because the same aircraft are looked up again whenever they reappear.
+
+File layout (little endian):
+
+    header:  b'ICAODB01' <uint32 count> <uint32 index offset>
+    records: registration \\t type \\t model \\t operator \\n   (UTF-8)
+    index:   count x <uint32 icao> <uint32 record offset>, sorted by icao
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Iterator
+
+logger = logging.getLogger('intercept.adsb')
+
+DB_MAGIC = b'ICAODB01'
+_HEADER = struct.Struct('<8sII')
+_ENTRY = struct.Struct('<II')
+
+# Keys of a lookup result, in record order
+DB_FIELDS = ('registration', 'type_code', 'model', 'operator')
+
+# Accepted CSV column names for each field (first match wins)
+_COLUMNS = {
+    'icao': ('icao24', 'icao', 'hex', 'icao_hex', 'modes', 'mode_s'),
+    'registration': ('registration', 'reg', 'r', 'regid'),
+    'type_code': ('typecode', 'type_code', 'icaotype', 'icao_type', 'type', 't'),
+    'model': ('model', 'desc', 'description', 'manufacturer_model'),
+    'operator': ('operator', 'owner', 'ownop', 'operatoricao', 'airline'),
+}
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace', newline='')
+    return open(path, 'r', encoding='utf-8', errors='replace', newline='')
+
+
+def _clean(value: str | None) -> str:
+    """Strip quoting leftovers and the record separators from one field."""
+    if not value:
+        return ''
+    return value.strip().strip("'").replace('\t', ' ').replace('\n', ' ').replace('\r', ' ')
+
+
+def read_csv_rows(path: str) -> Iterator[tuple[int, tuple[str, ...]]]:
+    """
+    Stream (icao, (registration, type_code, model, operator)) from a CSV export.
+
+    Rows without a valid ICAO address or without any known attribute are
+    skipped.
+
+    Raises:
+        ValueError: If the CSV has no recognisable ICAO column
+    """
+    with _open_text(path) as f:
+        reader = csv.reader(f)
+        header = [name.strip().strip("'").lower() for name in next(reader, [])]
+        positions: dict[str, int | None] = {}
+        for field, names in _COLUMNS.items():
+            positions[field] = next((header.index(name) for name in names if name in header), None)
+        icao_col = positions.pop('icao')
+        if icao_col is None:
+            raise ValueError(f'{path}: no ICAO address column in CSV header')
+        columns = [positions[field] for field in DB_FIELDS]
+
+        for row in reader:
+            if len(row) <= icao_col:
+                continue
+            try:
+                icao = int(_clean(row[icao_col]), 16)
+            except ValueError:
+                continue
+            if not 0 < icao <= 0xFFFFFF:
+                continue
+            values = tuple(_clean(row[col]) if col is not None and col < len(row) else ''
+                           for col in columns)
+            if any(values):
+                yield icao, values
+
+
+def build_aircraft_db(source: str, path: str) -> int:
+    """
+    Convert a CSV export (optionally .gz) into the binary database.
+
+    Records are written as the CSV is read; only (icao, offset) pairs are
+    held in memory for sorting. Later rows win for duplicate addresses.
+
+    Args:
+        source: CSV file to import
+        path: Database file to write (replaced atomically)
+
+    Returns:
+        Number of aircraft in the database
+
+    Raises:
+        ValueError: If the CSV has no recognisable ICAO column
+    """
+    icaos = array('I')
+    offsets = array('I')
+    tmp_path = path + '.tmp'
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(_HEADER.pack(DB_MAGIC, 0, 0))
+            offset = _HEADER.size
+            for icao, values in read_csv_rows(source):
+                record = '\t'.join(values).encode('utf-8') + b'\n'
+                icaos.append(icao)
+                offsets.append(offset)
+                out.write(record)
+                offset += len(record)
+
+            # Stable sort keeps file order among duplicates; keep the last one
+            order = sorted(range(len(icaos)), key=icaos.__getitem__)
+            index = bytearray()
+            count = 0
+            for n, i in enumerate(order):
+                if n + 1 < len(order) and icaos[order[n + 1]] == icaos[i]:
+                    continue
+                index += _ENTRY.pack(icaos[i], offsets[i])
+                count += 1
+            out.write(index)
+            out.seek(0)
+            out.write(_HEADER.pack(DB_MAGIC, count, offset))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info(f"Imported {count} aircraft from {source} into {path}")
+    return count
+
+
+class _IndexKeys:
+    """Read-only sequence view of the ICAO column of the index, for bisect."""
+
+    __slots__ = ('_buf', '_start', '_count')
+
+    def __init__(self, buf: mmap.mmap, start: int, count: int):
+        self._buf = buf
+        self._start = start
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> int:
+        return _ENTRY.unpack_from(self._buf, self._start + i * _ENTRY.size)[0]
+
+
+class AircraftDatabase:
+    """Read-only ICAO address lookup over a file written by build_aircraft_db()."""
+
+    def __init__(self, path: str, cache_size: int = 4096):
+        """
+        Open and map a database file.
+
+        Args:
+            path: Database file
+            cache_size: Lookups kept in the LRU (hits and misses)
+
+        Raises:
+            ValueError: If the file is not an aircraft database
+            OSError: If it can't be opened
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[int, dict[str, str] | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f'{path} is not an aircraft database')
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, index_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != DB_MAGIC or index_offset + count * _ENTRY.size > size:
+            self._mm.close()
+            raise ValueError(f'{path} is not an aircraft database')
+        self._index_offset = index_offset
+        self._keys = _IndexKeys(self._mm, index_offset, count)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _find(self, icao: int) -> dict[str, str] | None:
+        keys = self._keys
+        i = bisect_left(keys, icao)
+        if i == len(keys) or keys[i] != icao:
+            return None
+        offset = _ENTRY.unpack_from(self._mm, self._index_offset + i * _ENTRY.size)[1]
+        end = self._mm.find(b'\n', offset, self._index_offset)
+        values = self._mm[offset:end].decode('utf-8').split('\t')
+        return {field: value for field, value in zip(DB_FIELDS, values) if value}
+
+    def lookup(self, icao: str) -> dict[str, str] | None:
+        """
+        Registration details for an ICAO hex address.
+
+        Returns:
+            Dict with the known DB_FIELDS (shared between callers, don't
+            modify it), or None if the aircraft isn't in the database
+        """
+        try:
+            key = int(icao, 16)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            cache = self._cache
+            if key in cache:
+                cache.move_to_end(key)
+                self.hits += 1
+                return cache[key]
+            self.misses += 1
+            if self._mm.closed:
+                return None
+            result = self._find(key)
+            cache[key] = result
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+            return result
+
+    def __contains__(self, icao: str) -> bool:
+        return self.lookup(icao) is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            if not self._mm.closed:
+                self._mm.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'path': self.path,
+            'aircraft': len(self),
+            'cached': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+def open_aircraft_db(path: str, cache_size: int = 4096) -> AircraftDatabase | None:
+    """Open the database if the file exists, logging (not raising) on a bad file."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        database = AircraftDatabase(path, cache_size)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Aircraft database unavailable: {e}")
+        return None
+    logger.info(f"Aircraft database: {len(database)} aircraft from {path}")
+    return database
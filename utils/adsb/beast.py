@@ -0,0 +1,230 @@
+"""
+Beast binary feed decoder.
+
+dump1090 and readsb publish raw Mode S frames on port 30005:
+
+    <0x1a> <type> <6 byte 12 MHz MLAT timestamp> <1 byte signal> <message>
+
+Type '1' carries a 2 byte Mode A/C reply, '2' a 7 byte and '3' a 14 byte
+Mode S message. Any 0x1a byte after the type is escaped by doubling it.
+BeastParser shares the recv_from()/feed()/messages() interface of
+SBSParser, so parse_sbs_stream can use either.
+"""
+
+from __future__ import annotations
+
+import math
+import socket
+import time
+from typing import Any, Iterator, NamedTuple
+
+from .modes import ModeSDecoder
+
+_ESCAPE = 0x1A
+
+# Payload length after the type byte (timestamp + signal + message)
+_FRAME_LENGTHS = {
+    0x31: 6 + 1 + 2,    # '1' Mode A/C
+    0x32: 6 + 1 + 7,    # '2' Mode S short
+    0x33: 6 + 1 + 14,   # '3' Mode S long
+}
+
+
+class BeastFrame(NamedTuple):
+    """A single unescaped Beast frame."""
+
+    frame_type: int     # 0x31, 0x32 or 0x33
+    timestamp: int      # 12 MHz MLAT counter
+    signal: int         # Raw signal level 0-255
+    message: bytes
+
+    @property
+    def rssi(self) -> float:
+        """Signal level in dBFS."""
+        return round(20 * math.log10(max(self.signal, 1) / 255), 1)
+
+
+class BeastParser:
+    """Incremental parser for the Beast binary feed."""
+
+    def __init__(self, bufsize: int = 256 * 1024, decoder: ModeSDecoder | None = None):
+        """
+        Initialize parser.
+
+        Args:
+            bufsize: Receive buffer size
+            decoder: Mode S decoder to use (shared decoders share CPR state)
+        """
+        self._buf = bytearray(bufsize)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self.decoder = decoder or ModeSDecoder()
+        self.frames_parsed = 0
+        self.messages_parsed = 0
+
+    def _make_room(self) -> None:
+        """Slide unparsed bytes to the front of the buffer."""
+        pending = self._end - self._start
+        if self._start:
+            self._buf[:pending] = self._buf[self._start:self._end]
+            self._start = 0
+            self._end = pending
+        if self._end == len(self._buf):
+            self._start = self._end = 0
+
+    def recv_from(self, sock: socket.socket) -> int:
+        """
+        Receive directly into the parse buffer.
+
+        Returns:
+            Number of bytes received (0 when the peer closed the connection)
+
+        Raises:
+            socket.timeout: If the socket timed out
+        """
+        if self._end == len(self._buf):
+            self._make_room()
+        received = sock.recv_into(self._view[self._end:])
+        self._end += received
+        return received
+
+    def _append(self, data: bytes | memoryview) -> memoryview:
+        """Copy as much of data as fits, returning the remainder."""
+        view = memoryview(data)
+        if self._end == len(self._buf):
+            self._make_room()
+        chunk = min(len(view), len(self._buf) - self._end)
+        self._buf[self._end:self._end + chunk] = view[:chunk]
+        self._end += chunk
+        return view[chunk:]
+
+    def feed_frames(self, data: bytes) -> Iterator[BeastFrame]:
+        """Append raw bytes and parse frames from them."""
+        view = memoryview(data)
+        while view:
+            view = self._append(view)
+            yield from self.frames()
+
+    def feed(self, data: bytes) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Append raw bytes (for files, replay and tests) and decode them.
+
+        Yields:
+            Same as messages()
+        """
+        view = memoryview(data)
+        while view:
+            view = self._append(view)
+            yield from self.messages()
+
+    def frames(self) -> Iterator[BeastFrame]:
+        """
+        Parse all complete frames in the buffer.
+
+        Yields:
+            BeastFrame for each Mode A/C and Mode S frame
+        """
+        buf = self._buf
+        end = self._end
+        pos = self._start
+
+        while True:
+            start = buf.find(_ESCAPE, pos, end)
+            if start < 0:
+                pos = end
+                break
+            if start + 1 >= end:
+                pos = start
+                break
+
+            frame_type = buf[start + 1]
+            length = _FRAME_LENGTHS.get(frame_type)
+            if length is None:
+                # Escaped 0x1a inside a frame we lost sync on, or a status frame
+                pos = start + 1
+                continue
+
+            body_start = start + 2
+            raw = buf[body_start:body_start + length]
+            if _ESCAPE not in raw:
+                if body_start + length > end:
+                    pos = start
+                    break
+                payload = bytes(raw)
+                pos = body_start + length
+            else:
+                payload, pos = self._unescape(body_start, length, end)
+                if payload is None:
+                    pos = start
+                    break
+                if not payload:
+                    # Unescaped 0x1a marks the start of the next frame
+                    continue
+
+            self.frames_parsed += 1
+            yield BeastFrame(
+                frame_type,
+                int.from_bytes(payload[:6], 'big'),
+                payload[6],
+                payload[7:],
+            )
+
+        self._start = pos
+        if pos >= end:
+            self._start = self._end = 0
+
+    def _unescape(self, pos: int, length: int, end: int) -> tuple[bytes | None, int]:
+        """
+        Read length payload bytes starting at pos, collapsing doubled 0x1a.
+
+        Returns:
+            (payload, next position). payload is None if the frame is incomplete
+            and empty if the frame was truncated by the start of another frame.
+        """
+        buf = self._buf
+        out = bytearray()
+        while len(out) < length:
+            if pos >= end:
+                return None, pos
+            byte = buf[pos]
+            if byte == _ESCAPE:
+                if pos + 1 >= end:
+                    return None, pos
+                if buf[pos + 1] != _ESCAPE:
+                    return b'', pos
+                pos += 1
+            out.append(byte)
+            pos += 1
+        return bytes(out), pos
+
+    def messages(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Decode all complete Mode S frames in the buffer.
+
+        Yields:
+            (ICAO hex, attribute updates) for every message that passed the
+            CRC check. Updates include the per-message signal level as 'rssi'
+            and, if the receiver sets it, the 12 MHz MLAT counter as 'mlat_time'.
+        """
+        now = time.time()
+        decode = self.decoder.decode
+        for frame in self.frames():
+            if frame.frame_type == 0x31:
+                continue
+            result = decode(frame.message, now)
+            if result is None:
+                continue
+            self.messages_parsed += 1
+            icao, updates = result
+            updates['rssi'] = frame.rssi
+            if frame.timestamp:
+                updates['mlat_time'] = frame.timestamp
+            yield icao, updates
+
+
+def encode_beast_frame(message: bytes, timestamp: int = 0, signal: int = 0) -> bytes:
+    """Build an escaped Beast frame for a Mode S message (recordings and tests)."""
+    frame_type = 0x33 if len(message) == 14 else 0x32
+    body = timestamp.to_bytes(6, 'big') + bytes([signal]) + message
+    return bytes([_ESCAPE, frame_type]) + body.replace(b'\x1a', b'\x1a\x1a')
@@ -0,0 +1,229 @@
+"""
+Raw ADS-B feed recording and replay.
+
+A capture file holds the bytes read from a port 30003 (SBS) or 30005
+(Beast) socket, exactly as received, with the receive time of every chunk:
+
+    INTERCEPT-CAPTURE 1 <sbs|beast>\\n
+    repeated: <float64 receive time> <uint32 length> <length raw bytes>
+
+Replaying a capture at 1x, Nx or as fast as possible either serves it on a
+local TCP port (so the normal ingest path, dump1090 style, can connect to
+it) or feeds the chunks straight to a parser.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import BinaryIO, Iterator
+
+logger = logging.getLogger('intercept.adsb')
+
+CAPTURE_MAGIC = b'INTERCEPT-CAPTURE 1 '
+_RECORD = struct.Struct('<dI')
+
+
+def capture_path(directory: str, feed_format: str, name: str = 'adsb', now: float | None = None) -> str:
+    """Timestamped capture file name, e.g. recordings/adsb_beast_20240101_120000.cap."""
+    stamp = datetime.fromtimestamp(time.time() if now is None else now).strftime('%Y%m%d_%H%M%S')
+    return os.path.join(directory, f'{name}_{feed_format}_{stamp}.cap')
+
+
+class CaptureWriter:
+    """Appends timestamped raw feed chunks to a capture file."""
+
+    def __init__(self, path: str, feed_format: str = 'sbs'):
+        """
+        Create a capture file (and its directory).
+
+        Args:
+            path: File to write
+            feed_format: 'sbs' or 'beast', stored in the header for replay
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.feed_format = feed_format
+        self.bytes_written = 0
+        self.chunks = 0
+        with contextlib.ExitStack() as stack:
+            self._file: BinaryIO | None = stack.enter_context(open(path, 'wb'))
+            self._file.write(CAPTURE_MAGIC + feed_format.encode('ascii') + b'\n')
+            # Kept open until close()
+            stack.pop_all()
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes, now: float | None = None) -> None:
+        """Record one chunk as received from the socket."""
+        if not data:
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(time.time() if now is None else now, len(data)))
+            self._file.write(data)
+            self.bytes_written += len(data)
+            self.chunks += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> CaptureWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CaptureReader:
+    """Reads a capture file back as (receive time, bytes) chunks."""
+
+    def __init__(self, path: str):
+        """
+        Open a capture file.
+
+        Raises:
+            ValueError: If the file is not a capture
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.readline(64)
+        if not header.startswith(CAPTURE_MAGIC) or not header.endswith(b'\n'):
+            raise ValueError(f'{path} is not an ADS-B capture file')
+        self.feed_format = header[len(CAPTURE_MAGIC):-1].decode('ascii')
+        if self.feed_format not in ('sbs', 'beast'):
+            raise ValueError(f'Unknown capture format: {self.feed_format}')
+        self._data_start = len(header)
+
+    def __iter__(self) -> Iterator[tuple[float, bytes]]:
+        with open(self.path, 'rb') as f:
+            f.seek(self._data_start)
+            while True:
+                head = f.read(_RECORD.size)
+                if len(head) < _RECORD.size:
+                    return
+                timestamp, length = _RECORD.unpack(head)
+                data = f.read(length)
+                if len(data) < length:
+                    # Truncated final record (recording was interrupted)
+                    return
+                yield timestamp, data
+
+    def replay(self, speed: float = 1.0, stop: threading.Event | None = None) -> Iterator[bytes]:
+        """
+        Yield chunks paced by their recorded receive times.
+
+        Args:
+            speed: 1.0 for real time, N for N times faster, 0 for as fast as possible
+            stop: Optional event that ends the replay early
+        """
+        start_wall = time.monotonic()
+        first = None
+        for timestamp, data in self:
+            if stop is not None and stop.is_set():
+                return
+            if speed > 0:
+                if first is None:
+                    first = timestamp
+                delay = (timestamp - first) / speed - (time.monotonic() - start_wall)
+                if delay > 0:
+                    if stop is not None:
+                        if stop.wait(delay):
+                            return
+                    else:
+                        time.sleep(delay)
+            yield data
+
+
+class ReplayServer:
+    """Serves a capture on a local TCP port, like dump1090's 30003/30005 outputs."""
+
+    def __init__(self, path: str, host: str = '127.0.0.1', port: int = 0,
+                 speed: float = 1.0, loop: bool = False):
+        """
+        Initialize server.
+
+        Args:
+            path: Capture file to serve
+            host: Address to listen on
+            port: Port to listen on (0 picks a free one, see .port after start())
+            speed: Replay speed (see CaptureReader.replay)
+            loop: Start over at the end of the capture. Otherwise the server
+                stops listening once a client has received the whole capture,
+                so a reconnecting ingest doesn't replay it again.
+        """
+        self.reader = CaptureReader(path)
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.loop = loop
+        self.clients = 0
+        self.bytes_sent = 0
+        self.finished = False
+        self._stop = threading.Event()
+        self._sock: socket.socket | None = None
+
+    @property
+    def feed_format(self) -> str:
+        return self.reader.feed_format
+
+    def start(self) -> int:
+        """Bind, start accepting connections and return the listening port."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(4)
+        sock.settimeout(0.5)
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        logger.info(f"Replaying {self.reader.path} on {self.host}:{self.port} at {self.speed or 'max'}x")
+        return self.port
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @property
+    def running(self) -> bool:
+        return self._sock is not None and not self._stop.is_set()
+
+    def _accept_loop(self) -> None:
+        sock = self._sock
+        while not self._stop.is_set():
+            try:
+                client, _ = sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.clients += 1
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client: socket.socket) -> None:
+        try:
+            with client:
+                while not self._stop.is_set():
+                    for data in self.reader.replay(self.speed, self._stop):
+                        client.sendall(data)
+                        self.bytes_sent += len(data)
+                    if not self.loop:
+                        if not self._stop.is_set():
+                            self.finished = True
+                            self.stop()
+                        break
+        except OSError:
+            pass
@@ -0,0 +1,426 @@
+"""
+Mode S / ADS-B message decoder.
+
+Decodes raw 56 and 112 bit Mode S messages as delivered by the Beast feed:
+
+- CRC-24 check for every downlink format
+- DF11 all-call and DF17/18 extended squitter addresses
+- DF17/18 identification (callsign), airborne position (CPR global and
+  local decoding), airborne velocity and emergency squawk
+- DF4/20 altitude and DF5/21 squawk replies, whose address is recovered
+  from the CRC and only trusted for aircraft already seen
+
+Surface position and Comm-B (BDS) payloads are not decoded.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any
+
+# Mode S CRC-24 generator polynomial (without the leading x^24 term)
+_CRC_POLY = 0xFFF409
+
+_CALLSIGN_CHARS = '#ABCDEFGHIJKLMNOPQRSTUVWXYZ##### ###############0123456789######'
+
+# Even/odd CPR frames older than this are not paired for global decoding
+CPR_PAIR_MAX_AGE = 10.0
+
+# Aircraft position older than this is not used as a local decoding reference
+CPR_LOCAL_MAX_AGE = 60.0
+
+# Addresses recovered from the CRC are only accepted if the aircraft was
+# seen in an all-call or extended squitter this recently
+KNOWN_ICAO_MAX_AGE = 60.0
+
+# Seconds between sweeps of per-aircraft state for aircraft no longer heard
+STATE_PRUNE_INTERVAL = 60.0
+
+
+def _build_crc_table() -> list[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= _CRC_POLY
+        table.append(crc & 0xFFFFFF)
+    return table
+
+
+_CRC_TABLE = _build_crc_table()
+
+
+def crc24(data: bytes) -> int:
+    """Compute the Mode S CRC-24 over data."""
+    crc = 0
+    table = _CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ byte]
+    return crc
+
+
+def crc_syndrome(msg: bytes) -> int:
+    """
+    CRC of the message body XORed with its 24-bit parity field.
+
+    Zero for a valid DF11/17/18 message. For DF0/4/5/16/20/21 it is the
+    aircraft address (address/parity overlay).
+    """
+    return crc24(msg[:-3]) ^ int.from_bytes(msg[-3:], 'big')
+
+
+def decode_id13(field: int) -> str:
+    """Decode a 13-bit Mode A identity field to a 4 digit squawk."""
+    gillham = 0
+    if field & 0x1000:
+        gillham |= 0x0010  # C1
+    if field & 0x0800:
+        gillham |= 0x1000  # A1
+    if field & 0x0400:
+        gillham |= 0x0020  # C2
+    if field & 0x0200:
+        gillham |= 0x2000  # A2
+    if field & 0x0100:
+        gillham |= 0x0040  # C4
+    if field & 0x0080:
+        gillham |= 0x4000  # A4
+    if field & 0x0020:
+        gillham |= 0x0100  # B1
+    if field & 0x0010:
+        gillham |= 0x0001  # D1
+    if field & 0x0008:
+        gillham |= 0x0200  # B2
+    if field & 0x0004:
+        gillham |= 0x0002  # D2
+    if field & 0x0002:
+        gillham |= 0x0400  # B4
+    if field & 0x0001:
+        gillham |= 0x0004  # D4
+    return f'{gillham:04x}'
+
+
+def _gillham_to_altitude(squawk: str) -> int | None:
+    """Convert a Gillham coded Mode C reply (as squawk digits) to feet."""
+    mode_a = int(squawk, 16)
+    if mode_a & 0xFFFF8889 or not mode_a & 0x00F0:
+        return None
+
+    one_hundreds = 0
+    if mode_a & 0x0010:
+        one_hundreds ^= 0x007  # C1
+    if mode_a & 0x0020:
+        one_hundreds ^= 0x003  # C2
+    if mode_a & 0x0040:
+        one_hundreds ^= 0x001  # C4
+    if one_hundreds & 5 == 5:
+        one_hundreds ^= 2
+    if one_hundreds > 5:
+        return None
+
+    five_hundreds = 0
+    for bit, mask in ((0x0002, 0x0FF), (0x0004, 0x07F), (0x1000, 0x03F), (0x2000, 0x01F),
+                      (0x4000, 0x00F), (0x0100, 0x007), (0x0200, 0x003), (0x0400, 0x001)):
+        if mode_a & bit:
+            five_hundreds ^= mask
+    if five_hundreds & 1:
+        one_hundreds = 6 - one_hundreds
+
+    return (five_hundreds * 5 + one_hundreds - 13) * 100
+
+
+def decode_ac13(field: int) -> int | None:
+    """Decode a 13-bit altitude code (DF0/4/16/20) to feet."""
+    if field & 0x0040:
+        return None  # Metric altitude, not used in practice
+    if field & 0x0010:
+        n = ((field & 0x1F80) >> 2) | ((field & 0x0020) >> 1) | (field & 0x000F)
+        return n * 25 - 1000
+    if field == 0:
+        return None
+    return _gillham_to_altitude(decode_id13(field))
+
+
+def decode_ac12(field: int) -> int | None:
+    """Decode a 12-bit altitude code (extended squitter airborne position) to feet."""
+    if field & 0x0010:
+        n = ((field & 0x0FE0) >> 1) | (field & 0x000F)
+        return n * 25 - 1000
+    if field == 0:
+        return None
+    # Re-insert the M bit to reuse the 13-bit Gillham decoding
+    return _gillham_to_altitude(decode_id13(((field & 0x0FC0) << 1) | (field & 0x003F)))
+
+
+def cpr_nl(lat: float) -> int:
+    """Number of CPR longitude zones at a latitude."""
+    lat = abs(lat)
+    if lat == 0:
+        return 59
+    if lat == 87:
+        return 2
+    if lat > 87:
+        return 1
+    a = 1 - math.cos(math.pi / 30)
+    b = math.cos(math.pi / 180 * lat) ** 2
+    return int(math.floor(2 * math.pi / math.acos(1 - a / b)))
+
+
+def cpr_global(
+    even: tuple[float, float],
+    odd: tuple[float, float],
+    odd_is_newer: bool
+) -> tuple[float, float] | None:
+    """
+    Globally unambiguous airborne position from an even/odd CPR pair.
+
+    Args:
+        even: (lat_cpr, lon_cpr) of the even frame, normalised to [0, 1)
+        odd: (lat_cpr, lon_cpr) of the odd frame
+        odd_is_newer: Use the odd frame as the position reference
+
+    Returns:
+        (lat, lon) or None if the frames straddle a latitude zone boundary
+    """
+    lat_even_cpr, lon_even_cpr = even
+    lat_odd_cpr, lon_odd_cpr = odd
+
+    j = math.floor(59 * lat_even_cpr - 60 * lat_odd_cpr + 0.5)
+    lat_even = 360.0 / 60 * (j % 60 + lat_even_cpr)
+    lat_odd = 360.0 / 59 * (j % 59 + lat_odd_cpr)
+    if lat_even >= 270:
+        lat_even -= 360
+    if lat_odd >= 270:
+        lat_odd -= 360
+
+    nl = cpr_nl(lat_even)
+    if nl != cpr_nl(lat_odd):
+        return None
+
+    m = math.floor(lon_even_cpr * (nl - 1) - lon_odd_cpr * nl + 0.5)
+    if odd_is_newer:
+        lat, lon_cpr = lat_odd, lon_odd_cpr
+        ni = max(nl - 1, 1)
+    else:
+        lat, lon_cpr = lat_even, lon_even_cpr
+        ni = max(nl, 1)
+
+    lon = 360.0 / ni * (m % ni + lon_cpr)
+    if lon >= 180:
+        lon -= 360
+    return lat, lon
+
+
+def cpr_local(cpr: tuple[float, float], odd: bool, ref_lat: float, ref_lon: float) -> tuple[float, float]:
+    """
+    Airborne position from a single CPR frame near a reference position.
+
+    Only valid when the aircraft is within 180 NM of the reference.
+    """
+    lat_cpr, lon_cpr = cpr
+    dlat = 360.0 / (59 if odd else 60)
+    j = math.floor(ref_lat / dlat) + math.floor(0.5 + (ref_lat % dlat) / dlat - lat_cpr)
+    lat = dlat * (j + lat_cpr)
+
+    ni = cpr_nl(lat) - (1 if odd else 0)
+    dlon = 360.0 / ni if ni > 0 else 360.0
+    m = math.floor(ref_lon / dlon) + math.floor(0.5 + (ref_lon % dlon) / dlon - lon_cpr)
+    return lat, dlon * (m + lon_cpr)
+
+
+class _CPRState:
+    """Per-aircraft CPR frames and last decoded position."""
+
+    __slots__ = ('even', 'even_time', 'odd', 'odd_time', 'lat', 'lon', 'position_time')
+
+    def __init__(self):
+        self.even: tuple[float, float] | None = None
+        self.even_time = 0.0
+        self.odd: tuple[float, float] | None = None
+        self.odd_time = 0.0
+        self.lat = 0.0
+        self.lon = 0.0
+        self.position_time = 0.0
+
+
+class ModeSDecoder:
+    """Stateful Mode S decoder producing aircraft attribute updates."""
+
+    def __init__(self, reference: tuple[float, float] | None = None):
+        """
+        Initialize decoder.
+
+        Args:
+            reference: Optional receiver (lat, lon) used for local CPR decoding
+                before an even/odd pair has been received
+        """
+        self.reference = reference
+        self._known: dict[str, float] = {}
+        self._cpr: dict[str, _CPRState] = {}
+        self._next_prune = 0.0
+        self.crc_errors = 0
+        self.decoded = 0
+
+    def _is_known(self, icao: str, now: float) -> bool:
+        seen = self._known.get(icao)
+        return seen is not None and now - seen <= KNOWN_ICAO_MAX_AGE
+
+    def _mark_known(self, icao: str, now: float) -> None:
+        if now >= self._next_prune or len(self._known) > 50000:
+            self._prune(now)
+        self._known[icao] = now
+
+    def _prune(self, now: float) -> None:
+        """Forget addresses and CPR state of aircraft no longer heard."""
+        self._next_prune = now + STATE_PRUNE_INTERVAL
+        self._known = {k: t for k, t in self._known.items() if now - t <= KNOWN_ICAO_MAX_AGE}
+        # CPR state is only used for pairing and local decoding, both bounded by CPR_LOCAL_MAX_AGE
+        self._cpr = {
+            k: s for k, s in self._cpr.items()
+            if now - max(s.even_time, s.odd_time, s.position_time) <= CPR_LOCAL_MAX_AGE
+        }
+
+    def decode(self, msg: bytes, now: float | None = None) -> tuple[str, dict[str, Any]] | None:
+        """
+        Decode one Mode S message.
+
+        Args:
+            msg: 7 or 14 byte message
+            now: Receive time in seconds (defaults to time.time())
+
+        Returns:
+            (ICAO hex, attribute updates) or None if the message failed the
+            CRC check or carries nothing attributable to an aircraft
+        """
+        if len(msg) not in (7, 14):
+            return None
+        if now is None:
+            now = time.time()
+
+        df = msg[0] >> 3
+        if df > 24:
+            df = 24
+
+        if df in (17, 18):
+            if crc_syndrome(msg) != 0:
+                self.crc_errors += 1
+                return None
+            if df == 18 and msg[0] & 0x07 not in (0, 6):
+                return None
+            icao = msg[1:4].hex().upper()
+            self._mark_known(icao, now)
+            self.decoded += 1
+            return icao, self._decode_extended_squitter(icao, int.from_bytes(msg[4:11], 'big'), now)
+
+        if df == 11:
+            if crc_syndrome(msg) & 0xFFFF80:
+                self.crc_errors += 1
+                return None
+            icao = msg[1:4].hex().upper()
+            self._mark_known(icao, now)
+            self.decoded += 1
+            return icao, {}
+
+        if df in (0, 4, 5, 16, 20, 21):
+            icao = f'{crc_syndrome(msg):06X}'
+            if not self._is_known(icao, now):
+                return None
+            self._known[icao] = now
+            field = int.from_bytes(msg[:4], 'big') & 0x1FFF
+            updates: dict[str, Any] = {}
+            if df in (5, 21):
+                updates['squawk'] = decode_id13(field)
+            else:
+                altitude = decode_ac13(field)
+                if altitude is not None:
+                    updates['altitude'] = altitude
+            self.decoded += 1
+            return icao, updates
+
+        return None
+
+    def _decode_extended_squitter(self, icao: str, me: int, now: float) -> dict[str, Any]:
+        """Decode the 56-bit ME field of a DF17/18 message."""
+        tc = me >> 51
+
+        if 1 <= tc <= 4:
+            chars = ''.join(_CALLSIGN_CHARS[(me >> shift) & 0x3F] for shift in range(42, -1, -6))
+            callsign = chars.replace('#', '').strip()
+            return {'callsign': callsign} if callsign else {}
+
+        if 9 <= tc <= 18 or 20 <= tc <= 22:
+            return self._decode_airborne_position(icao, tc, me, now)
+
+        if tc == 19:
+            return self._decode_velocity(me)
+
+        if tc == 28 and (me >> 48) & 0x7 == 1:
+            squawk = decode_id13((me >> 32) & 0x1FFF)
+            return {'squawk': squawk} if squawk != '0000' else {}
+
+        return {}
+
+    def _decode_airborne_position(self, icao: str, tc: int, me: int, now: float) -> dict[str, Any]:
+        updates: dict[str, Any] = {}
+
+        if tc <= 18:
+            altitude = decode_ac12((me >> 36) & 0xFFF)
+            if altitude is not None:
+                updates['altitude'] = altitude
+
+        odd = bool((me >> 34) & 1)
+        cpr = (((me >> 17) & 0x1FFFF) / 131072.0, (me & 0x1FFFF) / 131072.0)
+
+        state = self._cpr.get(icao)
+        if state is None:
+            state = self._cpr[icao] = _CPRState()
+        if odd:
+            state.odd, state.odd_time = cpr, now
+        else:
+            state.even, state.even_time = cpr, now
+
+        position = None
+        if (state.even is not None and state.odd is not None
+                and abs(state.even_time - state.odd_time) <= CPR_PAIR_MAX_AGE):
+            position = cpr_global(state.even, state.odd, odd_is_newer=odd)
+        elif state.position_time and now - state.position_time <= CPR_LOCAL_MAX_AGE:
+            position = cpr_local(cpr, odd, state.lat, state.lon)
+        elif self.reference is not None:
+            position = cpr_local(cpr, odd, *self.reference)
+
+        if position is not None:
+            state.lat, state.lon = position
+            state.position_time = now
+            updates['lat'] = round(position[0], 5)
+            updates['lon'] = round(position[1], 5)
+
+        return updates
+
+    def _decode_velocity(self, me: int) -> dict[str, Any]:
+        subtype = (me >> 48) & 0x7
+        updates: dict[str, Any] = {}
+
+        if subtype in (1, 2):
+            v_ew = (me >> 32) & 0x3FF
+            v_ns = (me >> 21) & 0x3FF
+            if v_ew and v_ns:
+                scale = 4 if subtype == 2 else 1
+                vx = (v_ew - 1) * scale * (-1 if (me >> 42) & 1 else 1)
+                vy = (v_ns - 1) * scale * (-1 if (me >> 31) & 1 else 1)
+                updates['speed'] = int(round(math.hypot(vx, vy)))
+                updates['heading'] = int(math.degrees(math.atan2(vx, vy)) % 360)
+
+        elif subtype in (3, 4):
+            if (me >> 42) & 1:
+                updates['heading'] = int(((me >> 32) & 0x3FF) * 360 / 1024)
+            airspeed = (me >> 21) & 0x3FF
+            if airspeed:
+                updates['airspeed'] = (airspeed - 1) * (4 if subtype == 4 else 1)
+
+        vr = (me >> 10) & 0x1FF
+        if vr:
+            updates['vertical_rate'] = (vr - 1) * 64 * (-1 if (me >> 19) & 1 else 1)
+
+        return updates
@@ -0,0 +1,216 @@
+"""
+SBS-1 (BaseStation) feed decoder.
+
+dump1090 and readsb publish one comma separated line per Mode S message on
+port 30003:
+
+    MSG,3,1,1,4CA2D6,1,2024/01/01,12:00:00.000,2024/01/01,12:00:00.000,,35000,,,53.1,-2.3,,,0,0,0,0
+
+SBSParser works on a fixed bytearray filled with socket.recv_into() and
+walks it with a sliding offset, so a burst of traffic costs one copy per
+line instead of repeatedly re-slicing a growing string. Only the fields a
+given MSG type carries are converted.
+"""
+
+from __future__ import annotations
+
+import socket
+from typing import Any, Iterator
+
+# Number of splits needed to reach the last field each MSG type carries.
+# Other types only need the ICAO address and the 11 field minimum.
+_MAXSPLIT = {
+    1: 11,   # 10 callsign
+    3: 16,   # 11 altitude, 14 lat, 15 lon
+    4: 14,   # 12 ground speed, 13 track
+    5: 12,   # 10 callsign, 11 altitude
+    6: 18,   # 17 squawk
+}
+
+_MSG_PREFIX = b'MSG,'
+_NEWLINE = 0x0A
+_COMMA = 0x2C
+_DIGIT_ZERO = 0x30
+_ICAO_CACHE_SIZE = 65536
+
+
+def _to_int(value: bytes) -> int | None:
+    try:
+        return int(float(value))
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_sbs_fields(msg_type: int, fields: list[bytes]) -> dict[str, Any]:
+    """
+    Convert the fields of a split SBS line into aircraft attribute updates.
+
+    Args:
+        msg_type: SBS transmission type (1-8)
+        fields: Line split on commas
+
+    Returns:
+        Dict of aircraft attributes carried by this message (may be empty)
+    """
+    updates: dict[str, Any] = {}
+    count = len(fields)
+
+    if msg_type == 1 and count > 10:
+        callsign = fields[10].strip()
+        if callsign:
+            updates['callsign'] = callsign.decode('ascii', errors='ignore')
+
+    elif msg_type == 3 and count > 15:
+        if fields[11]:
+            altitude = _to_int(fields[11])
+            if altitude is not None:
+                updates['altitude'] = altitude
+        if fields[14] and fields[15]:
+            try:
+                lat = float(fields[14])
+                lon = float(fields[15])
+            except ValueError:
+                pass
+            else:
+                # Also rejects inf and nan
+                if -90 <= lat <= 90 and -180 <= lon <= 180:
+                    updates['lat'] = lat
+                    updates['lon'] = lon
+
+    elif msg_type == 4 and count > 13:
+        if fields[12]:
+            speed = _to_int(fields[12])
+            if speed is not None:
+                updates['speed'] = speed
+        if fields[13]:
+            heading = _to_int(fields[13])
+            if heading is not None:
+                updates['heading'] = heading
+
+    elif msg_type == 5 and count > 11:
+        callsign = fields[10].strip()
+        if callsign:
+            updates['callsign'] = callsign.decode('ascii', errors='ignore')
+        if fields[11]:
+            altitude = _to_int(fields[11])
+            if altitude is not None:
+                updates['altitude'] = altitude
+
+    elif msg_type == 6 and count > 17:
+        if fields[17]:
+            updates['squawk'] = fields[17].strip().decode('ascii', errors='ignore')
+
+    return updates
+
+
+class SBSParser:
+    """Incremental, bytes-level parser for the SBS-1 text feed."""
+
+    def __init__(self, bufsize: int = 256 * 1024):
+        """
+        Initialize parser.
+
+        Args:
+            bufsize: Receive buffer size. A line longer than this is discarded.
+        """
+        self._buf = bytearray(bufsize)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._icao_cache: dict[bytes, str] = {}
+        self.lines = 0
+        self.messages_parsed = 0
+
+    def _make_room(self) -> None:
+        """Slide unparsed bytes to the front of the buffer."""
+        if self._start == self._end:
+            self._start = self._end = 0
+            return
+        if self._start:
+            pending = self._end - self._start
+            self._buf[:pending] = self._buf[self._start:self._end]
+            self._start = 0
+            self._end = pending
+        if self._end == len(self._buf):
+            # A single line filled the buffer - it is not SBS, drop it
+            self._start = self._end = 0
+
+    def recv_from(self, sock: socket.socket) -> int:
+        """
+        Receive directly into the parse buffer.
+
+        Returns:
+            Number of bytes received (0 when the peer closed the connection)
+
+        Raises:
+            socket.timeout: If the socket timed out
+        """
+        if self._end == len(self._buf):
+            self._make_room()
+        received = sock.recv_into(self._view[self._end:])
+        self._end += received
+        return received
+
+    def feed(self, data: bytes) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Append raw bytes (for files, replay and tests) and parse them.
+
+        Yields:
+            Same as messages()
+        """
+        view = memoryview(data)
+        while view:
+            if self._end == len(self._buf):
+                self._make_room()
+            chunk = min(len(view), len(self._buf) - self._end)
+            self._buf[self._end:self._end + chunk] = view[:chunk]
+            self._end += chunk
+            view = view[chunk:]
+            yield from self.messages()
+
+    def messages(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Parse all complete lines in the buffer.
+
+        Yields:
+            (ICAO hex, attribute updates) for every MSG line with an ICAO address
+        """
+        last_newline = self._buf.rfind(_NEWLINE, self._start, self._end)
+        if last_newline < 0:
+            return
+
+        # One copy per read: split the complete lines in C, keep the partial tail
+        block = bytes(self._view[self._start:last_newline])
+        self._start = last_newline + 1
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        icao_cache = self._icao_cache
+        maxsplit = _MAXSPLIT.get
+        parse_fields = parse_sbs_fields
+        lines = block.split(b'\n')
+        self.lines += len(lines)
+
+        for line in lines:
+            # 'MSG,<single digit>,' (a truncated line or MSG,10 is not a message)
+            if len(line) <= 5 or line[5] != _COMMA or not line.startswith(_MSG_PREFIX):
+                continue
+            msg_type = line[4] - _DIGIT_ZERO
+            if not 0 <= msg_type <= 9:
+                continue
+            split = maxsplit(msg_type)
+            fields = line.split(b',', 10 if split is None else split)
+            if len(fields) < 11:
+                continue
+            raw_icao = fields[4]
+            if not raw_icao:
+                continue
+
+            icao = icao_cache.get(raw_icao)
+            if icao is None:
+                if len(icao_cache) >= _ICAO_CACHE_SIZE:
+                    icao_cache.clear()
+                icao = icao_cache[raw_icao] = raw_icao.upper().decode('ascii', errors='ignore')
+
+            self.messages_parsed += 1
+            yield icao, {} if split is None else parse_fields(msg_type, fields)
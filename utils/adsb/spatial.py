@@ -0,0 +1,204 @@
+"""
+Spatial index over current aircraft positions.
+
+SpatialGrid buckets aircraft into fixed-size lat/lon cells (a uniform grid,
+the same idea as a fixed-precision geohash) and is updated incrementally as
+positions arrive, so bounding-box and radius queries only look at aircraft
+in the cells they overlap. parse_bbox()/bbox_filter() turn a dashboard
+viewport into an SSE message filter.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, NamedTuple
+
+EARTH_RADIUS_NM = 3440.065
+
+
+class BBox(NamedTuple):
+    """Bounding box in degrees. west > east means it crosses the antimeridian."""
+
+    south: float
+    west: float
+    north: float
+    east: float
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if not self.south <= lat <= self.north:
+            return False
+        if self.west <= self.east:
+            return self.west <= lon <= self.east
+        return lon >= self.west or lon <= self.east
+
+
+def parse_bbox(text: str) -> BBox:
+    """
+    Parse a 'south,west,north,east' bounding box.
+
+    Raises:
+        ValueError: If the box is malformed or out of range
+    """
+    try:
+        south, west, north, east = (float(part) for part in text.split(','))
+    except ValueError:
+        raise ValueError('bbox must be south,west,north,east') from None
+    if not (-90 <= south <= north <= 90):
+        raise ValueError('Invalid bbox latitudes')
+    if not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError('Invalid bbox longitudes')
+    return BBox(south, west, north, east)
+
+
+def bbox_filter(
+    bbox: BBox,
+    position_of: Callable[[str], tuple[float, float] | None] | None = None
+) -> Callable[[dict[str, Any]], bool]:
+    """
+    SSE message filter passing aircraft updates inside bbox.
+
+    Args:
+        bbox: Viewport
+        position_of: Looks up the last known position of an aircraft for
+            delta messages that don't carry one
+
+    Aircraft without a known position are dropped (they can't be placed in
+    the viewport); other message types pass through.
+    """
+    contains = bbox.contains
+
+    def accept(msg: dict[str, Any]) -> bool:
+        if msg.get('type') != 'aircraft':
+            return True
+        lat = msg.get('lat')
+        if lat is not None:
+            return contains(lat, msg['lon'])
+        position = position_of(msg.get('icao')) if position_of is not None else None
+        return position is not None and contains(*position)
+
+    return accept
+
+
+def distance_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in nautical miles."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialGrid:
+    """Uniform grid of ICAO addresses keyed by (lat cell, lon cell)."""
+
+    def __init__(self, cell_degrees: float = 1.0):
+        """
+        Initialize grid.
+
+        Args:
+            cell_degrees: Cell size; 1 degree is ~60 nm north-south, a typical
+                receiver range spans a few cells
+        """
+        self.cell_degrees = cell_degrees
+        self.cells: dict[tuple[int, int], set[str]] = {}
+        self.positions: dict[str, tuple[float, float]] = {}
+        self._cell_of: dict[str, tuple[int, int]] = {}
+        self._lon_cells = math.ceil(360 / cell_degrees)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        size = self.cell_degrees
+        return int(math.floor(lat / size)), int(math.floor((lon + 180) / size)) % self._lon_cells
+
+    def update(self, icao: str, lat: float, lon: float) -> None:
+        """Record a new position, moving the aircraft between cells if needed."""
+        self.positions[icao] = (lat, lon)
+        cell = self._cell(lat, lon)
+        old = self._cell_of.get(icao)
+        if old == cell:
+            return
+        if old is not None:
+            members = self.cells[old]
+            members.discard(icao)
+            if not members:
+                del self.cells[old]
+        self.cells.setdefault(cell, set()).add(icao)
+        self._cell_of[icao] = cell
+
+    def remove(self, icao: str) -> None:
+        self.positions.pop(icao, None)
+        cell = self._cell_of.pop(icao, None)
+        if cell is not None:
+            members = self.cells[cell]
+            members.discard(icao)
+            if not members:
+                del self.cells[cell]
+
+    def clear(self) -> None:
+        self.cells = {}
+        self.positions = {}
+        self._cell_of = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _candidates(self, bbox: BBox) -> list[str]:
+        """ICAOs in every cell the box overlaps."""
+        size = self.cell_degrees
+        lat_cells = range(int(math.floor(bbox.south / size)), int(math.floor(bbox.north / size)) + 1)
+        west = int(math.floor((bbox.west + 180) / size))
+        east = int(math.floor((bbox.east + 180) / size))
+        if bbox.west > bbox.east:
+            east += self._lon_cells
+        if east - west + 1 >= self._lon_cells:
+            lon_cells = range(self._lon_cells)
+        else:
+            lon_cells = [c % self._lon_cells for c in range(west, east + 1)]
+
+        # A wide-area box can overlap more cells than are occupied
+        if len(lat_cells) * len(lon_cells) > len(self.cells):
+            lon_set = set(lon_cells)
+            return [icao for (lat_cell, lon_cell), members in self.cells.items()
+                    if lat_cell in lat_cells and lon_cell in lon_set for icao in members]
+
+        result = []
+        cells = self.cells
+        for lat_cell in lat_cells:
+            for lon_cell in lon_cells:
+                members = cells.get((lat_cell, lon_cell))
+                if members:
+                    result.extend(members)
+        return result
+
+    def query_bbox(self, bbox: BBox) -> list[str]:
+        """ICAOs of aircraft inside the bounding box."""
+        positions = self.positions
+        contains = bbox.contains
+        return [icao for icao in self._candidates(bbox) if contains(*positions[icao])]
+
+    def query_radius(self, lat: float, lon: float, radius_nm: float) -> list[tuple[str, float]]:
+        """
+        Aircraft within radius_nm of a point.
+
+        Returns:
+            (ICAO, distance in nm) pairs, nearest first
+        """
+        dlat = math.degrees(radius_nm / EARTH_RADIUS_NM)
+        south = max(-90.0, lat - dlat)
+        north = min(90.0, lat + dlat)
+        cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+        if north >= 90 or south <= -90 or cos_lat < 1e-6 or dlat / cos_lat >= 180:
+            bbox = BBox(south, -180.0, north, 180.0)
+        else:
+            dlon = dlat / cos_lat
+            west = (lon - dlon + 180) % 360 - 180
+            east = (lon + dlon + 180) % 360 - 180
+            bbox = BBox(south, west, north, east)
+
+        positions = self.positions
+        result = []
+        for icao in self._candidates(bbox):
+            distance = distance_nm(lat, lon, *positions[icao])
+            if distance <= radius_nm:
+                result.append((icao, distance))
+        result.sort(key=lambda item: item[1])
+        return result
@@ -0,0 +1,308 @@
+"""
+Aircraft state store.
+
+One compact record per aircraft (attributes in __slots__ rather than a dict
+per aircraft), expired server-side on last-seen age by the shared
+CleanupManager, with running counters so status polls don't have to walk or
+serialise the whole table.
+
+Each record also tracks which attributes changed since it was last
+published (a bitmask), so the SSE stream can send deltas instead of the
+full aircraft every second.
+
+With an AircraftDatabase attached, new aircraft are enriched with their
+registration, type and operator.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Iterator
+
+from ..cleanup import DataStore
+from .aircraft_db import AircraftDatabase
+from .spatial import BBox, SpatialGrid
+from .tracks import NUMPY_AVAILABLE, TrackHistory
+
+# Decoded attributes kept on every record; anything else goes to Aircraft.extra
+FIELDS = (
+    'callsign', 'altitude', 'lat', 'lon', 'speed', 'heading',
+    'vertical_rate', 'airspeed', 'squawk', 'rssi', 'mlat_time',
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Dirty bits: one per field, one for anything in Aircraft.extra and one for Aircraft.info
+_FIELD_BITS = {field: 1 << i for i, field in enumerate(FIELDS)}
+_EXTRA_BIT = 1 << len(FIELDS)
+_INFO_BIT = _EXTRA_BIT << 1
+_ALL_BITS = (_INFO_BIT << 1) - 1
+# Latitude and longitude are always published together
+_POSITION_BITS = _FIELD_BITS['lat'] | _FIELD_BITS['lon']
+
+EMERGENCY_SQUAWKS = frozenset({'7500', '7600', '7700'})
+
+
+class Aircraft:
+    """State for one aircraft."""
+
+    __slots__ = ('icao', 'first_seen', 'last_seen', 'messages', 'extra', 'info', 'dirty') + FIELDS
+
+    def __init__(self, icao: str, now: float, info: dict[str, str] | None = None):
+        self.icao = icao
+        self.first_seen = now
+        self.last_seen = now
+        self.messages = 0
+        self.extra: dict[str, Any] | None = None
+        # Database details (shared with the database cache, never modified)
+        self.info = info
+        # Everything is unpublished on a new aircraft
+        self.dirty = _ALL_BITS
+        for field in FIELDS:
+            setattr(self, field, None)
+
+    def apply(self, updates: dict[str, Any], now: float) -> None:
+        """Merge decoded attributes from one message, marking changed ones dirty."""
+        self.last_seen = now
+        self.messages += 1
+        dirty = self.dirty
+        for key, value in updates.items():
+            bit = _FIELD_BITS.get(key)
+            if bit is not None:
+                if getattr(self, key) != value:
+                    setattr(self, key, value)
+                    dirty |= bit
+            elif self.extra is None:
+                self.extra = {key: value}
+                dirty |= _EXTRA_BIT
+            elif self.extra.get(key) != value:
+                self.extra[key] = value
+                dirty |= _EXTRA_BIT
+        self.dirty = dirty
+
+    def take_delta(self) -> dict[str, Any] | None:
+        """
+        Attributes changed since the last call (or to_dict(clear_dirty=True)).
+
+        Returns:
+            Dict with icao and the changed attributes, or None if nothing changed
+        """
+        dirty = self.dirty
+        if not dirty:
+            return None
+        self.dirty = 0
+        if dirty & _POSITION_BITS:
+            dirty |= _POSITION_BITS
+        result: dict[str, Any] = {'icao': self.icao}
+        for field, bit in _FIELD_BITS.items():
+            if dirty & bit:
+                value = getattr(self, field)
+                if value is not None:
+                    result[field] = value
+        if dirty & _INFO_BIT and self.info:
+            result.update(self.info)
+        if dirty & _EXTRA_BIT and self.extra:
+            result.update(self.extra)
+        return result
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style attribute access for code that treated aircraft as dicts."""
+        if key in _FIELD_SET or key == 'icao':
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        if self.info is not None:
+            return self.info.get(key, default)
+        return default
+
+    def to_dict(self, clear_dirty: bool = False) -> dict[str, Any]:
+        """Known attributes as a dict (the export and keyframe payload)."""
+        if clear_dirty:
+            self.dirty = 0
+        result: dict[str, Any] = {'icao': self.icao}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+        if self.info:
+            result.update(self.info)
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+class AircraftStore(DataStore):
+    """
+    Aircraft table keyed by ICAO address, expiring aircraft not heard for max_age seconds.
+
+    Records carry their own last_seen, so apply() doesn't maintain the
+    DataStore timestamps dict alongside the data.
+    """
+
+    def __init__(self, max_age_seconds: float = 300.0, name: str = 'adsb_aircraft', track_points: int = 128,
+                 database: AircraftDatabase | None = None):
+        """
+        Initialize store.
+
+        Args:
+            max_age_seconds: Seconds since last message before an aircraft is dropped
+            name: Name for logging purposes
+            track_points: Positions of history kept per aircraft (0 disables,
+                as does a missing numpy)
+            database: Registration lookup for new aircraft (can be set later)
+        """
+        super().__init__(max_age_seconds=max_age_seconds, name=name)
+        self.database = database
+        self.tracks = TrackHistory(track_points) if NUMPY_AVAILABLE and track_points > 0 else None
+        self.spatial = SpatialGrid()
+        self.messages = 0
+        self.expired = 0
+        self._positioned: set[str] = set()
+        self._emergencies: set[str] = set()
+
+    def apply(self, icao: str, updates: dict[str, Any], now: float | None = None) -> Aircraft:
+        """
+        Create or update an aircraft from one decoded message.
+
+        Returns:
+            The aircraft record
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            aircraft = self.data.get(icao)
+            if aircraft is None:
+                info = self.database.lookup(icao) if self.database is not None else None
+                aircraft = self.data[icao] = Aircraft(icao, now, info)
+            self.messages += 1
+            if not updates:
+                # Most MSG 7/8 and surveillance replies only prove the aircraft is still there
+                aircraft.last_seen = now
+                aircraft.messages += 1
+                return aircraft
+            aircraft.apply(updates, now)
+            if 'lat' in updates:
+                self._positioned.add(icao)
+                self.spatial.update(icao, updates['lat'], updates['lon'])
+                if self.tracks is not None:
+                    self.tracks.record(icao, now, updates['lat'], updates['lon'],
+                                       aircraft.altitude, aircraft.speed)
+            squawk = updates.get('squawk')
+            if squawk is not None:
+                if squawk in EMERGENCY_SQUAWKS:
+                    self._emergencies.add(icao)
+                else:
+                    self._emergencies.discard(icao)
+        return aircraft
+
+    def snapshot(self, icao: str) -> dict[str, Any] | None:
+        """Get one aircraft as a dict."""
+        aircraft = self.get(icao)
+        return aircraft.to_dict() if aircraft is not None else None
+
+    def take_delta(self, icao: str) -> dict[str, Any] | None:
+        """Changed attributes of one aircraft since it was last published (see Aircraft.take_delta)."""
+        with self._lock:
+            aircraft = self.data.get(icao)
+            return aircraft.take_delta() if aircraft is not None else None
+
+    def keyframe(self) -> list[dict[str, Any]]:
+        """Every aircraft in full, marking all of them published."""
+        with self._lock:
+            return [aircraft.to_dict(clear_dirty=True) for aircraft in self.data.values()]
+
+    def position(self, icao: str) -> tuple[float, float] | None:
+        """Last known (lat, lon) of an aircraft."""
+        return self.spatial.positions.get(icao)
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """All aircraft as dicts."""
+        return [aircraft.to_dict() for aircraft in self.values()]
+
+    def __iter__(self) -> Iterator[Aircraft]:
+        return iter(self.values())
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self._positioned.discard(key)
+            self._emergencies.discard(key)
+            self.timestamps.pop(key, None)
+            self.spatial.remove(key)
+            if self.tracks is not None:
+                self.tracks.discard(key)
+            return self.data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._positioned.clear()
+            self._emergencies.clear()
+            self.messages = 0
+            self.spatial.clear()
+            if self.tracks is not None:
+                self.tracks.clear()
+        super().clear()
+
+    def cleanup(self, now: float | None = None) -> int:
+        """
+        Remove aircraft not heard for max_age seconds.
+
+        Returns:
+            Number of aircraft removed
+        """
+        if now is None:
+            now = time.time()
+        cutoff = now - self.max_age
+
+        with self._lock:
+            expired = [icao for icao, aircraft in self.data.items() if aircraft.last_seen < cutoff]
+            for icao in expired:
+                del self.data[icao]
+                self.timestamps.pop(icao, None)
+                self._positioned.discard(icao)
+                self._emergencies.discard(icao)
+                self.spatial.remove(icao)
+                if self.tracks is not None:
+                    self.tracks.discard(icao)
+            self.expired += len(expired)
+
+        return len(expired)
+
+    def in_bbox(self, bbox: BBox) -> list[Aircraft]:
+        """Aircraft whose last position is inside the bounding box."""
+        with self._lock:
+            return [self.data[icao] for icao in self.spatial.query_bbox(bbox)]
+
+    def within_radius(self, lat: float, lon: float, radius_nm: float) -> list[tuple[Aircraft, float]]:
+        """(aircraft, distance in nm) for aircraft within radius_nm of a point, nearest first."""
+        with self._lock:
+            return [(self.data[icao], distance)
+                    for icao, distance in self.spatial.query_radius(lat, lon, radius_nm)]
+
+    def track(self, icao: str, since: float | None = None):
+        """Position history rows for one aircraft (see utils.adsb.tracks), or None."""
+        if self.tracks is None:
+            return None
+        with self._lock:
+            return self.tracks.get(icao, since)
+
+    def all_tracks(self, since: float | None = None) -> dict[str, Any]:
+        """Position history rows for every aircraft with a track."""
+        if self.tracks is None:
+            return {}
+        with self._lock:
+            icaos = list(self.tracks.tracks)
+            return {icao: self.tracks.get(icao, since) for icao in icaos}
+
+    def summary(self) -> dict[str, Any]:
+        """Counts for status polling, without touching individual records."""
+        with self._lock:
+            return {
+                'aircraft': len(self.data),
+                'with_position': len(self._positioned),
+                'emergencies': sorted(self._emergencies),
+                'messages': self.messages,
+                'expired': self.expired,
+                'max_age': self.max_age,
+                'tracks': len(self.tracks) if self.tracks is not None else None,
+                'database': self.database.stats() if self.database is not None else None,
+            }
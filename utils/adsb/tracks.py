@@ -0,0 +1,170 @@
+"""
+Aircraft position history.
+
+Each aircraft gets a fixed-size ring of (t, lat, lon, alt, speed) rows in a
+NumPy structured array, so the server can hand a freshly opened dashboard
+the recent trail of every aircraft. simplify_track() applies
+Douglas-Peucker to keep those responses small.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Any
+
+logger = logging.getLogger('intercept.adsb')
+
+# Try to import numpy, but don't fail if not available
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    logger.warning("numpy not installed - ADS-B track history disabled")
+
+TRACK_DTYPE = [('t', 'f8'), ('lat', 'f8'), ('lon', 'f8'), ('alt', 'f4'), ('speed', 'f4')]
+
+# Metres per degree of latitude (mean)
+_M_PER_DEG = 111_195.0
+
+
+class Track:
+    """Ring buffer of positions for one aircraft."""
+
+    __slots__ = ('rows', 'next', 'count')
+
+    def __init__(self, size: int):
+        self.rows = np.zeros(size, dtype=TRACK_DTYPE)
+        self.next = 0
+        self.count = 0
+
+    def append(self, t: float, lat: float, lon: float, alt: float, speed: float) -> None:
+        self.rows[self.next] = (t, lat, lon, alt, speed)
+        self.next = (self.next + 1) % len(self.rows)
+        if self.count < len(self.rows):
+            self.count += 1
+
+    def last(self):
+        return self.rows[self.next - 1] if self.count else None
+
+    def points(self, since: float | None = None):
+        """Positions oldest first, optionally only those after since."""
+        if self.count < len(self.rows):
+            rows = self.rows[:self.count].copy()
+        else:
+            rows = np.concatenate((self.rows[self.next:], self.rows[:self.next]))
+        if since is not None:
+            rows = rows[rows['t'] > since]
+        return rows
+
+
+class TrackHistory:
+    """Position history for all aircraft."""
+
+    def __init__(self, points: int = 128):
+        """
+        Initialize history.
+
+        Args:
+            points: Positions kept per aircraft
+        """
+        self.size = points
+        self.tracks: dict[str, Track] = {}
+
+    def record(self, icao: str, t: float, lat: float, lon: float,
+               alt: float | None = None, speed: float | None = None) -> bool:
+        """
+        Append a position unless it repeats the aircraft's last one.
+
+        Returns:
+            True if the position was stored
+        """
+        track = self.tracks.get(icao)
+        if track is None:
+            track = self.tracks[icao] = Track(self.size)
+        else:
+            last = track.last()
+            if last['lat'] == lat and last['lon'] == lon:
+                return False
+        track.append(t, lat, lon, math.nan if alt is None else alt, math.nan if speed is None else speed)
+        return True
+
+    def get(self, icao: str, since: float | None = None):
+        """Positions for one aircraft oldest first, or None if it has no track."""
+        track = self.tracks.get(icao)
+        return track.points(since) if track is not None else None
+
+    def discard(self, icao: str) -> None:
+        self.tracks.pop(icao, None)
+
+    def clear(self) -> None:
+        self.tracks = {}
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def __contains__(self, icao: str) -> bool:
+        return icao in self.tracks
+
+
+def simplify_track(rows, tolerance: float):
+    """
+    Douglas-Peucker simplification.
+
+    Args:
+        rows: Track rows (TRACK_DTYPE) oldest first
+        tolerance: Maximum distance in metres between the simplified and
+            original track
+
+    Returns:
+        The subset of rows that is kept (always including both ends)
+    """
+    n = len(rows)
+    if n < 3 or tolerance <= 0:
+        return rows
+
+    # Local equirectangular projection around the track is accurate enough at trail scale
+    scale = math.cos(math.radians(float(rows['lat'].mean())))
+    x = rows['lon'] * (_M_PER_DEG * scale)
+    y = rows['lat'] * _M_PER_DEG
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        dx = x[last] - x[first]
+        dy = y[last] - y[first]
+        px = x[first + 1:last] - x[first]
+        py = y[first + 1:last] - y[first]
+        length = math.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(px, py)
+        else:
+            distances = np.abs(dx * py - dy * px) / length
+        index = int(distances.argmax())
+        if distances[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return rows[keep]
+
+
+def track_to_list(rows) -> list[list[Any]]:
+    """Rows as compact [t, lat, lon, alt, speed] lists (NaN becomes None)."""
+    result = []
+    for t, lat, lon, alt, speed in rows.tolist():
+        result.append([
+            round(t, 1),
+            round(lat, 5),
+            round(lon, 5),
+            None if alt != alt else round(alt),
+            None if speed != speed else round(speed),
+        ])
+    return result
@@ -0,0 +1,387 @@
+"""
+Incremental ingest of airodump-ng CSV output.
+
+airodump-ng rewrites its whole -01.csv every write interval, and for every
+access point in range the beacon count and last-seen time move on each
+rewrite, so re-parsing the file and re-sending every row floods the WiFi
+stream with updates that change nothing the UI shows.
+
+AirodumpIngest keeps the previous state of every row:
+
+- a poll does nothing if the file's mtime and size are unchanged;
+- each row's raw text is hashed, and rows identical to last time are not
+  even split;
+- a changed row is only reported ('update') if a field other than the
+  counters moved (channel, encryption, ESSID, probes, associated BSSID...)
+  or its power moved by at least power_delta dB since the last report;
+- rows not seen for stale_after seconds (by the file's own clock) or
+  missing from two rewrites in a row are reported once as 'remove'.
+
+Live frames (utils.dot11) update the same records through observe(), with
+the same rules for what is worth reporting, so a network first seen in a
+frame is not announced again when the CSV catches up. Per-frame signal
+jitters by several dB, so the power a frame sets is a running average.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from operator import itemgetter
+from typing import Any, Callable, NamedTuple
+
+# Columns of the access point section (index 12 is the ESSID length)
+NETWORK_COLUMNS = (
+    'bssid', 'first_seen', 'last_seen', 'channel', 'speed', 'privacy', 'cipher', 'auth',
+    'power', 'beacons', 'ivs', 'lan_ip',
+)
+# Columns that do not change on every rewrite while a device is in range
+# (everything but last seen, power and the beacon/IV/packet counters);
+# clients also have their probed ESSIDs from column 6 on
+STABLE_COLUMNS = {
+    'network': itemgetter(0, 1, 3, 4, 5, 6, 7, 11, 13),
+    'client': itemgetter(0, 1, 5),
+}
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Weight of each frame's signal in a row's running power average
+FRAME_SMOOTHING = 0.2
+
+# Records for devices first seen in a live frame, before the CSV has them
+BLANK_RECORDS = {
+    'network': {'bssid': '', 'first_seen': '', 'last_seen': '', 'channel': '', 'speed': '', 'privacy': '',
+                'cipher': '', 'auth': '', 'power': '-1', 'beacons': '0', 'ivs': '0', 'lan_ip': '',
+                'essid': 'Hidden'},
+    'client': {'mac': '', 'first_seen': '', 'last_seen': '', 'power': '-1', 'packets': '0',
+               'bssid': '(not associated)', 'probes': '', 'vendor': 'Unknown'},
+}
+
+
+class RowChange(NamedTuple):
+    """A row whose last-seen time moved; action is None if nothing worth sending changed."""
+    kind: str  # 'network' or 'client'
+    action: str | None  # 'new', 'update', 'remove' or None
+    record: dict[str, Any]
+
+
+def parse_network_row(parts: list[str]) -> dict[str, Any] | None:
+    """Access point row (already split and stripped) to a network record."""
+    if len(parts) < 14 or ':' not in parts[0]:
+        return None
+    record = dict(zip(NETWORK_COLUMNS, parts))
+    record['essid'] = parts[13] or 'Hidden'
+    return record
+
+
+def parse_client_row(parts: list[str], vendor: Callable[[str], str] | None = None) -> dict[str, Any] | None:
+    """Station row (already split and stripped) to a client record."""
+    if len(parts) < 6 or ':' not in parts[0]:
+        return None
+    return {
+        'mac': parts[0],
+        'first_seen': parts[1],
+        'last_seen': parts[2],
+        'power': parts[3],
+        'packets': parts[4],
+        'bssid': parts[5],
+        # Probed ESSIDs run over the remaining columns
+        'probes': ','.join(p for p in parts[6:] if p),
+        'vendor': vendor(parts[0]) if vendor else 'Unknown',
+    }
+
+
+def parse_airodump_text(
+    content: str, vendor: Callable[[str], str] | None = None
+) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+    """
+    Parse a whole airodump-ng CSV.
+
+    Returns:
+        (networks by BSSID, clients by MAC)
+    """
+    networks: dict[str, dict[str, Any]] = {}
+    clients: dict[str, dict[str, Any]] = {}
+    for kind, line in _rows(content):
+        parts = [p.strip() for p in line.split(',')]
+        if kind == 'network':
+            record = parse_network_row(parts)
+            if record:
+                networks[record['bssid']] = record
+        else:
+            record = parse_client_row(parts, vendor)
+            if record:
+                clients[record['mac']] = record
+    return networks, clients
+
+
+def _rows(content: str):
+    """(kind, line) for each data line, kind following the section headers."""
+    kind = None
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        if line.startswith('BSSID'):
+            kind = 'network'
+        elif line.startswith('Station MAC'):
+            kind = 'client'
+        elif kind is not None:
+            yield kind, line
+
+
+def _seen_time(value: str) -> float | None:
+    try:
+        return time.mktime(time.strptime(value, TIME_FORMAT))
+    except (ValueError, OverflowError):
+        return None
+
+
+class _Row:
+    __slots__ = ('raw', 'digest', 'power', 'level', 'seen', 'stale', 'missing')
+
+    def __init__(self):
+        self.missing = 0
+        self.raw = 0
+        self.digest = 0
+        self.power: int | None = None
+        self.level: float | None = None
+        self.seen: float | None = None
+        self.stale = False
+
+
+class AirodumpIngest:
+    """Tracks one airodump-ng CSV and reports what changed between rewrites."""
+
+    def __init__(
+        self,
+        path: str,
+        vendor: Callable[[str], str] | None = None,
+        stale_after: float = 120.0,
+        power_delta: int = 5,
+    ):
+        """
+        Initialize ingest.
+
+        Args:
+            path: The -01.csv file airodump-ng writes
+            vendor: MAC -> manufacturer lookup for clients
+            stale_after: Seconds without a sighting before a row is removed
+                (0 only removes rows that leave the file)
+            power_delta: dB of power change that makes a row worth an update
+        """
+        self.path = path
+        self.vendor = vendor
+        self.stale_after = stale_after
+        self.power_delta = power_delta
+        self.networks: dict[str, dict[str, Any]] = {}
+        self.clients: dict[str, dict[str, Any]] = {}
+        self._rows: dict[tuple[str, str], _Row] = {}
+        self._file_signature: tuple[int, int] | None = None
+        self._stamp: tuple[int, str] = (0, '')
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.parses = 0
+        self.rows_parsed = 0
+        self.frames = 0
+        self.events = 0
+
+    def records(self, kind: str) -> dict[str, dict[str, Any]]:
+        return self.networks if kind == 'network' else self.clients
+
+    def poll(self) -> list[RowChange] | None:
+        """
+        Read the file if it changed since the last poll.
+
+        Returns:
+            Changes (empty if the file is unchanged), or None if the file
+            does not exist yet
+        """
+        self.polls += 1
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._file_signature:
+            return []
+        try:
+            with open(self.path, 'r', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            return None
+        self._file_signature = signature
+        self.parses += 1
+        return self.apply(content)
+
+    def apply(self, content: str) -> list[RowChange]:
+        """Compare a full CSV with the previous one and update the records."""
+        with self._lock:
+            return self._apply(content)
+
+    def observe(
+        self,
+        kind: str,
+        key: str,
+        fields: dict[str, str],
+        power: int | None,
+        now: float,
+    ) -> RowChange | None:
+        """
+        Update a record from a live frame.
+
+        Args:
+            kind: 'network' or 'client'
+            key: BSSID or client MAC
+            fields: Record fields the frame carries (empty values are ignored)
+            power: Signal of the frame in dBm, if measured (averaged in)
+            now: Capture time of the frame
+
+        Returns:
+            The change if it is worth sending ('new' or 'update'), else None
+        """
+        with self._lock:
+            self.frames += 1
+            second = int(now)
+            if self._stamp[0] != second:
+                self._stamp = (second, time.strftime(TIME_FORMAT, time.localtime(second)))
+            stamp = self._stamp[1]
+            records = self.records(kind)
+            record = records.get(key)
+            row = self._rows.get((kind, key))
+            if row is not None and power is not None:
+                if row.level is None:
+                    row.level = power
+                else:
+                    row.level += (power - row.level) * FRAME_SMOOTHING
+                power = round(row.level)
+
+            if record is None or row is None:
+                record = dict(BLANK_RECORDS[kind], first_seen=stamp)
+                record['bssid' if kind == 'network' else 'mac'] = key
+                if kind == 'client' and self.vendor:
+                    record['vendor'] = self.vendor(key)
+                row = self._rows[(kind, key)] = _Row()
+                row.level = power
+                action = 'new'
+            elif row.stale or any(value and record.get(name) != value for name, value in fields.items()):
+                action = 'update'
+            elif power is not None and (row.power is None or abs(power - row.power) >= self.power_delta):
+                action = 'update'
+            else:
+                action = None
+
+            # Readers may be iterating the record: only existing keys change
+            for name, value in fields.items():
+                if value:
+                    record[name] = value
+            record['last_seen'] = stamp
+            if power is not None:
+                record['power'] = str(power)
+            row.seen = now
+            row.missing = 0
+            if action is None:
+                return None
+            row.power = power if power is not None else row.power
+            row.stale = False
+            records[key] = record
+            self.events += 1
+            return RowChange(kind, action, record)
+
+    def _apply(self, content: str) -> list[RowChange]:
+        changes: list[RowChange] = []
+        present: set[tuple[str, str]] = set()
+        seen_times: dict[str, float | None] = {}
+        newest = 0.0
+
+        for kind, line in _rows(content):
+            key = (kind, line.split(',', 1)[0].strip())
+            if ':' not in key[1]:
+                continue
+            present.add(key)
+            row = self._rows.get(key)
+            raw = hash(line)
+            if row is not None and row.raw == raw:
+                row.missing = 0
+                if row.seen and row.seen > newest:
+                    newest = row.seen
+                continue
+
+            parts = [p.strip() for p in line.split(',')]
+            record = parse_network_row(parts) if kind == 'network' else parse_client_row(parts, self.vendor)
+            if record is None:
+                present.discard(key)
+                continue
+            self.rows_parsed += 1
+            digest = hash((STABLE_COLUMNS[kind](parts), record.get('probes')))
+            try:
+                power = int(record['power'])
+            except ValueError:
+                power = None
+            # Most rows of a rewrite share a handful of last-seen stamps
+            seen_text = record['last_seen']
+            seen = seen_times.get(seen_text, 0.0)
+            if seen == 0.0:
+                seen = seen_times[seen_text] = _seen_time(seen_text)
+            if seen and seen > newest:
+                newest = seen
+
+            if row is None:
+                row = self._rows[key] = _Row()
+                action = 'new'
+            elif row.stale and seen != row.seen:
+                action = 'update'
+            elif digest != row.digest or (
+                power is not None and (row.power is None or abs(power - row.power) >= self.power_delta)
+            ):
+                action = 'update'
+            else:
+                action = None
+            seen_moved = seen != row.seen
+
+            row.missing = 0
+            row.raw = raw
+            row.digest = digest
+            row.seen = seen
+            if action is not None:
+                row.power = power
+                row.stale = False
+            self.records(kind)[key[1]] = record
+            if action is not None or seen_moved:
+                changes.append(RowChange(kind, action, record))
+
+        # Rows that left the file (two parses running, in case one caught the
+        # file mid-rewrite), or stopped being seen
+        for key, row in list(self._rows.items()):
+            gone = key not in present
+            if gone:
+                row.missing += 1
+                if row.missing < 2:
+                    continue
+            elif (row.stale or not self.stale_after or row.seen is None
+                  or newest - row.seen <= self.stale_after):
+                continue
+            kind, ident = key
+            record = self.records(kind).get(ident)
+            reported = row.stale
+            if gone:
+                del self._rows[key]
+                self.records(kind).pop(ident, None)
+            else:
+                row.stale = True
+            if record is not None and not reported:
+                changes.append(RowChange(kind, 'remove', record))
+
+        self.events += sum(1 for change in changes if change.action)
+        return changes
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'polls': self.polls,
+            'parses': self.parses,
+            'rows_parsed': self.rows_parsed,
+            'frames': self.frames,
+            'events': self.events,
+            'networks': len(self.networks),
+            'clients': len(self.clients),
+        }
@@ -0,0 +1,417 @@
+"""
+Watchlist alerts for pager, sensor and ADS-B streams.
+
+Watchlists are compiled once into a CompiledWatchlist: pager keywords go
+into an Aho-Corasick automaton, which finds every keyword in a message in
+one pass over its characters however many thousands of keywords there
+are, and identifiers (ICAO addresses, squawks, pager addresses, rtl_433
+model/id/channel) go into sets, so each check is a hash lookup. The
+decoder threads call the check_* methods of AlertEngine inline.
+
+Reloading builds a new CompiledWatchlist and swaps the reference, so
+decoders never wait for a reload and never see a half-built list. The
+watchlist file is polled for changes (hot reload) and can also be replaced
+through the API.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger('intercept.alerts')
+
+# Hijack, radio failure, emergency
+EMERGENCY_SQUAWKS = ('7500', '7600', '7700')
+
+WATCHLIST_KEYS = ('keywords', 'pager_addresses', 'icao', 'squawks', 'sensors')
+
+
+class AhoCorasick:
+    """Case-insensitive multi-keyword matcher."""
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = True):
+        """
+        Build automaton.
+
+        Args:
+            keywords: Words or phrases to find
+            whole_words: Only report matches not inside a longer word
+                ("fire" doesn't match "fireworks")
+        """
+        self.whole_words = whole_words
+        self.keywords: list[str] = []
+        # Trie transitions, failure links and keyword indices ending at each state
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[list[int]] = [[]]
+        seen: set[str] = set()
+        for keyword in keywords:
+            keyword = keyword.strip().casefold()
+            if not keyword or keyword in seen:
+                continue
+            seen.add(keyword)
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(len(self.keywords))
+            self.keywords.append(keyword)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                # Inherit keywords that end at the failure state (suffixes)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        self._outputs: list[tuple[int, ...]] = [tuple(out) for out in outputs]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find(self, text: str) -> list[str]:
+        """
+        Keywords present in text, in order of first occurrence.
+        """
+        if not self.keywords or not text:
+            return []
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        folded = text.casefold()
+        found: dict[int, None] = {}
+        state = 0
+        for end, ch in enumerate(folded):
+            while True:
+                nxt = goto[state].get(ch)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if outputs[state]:
+                for index in outputs[state]:
+                    if index in found:
+                        continue
+                    if self.whole_words and not self._whole_word(folded, end, self._lengths[index]):
+                        continue
+                    found[index] = None
+        return [self.keywords[index] for index in found]
+
+    @staticmethod
+    def _whole_word(text: str, end: int, length: int) -> bool:
+        start = end - length + 1
+        if start > 0 and text[start - 1].isalnum() and text[start].isalnum():
+            return False
+        if end + 1 < len(text) and text[end + 1].isalnum() and text[end].isalnum():
+            return False
+        return True
+
+
+def sensor_key(model: Any, device_id: Any = None, channel: Any = None) -> tuple[str, str, str]:
+    """Normalised (model, id, channel) for sensor watchlist lookups."""
+    return (
+        str(model).casefold(),
+        '' if device_id is None else str(device_id),
+        '' if channel is None else str(channel),
+    )
+
+
+class CompiledWatchlist:
+    """Immutable, lookup-ready form of a watchlist."""
+
+    def __init__(self, watchlist: dict[str, Any]):
+        """
+        Compile a watchlist.
+
+        Args:
+            watchlist: Dict with any of keywords, pager_addresses, icao,
+                squawks (lists of strings) and sensors (objects with model
+                and optional id/channel)
+
+        Raises:
+            ValueError: For malformed entries
+        """
+        unknown = set(watchlist) - set(WATCHLIST_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown watchlist keys: {', '.join(sorted(unknown))}")
+        for key in WATCHLIST_KEYS:
+            if not isinstance(watchlist.get(key, []), list):
+                raise ValueError(f'{key} must be a list')
+
+        self.source = {key: list(watchlist.get(key, [])) for key in WATCHLIST_KEYS}
+        self.keywords = AhoCorasick(str(k) for k in self.source['keywords'])
+        self.pager_addresses = frozenset(str(a).strip() for a in self.source['pager_addresses'])
+        self.icao = frozenset(str(i).strip().upper() for i in self.source['icao'])
+        self.squawks = frozenset(str(s).strip() for s in self.source['squawks'])
+
+        sensors = set()
+        for entry in self.source['sensors']:
+            if not isinstance(entry, dict) or not entry.get('model'):
+                raise ValueError('Sensor entries need a model')
+            sensors.add(sensor_key(entry['model'], entry.get('id'), entry.get('channel')))
+        self.sensors = frozenset(sensors)
+        # Watched models without an id/channel match every device of the model
+        self._sensor_wildcards = any(not device_id or not channel for _, device_id, channel in sensors)
+
+    def match_sensor(self, model: Any, device_id: Any, channel: Any) -> tuple[str, str, str] | None:
+        key = sensor_key(model, device_id, channel)
+        if key in self.sensors:
+            return key
+        if self._sensor_wildcards:
+            for candidate in ((key[0], key[1], ''), (key[0], '', key[2]), (key[0], '', '')):
+                if candidate in self.sensors:
+                    return candidate
+        return None
+
+    def counts(self) -> dict[str, int]:
+        return {
+            'keywords': len(self.keywords),
+            'pager_addresses': len(self.pager_addresses),
+            'icao': len(self.icao),
+            'squawks': len(self.squawks),
+            'sensors': len(self.sensors),
+        }
+
+
+def default_watchlist() -> dict[str, Any]:
+    return {'squawks': list(EMERGENCY_SQUAWKS)}
+
+
+class AlertEngine:
+    """Checks decoded events against the current watchlist and publishes alerts."""
+
+    def __init__(
+        self,
+        path: str | None,
+        publish: Callable[[dict[str, Any]], None],
+        cooldown: float = 60.0,
+        reload_interval: float = 5.0,
+    ):
+        """
+        Initialize engine (call load() to read the watchlist file).
+
+        Args:
+            path: Watchlist JSON file (None: in-memory only)
+            publish: Called with each alert event (e.g. BroadcastHub.put)
+            cooldown: Seconds before the same identifier alerts again; aircraft
+                and sensors report continuously, pager messages alert every time
+            reload_interval: Seconds between checks of the file for changes
+                (0 disables hot reload)
+        """
+        self.path = path
+        self.publish = publish
+        self.cooldown = cooldown
+        self.reload_interval = reload_interval
+        self.watchlist = CompiledWatchlist(default_watchlist())
+        self.alerts = 0
+        self.suppressed = 0
+        self.reloads = 0
+        self.checked = 0
+        self._mtime: float | None = None
+        self._recent: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ============================================
+    # Watchlist management
+    # ============================================
+
+    def load(self) -> bool:
+        """
+        (Re)load the watchlist file; keeps the current list if it is invalid.
+
+        Returns:
+            True if a new watchlist is in effect
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            # Remembered even if the file is invalid: retry on the next edit
+            self._mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding='utf-8') as f:
+                compiled = CompiledWatchlist(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.error(f"Watchlist {self.path} not loaded: {e}")
+            return False
+        self._install(compiled)
+        logger.info(f"Watchlist loaded from {self.path}: {compiled.counts()}")
+        return True
+
+    def update(self, watchlist: dict[str, Any], save: bool = True) -> CompiledWatchlist:
+        """
+        Replace the watchlist, optionally writing it to the watchlist file.
+
+        The new list is in effect even if saving it fails.
+
+        Raises:
+            ValueError: For a malformed watchlist (nothing changes)
+            OSError: If the file can't be written
+        """
+        compiled = CompiledWatchlist(watchlist)
+        self._install(compiled)
+        if save and self.path:
+            tmp = f'{self.path}.tmp'
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(compiled.source, f, indent=2)
+                os.replace(tmp, self.path)
+            except OSError:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            self._mtime = os.path.getmtime(self.path)
+        return compiled
+
+    def _install(self, compiled: CompiledWatchlist) -> None:
+        # A single reference swap: decoder threads see the old or the new list
+        self.watchlist = compiled
+        self.reloads += 1
+        with self._lock:
+            self._recent.clear()
+
+    def start(self) -> None:
+        """Load the watchlist and start watching the file for changes."""
+        self.load()
+        if self._thread is not None or not self.path or self.reload_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='alert-watchlist', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            self._watch_once()
+
+    def _watch_once(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    # ============================================
+    # Checks (called from decoder threads)
+    # ============================================
+
+    def check_pager(self, msg: dict[str, Any]) -> int:
+        """Check a decoded pager message for watched addresses and keywords."""
+        watchlist = self.watchlist
+        self.checked += 1
+        raised = 0
+        address = str(msg.get('address', ''))
+        details = {
+            'address': address,
+            'protocol': msg.get('protocol'),
+            'text': msg.get('message'),
+        }
+        if address in watchlist.pager_addresses:
+            raised += self._raise('pager', 'pager_address', address, address, details, cooldown=False)
+        for keyword in watchlist.keywords.find(str(msg.get('message', ''))):
+            raised += self._raise('pager', 'keyword', keyword, address, details, cooldown=False)
+        return raised
+
+    def check_aircraft(self, icao: str, updates: dict[str, Any], now: float | None = None) -> int:
+        """Check one ADS-B update for watched ICAO addresses and squawks."""
+        watchlist = self.watchlist
+        self.checked += 1
+        raised = 0
+        if icao in watchlist.icao:
+            raised += self._raise('adsb', 'icao', icao, icao, {'icao': icao, **updates}, now=now)
+        squawk = updates.get('squawk')
+        if squawk is not None and str(squawk) in watchlist.squawks:
+            raised += self._raise('adsb', 'squawk', str(squawk), icao, {'icao': icao, **updates}, now=now)
+        return raised
+
+    def check_sensor(self, data: dict[str, Any]) -> int:
+        """Check one rtl_433 event for watched model/id/channel combinations."""
+        watchlist = self.watchlist
+        self.checked += 1
+        if not watchlist.sensors or 'model' not in data:
+            return 0
+        matched = watchlist.match_sensor(data.get('model'), data.get('id'), data.get('channel'))
+        if matched is None:
+            return 0
+        subject = '/'.join(str(part) for part in (data.get('model'), data.get('id'), data.get('channel'))
+                           if part is not None)
+        details = {k: v for k, v in data.items() if k != 'type'}
+        return self._raise('sensor', 'sensor', '/'.join(filter(None, matched)), subject, details)
+
+    def _raise(
+        self,
+        source: str,
+        kind: str,
+        match: str,
+        subject: str,
+        details: dict[str, Any],
+        cooldown: bool = True,
+        now: float | None = None,
+    ) -> int:
+        if now is None:
+            now = time.time()
+        if cooldown and self.cooldown > 0:
+            key = (kind, match, subject)
+            with self._lock:
+                recent = self._recent
+                last = recent.get(key)
+                if last is not None and now - last < self.cooldown:
+                    self.suppressed += 1
+                    return 0
+                recent[key] = now
+                recent.move_to_end(key)
+                # Forget identifiers that have been quiet for a cooldown period
+                while recent:
+                    oldest_key, oldest = next(iter(recent.items()))
+                    if now - oldest < self.cooldown:
+                        break
+                    del recent[oldest_key]
+        self.alerts += 1
+        self.publish({
+            'type': 'alert',
+            'source': source,
+            'kind': kind,
+            'match': match,
+            'subject': subject,
+            'timestamp': now,
+            'details': details,
+        })
+        return 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'path': self.path,
+            'watchlist': self.watchlist.counts(),
+            'checked': self.checked,
+            'alerts': self.alerts,
+            'suppressed': self.suppressed,
+            'reloads': self.reloads,
+            'cooldown': self.cooldown,
+        }
@@ -0,0 +1,308 @@
+"""
+Wideband pager receiver: one SDR, several channels.
+
+rtl_sdr (or an IQ file) supplies 8-bit IQ at 2.4 Msps. PolyphaseChannelizer
+splits that into narrowband channels with a polyphase filter bank: the
+prototype low-pass is applied once per output frame across num_bins
+branches, and one FFT then yields every bin at once, instead of mixing,
+filtering and decimating the full-rate stream separately per channel.
+Bins are 12.5 kHz apart (the pager channel raster) and 2x oversampled,
+giving 25 ksps per channel; any remaining offset between a channel and its
+bin centre is mixed out at that rate.
+
+FMDemodulator turns each channel into the 16-bit 22050 Hz PCM multimon-ng
+reads with "-t raw", so every channel can feed its own multimon-ng. All
+stages keep their state between blocks, so output does not depend on how
+the input stream was chunked.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Sequence
+
+logger = logging.getLogger('intercept.channelizer')
+
+# Try to import numpy, but don't fail if not available
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    logger.warning("numpy not installed - wideband pager channelizer disabled")
+
+DEFAULT_SAMPLE_RATE = 2_400_000
+# 192 bins at 2.4 Msps = 12.5 kHz apart
+DEFAULT_NUM_BINS = 192
+DEFAULT_TAPS_PER_BIN = 16
+# Half-amplitude point of the channel filter (POCSAG/FLEX occupy about +-6 kHz)
+DEFAULT_CUTOFF_HZ = 6500.0
+AUDIO_RATE = 22050
+# Discriminator scaling used by rtl_fm: +-pi rad/sample -> +-16384
+PCM_SCALE = (1 << 14) / math.pi
+# IQ samples per DC offset estimate (~27 ms at 2.4 Msps)
+DC_WINDOW = 65536
+
+
+def iq_from_u8(raw: bytes) -> np.ndarray:
+    """Convert rtl_sdr output (interleaved unsigned 8-bit I/Q) to complex64 in [-1, 1]."""
+    samples = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+    samples -= 127.5
+    samples *= 1 / 127.5
+    return samples.view(np.complex64)
+
+
+def prototype_filter(num_taps: int, cutoff_hz: float, sample_rate: float) -> np.ndarray:
+    """Hamming-windowed sinc low-pass with unity DC gain."""
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = np.sinc(2 * cutoff_hz / sample_rate * n) * np.hamming(num_taps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def plan_center_frequency(
+    channels_hz: Sequence[float],
+    sample_rate: float = DEFAULT_SAMPLE_RATE,
+    spacing_hz: float = DEFAULT_SAMPLE_RATE / DEFAULT_NUM_BINS,
+    usable_fraction: float = 0.8,
+) -> float:
+    """
+    Pick the SDR centre frequency for a set of channels.
+
+    The centre is placed on the channels' raster (so they land on bin
+    centres), keeps every channel inside the flat part of the band, and
+    avoids putting a channel within one bin of the DC spike where possible.
+
+    Args:
+        channels_hz: Channel frequencies in Hz
+        sample_rate: SDR sample rate
+        spacing_hz: Channelizer bin spacing
+        usable_fraction: Part of the sampled bandwidth channels may use
+
+    Returns:
+        Centre frequency in Hz
+
+    Raises:
+        ValueError: If the channels don't fit in one capture
+    """
+    if not channels_hz:
+        raise ValueError('No channels given')
+    lo, hi = min(channels_hz), max(channels_hz)
+    half = sample_rate * usable_fraction / 2
+    if hi - lo > 2 * half:
+        raise ValueError(f'Channels span {(hi - lo) / 1e3:.1f} kHz; at most '
+                         f'{2 * half / 1e3:.1f} kHz fits in {sample_rate / 1e6:g} Msps')
+    mid = (lo + hi) / 2
+    base = lo + round((mid - lo) / spacing_hz) * spacing_hz
+    candidates = [base + i * spacing_hz for i in range(-4, 5)]
+    candidates = [c for c in candidates if all(abs(f - c) <= half for f in channels_hz)]
+    if not candidates:
+        return mid
+    return max(candidates, key=lambda c: (min(abs(f - c) for f in channels_hz) >= spacing_hz,
+                                          -abs(c - mid)))
+
+
+class PolyphaseChannelizer:
+    """2x oversampled polyphase filter bank returning selected channels."""
+
+    def __init__(
+        self,
+        channels_hz: Sequence[float],
+        center_hz: float,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        num_bins: int = DEFAULT_NUM_BINS,
+        taps_per_bin: int = DEFAULT_TAPS_PER_BIN,
+        cutoff_hz: float = DEFAULT_CUTOFF_HZ,
+    ):
+        """
+        Initialize filter bank.
+
+        Args:
+            channels_hz: Channel frequencies in Hz, in output order
+            center_hz: SDR centre frequency
+            sample_rate: Input sample rate
+            num_bins: Filter bank size (even); bins are sample_rate/num_bins apart
+            taps_per_bin: Prototype filter length per branch
+            cutoff_hz: Channel filter cutoff
+
+        Raises:
+            ValueError: For an odd num_bins or a channel outside the band
+        """
+        if num_bins % 2:
+            raise ValueError('num_bins must be even')
+        self.sample_rate = sample_rate
+        self.num_bins = num_bins
+        self.decimation = num_bins // 2
+        self.output_rate = sample_rate / self.decimation
+        self.spacing = sample_rate / num_bins
+        self.channels_hz = list(channels_hz)
+
+        taps = prototype_filter(num_bins * taps_per_bin, cutoff_hz, sample_rate)
+        # Branch p sees taps[pM:(p+1)M] applied to input in reverse order
+        self._branches = [taps[p * num_bins:(p + 1) * num_bins][::-1].copy()
+                          for p in range(taps_per_bin)]
+        self._length = len(taps)
+
+        bins, residuals = [], []
+        for freq in self.channels_hz:
+            offset = freq - center_hz
+            if abs(offset) > sample_rate / 2 - self.spacing:
+                raise ValueError(f'{freq / 1e6:.4f} MHz is outside the captured band')
+            k = round(offset / self.spacing)
+            bins.append(k % num_bins)
+            residuals.append(offset - k * self.spacing)
+        self._bins = np.array(bins)
+        # FFT of the reversed branch sum is off by a constant phase per bin
+        self._bin_phase = np.exp(-2j * np.pi * self._bins / num_bins).astype(np.complex64)
+        self._odd_bins = (self._bins % 2).astype(bool)
+        # Per-channel mixer for the offset left after bin selection
+        self._mix_step = np.array([-2 * np.pi * r / self.output_rate for r in residuals])
+        self._mix_phase = np.zeros(len(bins))
+
+        self._history = np.zeros(self._length - self.decimation, dtype=np.complex64)
+        self._frame = 0
+
+    def process(self, iq: np.ndarray) -> np.ndarray:
+        """
+        Channelize one block of complex samples.
+
+        Returns:
+            complex64 array of shape (channels, frames) at output_rate; the
+            frame count depends on how many samples are buffered
+        """
+        buffer = np.concatenate((self._history, iq.astype(np.complex64, copy=False)))
+        M, D, L = self.num_bins, self.decimation, self._length
+        frames = (len(buffer) - L) // D + 1 if len(buffer) >= L else 0
+        if frames <= 0:
+            self._history = buffer
+            return np.zeros((len(self._bins), 0), dtype=np.complex64)
+
+        windows = sliding_window_view(buffer, M)
+        acc = np.zeros((frames, M), dtype=np.complex64)
+        for p, branch in enumerate(self._branches):
+            start = L - (p + 1) * M
+            acc += windows[start:start + frames * D:D] * branch
+        spectra = np.fft.fft(acc, axis=1)
+        out = (spectra[:, self._bins] * self._bin_phase).T
+
+        # With decimation M/2, bin k of frame m carries a (-1)^(k*m) rotation
+        m = self._frame + np.arange(frames)
+        out[np.ix_(self._odd_bins, m % 2 == 1)] *= -1
+        self._frame = (self._frame + frames) % 2
+
+        if self._mix_step.any():
+            phase = self._mix_phase[:, None] + self._mix_step[:, None] * np.arange(frames)
+            out *= np.exp(1j * phase).astype(np.complex64)
+            self._mix_phase = (phase[:, -1] + self._mix_step) % (2 * np.pi)
+
+        self._history = buffer[frames * D:]
+        return out
+
+
+class FMDemodulator:
+    """Quadrature FM discriminator resampled to multimon-ng's 22050 Hz."""
+
+    def __init__(self, input_rate: float, output_rate: float = AUDIO_RATE):
+        self.step = input_rate / output_rate
+        self._prev = np.complex64(0)
+        self._last = 0.0
+        # Position of the next output sample, in input samples after _last
+        self._pos = 1.0
+
+    def process(self, iq: np.ndarray) -> np.ndarray:
+        """
+        Demodulate one block of channel samples.
+
+        Returns:
+            int16 PCM samples
+        """
+        if not len(iq):
+            return np.zeros(0, dtype=np.int16)
+        previous = np.concatenate(([self._prev], iq[:-1]))
+        audio = np.angle(iq * np.conj(previous)).astype(np.float32)
+        self._prev = iq[-1]
+
+        # Linear interpolation; index 0 is the previous block's last sample
+        samples = np.concatenate(([self._last], audio))
+        end = len(samples) - 1
+        count = int((end - self._pos) // self.step) + 1 if self._pos <= end else 0
+        positions = self._pos + self.step * np.arange(count)
+        pcm = np.interp(positions, np.arange(len(samples)), samples)
+        self._pos = (positions[-1] if count else self._pos - self.step) + self.step - end
+        self._last = float(samples[-1])
+
+        return np.clip(pcm * PCM_SCALE, -32768, 32767).astype(np.int16)
+
+
+class PagerChannelizer:
+    """rtl_sdr bytes in, one 22050 Hz PCM stream per pager channel out."""
+
+    def __init__(
+        self,
+        channels_hz: Sequence[float],
+        center_hz: float | None = None,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        **bank_options,
+    ):
+        """
+        Initialize receiver.
+
+        Args:
+            channels_hz: Channel frequencies in Hz
+            center_hz: SDR centre frequency (default: plan_center_frequency())
+            sample_rate: IQ sample rate
+            bank_options: Passed to PolyphaseChannelizer
+
+        Raises:
+            ValueError: If the channels don't fit in the captured band
+        """
+        if center_hz is None:
+            num_bins = bank_options.get('num_bins', DEFAULT_NUM_BINS)
+            center_hz = plan_center_frequency(channels_hz, sample_rate, sample_rate / num_bins)
+        self.center_hz = center_hz
+        self.channels_hz = list(channels_hz)
+        self.bank = PolyphaseChannelizer(channels_hz, center_hz, sample_rate, **bank_options)
+        self.demodulators = [FMDemodulator(self.bank.output_rate) for _ in self.channels_hz]
+        self._odd_byte = b''
+        self.samples_in = 0
+        self._dc = 0j
+        self._dc_sum = 0j
+        self._dc_count = 0
+
+    def process(self, raw: bytes) -> list[bytes]:
+        """
+        Process a chunk of 8-bit IQ.
+
+        Returns:
+            Little-endian int16 PCM for each channel, in channels_hz order
+        """
+        raw = self._odd_byte + raw
+        whole = len(raw) & ~1
+        self._odd_byte = raw[whole:]
+        iq = iq_from_u8(raw[:whole])
+        self.samples_in += len(iq)
+        self._remove_dc(iq)
+        channels = self.bank.process(iq)
+        return [demod.process(channel).astype('<i2').tobytes()
+                for demod, channel in zip(self.demodulators, channels)]
+
+    def _remove_dc(self, iq: np.ndarray) -> None:
+        """
+        Subtract the DC offset of the RTL-SDR front end, in place.
+
+        Each DC_WINDOW samples of the stream are corrected by the mean of the
+        window before, so chunk boundaries don't change the result.
+        """
+        pos = 0
+        while pos < len(iq):
+            block = iq[pos:pos + DC_WINDOW - self._dc_count]
+            self._dc_sum += complex(block.sum(dtype=np.complex128))
+            block -= self._dc
+            self._dc_count += len(block)
+            pos += len(block)
+            if self._dc_count == DC_WINDOW:
+                self._dc = self._dc_sum / DC_WINDOW
+                self._dc_sum = 0j
+                self._dc_count = 0
@@ -35,6 +35,15 @@ TOOL_DEPENDENCIES = {
                     'manual': 'https://github.com/EliasOewornal/multimon-ng'
                 }
             },
+            'rtl_sdr': {
+                'required': False,
+                'description': 'RTL-SDR IQ capture (wideband multi-channel mode)',
+                'install': {
+                    'apt': 'sudo apt install rtl-sdr',
+                    'brew': 'brew install librtlsdr',
+                    'manual': 'https://osmocom.org/projects/rtl-sdr/wiki'
+                }
+            },
             'rtl_test': {
                 'required': False,
                 'description': 'RTL-SDR device detection',
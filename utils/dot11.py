@@ -0,0 +1,530 @@
+"""
+Streaming 802.11 frame parser for pcap captures.
+
+airodump-ng only rewrites its CSV every few seconds, and the power it
+reports is an average. Reading frames directly gives sub-second latency
+and the signal of every frame:
+
+- PcapReader parses classic pcap incrementally from whatever bytes it is
+  fed (a pipe from `tcpdump -w -`, or chunks of a file), keeping partial
+  records until the rest arrives;
+- PcapTail follows a capture file that is still being written (the
+  -01.cap airodump-ng writes next to its CSV) by offset, starting over
+  if the file is replaced or truncated;
+- parse_frame decodes the radiotap header (dBm signal, channel) and the
+  802.11 frames that matter for reconnaissance: beacons and probe
+  responses (SSID, channel, security), probe requests, (re)association,
+  data frames (which station is talking to which access point) and
+  EAPOL-Key handshake messages;
+- FrameTracker turns frames into the same network/client records
+  AirodumpIngest keeps, so both sources update one view.
+
+airodump-ng writes its capture without radiotap headers, so frames from
+the .cap file have no signal; a radiotap pipe from tcpdump on the same
+monitor interface has it for every frame. Only the standard library is
+used.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+from utils.airodump import AirodumpIngest, RowChange
+
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+# Magic -> (byte order, timestamp fraction unit)
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+PCAPNG_MAGIC = b'\x0a\x0d\x0d\x0a'
+PCAP_HEADER_SIZE = 24
+RECORD_HEADER_SIZE = 16
+# Larger records can only come from a corrupt or misaligned stream
+MAX_RECORD_SIZE = 262144
+
+# (alignment, size) of radiotap fields 0-5: TSFT, flags, rate, channel,
+# FHSS, dBm antenna signal
+_RADIOTAP_FIELDS = ((8, 8), (1, 1), (1, 1), (2, 4), (1, 2), (1, 1))
+_RADIOTAP_FLAG_FCS = 0x10
+
+LLC_EAPOL = b'\xaa\xaa\x03\x00\x00\x00\x88\x8e'
+EAPOL_KEY = 3
+
+# RSN/WPA suite types (last byte of the suite selector)
+CIPHER_SUITES = {1: 'WEP40', 2: 'TKIP', 4: 'CCMP', 5: 'WEP104', 8: 'GCMP', 9: 'GCMP256', 10: 'CCMP256'}
+AKM_SUITES = {1: 'MGT', 2: 'PSK', 3: 'MGT', 4: 'PSK', 5: 'MGT', 6: 'PSK', 8: 'SAE', 9: 'SAE', 18: 'OWE'}
+WPA_VENDOR_IE = b'\x00\x50\xf2\x01'
+
+# Management subtypes
+ASSOC_REQUEST, ASSOC_RESPONSE, REASSOC_REQUEST, REASSOC_RESPONSE = 0, 1, 2, 3
+PROBE_REQUEST, PROBE_RESPONSE, BEACON = 4, 5, 8
+
+
+class PcapError(ValueError):
+    """The stream is not a classic pcap capture, or is corrupt."""
+
+
+class Dot11Frame(NamedTuple):
+    """The parts of one 802.11 frame the tracker uses."""
+    kind: str  # 'beacon', 'probe_response', 'probe_request', 'association', 'data' or 'eapol'
+    transmitter: str  # MAC the signal was measured from
+    bssid: str | None
+    station: str | None  # client MAC, if the frame involves one
+    signal: int | None  # dBm (radiotap captures only)
+    channel: int | None
+    ssid: str | None  # '' for a hidden network or wildcard probe
+    security: tuple[str, str, str] | None  # (privacy, cipher, auth) from beacons
+    eapol: int | None  # EAPOL-Key handshake message number (1-4)
+
+
+class PcapReader:
+    """Incremental classic pcap parser; feed it bytes as they arrive."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._record: struct.Struct | None = None
+        self._scale = 1e-6
+        self.linktype: int | None = None
+        self.frames = 0
+        self.bytes = 0
+
+    def feed(self, data: bytes) -> list[tuple[float, bytes]]:
+        """
+        Add captured bytes.
+
+        Returns:
+            (timestamp, frame bytes) for every record completed by data
+
+        Raises:
+            PcapError: If the stream is pcapng, not pcap at all, or corrupt
+        """
+        buf = self._buffer
+        buf += data
+        self.bytes += len(data)
+        pos = 0
+        if self._record is None:
+            if len(buf) < PCAP_HEADER_SIZE:
+                return []
+            magic = bytes(buf[:4])
+            if magic == PCAPNG_MAGIC:
+                raise PcapError('pcapng captures are not supported; write classic pcap')
+            if magic not in PCAP_MAGIC:
+                raise PcapError('Not a pcap capture')
+            order, self._scale = PCAP_MAGIC[magic]
+            self.linktype = struct.unpack_from(order + 'I', buf, 20)[0] & 0xFFFF
+            self._record = struct.Struct(order + 'IIII')
+            pos = PCAP_HEADER_SIZE
+
+        unpack = self._record.unpack_from
+        scale = self._scale
+        end = len(buf)
+        frames = []
+        while end - pos >= RECORD_HEADER_SIZE:
+            sec, frac, length, _ = unpack(buf, pos)
+            if length > MAX_RECORD_SIZE:
+                raise PcapError(f'Corrupt pcap record ({length} bytes)')
+            start = pos + RECORD_HEADER_SIZE
+            if end - start < length:
+                break
+            frames.append((sec + frac * scale, bytes(buf[start:start + length])))
+            pos = start + length
+        del buf[:pos]
+        self.frames += len(frames)
+        return frames
+
+
+class PcapTail:
+    """Reads the frames appended to a capture file since the last read."""
+
+    def __init__(self, path: str, chunk_size: int = 1 << 20):
+        """
+        Initialize tail.
+
+        Args:
+            path: Capture file (may not exist yet)
+            chunk_size: Most bytes read per call, so a large backlog is
+                worked through over several calls
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.restarts = 0
+        self._file_id: tuple[int, int] | None = None
+        self._reader = PcapReader()
+
+    @property
+    def linktype(self) -> int | None:
+        return self._reader.linktype
+
+    def read(self) -> list[tuple[float, bytes]] | None:
+        """
+        Read newly written frames.
+
+        Returns:
+            Frames (empty if the file has not grown), or None if the file
+            does not exist yet
+
+        Raises:
+            PcapError: If the file is not a pcap capture
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        file_id = (st.st_dev, st.st_ino)
+        if file_id != self._file_id or st.st_size < self.offset:
+            # New or truncated capture: start from its header again
+            if self._file_id is not None:
+                self.restarts += 1
+            self._file_id = file_id
+            self.offset = 0
+            self._reader = PcapReader()
+        if st.st_size == self.offset:
+            return []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read(self.chunk_size)
+        except OSError:
+            return None
+        self.offset += len(data)
+        return self._reader.feed(data)
+
+
+def parse_radiotap(data: bytes) -> tuple[int, int | None, int | None, bool]:
+    """
+    Parse the start of a radiotap header.
+
+    Returns:
+        (header length, dBm signal, channel frequency in MHz, whether the
+        frame ends with an FCS)
+    """
+    if len(data) < 8 or data[0] != 0:
+        return len(data), None, None, False
+    length = data[2] | data[3] << 8
+    present = int.from_bytes(data[4:8], 'little')
+    offset = 8
+    word = present
+    # Extended presence bitmaps come before the first field
+    while word & 0x80000000:
+        if offset + 4 > length:
+            return length, None, None, False
+        word = int.from_bytes(data[offset:offset + 4], 'little')
+        offset += 4
+
+    signal = freq = None
+    fcs = False
+    for bit, (align, size) in enumerate(_RADIOTAP_FIELDS):
+        if not present & (1 << bit):
+            continue
+        offset = (offset + align - 1) & -align
+        if offset + size > length:
+            break
+        if bit == 1:
+            fcs = bool(data[offset] & _RADIOTAP_FLAG_FCS)
+        elif bit == 3:
+            freq = data[offset] | data[offset + 1] << 8
+        elif bit == 5:
+            signal = data[offset] - 256 if data[offset] > 127 else data[offset]
+        offset += size
+    return length, signal, freq, fcs
+
+
+def frequency_to_channel(freq: int) -> int | None:
+    """WiFi channel number for a centre frequency in MHz."""
+    if freq == 2484:
+        return 14
+    if 2412 <= freq < 2484:
+        return (freq - 2407) // 5
+    if 5000 <= freq <= 5900:
+        return (freq - 5000) // 5
+    if 5955 <= freq <= 7115:
+        return (freq - 5950) // 5
+    return None
+
+
+def _mac(data: bytes, pos: int) -> str:
+    return data[pos:pos + 6].hex(':').upper()
+
+
+def _suites(data: bytes, pos: int, end: int, names: dict[int, str]) -> tuple[list[str], int]:
+    """Suite list (count, then 4-byte selectors) at pos."""
+    if pos + 2 > end:
+        return [], end
+    count = data[pos] | data[pos + 1] << 8
+    pos += 2
+    found = []
+    for _ in range(count):
+        if pos + 4 > end:
+            break
+        name = names.get(data[pos + 3])
+        if name and name not in found:
+            found.append(name)
+        pos += 4
+    return found, pos
+
+
+def _security(data: bytes, capability: int, rsn: tuple[int, int] | None,
+              wpa: tuple[int, int] | None) -> tuple[str, str, str]:
+    """(privacy, cipher, auth) in airodump-ng's notation."""
+    privacy: list[str] = []
+    ciphers: list[str] = []
+    auths: list[str] = []
+    for span, version in ((rsn, 'WPA2'), (wpa, 'WPA')):
+        if span is None:
+            continue
+        start, end = span
+        # Version (2), group cipher (4), pairwise ciphers, AKMs
+        pairwise, pos = _suites(data, start + 6, end, CIPHER_SUITES)
+        akms, _ = _suites(data, pos, end, AKM_SUITES)
+        if version == 'WPA2' and 'SAE' in akms:
+            privacy.append('WPA3')
+            if akms != ['SAE']:
+                privacy.append('WPA2')
+        else:
+            privacy.append(version)
+        ciphers += [c for c in pairwise if c not in ciphers]
+        auths += [a for a in akms if a not in auths]
+    if privacy:
+        return ' '.join(privacy), ' '.join(ciphers), ' '.join(auths)
+    if capability & 0x10:
+        return 'WEP', 'WEP', ''
+    return 'OPN', '', ''
+
+
+def _elements(data: bytes, pos: int, end: int) -> tuple[str | None, int | None, tuple | None, tuple | None]:
+    """SSID, DS channel and RSN/WPA spans from the information elements at pos."""
+    ssid = channel = rsn = wpa = None
+    while pos + 2 <= end:
+        eid = data[pos]
+        start = pos + 2
+        pos = start + data[pos + 1]
+        if pos > end:
+            break
+        if eid == 0:
+            raw = data[start:pos]
+            ssid = '' if not raw.strip(b'\x00') else raw.decode('utf-8', errors='replace')
+        elif eid == 3 and pos > start:
+            channel = data[start]
+        elif eid == 48:
+            rsn = (start, pos)
+        elif eid == 221 and data[start:start + 4] == WPA_VENDOR_IE:
+            wpa = (start + 4, pos)
+    return ssid, channel, rsn, wpa
+
+
+def _eapol_message(key_info: int) -> int | None:
+    """4-way handshake message number from EAPOL-Key key information bits."""
+    ack = key_info & 0x0080
+    mic = key_info & 0x0100
+    if not key_info & 0x0008:  # group key handshake
+        return None
+    if ack and not mic:
+        return 1
+    if ack and mic:
+        return 3
+    if mic and key_info & 0x0200:
+        return 4
+    if mic:
+        return 2
+    return None
+
+
+def parse_dot11(data: bytes, signal: int | None = None, freq: int | None = None) -> Dot11Frame | None:
+    """
+    Decode an 802.11 frame (without radiotap header or FCS).
+
+    Returns:
+        The frame, or None for frame types the tracker does not use
+    """
+    if len(data) < 24:
+        return None
+    fc = data[0]
+    flags = data[1]
+    if fc & 0x03:
+        return None
+    ftype = (fc >> 2) & 0x03
+    subtype = fc >> 4
+    channel = frequency_to_channel(freq) if freq else None
+    transmitter = _mac(data, 10)
+    end = len(data)
+
+    if ftype == 0:
+        if flags & 0x40:  # protected management frame
+            return None
+        header = 28 if flags & 0x80 else 24
+        if subtype in (BEACON, PROBE_RESPONSE):
+            if header + 12 > end:
+                return None
+            capability = data[header + 10] | data[header + 11] << 8
+            ssid, ds_channel, rsn, wpa = _elements(data, header + 12, end)
+            return Dot11Frame(
+                'beacon' if subtype == BEACON else 'probe_response', transmitter, _mac(data, 16), None,
+                signal, ds_channel or channel, ssid, _security(data, capability, rsn, wpa), None,
+            )
+        if subtype == PROBE_REQUEST:
+            ssid = _elements(data, header, end)[0]
+            return Dot11Frame('probe_request', transmitter, None, transmitter, signal, channel, ssid, None, None)
+        if subtype in (ASSOC_REQUEST, REASSOC_REQUEST):
+            fixed = 4 if subtype == ASSOC_REQUEST else 10
+            ssid = _elements(data, header + fixed, end)[0]
+            return Dot11Frame('association', transmitter, _mac(data, 16), transmitter,
+                              signal, channel, ssid, None, None)
+        if subtype in (ASSOC_RESPONSE, REASSOC_RESPONSE):
+            # Status code 0: the station is now associated
+            if header + 4 > end or data[header + 2] or data[header + 3]:
+                return None
+            return Dot11Frame('association', transmitter, _mac(data, 16), _mac(data, 4),
+                              signal, channel, None, None, None)
+        return None
+
+    if ftype != 2:
+        return None
+    ds = flags & 0x03
+    if ds == 1:  # to the AP
+        bssid, station = _mac(data, 4), transmitter
+    elif ds == 2:  # from the AP
+        bssid, station = transmitter, _mac(data, 4)
+    elif ds == 0:  # ad hoc
+        bssid, station = _mac(data, 16), transmitter
+    else:  # WDS bridge
+        return None
+    if int(station[:2], 16) & 0x01:  # broadcast/multicast destination
+        station = None
+
+    eapol = None
+    if not flags & 0x40 and not subtype & 0x04:
+        header = 24
+        if subtype & 0x08:  # QoS data
+            header += 6 if flags & 0x80 else 2
+        if data[header:header + 8] == LLC_EAPOL and header + 15 <= end and data[header + 9] == EAPOL_KEY:
+            # EAPOL header (4), descriptor type (1), key information (2)
+            eapol = _eapol_message(data[header + 13] << 8 | data[header + 14])
+    return Dot11Frame('eapol' if eapol else 'data', transmitter, bssid, station,
+                      signal, channel, None, None, eapol)
+
+
+def parse_frame(linktype: int | None, data: bytes) -> Dot11Frame | None:
+    """Decode a captured frame of the given pcap link type."""
+    if linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+        length, signal, freq, fcs = parse_radiotap(data)
+        end = len(data) - 4 if fcs else len(data)
+        return parse_dot11(data[length:end], signal, freq)
+    if linktype == LINKTYPE_IEEE802_11:
+        return parse_dot11(data)
+    return None
+
+
+class FrameTracker:
+    """Feeds decoded frames into an AirodumpIngest's network and client records."""
+
+    def __init__(self, ingest: AirodumpIngest, max_handshakes: int = 256):
+        """
+        Initialize tracker.
+
+        Args:
+            ingest: Shared with the CSV reader, so both sources update the
+                same records and only report real changes once
+            max_handshakes: (BSSID, client) pairs whose handshake progress
+                is remembered
+        """
+        self.ingest = ingest
+        self.max_handshakes = max_handshakes
+        self._handshakes: OrderedDict[tuple[str, str], set[int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.decoded = 0
+        self.kinds: dict[str, int] = {}
+
+    def process(
+        self, linktype: int | None, frames: list[tuple[float, bytes]]
+    ) -> tuple[list[RowChange], list[dict[str, Any]]]:
+        """
+        Decode captured frames and update the records.
+
+        Returns:
+            (record changes worth sending, handshake progress events)
+        """
+        changes: list[RowChange] = []
+        handshakes: list[dict[str, Any]] = []
+        networks = self.ingest.networks
+        for ts, data in frames:
+            self.frames += 1
+            frame = parse_frame(linktype, data)
+            if frame is None:
+                continue
+            self.decoded += 1
+            self.kinds[frame.kind] = self.kinds.get(frame.kind, 0) + 1
+            kind = frame.kind
+
+            if kind in ('beacon', 'probe_response'):
+                privacy, cipher, auth = frame.security
+                fields = {'channel': str(frame.channel) if frame.channel else '',
+                          'privacy': privacy, 'cipher': cipher, 'auth': auth}
+                if frame.ssid:
+                    fields['essid'] = frame.ssid
+                elif frame.bssid not in networks:
+                    fields['essid'] = 'Hidden'
+                change = self.ingest.observe('network', frame.bssid, fields, frame.signal, ts)
+            elif kind == 'probe_request':
+                fields = {}
+                if frame.ssid:
+                    record = self.ingest.clients.get(frame.station)
+                    probes = record['probes'] if record else ''
+                    if frame.ssid not in probes.split(','):
+                        fields['probes'] = f'{probes},{frame.ssid}' if probes else frame.ssid
+                change = self.ingest.observe('client', frame.station, fields, frame.signal, ts)
+            else:
+                if frame.station is None:
+                    continue
+                # The signal belongs to whichever end sent the frame
+                client_signal = frame.signal if frame.transmitter == frame.station else None
+                change = self.ingest.observe('client', frame.station, {'bssid': frame.bssid}, client_signal, ts)
+                if frame.eapol:
+                    event = self._handshake(frame)
+                    if event:
+                        handshakes.append(event)
+            if change is not None:
+                changes.append(change)
+        return changes, handshakes
+
+    def _handshake(self, frame: Dot11Frame) -> dict[str, Any] | None:
+        """Progress event when a pair's handshake gains a message."""
+        pair = (frame.bssid, frame.station)
+        with self._lock:
+            messages = self._handshakes.get(pair)
+            if messages is None:
+                messages = self._handshakes[pair] = set()
+                while len(self._handshakes) > self.max_handshakes:
+                    self._handshakes.popitem(last=False)
+            else:
+                self._handshakes.move_to_end(pair)
+            if frame.eapol in messages:
+                return None
+            messages.add(frame.eapol)
+            return {
+                'bssid': frame.bssid,
+                'client': frame.station,
+                'messages': sorted(messages),
+                # M1+M2 or M2+M3 are enough to test a passphrase
+                'complete': 2 in messages and (1 in messages or 3 in messages),
+            }
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            complete = sum(1 for m in self._handshakes.values() if 2 in m and (1 in m or 3 in m))
+        return {
+            'frames': self.frames,
+            'decoded': self.decoded,
+            'kinds': dict(self.kinds),
+            'handshakes': complete,
+        }
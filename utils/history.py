@@ -0,0 +1,501 @@
+"""
+Persistent event history in SQLite.
+
+Decoder threads hand events to HistoryWriter.record(), which only appends
+to an in-memory deque and never touches the disk. A single writer thread
+drains the deque every flush interval (or sooner once a batch has built
+up) and inserts each mode's rows with one executemany() per table inside
+one transaction. The database runs in WAL mode, so the history routes can
+read while the writer appends, and rows older than the retention period
+are deleted periodically.
+
+Each mode has its own table with a few indexed columns for the common
+lookups; remaining event fields are kept as JSON in the data column.
+
+Pager messages are also indexed for full-text search: an FTS5 table over
+the pager table's message and address columns is filled in the same
+transaction as each batch, so search() can answer phrase, prefix, address
+and time-range queries without scanning, and decoders still never wait on
+the index. Modes can keep rows longer than the default retention (pager
+messages are worth keeping for weeks).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any
+
+logger = logging.getLogger('intercept.history')
+
+# Table per mode: column -> event key. Every table also has ts and data columns.
+SCHEMAS: dict[str, dict[str, str]] = {
+    'adsb': {
+        'icao': 'icao', 'callsign': 'callsign', 'altitude': 'altitude', 'lat': 'lat', 'lon': 'lon',
+        'speed': 'speed', 'heading': 'heading', 'vertical_rate': 'vertical_rate', 'squawk': 'squawk',
+    },
+    'pager': {
+        'protocol': 'protocol', 'address': 'address', 'function': 'function',
+        'msg_type': 'msg_type', 'message': 'message',
+    },
+    'sensor': {'model': 'model', 'device_id': 'id', 'channel': 'channel'},
+    'wifi': {
+        'kind': 'kind', 'bssid': 'bssid', 'mac': 'mac', 'essid': 'essid',
+        'channel': 'channel', 'power': 'power', 'privacy': 'privacy',
+    },
+    'bluetooth': {'mac': 'mac', 'name': 'name', 'manufacturer': 'manufacturer', 'rssi': 'rssi'},
+}
+
+# Column searched by /history/<mode>?key=...
+KEY_COLUMNS = {'adsb': 'icao', 'pager': 'address', 'sensor': 'model', 'wifi': 'bssid', 'bluetooth': 'mac'}
+
+# Fields never worth storing (SSE message plumbing)
+_SKIP_KEYS = frozenset({'type', 'action'})
+
+# Full-text indexed columns per mode. The FTS5 tables use the mode table as
+# external content keyed by its rowid (stable as long as the file is never
+# VACUUMed).
+FTS_COLUMNS: dict[str, tuple[str, ...]] = {'pager': ('message', 'address')}
+
+# "quoted phrase" or bare term (a trailing * makes it a prefix)
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn a search box string into an FTS5 MATCH expression.
+
+    Words are ANDed; "double quotes" match a phrase and a trailing * a
+    prefix (fire* ambul*). Every term is quoted, so FTS5 operators and
+    punctuation in the input are matched literally instead of raising
+    syntax errors.
+
+    Raises:
+        ValueError: If the text contains no terms
+    """
+    terms = []
+    for phrase, word in _SEARCH_TERM.findall(text):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        elif word:
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '""')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+    if not terms:
+        raise ValueError('Empty search query')
+    return ' '.join(terms)
+
+
+class HistoryWriter:
+    """Non-blocking event sink with a single batching SQLite writer thread."""
+
+    def __init__(
+        self,
+        path: str,
+        retention_hours: float = 24.0,
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_pending: int = 200_000,
+        mode_retention_hours: dict[str, float] | None = None,
+    ):
+        """
+        Initialize writer (nothing is opened until start()).
+
+        Args:
+            path: SQLite database file
+            retention_hours: Age after which rows are deleted (0 keeps everything)
+            mode_retention_hours: Per-mode overrides of retention_hours
+            batch_size: Pending events that wake the writer before the flush interval
+            flush_interval: Seconds between writes
+            max_pending: Events held in memory if the disk falls behind; beyond
+                this the oldest are dropped rather than blocking decoders
+        """
+        self.path = path
+        self.retention = retention_hours * 3600
+        self._retention = {mode: (mode_retention_hours or {}).get(mode, retention_hours) * 3600
+                           for mode in SCHEMAS}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self.pruned = 0
+        self.last_batch_ms = 0.0
+
+        self._pending: deque[tuple[str, float, dict[str, Any]]] = deque(maxlen=max_pending)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_prune = 0.0
+        self._keys = {mode: tuple(columns.values()) for mode, columns in SCHEMAS.items()}
+        self._skip = {mode: _SKIP_KEYS | set(keys) for mode, keys in self._keys.items()}
+        self._inserts = {
+            mode: f"INSERT INTO {mode} (ts, {', '.join(columns)}, data) "
+                  f"VALUES ({', '.join('?' * (len(columns) + 2))})"
+            for mode, columns in SCHEMAS.items()
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def record(self, mode: str, event: dict[str, Any], ts: float | None = None) -> None:
+        """
+        Queue one event for writing. Never blocks on disk.
+
+        Args:
+            mode: One of SCHEMAS
+            event: Decoded event; must not be modified afterwards
+            ts: Event time (default now)
+        """
+        if self._thread is None:
+            return
+        pending = self._pending
+        if len(pending) >= self.max_pending:
+            self.dropped += 1
+        pending.append((mode, time.time() if ts is None else ts, event))
+        self.recorded += 1
+        if len(pending) >= self.batch_size:
+            self._wake.set()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        with conn:
+            for mode, columns in SCHEMAS.items():
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {mode} "
+                    f"(ts REAL NOT NULL, {', '.join(columns)}, data TEXT)"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {mode}_ts ON {mode} (ts)")
+                key = KEY_COLUMNS[mode]
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {mode}_{key} ON {mode} ({key}, ts)")
+            for mode, columns in FTS_COLUMNS.items():
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = ?", (f'{mode}_fts',)
+                ).fetchone()
+                conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {mode}_fts USING fts5"
+                    f"({', '.join(columns)}, content='{mode}', content_rowid='rowid')"
+                )
+                if not exists:
+                    # Index rows written before full-text search existed
+                    conn.execute(f"INSERT INTO {mode}_fts ({mode}_fts) VALUES ('rebuild')")
+
+    def start(self) -> None:
+        """Create the database and start the writer thread."""
+        if self._thread is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            self._create_tables(conn)
+        finally:
+            conn.close()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+        logger.info(f"History writer started: {self.path}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write everything still pending and stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._write_pending(conn)
+                if self._prune_due():
+                    self._prune(conn)
+            self._write_pending(conn)
+        finally:
+            conn.close()
+
+    def _row(self, mode: str, ts: float, event: dict[str, Any]) -> tuple[Any, ...]:
+        keys = self._keys[mode]
+        skip = self._skip[mode]
+        extra = {k: v for k, v in event.items() if k not in skip and v is not None}
+        return (ts, *(event.get(key) for key in keys), json.dumps(extra, default=str) if extra else None)
+
+    def _write_pending(self, conn: sqlite3.Connection) -> None:
+        pending = self._pending
+        while pending:
+            start = time.perf_counter()
+            batches: dict[str, list[tuple[Any, ...]]] = {}
+            count = 0
+            # Bound the transaction size if the queue built up
+            while pending and count < self.batch_size * 10:
+                mode, ts, event = pending.popleft()
+                if mode not in SCHEMAS:
+                    continue
+                batches.setdefault(mode, []).append(self._row(mode, ts, event))
+                count += 1
+            try:
+                with conn:
+                    for mode, rows in batches.items():
+                        columns = FTS_COLUMNS.get(mode)
+                        if columns:
+                            last = conn.execute(f"SELECT max(rowid) FROM {mode}").fetchone()[0] or 0
+                        conn.executemany(self._inserts[mode], rows)
+                        if columns:
+                            conn.execute(
+                                f"INSERT INTO {mode}_fts (rowid, {', '.join(columns)}) "
+                                f"SELECT rowid, {', '.join(columns)} FROM {mode} WHERE rowid > ?", (last,)
+                            )
+            except sqlite3.Error as e:
+                self.errors += 1
+                self.dropped += count
+                logger.error(f"History write failed, {count} events lost: {e}")
+                return
+            self.written += count
+            self.batches += 1
+            self.last_batch_ms = (time.perf_counter() - start) * 1000
+
+    def _prune_due(self) -> bool:
+        shortest = min((r for r in self._retention.values() if r > 0), default=0)
+        return shortest > 0 and time.time() - self._last_prune > min(300.0, shortest / 10)
+
+    def prune(self, now: float | None = None) -> int:
+        """
+        Delete rows older than the retention period now (the writer thread
+        also does this periodically).
+
+        Returns:
+            Number of rows deleted
+        """
+        if not any(r > 0 for r in self._retention.values()) or not os.path.exists(self.path):
+            return 0
+        pruned = self.pruned
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            self._prune(conn, now)
+        finally:
+            conn.close()
+        return self.pruned - pruned
+
+    def _prune(self, conn: sqlite3.Connection, now: float | None = None) -> None:
+        self._last_prune = time.time()
+        if now is None:
+            now = self._last_prune
+        try:
+            with conn:
+                for mode, retention in self._retention.items():
+                    if retention <= 0:
+                        continue
+                    cutoff = now - retention
+                    columns = FTS_COLUMNS.get(mode)
+                    if columns:
+                        # External content: the index needs the old values to remove rows
+                        conn.execute(
+                            f"INSERT INTO {mode}_fts ({mode}_fts, rowid, {', '.join(columns)}) "
+                            f"SELECT 'delete', rowid, {', '.join(columns)} FROM {mode} WHERE ts < ?", (cutoff,)
+                        )
+                    self.pruned += conn.execute(f"DELETE FROM {mode} WHERE ts < ?", (cutoff,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"History pruning failed: {e}")
+
+    def query(
+        self,
+        mode: str,
+        key: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """
+        Read stored events, newest first.
+
+        Args:
+            mode: One of SCHEMAS
+            key: Only events for this KEY_COLUMNS value (ICAO, pager address, ...)
+            since: Only events at or after this time
+            until: Only events before this time
+            limit: Maximum rows
+
+        Raises:
+            ValueError: For an unknown mode
+        """
+        if mode not in SCHEMAS:
+            raise ValueError(f'Unknown history mode: {mode}')
+        if not os.path.exists(self.path):
+            return []
+        clauses = []
+        params: list[Any] = []
+        if key is not None:
+            clauses.append(f'{KEY_COLUMNS[mode]} = ?')
+            params.append(key)
+        if since is not None:
+            clauses.append('ts >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('ts < ?')
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(limit)
+
+        columns = ('ts', *SCHEMAS[mode])
+        conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, timeout=10)
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(columns)}, data FROM {mode} {where} ORDER BY ts DESC LIMIT ?", params
+            ).fetchall()
+        finally:
+            conn.close()
+
+        result = []
+        for row in rows:
+            event = {column: value for column, value in zip(columns, row) if value is not None}
+            if row[-1]:
+                event.update(json.loads(row[-1]))
+            result.append(event)
+        return result
+
+    def search(
+        self,
+        mode: str = 'pager',
+        text: str | None = None,
+        key: str | None = None,
+        protocol: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        before: int | None = None,
+        limit: int = 50,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Search stored messages, newest first, one page at a time.
+
+        Args:
+            mode: A mode with FTS_COLUMNS
+            text: Search string (see build_match_query)
+            key: Only this KEY_COLUMNS value (pager address)
+            protocol: Only this protocol
+            since: Only events at or after this time
+            until: Only events before this time
+            before: Cursor from the previous page
+            limit: Page size
+
+        Returns:
+            (events, cursor for the next page or None); each event has an 'id'
+
+        Raises:
+            ValueError: For a mode without full-text search or an empty text query
+        """
+        if mode not in FTS_COLUMNS:
+            raise ValueError(f'No full-text search for mode: {mode}')
+        match = build_match_query(text) if text is not None else None
+        if not os.path.exists(self.path):
+            return [], None
+
+        columns = ('ts', *SCHEMAS[mode])
+        conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, timeout=10)
+        try:
+            # Rows are appended in time order, so a time range is also a rowid
+            # range, which both the FTS index and the table can seek to directly
+            low = high = None
+            if since is not None:
+                row = conn.execute(f"SELECT rowid FROM {mode} WHERE ts >= ? ORDER BY ts LIMIT 1",
+                                   (since,)).fetchone()
+                if row is None:
+                    return [], None
+                low = row[0]
+            if until is not None:
+                row = conn.execute(f"SELECT rowid FROM {mode} WHERE ts < ? ORDER BY ts DESC LIMIT 1",
+                                   (until,)).fetchone()
+                if row is None:
+                    return [], None
+                high = row[0]
+            if before is not None:
+                high = before - 1 if high is None else min(high, before - 1)
+
+            clauses: list[str] = []
+            params: list[Any] = []
+            if match is not None:
+                source = f"{mode}_fts f JOIN {mode} m ON m.rowid = f.rowid"
+                order = 'f.rowid'
+                key_column = KEY_COLUMNS[mode]
+                if key is not None and key_column in FTS_COLUMNS[mode]:
+                    # Let the index intersect on the key too (rows are still
+                    # checked for an exact match below)
+                    match += f' {key_column} : "' + key.replace('"', '""') + '"'
+                clauses.append(f"{mode}_fts MATCH ?")
+                params.append(match)
+            else:
+                source = f"{mode} m"
+                order = 'm.rowid'
+            if low is not None:
+                clauses.append(f'{order} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{order} <= ?')
+                params.append(high)
+            if key is not None:
+                clauses.append(f'm.{KEY_COLUMNS[mode]} = ?')
+                params.append(key)
+            if protocol is not None:
+                clauses.append('m.protocol = ?')
+                params.append(protocol)
+            if since is not None:
+                clauses.append('m.ts >= ?')
+                params.append(since)
+            if until is not None:
+                clauses.append('m.ts < ?')
+                params.append(until)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+            params.append(limit)
+            rows = conn.execute(
+                f"SELECT m.rowid, {', '.join('m.' + c for c in columns)}, m.data FROM {source} "
+                f"{where} ORDER BY {order} DESC LIMIT ?", params
+            ).fetchall()
+        finally:
+            conn.close()
+
+        result = []
+        for row in rows:
+            event = {'id': row[0]}
+            event.update((column, value) for column, value in zip(columns, row[1:]) if value is not None)
+            if row[-1]:
+                event.update(json.loads(row[-1]))
+            result.append(event)
+        cursor = rows[-1][0] if len(rows) == limit else None
+        return result, cursor
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'running': self.running,
+            'path': self.path,
+            'pending': len(self._pending),
+            'recorded': self.recorded,
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'errors': self.errors,
+            'pruned': self.pruned,
+            'last_batch_ms': round(self.last_batch_ms, 2),
+            'retention_hours': self.retention / 3600,
+        }
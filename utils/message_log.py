@@ -0,0 +1,243 @@
+"""
+Buffered, rotating log file for decoded messages.
+
+Decoders call MessageLog.write(), which formats the line and appends it to
+an in-memory buffer. A background thread writes the buffer to a
+long-lived file handle every flush interval, so a busy decoder costs one
+write() per second instead of an open/write/close per message (which
+hurts on SD-card Raspberry Pis).
+
+The file is rotated when it reaches max_bytes or has been open for
+rotate_seconds. Rotated files get a timestamp in their name, are
+optionally gzipped, and only the newest backups are kept.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Any, TextIO
+
+logger = logging.getLogger('intercept.messagelog')
+
+LOG_FORMATS = ('text', 'jsonl')
+
+
+class MessageLog:
+    """Shared message log sink with background flushing and rotation."""
+
+    def __init__(
+        self,
+        path: str,
+        log_format: str = 'text',
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_seconds: float = 86400.0,
+        backups: int = 7,
+        compress: bool = True,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Initialize sink (the file is opened on the first flush).
+
+        Args:
+            path: Log file
+            log_format: 'text' ("timestamp | field | field" lines) or 'jsonl'
+            max_bytes: Rotate once the file reaches this size (0 disables)
+            rotate_seconds: Rotate once the file has been open this long (0 disables)
+            backups: Rotated files kept per log
+            compress: Gzip rotated files
+            flush_interval: Seconds between writes to disk
+
+        Raises:
+            ValueError: For an unknown log_format
+        """
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f'Unknown log format: {log_format}')
+        self.path = path
+        self.log_format = log_format
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+
+        self.lines_written = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.errors = 0
+
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._file: TextIO | None = None
+        self._file_path: str | None = None
+        self._opened_at = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self, source: str, fields: dict[str, Any], text: str | None = None) -> None:
+        """
+        Queue one message.
+
+        Args:
+            source: Decoder name, e.g. 'pager' or 'sensor'
+            fields: Message fields (the JSONL record)
+            text: Body of the text format line after the timestamp; defaults
+                to the field values separated by ' | '
+        """
+        now = time.time()
+        if self.log_format == 'jsonl':
+            record = {'timestamp': datetime.fromtimestamp(now).isoformat(timespec='seconds'), 'source': source}
+            for key, value in fields.items():
+                record.setdefault(key, value)
+            line = json.dumps(record, default=str)
+        else:
+            if text is None:
+                text = ' | '.join(str(value) for value in fields.values())
+            line = f"{datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')} | {text}"
+        with self._lock:
+            self._buffer.append(line + '\n')
+            if self._thread is None:
+                self._start()
+
+    def _start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='message-log', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def set_path(self, path: str) -> None:
+        """Write what's pending to the current file, then switch files."""
+        if path == self.path:
+            return
+        self.flush()
+        with self._io_lock:
+            self._close_file()
+            self.path = path
+
+    def set_format(self, log_format: str) -> None:
+        """
+        Switch between 'text' and 'jsonl' for subsequent messages.
+
+        Raises:
+            ValueError: For an unknown format
+        """
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f'Unknown log format: {log_format}')
+        self.log_format = log_format
+
+    def flush(self) -> None:
+        """Write buffered lines to disk, rotating first if due."""
+        with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+        with self._io_lock:
+            try:
+                f = self._open_file()
+                f.write(''.join(lines))
+                f.flush()
+            except OSError as e:
+                self.errors += 1
+                logger.error(f"Failed to write {len(lines)} messages to {self.path}: {e}")
+                self._close_file()
+                return
+            self.lines_written += len(lines)
+            self.flushes += 1
+
+    def _open_file(self) -> TextIO:
+        if self._file is not None and self._rotation_due():
+            self._rotate()
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with contextlib.ExitStack() as stack:
+                self._file = stack.enter_context(open(self.path, 'a', encoding='utf-8'))
+                # Kept open across flushes until rotated or closed
+                stack.pop_all()
+            self._file_path = self.path
+            self._opened_at = time.time()
+        return self._file
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+            self._file_path = None
+
+    def _rotation_due(self) -> bool:
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._opened_at >= self.rotate_seconds
+
+    def rotated_name(self, when: float | None = None) -> str:
+        """Name for the current file once rotated, e.g. pager_messages.20240101-120000.log."""
+        stem, ext = os.path.splitext(self.path)
+        stamp = datetime.fromtimestamp(time.time() if when is None else when).strftime('%Y%m%d-%H%M%S')
+        return f'{stem}.{stamp}{ext}'
+
+    def _rotate(self) -> None:
+        path = self._file_path
+        self._close_file()
+        target = self.rotated_name()
+        suffix = 1
+        while os.path.exists(target) or os.path.exists(target + '.gz'):
+            stem, ext = os.path.splitext(self.rotated_name())
+            target = f'{stem}-{suffix}{ext}'
+            suffix += 1
+        os.replace(path, target)
+        if self.compress:
+            with open(target, 'rb') as src, gzip.open(target + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+        self.rotations += 1
+        self._remove_old_backups()
+
+    def _remove_old_backups(self) -> None:
+        stem, ext = os.path.splitext(self.path)
+        pattern = glob.escape(stem) + '.[0-9]*' + ext
+        rotated = sorted(glob.glob(pattern) + glob.glob(pattern + '.gz'),
+                         key=lambda name: (os.path.getmtime(name), name))
+        for old in rotated[:max(0, len(rotated) - self.backups)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """Flush, stop the background thread and close the file."""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join(5)
+            self._thread = None
+        self.flush()
+        with self._io_lock:
+            self._close_file()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'path': self.path,
+            'format': self.log_format,
+            'pending': len(self._buffer),
+            'lines_written': self.lines_written,
+            'flushes': self.flushes,
+            'rotations': self.rotations,
+            'errors': self.errors,
+        }
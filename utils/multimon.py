@@ -0,0 +1,261 @@
+"""
+multimon-ng output parsing.
+
+Every multimon-ng decoder prefixes its output with its own name
+("POCSAG1200: ...", "FLEX|...", "EAS: ...", "AFSK1200: ..."), so the
+parser reads the first token of a line and hands the rest to the one
+decoder registered for it, instead of trying every pattern in turn. All
+patterns are compiled once at import.
+
+Decoders live in a table (register_decoder()); each produces the same
+protocol/address/function/msg_type/message fields the pager UI shows,
+plus decoder-specific extras. AX.25 (AFSK1200/APRS) prints the frame
+header and payload on separate lines, so MultimonParser keeps that one
+piece of state between lines.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+Message = dict[str, Any]
+
+# First token: decoder name up to ':', '|' or whitespace
+_TOKEN = re.compile(r'[^:|\s]+')
+
+
+@dataclass(frozen=True)
+class MultimonDecoder:
+    """One multimon-ng demodulator and the parser for its output."""
+
+    name: str
+    # First tokens this decoder prints (e.g. EAS prints "EAS:" and "EAS (part):")
+    prefixes: tuple[str, ...]
+    # Parses a line given its first token and the remainder after it
+    parse: Callable[[str, str], Message | None]
+    # Output spans two lines (header, then payload): see MultimonParser
+    continued: Callable[[Message, str], Message] | None = None
+    # multimon-ng arguments enabling the decoder
+    args: tuple[str, ...] = field(default=())
+
+    def multimon_args(self) -> list[str]:
+        return list(self.args or ('-a', self.name))
+
+
+DECODERS: dict[str, MultimonDecoder] = {}
+_BY_PREFIX: dict[str, MultimonDecoder] = {}
+
+
+def register_decoder(decoder: MultimonDecoder) -> None:
+    """Add (or replace) a decoder in the dispatch table."""
+    DECODERS[decoder.name] = decoder
+    for prefix in decoder.prefixes:
+        _BY_PREFIX[prefix] = decoder
+
+
+def multimon_args(names: list[str]) -> list[str]:
+    """multimon-ng '-a' arguments for the named decoders (unknown names are skipped)."""
+    args: list[str] = []
+    for name in names:
+        decoder = DECODERS.get(name)
+        if decoder is not None:
+            args.extend(decoder.multimon_args())
+    return args
+
+
+# ============================================
+# POCSAG / FLEX
+# ============================================
+
+_POCSAG = re.compile(
+    r':\s*Address:\s*(\d+)\s+Function:\s*(\d+)(?:\s+(Alpha|Numeric):\s*(.*)|\s*$)'
+)
+_FLEX = re.compile(
+    r'[:\|]\s*[\d\-]+[\s\|]+[\d:]+[\s\|]+([\d/A-Z]+)[\s\|]+([\d.]+)[\s\|]+\[?(\d+)\]?[\s\|]+(\w+)[\s\|]+(.*)'
+)
+_FLEX_SIMPLE = re.compile(r':\s*(.+)')
+
+
+def _parse_pocsag(token: str, rest: str) -> Message | None:
+    match = _POCSAG.match(rest)
+    if not match:
+        return None
+    address, function, msg_type, message = match.groups()
+    if msg_type is None:
+        return {'protocol': token, 'address': address, 'function': function,
+                'msg_type': 'Tone', 'message': '[Tone Only]'}
+    return {'protocol': token, 'address': address, 'function': function,
+            'msg_type': msg_type, 'message': message.strip() or '[No Message]'}
+
+
+def _parse_flex(token: str, rest: str) -> Message | None:
+    match = _FLEX.match(rest)
+    if match:
+        return {'protocol': 'FLEX', 'address': match.group(3), 'function': match.group(1),
+                'msg_type': match.group(4), 'message': match.group(5).strip() or '[No Message]'}
+    match = _FLEX_SIMPLE.match(rest)
+    if match:
+        return {'protocol': 'FLEX', 'address': 'Unknown', 'function': '',
+                'msg_type': 'Unknown', 'message': match.group(1).strip()}
+    return None
+
+
+# ============================================
+# EAS (SAME headers)
+# ============================================
+
+# ZCZC-ORG-EEE-PSSCCC-PSSCCC+TTTT-JJJHHMM-LLLLLLLL-
+_SAME = re.compile(
+    r'ZCZC-([A-Z]{3})-([A-Z0-9]{3})-((?:\d{6}-?)+)\+(\d{4})-(\d{7})-([^-]{1,8})-?'
+)
+_EAS = re.compile(r'(?:\s*\(part\))?:\s*(.*)')
+
+
+def _parse_eas(token: str, rest: str) -> Message | None:
+    match = _EAS.match(rest)
+    if not match:
+        return None
+    text = match.group(1).strip()
+    header = _SAME.search(text)
+    if header:
+        originator, event, locations, duration, issued, station = header.groups()
+        return {
+            'protocol': 'EAS', 'address': station.strip(), 'function': originator,
+            'msg_type': event, 'message': text,
+            'originator': originator, 'event': event,
+            'locations': [loc for loc in locations.split('-') if loc],
+            'duration': f'{duration[:2]}:{duration[2:]}', 'issued': issued,
+        }
+    if text.startswith('NNNN'):
+        return {'protocol': 'EAS', 'address': '', 'function': '', 'msg_type': 'End of Message',
+                'message': text}
+    return None
+
+
+# ============================================
+# DTMF / ZVEI tone sequences
+# ============================================
+
+_TONES = re.compile(r':\s*([0-9A-FR*#]+)\s*$')
+
+
+def _parse_tones(token: str, rest: str) -> Message | None:
+    match = _TONES.match(rest)
+    if not match:
+        return None
+    tones = match.group(1)
+    return {'protocol': token, 'address': tones if token != 'DTMF' else '', 'function': '',
+            'msg_type': 'Tone Sequence' if token != 'DTMF' else 'DTMF', 'message': tones}
+
+
+# ============================================
+# AFSK1200 (AX.25 / APRS)
+# ============================================
+
+_AX25 = re.compile(r':\s*fm\s+(\S+)\s+to\s+(\S+)(?:\s+via\s+(\S+))?(?:\s+(.*?))?\s*$')
+
+
+def _parse_ax25(token: str, rest: str) -> Message | None:
+    match = _AX25.match(rest)
+    if not match:
+        return None
+    source, destination, path, frame = match.groups()
+    return {
+        'protocol': token, 'address': source, 'function': destination,
+        'msg_type': 'APRS', 'message': '[No Payload]',
+        'source': source, 'destination': destination,
+        'path': path.split(',') if path else [], 'frame': frame or '',
+    }
+
+
+def _ax25_payload(header: Message, line: str) -> Message:
+    return {**header, 'message': line.strip() or '[No Payload]'}
+
+
+for _decoder in (
+    MultimonDecoder('POCSAG512', ('POCSAG512',), _parse_pocsag),
+    MultimonDecoder('POCSAG1200', ('POCSAG1200',), _parse_pocsag),
+    MultimonDecoder('POCSAG2400', ('POCSAG2400',), _parse_pocsag),
+    MultimonDecoder('FLEX', ('FLEX',), _parse_flex),
+    MultimonDecoder('EAS', ('EAS',), _parse_eas),
+    MultimonDecoder('DTMF', ('DTMF',), _parse_tones),
+    MultimonDecoder('AFSK1200', ('AFSK1200',), _parse_ax25, continued=_ax25_payload),
+    MultimonDecoder('ZVEI1', ('ZVEI1',), _parse_tones),
+    MultimonDecoder('ZVEI2', ('ZVEI2',), _parse_tones),
+    MultimonDecoder('ZVEI3', ('ZVEI3',), _parse_tones),
+):
+    register_decoder(_decoder)
+
+PAGER_DECODERS = ('POCSAG512', 'POCSAG1200', 'POCSAG2400', 'FLEX')
+
+
+def parse_multimon_line(line: str) -> Message | None:
+    """
+    Parse one line of multimon-ng output.
+
+    Returns:
+        Message fields, or None for lines no registered decoder recognises
+    """
+    line = line.strip()
+    token = _TOKEN.match(line)
+    if token is None:
+        return None
+    decoder = _BY_PREFIX.get(token.group())
+    if decoder is None:
+        return None
+    end = token.end()
+    return decoder.parse(line[:end], line[end:])
+
+
+class MultimonParser:
+    """Line parser that also joins two-line AX.25 output."""
+
+    def __init__(self):
+        self._pending: tuple[MultimonDecoder, Message] | None = None
+
+    @property
+    def waiting(self) -> bool:
+        """True while a header line is held back for its payload."""
+        return self._pending is not None
+
+    def feed(self, line: str) -> list[Message]:
+        """
+        Parse one line of output.
+
+        Returns:
+            Zero, one or (when a header without payload is followed by
+            another message) two messages
+        """
+        line = line.strip()
+        token = _TOKEN.match(line)
+        decoder = _BY_PREFIX.get(token.group()) if token is not None else None
+        result: list[Message] = []
+
+        if self._pending is not None:
+            pending_decoder, header = self._pending
+            self._pending = None
+            if decoder is None:
+                # The payload line following an AX.25 header
+                return [pending_decoder.continued(header, line)]
+            result.append(header)
+
+        if decoder is None:
+            return result
+        end = token.end()
+        message = decoder.parse(line[:end], line[end:])
+        if message is not None:
+            if decoder.continued is not None:
+                self._pending = (decoder, message)
+            else:
+                result.append(message)
+        return result
+
+    def flush(self) -> list[Message]:
+        """Return a header still waiting for its payload (at end of output)."""
+        if self._pending is None:
+            return []
+        header = self._pending[1]
+        self._pending = None
+        return [header]
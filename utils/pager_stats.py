@@ -0,0 +1,189 @@
+"""
+Pager message de-duplication and per-address statistics.
+
+Paging networks transmit the same page several times (and from several
+transmitters), and every copy comes out of multimon-ng. MessageDeduplicator
+drops copies of a POCSAG or FLEX page (protocol, address, message) already
+seen within a time window. Other decoders are passed through untouched: a
+repeated DTMF digit or ZVEI/EAS sequence is a new event, not a retransmission.
+
+AddressStats keeps running counters per capcode for /pager/addresses. Both
+are bounded: the oldest entries are evicted first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+# Protocols whose repeats are retransmissions of one page
+PAGING_PROTOCOLS = ('POCSAG', 'FLEX')
+
+
+def is_page(msg: dict[str, Any]) -> bool:
+    """Whether a decoded message is a POCSAG or FLEX page."""
+    return str(msg.get('protocol', '')).startswith(PAGING_PROTOCOLS)
+
+
+def message_key(msg: dict[str, Any]) -> tuple[str, str, bytes]:
+    """(protocol, address, message digest) identifying copies of one page."""
+    text = str(msg.get('message', ''))
+    return (
+        str(msg.get('protocol', '')),
+        str(msg.get('address', '')),
+        hashlib.blake2b(text.encode('utf-8', 'replace'), digest_size=8).digest(),
+    )
+
+
+class MessageDeduplicator:
+    """Sliding-window duplicate filter over a bounded TTL map."""
+
+    def __init__(self, window: float = 30.0, max_entries: int = 10000):
+        """
+        Initialize filter.
+
+        Args:
+            window: Seconds after a page during which identical copies are
+                dropped (0 disables de-duplication)
+            max_entries: Pages remembered at most; the oldest are forgotten
+                first if a busy network exceeds this within one window
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.accepted = 0
+        self.duplicates = 0
+        # key -> time first seen, oldest first
+        self._seen: OrderedDict[tuple[str, str, bytes], float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def accept(self, msg: dict[str, Any], now: float | None = None) -> bool:
+        """
+        Check one decoded page.
+
+        Returns:
+            True for the first copy, False for a repeat within the window
+            (always True for anything but a POCSAG/FLEX page)
+        """
+        if not is_page(msg):
+            return True
+        if self.window <= 0:
+            self.accepted += 1
+            return True
+        if now is None:
+            now = time.time()
+        key = message_key(msg)
+        cutoff = now - self.window
+        with self._lock:
+            seen = self._seen
+            while seen:
+                oldest_key, oldest = next(iter(seen.items()))
+                if oldest > cutoff and len(seen) < self.max_entries:
+                    break
+                del seen[oldest_key]
+            if key in seen:
+                self.duplicates += 1
+                return False
+            seen[key] = now
+            self.accepted += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seen.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'window': self.window,
+            'tracked': len(self._seen),
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+        }
+
+
+class AddressStats:
+    """Per-address counters, evicting the least recently heard addresses."""
+
+    def __init__(self, max_addresses: int = 5000):
+        """
+        Initialize counters.
+
+        Args:
+            max_addresses: Addresses tracked at most
+        """
+        self.max_addresses = max_addresses
+        self._addresses: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, msg: dict[str, Any], duplicate: bool = False, now: float | None = None) -> None:
+        """Count one decoded page (or a suppressed duplicate of one)."""
+        address = str(msg.get('address', ''))
+        if not address:
+            return
+        if now is None:
+            now = time.time()
+        with self._lock:
+            entry = self._addresses.get(address)
+            if entry is None:
+                entry = self._addresses[address] = {
+                    'address': address,
+                    'count': 0,
+                    'duplicates': 0,
+                    'first_seen': now,
+                    'last_seen': now,
+                    'protocols': {},
+                    'functions': {},
+                    'msg_types': {},
+                    'last_message': None,
+                }
+                if len(self._addresses) > self.max_addresses:
+                    self._addresses.popitem(last=False)
+            else:
+                self._addresses.move_to_end(address)
+            entry['last_seen'] = now
+            if duplicate:
+                entry['duplicates'] += 1
+                return
+            entry['count'] += 1
+            for field, counts in (('protocol', entry['protocols']), ('function', entry['functions']),
+                                  ('msg_type', entry['msg_types'])):
+                value = msg.get(field)
+                if value not in (None, ''):
+                    counts[value] = counts.get(value, 0) + 1
+            entry['last_message'] = msg.get('message')
+
+    def get(self, address: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._addresses.get(address)
+            return _copy_entry(entry) if entry is not None else None
+
+    def snapshot(self, sort: str = 'last_seen', limit: int | None = None) -> list[dict[str, Any]]:
+        """
+        Address counters, most active or most recent first.
+
+        Args:
+            sort: 'last_seen', 'count' or 'first_seen'
+
+        Raises:
+            ValueError: For an unknown sort key
+        """
+        if sort not in ('last_seen', 'count', 'first_seen'):
+            raise ValueError(f'Unknown sort key: {sort}')
+        with self._lock:
+            entries = [_copy_entry(entry) for entry in self._addresses.values()]
+        entries.sort(key=lambda entry: entry[sort], reverse=True)
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._addresses.clear()
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+
+def _copy_entry(entry: dict[str, Any]) -> dict[str, Any]:
+    return {**entry, 'protocols': dict(entry['protocols']), 'functions': dict(entry['functions']),
+            'msg_types': dict(entry['msg_types'])}
@@ -139,6 +139,32 @@ class CommandBuilder(ABC):
         """
         pass
 
+    def build_iq_capture_command(
+        self,
+        device: SDRDevice,
+        frequency_mhz: float,
+        sample_rate: int = 2400000,
+        gain: Optional[float] = None,
+        ppm: Optional[int] = None
+    ) -> list[str]:
+        """
+        Build raw IQ capture command (interleaved unsigned 8-bit I/Q on stdout).
+
+        Args:
+            device: The SDR device to use
+            frequency_mhz: Center frequency in MHz
+            sample_rate: IQ sample rate in samples/second
+            gain: Gain in dB (None for auto)
+            ppm: PPM frequency correction
+
+        Returns:
+            Command as list of strings for subprocess
+
+        Raises:
+            NotImplementedError: If the hardware has no 8-bit IQ capture tool
+        """
+        raise NotImplementedError(f'Raw IQ capture is not supported for {self.get_sdr_type().value}')
+
     @abstractmethod
     def get_capabilities(self) -> SDRCapabilities:
         """Return hardware capabilities for this SDR type."""
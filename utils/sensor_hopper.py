@@ -0,0 +1,159 @@
+"""
+Adaptive dwell schedule for hopping rtl_433 across ISM bands.
+
+One receiver can only listen on one band at a time (315, 345, 433.92, 868
+and 915 MHz are too far apart for a single capture). Bands are visited
+round-robin so every band is heard each cycle, but the time spent on each
+scales with its recent decode rate: a band's dwell runs from min_dwell for
+a silent band up to max_dwell for the busiest one. The recent rate is an
+exponentially weighted average of decodes per minute over past dwells, so
+a band that goes quiet gives its time back within a few cycles and a band
+that wakes up claims it just as quickly.
+
+Per-band totals (time listened, decodes, distinct devices) give the yield
+of each band in decodes per minute of listening.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Hashable
+
+DEFAULT_BANDS = (315.0, 345.0, 433.92, 868.0, 915.0)
+
+# Distinct devices remembered per band for the yield report
+MAX_DEVICES_PER_BAND = 1000
+
+
+@dataclass
+class BandStats:
+    """Listening time and decodes for one band."""
+    frequency_mhz: float
+    dwells: int = 0
+    listened: float = 0.0
+    decodes: int = 0
+    rate: float = 0.0  # recent decodes/minute (weighted over past dwells)
+    last_decode: float | None = None
+    devices: set[Hashable] = field(default_factory=set)
+    # Decodes during the dwell in progress
+    pending: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'frequency_mhz': self.frequency_mhz,
+            'dwells': self.dwells,
+            'listened': round(self.listened, 1),
+            'decodes': self.decodes,
+            'devices': len(self.devices),
+            'yield_per_minute': round(self.decodes * 60 / self.listened, 3) if self.listened else 0.0,
+            'recent_rate': round(self.rate, 3),
+            'last_decode': self.last_decode,
+        }
+
+
+class HopSchedule:
+    """Round-robin band order with dwell proportional to recent yield."""
+
+    def __init__(
+        self,
+        frequencies: list[float],
+        min_dwell: float = 15.0,
+        max_dwell: float = 90.0,
+        smoothing: float = 0.5,
+    ):
+        """
+        Initialize schedule.
+
+        Args:
+            frequencies: Band centre frequencies in MHz (visited in this order)
+            min_dwell: Seconds on a band with no recent traffic
+            max_dwell: Seconds on the band with the highest recent rate
+            smoothing: Weight of the latest dwell in each band's recent rate (0-1]
+
+        Raises:
+            ValueError: For an empty band list or inconsistent dwell times
+        """
+        if not frequencies:
+            raise ValueError('At least one frequency is required')
+        if not 0 < min_dwell <= max_dwell:
+            raise ValueError('Dwell times must satisfy 0 < min_dwell <= max_dwell')
+        if not 0 < smoothing <= 1:
+            raise ValueError('smoothing must be in (0, 1]')
+        self.bands = [BandStats(float(f)) for f in dict.fromkeys(frequencies)]
+        self.min_dwell = min_dwell
+        self.max_dwell = max_dwell
+        self.smoothing = smoothing
+        self.hops = 0
+        self._index = -1
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> BandStats | None:
+        return self.bands[self._index] if self._index >= 0 else None
+
+    def dwell_for(self, band: BandStats) -> float:
+        """Seconds the next visit to a band will last."""
+        busiest = max(b.rate for b in self.bands)
+        if busiest <= 0:
+            return self.min_dwell
+        return self.min_dwell + (self.max_dwell - self.min_dwell) * band.rate / busiest
+
+    def next_dwell(self) -> tuple[float, float]:
+        """
+        Move to the next band.
+
+        Returns:
+            (frequency in MHz, seconds to listen)
+        """
+        with self._lock:
+            self._index = (self._index + 1) % len(self.bands)
+            band = self.bands[self._index]
+            band.pending = 0
+            self.hops += 1
+            return band.frequency_mhz, self.dwell_for(band)
+
+    def record(self, device: Hashable | None = None, now: float | None = None) -> None:
+        """Count a decode on the current band (device: e.g. its registry key)."""
+        with self._lock:
+            band = self.current
+            if band is None:
+                return
+            band.pending += 1
+            band.decodes += 1
+            band.last_decode = time.time() if now is None else now
+            if device is not None and len(band.devices) < MAX_DEVICES_PER_BAND:
+                band.devices.add(device)
+
+    def finish(self, listened: float) -> None:
+        """End the current dwell after listening for `listened` seconds."""
+        with self._lock:
+            band = self.current
+            if band is None or listened <= 0:
+                return
+            band.dwells += 1
+            band.listened += listened
+            rate = band.pending * 60 / listened
+            band.rate = rate if band.dwells == 1 else (
+                self.smoothing * rate + (1 - self.smoothing) * band.rate
+            )
+            band.pending = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            current = self.current
+            listened = sum(b.listened for b in self.bands)
+            bands = []
+            for band in self.bands:
+                entry = band.to_dict()
+                entry['next_dwell'] = round(self.dwell_for(band), 1)
+                entry['share'] = round(band.listened / listened, 3) if listened else 0.0
+                bands.append(entry)
+            return {
+                'current': current.frequency_mhz if current else None,
+                'hops': self.hops,
+                'min_dwell': self.min_dwell,
+                'max_dwell': self.max_dwell,
+                'bands': bands,
+            }
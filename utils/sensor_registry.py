@@ -0,0 +1,295 @@
+"""
+Registry of rtl_433 devices with rolling per-field aggregates.
+
+Devices are keyed on (model, id, channel). Most 433 MHz sensors send every
+reading several times in a row; a reading identical to one accepted from
+the same device within the repeat window is counted but not passed on.
+
+Every numeric field of an accepted reading is added to three rings of time
+buckets (TIERS): 5 s buckets covering a minute, 1 min buckets covering an
+hour and 15 min buckets covering a day. Each ring is a set of fixed-size
+arrays (count, sum, min, max and the bucket's epoch), so memory per field
+is constant, old buckets are overwritten in place, and rolling min/max/mean
+over each window come from combining at most 96 buckets. The buckets
+double as a downsampled history the UI can chart without replaying raw
+events.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+# (name, bucket seconds, buckets): the window is their product
+TIERS: tuple[tuple[str, int, int], ...] = (
+    ('1m', 5, 12),
+    ('1h', 60, 60),
+    ('24h', 900, 96),
+)
+
+# rtl_433 keys that identify a device or describe the transmission, not a measurement
+_META_KEYS = frozenset({
+    'type', 'time', 'model', 'id', 'channel', 'mic', 'subtype', 'sequence', 'message_type', 'protocol',
+})
+# Keys that may change between repeats of one transmission
+_SIGNATURE_SKIP = frozenset({'type', 'time', 'rssi', 'snr', 'noise', 'freq', 'freq1', 'freq2'})
+
+
+def device_key(data: dict[str, Any]) -> tuple[str, str, str]:
+    """(model, id, channel) identifying the device that sent a reading."""
+    return (
+        str(data.get('model', 'Unknown')),
+        '' if data.get('id') is None else str(data['id']),
+        '' if data.get('channel') is None else str(data['channel']),
+    )
+
+
+def measurements(data: dict[str, Any]) -> dict[str, float]:
+    """Numeric fields of a reading (booleans and identity fields excluded)."""
+    return {
+        key: float(value) for key, value in data.items()
+        if key not in _META_KEYS and isinstance(value, (int, float)) and not isinstance(value, bool)
+        and math.isfinite(value)
+    }
+
+
+_UNUSED = -(1 << 62)
+
+
+class BucketRing:
+    """Fixed number of time buckets with count/sum/min/max each."""
+
+    __slots__ = ('width', 'size', 'epochs', 'counts', 'totals', 'lows', 'highs')
+
+    def __init__(self, width: int, size: int):
+        self.width = width
+        self.size = size
+        # Bucket number (ts // width) each slot holds; never-used slots sit far in the past
+        self.epochs = array('q', [_UNUSED]) * size
+        self.counts = array('l', [0]) * size
+        self.totals = array('d', [0.0]) * size
+        self.lows = array('d', [0.0]) * size
+        self.highs = array('d', [0.0]) * size
+
+    def add(self, ts: float, value: float) -> None:
+        epoch = int(ts // self.width)
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            if self.epochs[slot] > epoch:
+                # Older than anything this ring still covers
+                return
+            self.epochs[slot] = epoch
+            self.counts[slot] = 1
+            self.totals[slot] = self.lows[slot] = self.highs[slot] = value
+            return
+        self.counts[slot] += 1
+        self.totals[slot] += value
+        if value < self.lows[slot]:
+            self.lows[slot] = value
+        if value > self.highs[slot]:
+            self.highs[slot] = value
+
+    def _live_slots(self, now: float) -> list[int]:
+        oldest = int(now // self.width) - self.size
+        return [slot for slot in range(self.size) if self.epochs[slot] > oldest]
+
+    def summary(self, now: float) -> dict[str, Any] | None:
+        """min/max/mean/count over the ring's window, or None if empty."""
+        slots = self._live_slots(now)
+        if not slots:
+            return None
+        count = sum(self.counts[s] for s in slots)
+        return {
+            'min': min(self.lows[s] for s in slots),
+            'max': max(self.highs[s] for s in slots),
+            'mean': sum(self.totals[s] for s in slots) / count,
+            'count': count,
+        }
+
+    def series(self, now: float) -> list[list[float]]:
+        """[bucket start, min, max, mean, count] for each filled bucket, oldest first."""
+        slots = sorted(self._live_slots(now), key=lambda s: self.epochs[s])
+        return [[self.epochs[s] * self.width, self.lows[s], self.highs[s],
+                 self.totals[s] / self.counts[s], self.counts[s]] for s in slots]
+
+
+class FieldStats:
+    """Last value plus one BucketRing per tier for a measured field."""
+
+    __slots__ = ('last', 'last_time', 'rings')
+
+    def __init__(self, tiers: tuple[tuple[str, int, int], ...]):
+        self.last = 0.0
+        self.last_time = 0.0
+        self.rings = [BucketRing(width, size) for _, width, size in tiers]
+
+    def add(self, ts: float, value: float) -> None:
+        self.last = value
+        self.last_time = ts
+        for ring in self.rings:
+            ring.add(ts, value)
+
+
+class SensorDevice:
+    """State kept for one (model, id, channel)."""
+
+    __slots__ = ('key', 'first_seen', 'last_seen', 'count', 'repeats', 'last', 'fields',
+                 '_signature', '_signature_time')
+
+    def __init__(self, key: tuple[str, str, str], now: float):
+        self.key = key
+        self.first_seen = now
+        self.last_seen = now
+        self.count = 0
+        self.repeats = 0
+        self.last: dict[str, Any] = {}
+        self.fields: dict[str, FieldStats] = {}
+        self._signature: int | None = None
+        self._signature_time = 0.0
+
+
+class SensorRegistry:
+    """Thread-safe registry of rtl_433 devices."""
+
+    def __init__(
+        self,
+        repeat_window: float = 2.0,
+        max_devices: int = 500,
+        max_fields: int = 32,
+        tiers: tuple[tuple[str, int, int], ...] = TIERS,
+    ):
+        """
+        Initialize registry.
+
+        Args:
+            repeat_window: Seconds after a reading during which identical
+                readings from the same device are repeats (0 disables)
+            max_devices: Devices tracked at most (least recently heard evicted)
+            max_fields: Numeric fields aggregated per device at most
+            tiers: (name, bucket seconds, bucket count) per aggregate window
+        """
+        self.repeat_window = repeat_window
+        self.max_devices = max_devices
+        self.max_fields = max_fields
+        self.tiers = tiers
+        self.accepted = 0
+        self.repeats = 0
+        self._devices: OrderedDict[tuple[str, str, str], SensorDevice] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ingest(self, data: dict[str, Any], now: float | None = None) -> bool:
+        """
+        Record one rtl_433 reading.
+
+        Returns:
+            False if it repeats a reading accepted within the repeat window
+        """
+        if now is None:
+            now = time.time()
+        key = device_key(data)
+        signature = hash(tuple(sorted(
+            (k, repr(v)) for k, v in data.items() if k not in _SIGNATURE_SKIP
+        )))
+        with self._lock:
+            device = self._devices.get(key)
+            if device is None:
+                device = self._devices[key] = SensorDevice(key, now)
+                if len(self._devices) > self.max_devices:
+                    self._devices.popitem(last=False)
+            else:
+                self._devices.move_to_end(key)
+            device.last_seen = now
+
+            if (self.repeat_window > 0 and signature == device._signature
+                    and now - device._signature_time < self.repeat_window):
+                device.repeats += 1
+                self.repeats += 1
+                return False
+            device._signature = signature
+            device._signature_time = now
+
+            device.count += 1
+            device.last = {k: v for k, v in data.items() if k != 'type'}
+            for name, value in measurements(data).items():
+                stats = device.fields.get(name)
+                if stats is None:
+                    if len(device.fields) >= self.max_fields:
+                        continue
+                    stats = device.fields[name] = FieldStats(self.tiers)
+                stats.add(now, value)
+            self.accepted += 1
+            return True
+
+    def _describe(self, device: SensorDevice, now: float, series: str | None) -> dict[str, Any]:
+        model, device_id, channel = device.key
+        fields = {}
+        for name, stats in device.fields.items():
+            field: dict[str, Any] = {'last': stats.last, 'last_time': stats.last_time}
+            for (tier, _, _), ring in zip(self.tiers, stats.rings):
+                field[tier] = ring.summary(now)
+                if tier == series:
+                    field['series'] = ring.series(now)
+            fields[name] = field
+        return {
+            'model': model,
+            'id': device_id or None,
+            'channel': channel or None,
+            'first_seen': device.first_seen,
+            'last_seen': device.last_seen,
+            'count': device.count,
+            'repeats': device.repeats,
+            'last': device.last,
+            'fields': fields,
+        }
+
+    def devices(
+        self,
+        model: str | None = None,
+        device_id: str | None = None,
+        channel: str | None = None,
+        series: str | None = None,
+        limit: int | None = None,
+        now: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Devices, most recently heard first, with per-field aggregates.
+
+        Args:
+            model: Only this model
+            device_id: Only this id
+            channel: Only this channel
+            series: Also return the buckets of this tier (e.g. '1h')
+            limit: Return at most this many devices
+
+        Raises:
+            ValueError: For an unknown tier name
+        """
+        if series is not None and series not in {name for name, _, _ in self.tiers}:
+            raise ValueError(f'Unknown series: {series}')
+        if now is None:
+            now = time.time()
+        with self._lock:
+            selected = [
+                device for device in reversed(self._devices.values())
+                if (model is None or device.key[0] == model)
+                and (device_id is None or device.key[1] == device_id)
+                and (channel is None or device.key[2] == channel)
+            ][:limit]
+            return [self._describe(device, now, series) for device in selected]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._devices.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'devices': len(self._devices),
+            'accepted': self.accepted,
+            'repeats': self.repeats,
+            'repeat_window': self.repeat_window,
+            'tiers': [name for name, _, _ in self.tiers],
+        }
@@ -4,54 +4,398 @@ from __future__ import annotations
 
 import json
 import queue
+import threading
 import time
-from typing import Any, Generator
+from collections import OrderedDict, deque
+from typing import Any, Callable, Generator, Hashable
+
+DROP_OLDEST = 'drop_oldest'
+COALESCE = 'coalesce'
+
+
+def message_key(*fields: str) -> Callable[[dict[str, Any]], Hashable | None]:
+    """
+    Build a coalescing key function for BroadcastHub.
+
+    Messages sharing the same 'type', 'action' and identifying field
+    (the first of fields present) replace each other while still pending.
+    Messages without an identifying field are never coalesced.
+    """
+    def key(msg: dict[str, Any]) -> Hashable | None:
+        if not isinstance(msg, dict):
+            return None
+        for field in fields:
+            value = msg.get(field)
+            if value:
+                return (msg.get('type'), msg.get('action'), value)
+        return None
+    return key
+
+
+def merge_update(pending: dict[str, Any], newer: dict[str, Any]) -> dict[str, Any]:
+    """Coalescing merge for delta messages: newer fields win, older ones are kept."""
+    return {**pending, **newer}
+
+
+class SSESubscriber:
+    """Bounded ring buffer holding pending messages for a single SSE client."""
+
+    def __init__(
+        self,
+        maxlen: int = 1000,
+        policy: str = DROP_OLDEST,
+        key: Callable[[Any], Hashable | None] | None = None,
+        message_filter: Callable[[Any], bool] | None = None,
+        merge: Callable[[Any, Any], Any] | None = None
+    ):
+        """
+        Initialize subscriber buffer.
+
+        Args:
+            maxlen: Maximum number of pending messages before the oldest is dropped
+            policy: DROP_OLDEST, or COALESCE to replace pending messages with the same key
+            key: Key function used by the COALESCE policy
+            merge: Combines a pending message with its replacement when
+                coalescing (e.g. merge_update for delta messages)
+            message_filter: Optional predicate; messages it rejects are never queued
+        """
+        if policy == COALESCE and key is None:
+            raise ValueError("Coalesce policy requires a key function")
+        self.maxlen = maxlen
+        self.policy = policy
+        self._key = key
+        self.message_filter = message_filter
+        self._merge = merge
+        self._buffer: OrderedDict[Hashable, tuple[int | None, Any]] = OrderedDict()
+        self._counter = 0
+        self._cond = threading.Condition()
+        self.last_seq: int | None = None
+        self.dropped = 0
+        self.coalesced = 0
+        self.filtered = 0
+        self.high_water = 0
+
+    def put(self, msg: Any, seq: int | None = None) -> None:
+        """
+        Append a message, dropping the oldest one if the buffer is full.
+
+        Args:
+            msg: Message to deliver
+            seq: Hub sequence number, sent to the client as the SSE event id
+        """
+        if self.message_filter is not None and not self.message_filter(msg):
+            self.filtered += 1
+            return
+        with self._cond:
+            key = self._key(msg) if self._key is not None else None
+            if key is not None and key in self._buffer:
+                # Keep the original position and event id so coalesced updates
+                # are not starved and a resuming client never skips past them
+                first_seq, pending = self._buffer[key]
+                if self._merge is not None:
+                    msg = self._merge(pending, msg)
+                self._buffer[key] = (first_seq, msg)
+                self.coalesced += 1
+                return
+            if key is None:
+                self._counter += 1
+                key = self._counter
+            if len(self._buffer) >= self.maxlen:
+                self._buffer.popitem(last=False)
+                self.dropped += 1
+            self._buffer[key] = (seq, msg)
+            if len(self._buffer) > self.high_water:
+                self.high_water = len(self._buffer)
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None) -> Any:
+        """
+        Pop the next pending message and record its sequence number in last_seq.
+
+        Raises:
+            queue.Empty: If no message arrived within timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._buffer, timeout):
+                raise queue.Empty
+            seq, msg = self._buffer.popitem(last=False)[1]
+            self.last_seq = seq
+            return msg
+
+    def clear(self) -> int:
+        """Discard all pending messages."""
+        with self._cond:
+            count = len(self._buffer)
+            self._buffer.clear()
+            return count
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+
+class BroadcastHub:
+    """
+    Fan-out message hub for SSE streams.
+
+    Decoder threads call put() exactly as they would on a queue.Queue, and
+    every connected client receives its own copy of each message. Publishing
+    never blocks: a slow client only loses its own oldest messages, or with
+    the COALESCE policy has stale updates replaced by newer ones.
+
+    Every message gets a monotonically increasing sequence number and is kept
+    in a bounded replay ring, so a reconnecting client can resume from its
+    Last-Event-ID instead of reloading full state.
+    """
+
+    def __init__(
+        self,
+        name: str = 'sse',
+        subscriber_maxlen: int = 1000,
+        policy: str = DROP_OLDEST,
+        key: Callable[[Any], Hashable | None] | None = None,
+        replay_size: int = 1000,
+        merge: Callable[[Any, Any], Any] | None = None
+    ):
+        """
+        Initialize broadcast hub.
+
+        Args:
+            name: Name for status reporting
+            subscriber_maxlen: Ring buffer size for each subscriber
+            policy: Overflow policy for subscriber buffers (DROP_OLDEST or COALESCE)
+            key: Key function for the COALESCE policy (see message_key)
+            replay_size: Number of recent messages kept for Last-Event-ID resume
+            merge: Combines coalesced messages instead of replacing them (see merge_update)
+        """
+        if policy not in (DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        if policy == COALESCE and key is None:
+            raise ValueError("Coalesce policy requires a key function")
+        self.name = name
+        self.subscriber_maxlen = subscriber_maxlen
+        self.policy = policy
+        self._key = key
+        self._merge = merge
+        self._subscribers: tuple[SSESubscriber, ...] = ()
+        self._lock = threading.Lock()
+        # Seeded from the clock so ids issued after a restart sort after old ones
+        self._seq = int(time.time() * 1000)
+        self._replay: deque[tuple[int, Any]] = deque(maxlen=replay_size)
+        self.enqueued = 0
+        self.undelivered = 0
+        # Counters from subscribers that have already disconnected
+        self._retired_dropped = 0
+        self._retired_coalesced = 0
+        self._retired_filtered = 0
+        self._high_water = 0
+
+    def subscribe(
+        self,
+        last_event_id: int | None = None,
+        message_filter: Callable[[Any], bool] | None = None
+    ) -> SSESubscriber:
+        """
+        Register a new client and return its buffer.
+
+        Args:
+            last_event_id: Sequence number of the last event the client saw.
+                Newer messages still in the replay ring are queued first.
+            message_filter: Only queue messages this predicate accepts
+                (e.g. aircraft inside the client's map viewport)
+        """
+        subscriber = SSESubscriber(
+            maxlen=self.subscriber_maxlen,
+            policy=self.policy,
+            key=self._key,
+            message_filter=message_filter,
+            merge=self._merge,
+        )
+        with self._lock:
+            if last_event_id is not None:
+                for seq, msg in self._replay:
+                    if seq > last_event_id:
+                        subscriber.put(msg, seq)
+            self._subscribers = self._subscribers + (subscriber,)
+        return subscriber
+
+    def unsubscribe(self, subscriber: SSESubscriber) -> None:
+        """Remove a client buffer."""
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscriber)
+            self._retired_dropped += subscriber.dropped
+            self._retired_coalesced += subscriber.coalesced
+            self._retired_filtered += subscriber.filtered
+            self._high_water = max(self._high_water, subscriber.high_water)
+
+    def put(self, msg: Any, block: bool = True, timeout: float | None = None) -> None:
+        """Publish a message to every subscriber (queue.Queue compatible)."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._replay.append((seq, msg))
+            subscribers = self._subscribers
+            self.enqueued += 1
+            if not subscribers:
+                self.undelivered += 1
+        for subscriber in subscribers:
+            subscriber.put(msg, seq)
+
+    def put_nowait(self, msg: Any) -> None:
+        """Publish a message to every subscriber."""
+        self.put(msg)
+
+    def clear(self) -> int:
+        """Discard pending messages for all subscribers and the replay ring."""
+        with self._lock:
+            self._replay.clear()
+        return sum(s.clear() for s in self._subscribers)
+
+    def qsize(self) -> int:
+        """Largest backlog of any subscriber."""
+        return max((len(s) for s in self._subscribers), default=0)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get queue counters for status reporting.
+
+        Returns:
+            Dict with enqueued, dropped, coalesced, filtered, undelivered (no
+            subscriber connected), high_water and current pending counts
+        """
+        with self._lock:
+            subscribers = self._subscribers
+            dropped = self._retired_dropped
+            coalesced = self._retired_coalesced
+            filtered = self._retired_filtered
+            high_water = self._high_water
+            enqueued = self.enqueued
+            undelivered = self.undelivered
+
+        for subscriber in subscribers:
+            dropped += subscriber.dropped
+            coalesced += subscriber.coalesced
+            filtered += subscriber.filtered
+            high_water = max(high_water, subscriber.high_water)
+
+        return {
+            'name': self.name,
+            'policy': self.policy,
+            'maxsize': self.subscriber_maxlen,
+            'subscribers': len(subscribers),
+            'enqueued': enqueued,
+            'dropped': dropped,
+            'coalesced': coalesced,
+            'filtered': filtered,
+            'undelivered': undelivered,
+            'high_water': high_water,
+            'pending': max((len(s) for s in subscribers), default=0),
+        }
 
 
 def sse_stream(
-    data_queue: queue.Queue,
+    data_queue: queue.Queue | BroadcastHub,
     timeout: float = 1.0,
     keepalive_interval: float = 30.0,
-    stop_check: callable = None
+    stop_check: callable = None,
+    last_event_id: int | None = None,
+    batch: bool = False,
+    batch_max_count: int = 200,
+    batch_max_bytes: int = 64 * 1024,
+    batch_max_delay: float = 0.025,
+    message_filter: Callable[[Any], bool] | None = None
 ) -> Generator[str, None, None]:
     """
-    Generate SSE stream from a queue.
+    Generate SSE stream from a queue or broadcast hub.
 
     Args:
-        data_queue: Queue to read messages from
+        data_queue: Queue to read messages from, or hub to subscribe to
         timeout: Queue get timeout in seconds
         keepalive_interval: Seconds between keepalive messages
         stop_check: Optional callable that returns True to stop the stream
+        last_event_id: Resume a hub stream after this event id (Last-Event-ID)
+        batch: Send pending messages as one event with a JSON array payload
+        batch_max_count: Maximum messages per batched event
+        batch_max_bytes: Maximum encoded payload size per batched event
+        batch_max_delay: Seconds to wait for more messages after the first
+        message_filter: Per-client predicate for hub streams; rejected messages
+            are never queued for this client
 
     Yields:
         SSE formatted strings
     """
+    if isinstance(data_queue, BroadcastHub):
+        subscriber = data_queue.subscribe(last_event_id=last_event_id, message_filter=message_filter)
+    else:
+        subscriber = None
+    source = data_queue if subscriber is None else subscriber
     last_keepalive = time.time()
 
-    while True:
-        # Check if we should stop
-        if stop_check and stop_check():
-            break
+    try:
+        while True:
+            # Check if we should stop
+            if stop_check and stop_check():
+                break
+
+            try:
+                msg = source.get(timeout=timeout)
+                last_keepalive = time.time()
+                if batch:
+                    msg = _drain_batch(source, msg, batch_max_count, batch_max_bytes, batch_max_delay)
+                yield format_sse(msg, event_id=None if subscriber is None else subscriber.last_seq)
+            except queue.Empty:
+                # Send keepalive if enough time has passed
+                now = time.time()
+                if now - last_keepalive >= keepalive_interval:
+                    yield format_sse({'type': 'keepalive'})
+                    last_keepalive = now
+    finally:
+        if subscriber is not None:
+            data_queue.unsubscribe(subscriber)
+
+
+def _drain_batch(
+    source: queue.Queue | SSESubscriber,
+    first: Any,
+    max_count: int,
+    max_bytes: int,
+    max_delay: float
+) -> str:
+    """Collect messages following first into a JSON array string."""
+    encoded = [json.dumps(first)]
+    size = len(encoded[0])
+    deadline = time.monotonic() + max_delay
 
+    while len(encoded) < max_count and size < max_bytes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
         try:
-            msg = data_queue.get(timeout=timeout)
-            last_keepalive = time.time()
-            yield format_sse(msg)
+            item = json.dumps(source.get(timeout=remaining))
         except queue.Empty:
-            # Send keepalive if enough time has passed
-            now = time.time()
-            if now - last_keepalive >= keepalive_interval:
-                yield format_sse({'type': 'keepalive'})
-                last_keepalive = now
+            break
+        encoded.append(item)
+        size += len(item) + 1
 
+    return '[' + ','.join(encoded) + ']'
 
-def format_sse(data: dict[str, Any] | str, event: str | None = None) -> str:
+
+def format_sse(data: dict[str, Any] | str, event: str | None = None, event_id: int | None = None) -> str:
     """
     Format data as SSE message.
 
     Args:
         data: Data to send (will be JSON encoded if dict)
         event: Optional event name
+        event_id: Optional event id, echoed back by browsers as Last-Event-ID
 
     Returns:
         SSE formatted string
@@ -60,6 +404,8 @@ def format_sse(data: dict[str, Any] | str, event: str | None = None) -> str:
         data = json.dumps(data)
 
     lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
     if event:
         lines.append(f"event: {event}")
     lines.append(f"data: {data}")
@@ -69,16 +415,19 @@ def format_sse(data: dict[str, Any] | str, event: str | None = None) -> str:
     return '\n'.join(lines)
 
 
-def clear_queue(q: queue.Queue) -> int:
+def clear_queue(q: queue.Queue | BroadcastHub) -> int:
     """
     Clear all items from a queue.
 
     Args:
-        q: Queue to clear
+        q: Queue or broadcast hub to clear
 
     Returns:
         Number of items cleared
     """
+    if isinstance(q, BroadcastHub):
+        return q.clear()
+
     count = 0
     while True:
         try:
@@ -87,3 +436,29 @@ def clear_queue(q: queue.Queue) -> int:
         except queue.Empty:
             break
     return count
+
+
+def negotiate_stream(request: Any) -> dict[str, Any]:
+    """
+    Get sse_stream options requested by the client.
+
+    Clients opt into batching with ?batch=1. Reconnecting EventSource clients
+    send a Last-Event-ID header; ?last_event_id= is accepted for clients that
+    open a fresh EventSource after an error.
+
+    Args:
+        request: Flask request
+
+    Returns:
+        Keyword arguments for sse_stream
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    return {
+        'batch': request.args.get('batch') == '1',
+        'last_event_id': last_event_id,
+    }
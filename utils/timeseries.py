@@ -0,0 +1,250 @@
+"""
+In-memory numeric time series for charts (sensor readings, RSSI).
+
+Each series is a pair of columns, timestamps and values, held in
+array('d') so a point costs 16 bytes and range lookups are a bisect on
+the timestamp column. Series are capped by point count and age; trimming
+is done in chunks so appends stay amortised O(1).
+
+Queries never return more than the requested number of points, however
+wide the range:
+
+- 'lttb' (Largest-Triangle-Three-Buckets) keeps the points that preserve
+  the visual shape of the line, one per bucket plus both end points.
+- 'minmax' splits the range into equal time buckets and keeps each
+  bucket's lowest and highest point, so spikes are never lost.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any
+
+METHODS = ('lttb', 'minmax')
+
+
+def lttb(times: array, values: array, points: int) -> tuple[list[float], list[float]]:
+    """
+    Downsample to at most `points` points with Largest-Triangle-Three-Buckets.
+
+    Args:
+        times: Timestamps, ascending
+        values: Values matching times
+        points: Points wanted (at least 3 to downsample)
+
+    Returns:
+        (times, values) of the selected points
+    """
+    n = len(times)
+    if n <= points:
+        return list(times), list(values)
+    if points < 3:
+        return minmax(times, values, points)
+
+    out_t = [times[0]]
+    out_v = [values[0]]
+    every = (n - 2) / (points - 2)
+    a = 0
+    for i in range(points - 2):
+        # Average of the next bucket is the third corner of the triangle
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = avg_end - avg_start
+        avg_t = sum(times[avg_start:avg_end]) / span
+        avg_v = sum(values[avg_start:avg_end]) / span
+
+        at = times[a]
+        av = values[a]
+        dt = at - avg_t
+        dv = avg_v - av
+        best = -1.0
+        best_index = start = int(i * every) + 1
+        for j in range(start, int((i + 1) * every) + 1):
+            area = abs(dt * (values[j] - av) - (at - times[j]) * dv)
+            if area > best:
+                best = area
+                best_index = j
+        out_t.append(times[best_index])
+        out_v.append(values[best_index])
+        a = best_index
+
+    out_t.append(times[n - 1])
+    out_v.append(values[n - 1])
+    return out_t, out_v
+
+
+def minmax(times: array, values: array, points: int) -> tuple[list[float], list[float]]:
+    """
+    Downsample to at most `points` points keeping each time bucket's extremes.
+
+    Args:
+        times: Timestamps, ascending
+        values: Values matching times
+        points: Points wanted (two per bucket)
+
+    Returns:
+        (times, values) of the selected points
+    """
+    n = len(times)
+    if n <= points:
+        return list(times), list(values)
+    if points < 2:
+        return list(times[-points:]), list(values[-points:])
+    buckets = points // 2
+    first = times[0]
+    width = (times[n - 1] - first) / buckets or 1.0
+    out_t: list[float] = []
+    out_v: list[float] = []
+    lo = 0
+    for b in range(1, buckets + 1):
+        hi = n if b == buckets else bisect_left(times, first + b * width, lo)
+        if hi > lo:
+            low = min(range(lo, hi), key=values.__getitem__)
+            high = max(range(lo, hi), key=values.__getitem__)
+            for index in sorted({low, high}):
+                out_t.append(times[index])
+                out_v.append(values[index])
+        lo = hi
+    return out_t, out_v
+
+
+class TimeSeries:
+    """One series: timestamp and value columns."""
+
+    __slots__ = ('times', 'values')
+
+    def __init__(self):
+        self.times = array('d')
+        self.values = array('d')
+
+    def append(self, ts: float, value: float) -> None:
+        if not self.times or ts >= self.times[-1]:
+            self.times.append(ts)
+            self.values.append(value)
+        else:
+            # Late point: keep the columns sorted
+            index = bisect_right(self.times, ts)
+            self.times.insert(index, ts)
+            self.values.insert(index, value)
+
+    def drop_before(self, index: int) -> None:
+        del self.times[:index]
+        del self.values[:index]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+class TimeSeriesStore:
+    """Thread-safe collection of named series."""
+
+    def __init__(self, max_series: int = 1000, max_points: int = 20000, retention: float = 7 * 86400.0):
+        """
+        Initialize store.
+
+        Args:
+            max_series: Series kept at most (least recently updated evicted)
+            max_points: Points kept per series (oldest dropped)
+            retention: Seconds of points kept (0 keeps them until max_points)
+        """
+        self.max_series = max_series
+        self.max_points = max_points
+        self.retention = retention
+        self.recorded = 0
+        self._series: OrderedDict[str, TimeSeries] = OrderedDict()
+        self._lock = threading.Lock()
+        # Trim in chunks: let a series overshoot by this much before cutting
+        self._slack_points = max(max_points // 8, 1)
+        self._slack_seconds = retention / 8
+
+    def record(self, name: str, value: float, ts: float | None = None) -> None:
+        """Append a point to a series (created on first use)."""
+        if ts is None:
+            ts = time.time()
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = TimeSeries()
+                if len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+            else:
+                self._series.move_to_end(name)
+            series.append(ts, float(value))
+            self.recorded += 1
+
+            times = series.times
+            if len(times) > self.max_points + self._slack_points:
+                series.drop_before(len(times) - self.max_points)
+            if self.retention > 0 and times[0] < ts - self.retention - self._slack_seconds:
+                series.drop_before(bisect_left(times, ts - self.retention))
+
+    def query(
+        self,
+        name: str,
+        start: float | None = None,
+        end: float | None = None,
+        points: int = 500,
+        method: str = 'lttb',
+    ) -> dict[str, Any] | None:
+        """
+        Points of a series between start and end, downsampled to at most `points`.
+
+        Args:
+            name: Series name
+            start: Earliest timestamp (default: oldest point)
+            end: Latest timestamp (default: newest point)
+            points: Most points to return
+            method: 'lttb' or 'minmax'
+
+        Returns:
+            {'t': [...], 'v': [...], 'total': points in range} or None for an
+            unknown series
+
+        Raises:
+            ValueError: For an unknown method or a non-positive point count
+        """
+        if method not in METHODS:
+            raise ValueError(f'Unknown method: {method}')
+        if points < 1:
+            raise ValueError('points must be positive')
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return None
+            lo = 0 if start is None else bisect_left(series.times, start)
+            hi = len(series) if end is None else bisect_right(series.times, end)
+            # Copy the range out so downsampling runs without the lock
+            times = series.times[lo:hi]
+            values = series.values[lo:hi]
+        if method == 'lttb':
+            out_t, out_v = lttb(times, values, points)
+        else:
+            out_t, out_v = minmax(times, values, points)
+        return {'t': out_t, 'v': out_v, 'total': len(times)}
+
+    def names(self, prefix: str = '') -> list[dict[str, Any]]:
+        """Series (optionally only those starting with prefix) with point counts and time span."""
+        with self._lock:
+            return [
+                {'name': name, 'points': len(series), 'first': series.times[0], 'last': series.times[-1]}
+                for name, series in self._series.items()
+                if name.startswith(prefix) and len(series)
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'series': len(self._series),
+                'points': sum(len(series) for series in self._series.values()),
+                'recorded': self.recorded,
+                'max_points': self.max_points,
+                'retention': self.retention,
+            }